@@ -0,0 +1,177 @@
+"""
+Reutilización del mundo natural entre episodios
+Genera el mundo (DefaultWorldGenerator con semilla) una sola vez y varía el
+punto de inicio en vez de regenerar todo el terreno en cada misión
+
+- Primera misión de la ejecución: forceReset="true" (genera el mundo)
+- Misiones siguientes: forceReset="false" + Placement en un spawn válido
+- Spawns válidos: se sondean una vez con /spreadplayers (superficie) y se
+  guardan en spawns_<seed>.json; se descartan agua, lava, hojas y puntos
+  bajo el nivel del mar o con agua en la rejilla cercana
+- El inventario se limpia con /clear al inicio de cada episodio
+
+Autor: Sistema de IA
+"""
+
+import json
+import math
+import os
+import random
+import time
+
+
+# Nivel del mar en mundos por defecto: por debajo suele ser cueva o agua
+ALTURA_MINIMA = 63
+
+# Bloques donde no se permite iniciar un episodio
+BLOQUES_LIQUIDOS = {"water", "flowing_water", "lava", "flowing_lava"}
+BLOQUES_NO_VALIDOS = BLOQUES_LIQUIDOS | {"leaves", "leaves2", "cactus", "ice", "packed_ice", "fire"}
+
+# Rejilla near5x3x5 (y de -1 a 1): centro de la capa bajo los pies y de los pies
+IDX_BAJO_PIES = 12
+IDX_PIES = 37
+
+
+def candidatos_spawn(seed, cantidad=40, radio=100):
+    """
+    Columnas (x, z) candidatas, deterministas por semilla
+
+    Retorna:
+    --------
+    list: [(x, z), ...] enteros dentro de un cuadrado de lado 2*radio
+    """
+    rng = random.Random(seed)
+    return [(rng.randint(-radio, radio), rng.randint(-radio, radio)) for _ in range(cantidad)]
+
+
+def es_spawn_valido(obs, x, z, tolerancia=1.5):
+    """
+    Verifica que la observación tras /spreadplayers sea un buen inicio
+
+    Parámetros:
+    -----------
+    obs: dict
+        Observación JSON (ObservationFromFullStats + near5x3x5)
+    x, z: int
+        Columna pedida (el teleport debe haber llegado cerca)
+    """
+    if abs(obs.get("XPos", 1e9) - x - 0.5) > tolerancia or abs(obs.get("ZPos", 1e9) - z - 0.5) > tolerancia:
+        return False
+    if obs.get("YPos", 0) < ALTURA_MINIMA:
+        return False
+    grid = obs.get("near5x3x5", [])
+    if len(grid) < 75:
+        return False
+    if grid[IDX_BAJO_PIES] in BLOQUES_NO_VALIDOS or grid[IDX_BAJO_PIES] == "air":
+        return False
+    if grid[IDX_PIES] in BLOQUES_NO_VALIDOS:
+        return False
+    # Con agua al lado el episodio terminaría en el primer paso
+    return not any(bloque in BLOQUES_LIQUIDOS for bloque in grid)
+
+
+def sondear_spawns(agent_host, candidatos, espera=0.5):
+    """
+    Recorre las columnas candidatas con /spreadplayers (deja al agente en el
+    bloque más alto sin líquido) y se queda con las posiciones válidas
+
+    Requiere <ChatCommands/> y la rejilla near5x3x5 en la misión
+
+    Retorna:
+    --------
+    list: [(x, y, z), ...] posiciones exactas de inicio
+    """
+    spawns = []
+    for x, z in candidatos:
+        agent_host.sendCommand(f"chat /spreadplayers {x + 0.5} {z + 0.5} 0 1 false @p")
+        time.sleep(espera)
+        world_state = agent_host.getWorldState()
+        if not world_state.is_mission_running:
+            break
+        if world_state.number_of_observations_since_last_state == 0:
+            continue
+        obs = json.loads(world_state.observations[-1].text)
+        if es_spawn_valido(obs, x, z):
+            spawns.append((math.floor(obs["XPos"]) + 0.5, obs["YPos"], math.floor(obs["ZPos"]) + 0.5))
+    return spawns
+
+
+def ruta_spawns(seed, directorio=None):
+    directorio = directorio or os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(directorio, f"spawns_{seed}.json")
+
+
+def cargar_spawns(seed, directorio=None):
+    """Spawns guardados para la semilla (lista vacía si no hay archivo)"""
+    ruta = ruta_spawns(seed, directorio)
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta) as f:
+        return [tuple(p) for p in json.load(f)["spawns"]]
+
+
+def guardar_spawns(seed, spawns, directorio=None):
+    with open(ruta_spawns(seed, directorio), "w") as f:
+        json.dump({"seed": seed, "spawns": spawns}, f, indent=2)
+
+
+class MundoReutilizable:
+    """
+    Decide por episodio si hay que generar el mundo y dónde empieza el agente
+    """
+
+    def __init__(self, seed=123456, cantidad_candidatos=40, radio=100, directorio=None):
+        """
+        Parámetros:
+        -----------
+        seed: int
+            Semilla del DefaultWorldGenerator (fija durante toda la ejecución)
+        cantidad_candidatos, radio:
+            Columnas a sondear si no hay spawns guardados para la semilla
+        directorio: str o None
+            Dónde guardar spawns_<seed>.json (None = junto a este archivo)
+        """
+        self.seed = seed
+        self.cantidad_candidatos = cantidad_candidatos
+        self.radio = radio
+        self.directorio = directorio
+        self.spawns = cargar_spawns(seed, directorio)
+        self.rng = random.Random(seed)
+        self.mundo_generado = False  # El cliente ya tiene el mundo de esta ejecución
+        self.spawn_actual = None
+
+    def parametros_mision(self):
+        """
+        Retorna:
+        --------
+        dict: forceReset y spawn para obtener_mision_xml
+        """
+        if not self.mundo_generado or not self.spawns:
+            # Primera misión: generar el mundo; spawn natural y luego /tp
+            self.spawn_actual = None
+            return {"force_reset": True, "spawn": None}
+        self.spawn_actual = self.rng.choice(self.spawns)
+        return {"force_reset": False, "spawn": self.spawn_actual}
+
+    def preparar_episodio(self, agent_host):
+        """
+        Llamar apenas empieza la misión: sondea spawns si hace falta, lleva al
+        agente a un spawn válido (solo en la misión que generó el mundo) y
+        limpia el inventario
+        """
+        if not self.mundo_generado:
+            self.mundo_generado = True
+            if not self.spawns:
+                print(f"🔎 Sondeando {self.cantidad_candidatos} spawns (una sola vez por semilla)...")
+                inicio = time.time()
+                candidatos = candidatos_spawn(self.seed, self.cantidad_candidatos, self.radio)
+                self.spawns = sondear_spawns(agent_host, candidatos)
+                print(f"   {len(self.spawns)} spawns válidos en {time.time() - inicio:.1f}s")
+                if self.spawns:
+                    guardar_spawns(self.seed, self.spawns, self.directorio)
+            if self.spawns:
+                x, y, z = self.rng.choice(self.spawns)
+                agent_host.sendCommand(f"chat /tp @p {x} {y} {z}")
+                self.spawn_actual = (x, y, z)
+        agent_host.sendCommand("chat /clear")
+        time.sleep(0.2)
@@ -8,6 +8,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pickle
 
+from tabla_q import TablaQ, top_estados, distribucion_acciones, estadisticas_valores
+
 
 def graficar_aprendizaje(modelo_path="modelo_agente_agua.pkl", guardar=True):
     """
@@ -111,7 +113,8 @@ def analizar_tabla_q(modelo_path="modelo_agente_agua.pkl", top_n=10):
         print(f"❌ No se encontró el archivo: {modelo_path}")
         return
     
-    Q = datos['Q']
+    # Acepta el formato compacto y el anterior (dict estado -> array)
+    Q = TablaQ.desde_datos(datos['Q'], 4)
     
     print("\n" + "="*80)
     print("📊 ANÁLISIS DE LA TABLA Q")
@@ -121,21 +124,11 @@ def analizar_tabla_q(modelo_path="modelo_agente_agua.pkl", top_n=10):
     # Acciones
     acciones_nombres = ["move 1", "turn 1", "turn -1", "jumpmove 1"]
     
-    # Encontrar estados con mayor valor Q
-    valores_maximos = []
-    for estado, valores_q in Q.items():
-        max_q = np.max(valores_q)
-        mejor_accion = np.argmax(valores_q)
-        valores_maximos.append((estado, max_q, mejor_accion, valores_q))
-    
-    # Ordenar por valor Q máximo
-    valores_maximos.sort(key=lambda x: x[1], reverse=True)
-    
     print(f"\n🏆 Top {top_n} estados con mayor valor Q:\n")
     print(f"{'#':<4} {'Estado':<50} {'Mejor Acción':<15} {'Max Q':>10}")
     print("-" * 80)
     
-    for i, (estado, max_q, mejor_accion, valores_q) in enumerate(valores_maximos[:top_n]):
+    for i, (estado, max_q, mejor_accion) in enumerate(top_estados(Q, top_n)):
         estado_str = str(estado)
         if len(estado_str) > 47:
             estado_str = estado_str[:44] + "..."
@@ -147,27 +140,21 @@ def analizar_tabla_q(modelo_path="modelo_agente_agua.pkl", top_n=10):
     print("📈 ESTADÍSTICAS DE VALORES Q")
     print("="*80)
     
-    todos_valores = []
-    for valores_q in Q.values():
-        todos_valores.extend(valores_q)
-    
-    if todos_valores:
-        print(f"Valor Q promedio: {np.mean(todos_valores):.4f}")
-        print(f"Valor Q máximo: {np.max(todos_valores):.4f}")
-        print(f"Valor Q mínimo: {np.min(todos_valores):.4f}")
-        print(f"Desviación estándar: {np.std(todos_valores):.4f}")
+    stats = estadisticas_valores(Q)
+    if stats:
+        print(f"Valor Q promedio: {stats['media']:.4f}")
+        print(f"Valor Q máximo: {stats['max']:.4f}")
+        print(f"Valor Q mínimo: {stats['min']:.4f}")
+        print(f"Desviación estándar: {stats['std']:.4f}")
     
     # Distribución de acciones preferidas
     print("\n" + "="*80)
     print("🎯 DISTRIBUCIÓN DE ACCIONES PREFERIDAS")
     print("="*80)
     
-    acciones_conteo = [0, 0, 0, 0]
-    for valores_q in Q.values():
-        mejor_accion = np.argmax(valores_q)
-        acciones_conteo[mejor_accion] += 1
+    acciones_conteo = distribucion_acciones(Q)
     
-    total = sum(acciones_conteo)
+    total = int(acciones_conteo.sum())
     for i, (nombre, count) in enumerate(zip(acciones_nombres, acciones_conteo)):
         porcentaje = 100 * count / total if total > 0 else 0
         barra = "█" * int(porcentaje / 2)
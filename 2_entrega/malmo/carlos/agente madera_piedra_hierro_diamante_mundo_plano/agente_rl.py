@@ -12,6 +12,8 @@ import json
 import pickle
 from collections import defaultdict
 
+from analisis_grid import analizar_observacion, MATERIALES_FASE, ITEMS_SUFICIENTES_FASE
+
 
 class AgenteQLearningProgresivo:
     """
@@ -132,11 +134,14 @@ class AgenteQLearningProgresivo:
         distancia_material = 0
         mirando_material = False
         
-        # Analizar rejilla 5x5x5 (125 bloques)
+        # Analizar rejilla 5x5x5 (125 bloques), compartido con el entorno
         grid = obs.get('floor3x3', [])
-        if len(grid) == 125:
-            material_cerca, material_frente, distancia_material, mirando_material = \
-                self._analizar_grid_material(grid, orientacion, materiales_objetivo)
+        objetivo = analizar_observacion(obs).objetivo(fase_actual)
+        if objetivo.cerca:
+            material_cerca = True
+            material_frente = objetivo.frente[orientacion]
+            distancia_material = objetivo.distancia
+            mirando_material = objetivo.mirando[orientacion]
         
         # 6-7. Obstáculos y aire frente
         obstaculo_frente = False
@@ -185,107 +190,19 @@ class AgenteQLearningProgresivo:
     
     def _obtener_materiales_objetivo(self, fase):
         """Retorna lista de materiales a buscar según la fase"""
-        if fase == 0:  # MADERA
-            return ['log', 'log2', 'oak_wood', 'spruce_wood', 'birch_wood', 
-                    'jungle_wood', 'acacia_wood', 'dark_oak_wood']
-        elif fase == 1:  # PIEDRA
-            return ['stone', 'cobblestone']
-        elif fase == 2:  # HIERRO
-            return ['iron_ore']
-        elif fase == 3:  # DIAMANTE
-            return ['diamond_ore']
-        return []
-    
-    def _analizar_grid_material(self, grid, orientacion, materiales_objetivo):
-        """
-        Analiza la rejilla 5x5x5 buscando materiales objetivo
-        
-        Returns:
-        --------
-        tuple: (material_cerca, material_frente, distancia, mirando_material)
-        """
-        material_cerca = False
-        material_frente = False
-        distancia_material = 0  # 0: lejos, 1: medio, 2: cerca
-        mirando_material = False
-        
-        # Mapeo de orientación a dirección de búsqueda
-        # 0: Norte (-Z), 1: Este (+X), 2: Sur (+Z), 3: Oeste (-X)
-        
-        # Índices de la rejilla (5x5x5 = 125 bloques)
-        # Centro: (2, 2, 2) = índice 62
-        # Capa Y=0 (inferior): 0-24
-        # Capa Y=1 (media inferior): 25-49
-        # Capa Y=2 (centro): 50-74
-        # Capa Y=3 (media superior): 75-99
-        # Capa Y=4 (superior): 100-124
-        
-        # Buscar en capa central y adyacentes
-        for y_offset in range(5):
-            for x in range(5):
-                for z in range(5):
-                    idx = y_offset * 25 + z * 5 + x
-                    if idx >= len(grid):
-                        continue
-                    
-                    bloque = grid[idx]
-                    if bloque in materiales_objetivo:
-                        material_cerca = True
-                        
-                        # Calcular distancia Manhattan desde centro (2,2,2)
-                        dist = abs(x - 2) + abs(y_offset - 2) + abs(z - 2)
-                        
-                        if dist <= 2:
-                            distancia_material = 2  # Muy cerca
-                        elif dist <= 4:
-                            distancia_material = max(distancia_material, 1)  # Medio
-                        
-                        # Verificar si está frente según orientación
-                        if orientacion == 0 and z < 2 and abs(x - 2) <= 1:  # Norte
-                            material_frente = True
-                            if x == 2 and z == 1:
-                                mirando_material = True
-                        elif orientacion == 1 and x > 2 and abs(z - 2) <= 1:  # Este
-                            material_frente = True
-                            if z == 2 and x == 3:
-                                mirando_material = True
-                        elif orientacion == 2 and z > 2 and abs(x - 2) <= 1:  # Sur
-                            material_frente = True
-                            if x == 2 and z == 3:
-                                mirando_material = True
-                        elif orientacion == 3 and x < 2 and abs(z - 2) <= 1:  # Oeste
-                            material_frente = True
-                            if z == 2 and x == 1:
-                                mirando_material = True
-        
-        return material_cerca, material_frente, distancia_material, mirando_material
+        return list(MATERIALES_FASE.get(fase, ()))
     
     def _verificar_inventario_suficiente(self, obs, fase):
         """Verifica si tiene suficiente material para la fase actual"""
         cantidad_requerida = {
             0: 3,  # 3 madera
             1: 3,  # 3 piedra
-            2: 3,  # 3 hierro
+            2: 3,  # 3 hierro (mineral o lingote)
             3: 1,  # 1 diamante
         }
         
-        materiales = self._obtener_materiales_objetivo(fase)
-        count = 0
-        
-        # Contar en inventario (slots 0-44)
-        for slot in range(45):
-            item_key = f'InventorySlot_{slot}_item'
-            size_key = f'InventorySlot_{slot}_size'
-            
-            if item_key in obs:
-                item = obs[item_key]
-                size = obs.get(size_key, 1)
-                
-                # Caso especial: hierro se convierte a lingote
-                if fase == 2 and item == 'iron_ingot':
-                    count += size
-                elif item in materiales:
-                    count += size
+        analisis = analizar_observacion(obs)
+        count = analisis.cantidad(ITEMS_SUFICIENTES_FASE.get(fase, ()))
         
         return count >= cantidad_requerida.get(fase, 999)
     
@@ -0,0 +1,207 @@
+"""
+Análisis vectorizado de la observación (rejilla floor3x3 + inventario)
+
+El estado (AgenteQLearningProgresivo) y la recompensa (EntornoMalmoProgresivo)
+recorrían la rejilla 5x5x5 con tres bucles anidados y búsquedas en listas de
+strings en cada paso, y el inventario se escaneaba una vez por material.
+Aquí se hace una sola pasada por observación:
+- La rejilla se codifica a un array uint8 (un código por bloque conocido)
+- Distancias Manhattan y máscaras de "frente"/"mirando" por orientación
+  están precalculadas; cercanía, frente y distancia salen con NumPy
+- Todos los conteos del inventario salen de un único recorrido de slots
+
+analizar_observacion(obs) guarda el último análisis, así que el agente y el
+entorno comparten el resultado cuando reciben el mismo dict de observación.
+
+Autor: Sistema de IA
+"""
+
+import numpy as np
+
+
+# Rejilla floor3x3: 5x5x5 (y de -2 a 2), índice = y*25 + z*5 + x, centro (2,2,2)
+LADO = 5
+CELDAS = LADO ** 3
+CENTRO = 2
+
+# Materiales objetivo por fase (mismos que _obtener_materiales_objetivo)
+MATERIALES_FASE = {
+    0: ('log', 'log2', 'oak_wood', 'spruce_wood', 'birch_wood',
+        'jungle_wood', 'acacia_wood', 'dark_oak_wood'),
+    1: ('stone', 'cobblestone'),
+    2: ('iron_ore',),
+    3: ('diamond_ore',),
+}
+
+# Items del inventario que cuentan para cada material
+ITEMS_INVENTARIO = {
+    'madera': MATERIALES_FASE[0],
+    'piedra': MATERIALES_FASE[1],
+    'hierro': ('iron_ingot',),  # El mineral se convierte a lingote
+    'diamante': ('diamond',),
+}
+
+# Items que cuentan como "suficiente" en cada fase (hierro acepta mineral y lingote)
+ITEMS_SUFICIENTES_FASE = {
+    0: MATERIALES_FASE[0],
+    1: MATERIALES_FASE[1],
+    2: MATERIALES_FASE[2] + ('iron_ingot',),
+    3: MATERIALES_FASE[3],
+}
+
+SLOTS_INVENTARIO = 45
+
+# Códigos uint8: 0 = bloque sin interés, 1 = aire, 2.. = materiales objetivo
+CODIGO_OTRO = 0
+CODIGOS_BLOQUE = {'air': 1}
+for _materiales in MATERIALES_FASE.values():
+    for _bloque in _materiales:
+        CODIGOS_BLOQUE.setdefault(_bloque, len(CODIGOS_BLOQUE) + 1)
+
+# Tabla código -> es objetivo de la fase (se indexa con el array codificado)
+ES_OBJETIVO_FASE = {}
+for _fase, _materiales in MATERIALES_FASE.items():
+    _tabla = np.zeros(256, dtype=bool)
+    _tabla[[CODIGOS_BLOQUE[b] for b in _materiales]] = True
+    ES_OBJETIVO_FASE[_fase] = _tabla
+SIN_OBJETIVO = np.zeros(256, dtype=bool)
+
+
+def _precalcular_mascaras():
+    """Distancias al centro y máscaras por orientación (0: N, 1: E, 2: S, 3: O)"""
+    y, z, x = np.indices((LADO, LADO, LADO)).reshape(3, CELDAS)
+    dx, dy, dz = x - CENTRO, y - CENTRO, z - CENTRO
+    distancias = np.abs(dx) + np.abs(dy) + np.abs(dz)
+
+    # Mismo criterio en todas las capas y: bloque delante dentro de ±1 lateral
+    frente = (
+        (dz < 0) & (np.abs(dx) <= 1),  # Norte (-Z)
+        (dx > 0) & (np.abs(dz) <= 1),  # Este (+X)
+        (dz > 0) & (np.abs(dx) <= 1),  # Sur (+Z)
+        (dx < 0) & (np.abs(dz) <= 1),  # Oeste (-X)
+    )
+    mirando = (
+        (dx == 0) & (dz == -1),
+        (dz == 0) & (dx == 1),
+        (dx == 0) & (dz == 1),
+        (dz == 0) & (dx == -1),
+    )
+    # Capas de arriba/abajo (sin la central) a 1 bloque horizontal como máximo
+    vertical = (dy != 0) & (np.abs(dx) + np.abs(dz) <= 1)
+    return distancias, np.array(frente), np.array(mirando), vertical
+
+
+DISTANCIAS, MASCARAS_FRENTE, MASCARAS_MIRANDO, MASCARA_VERTICAL = _precalcular_mascaras()
+DISTANCIA_LEJOS = 99
+
+
+def codificar_grid(grid):
+    """
+    Codifica la rejilla como array uint8 (None si no tiene las 125 celdas)
+    """
+    if len(grid) != CELDAS:
+        return None
+    codigos = CODIGOS_BLOQUE
+    return np.fromiter((codigos.get(b, CODIGO_OTRO) for b in grid), dtype=np.uint8, count=CELDAS)
+
+
+def contar_inventario(obs):
+    """
+    Suma las cantidades por item en un solo recorrido de los slots 0-44
+
+    Retorna:
+    --------
+    dict: {item: cantidad}
+    """
+    totales = {}
+    for slot in range(SLOTS_INVENTARIO):
+        item = obs.get(f'InventorySlot_{slot}_item')
+        if item is not None:
+            totales[item] = totales.get(item, 0) + obs.get(f'InventorySlot_{slot}_size', 1)
+    return totales
+
+
+class AnalisisObjetivo:
+    """Resultado del análisis de la rejilla para los materiales de una fase"""
+
+    __slots__ = ('cerca', 'frente', 'mirando', 'distancia_min', 'vertical_cerca')
+
+    def __init__(self, cerca, frente, mirando, distancia_min, vertical_cerca):
+        self.cerca = cerca              # Algún objetivo en la rejilla
+        self.frente = frente            # Tupla por orientación
+        self.mirando = mirando          # Tupla por orientación
+        self.distancia_min = distancia_min
+        self.vertical_cerca = vertical_cerca
+
+    @property
+    def distancia(self):
+        """0: lejos, 1: medio (<=4), 2: muy cerca (<=2)"""
+        if self.distancia_min <= 2:
+            return 2
+        if self.distancia_min <= 4:
+            return 1
+        return 0
+
+
+class AnalisisObservacion:
+    """
+    Rejilla codificada y conteos de inventario de una observación; el
+    análisis por fase se calcula una vez y se reutiliza
+    """
+
+    def __init__(self, obs):
+        self.codigos = codificar_grid(obs.get('floor3x3', []))
+        self.inventario = contar_inventario(obs)
+        self._por_fase = {}
+
+    def objetivo(self, fase):
+        """
+        Retorna:
+        --------
+        AnalisisObjetivo para los materiales de la fase
+        """
+        analisis = self._por_fase.get(fase)
+        if analisis is None:
+            analisis = self._analizar(fase)
+            self._por_fase[fase] = analisis
+        return analisis
+
+    def _analizar(self, fase):
+        if self.codigos is None:
+            return AnalisisObjetivo(False, (False,) * 4, (False,) * 4, DISTANCIA_LEJOS, False)
+        es_objetivo = ES_OBJETIVO_FASE.get(fase, SIN_OBJETIVO)[self.codigos]
+        if not es_objetivo.any():
+            return AnalisisObjetivo(False, (False,) * 4, (False,) * 4, DISTANCIA_LEJOS, False)
+        frente = (MASCARAS_FRENTE & es_objetivo).any(axis=1)
+        mirando = (MASCARAS_MIRANDO & es_objetivo).any(axis=1)
+        return AnalisisObjetivo(
+            True,
+            tuple(bool(v) for v in frente),
+            tuple(bool(v) for v in mirando),
+            int(DISTANCIAS[es_objetivo].min()),
+            bool((MASCARA_VERTICAL & es_objetivo).any()),
+        )
+
+    def cantidad(self, items):
+        """Total en inventario de un grupo de items"""
+        return sum(self.inventario.get(item, 0) for item in items)
+
+    def cantidad_material(self, material):
+        """Total de 'madera', 'piedra', 'hierro' o 'diamante'"""
+        return self.cantidad(ITEMS_INVENTARIO[material])
+
+
+_ultima_obs = None
+_ultimo_analisis = None
+
+
+def analizar_observacion(obs):
+    """
+    Análisis de la observación, compartido entre llamadas con el mismo dict
+    (el entorno calcula la recompensa y el agente el estado sobre obs_nueva)
+    """
+    global _ultima_obs, _ultimo_analisis
+    if obs is not _ultima_obs:
+        _ultima_obs = obs
+        _ultimo_analisis = AnalisisObservacion(obs)
+    return _ultimo_analisis
@@ -15,9 +15,9 @@ MINECRAFT_PORT = 10001         # Puerto del cliente Minecraft
 # Si Minecraft está en otra máquina en la red local, cambia la IP:
 # Ejemplo: MINECRAFT_HOST = "192.168.1.100"
 
-# Configuración de puertos alternativos si el 10001 está ocupado:
-# MINECRAFT_PORT = 10002
-# MINECRAFT_PORT = 10003
+# Puertos alternativos: si el 10001 no responde, crear_client_pool() agrega
+# los clientes sanos de esta lista al pool (Malmo elige uno disponible)
+MINECRAFT_PUERTOS_ALTERNATIVOS = [10002, 10003]
 
 # Para verificar que el cliente está disponible, ejecuta en Windows:
 # netstat -an | findstr :10001
@@ -43,15 +43,59 @@ def crear_client_pool():
     """
     import MalmoPython
     
+    estado = verificar_conexiones(mostrar=False)
+    puertos = [p for p, abierto in estado.items() if abierto]
+    if not puertos:
+        # Ningún cliente responde: usar el principal y dejar que Malmo reintente
+        puertos = [MINECRAFT_PORT]
+    
     client_pool = MalmoPython.ClientPool()
-    client_info = MalmoPython.ClientInfo(MINECRAFT_HOST, MINECRAFT_PORT)
-    client_pool.add(client_info)
+    for puerto in puertos:
+        client_pool.add(MalmoPython.ClientInfo(MINECRAFT_HOST, puerto))
     
-    print(f"🔌 Cliente configurado: {MINECRAFT_HOST}:{MINECRAFT_PORT}")
+    print(f"🔌 Clientes configurados: {MINECRAFT_HOST}:{', '.join(str(p) for p in puertos)}")
     
     return client_pool
 
 
+def _probar_puerto(puerto, timeout=2):
+    """
+    Retorna True si el puerto acepta conexiones TCP
+    """
+    import socket
+    
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        result = sock.connect_ex((MINECRAFT_HOST, puerto))
+        sock.close()
+        return result == 0
+    except OSError:
+        return False
+
+
+def verificar_conexiones(mostrar=True):
+    """
+    Sondea en paralelo el puerto principal y los alternativos
+    
+    Returns:
+    --------
+    dict: {puerto: bool} con el estado de cada cliente
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    puertos = [MINECRAFT_PORT] + [p for p in MINECRAFT_PUERTOS_ALTERNATIVOS if p != MINECRAFT_PORT]
+    with ThreadPoolExecutor(max_workers=len(puertos)) as executor:
+        estado = dict(zip(puertos, executor.map(_probar_puerto, puertos)))
+    
+    if mostrar:
+        for puerto, abierto in estado.items():
+            icono = "✅" if abierto else "⚠️ "
+            print(f"{icono} Puerto {puerto} {'abierto' if abierto else 'no responde'} en {MINECRAFT_HOST}")
+    
+    return estado
+
+
 def verificar_conexion():
     """
     Intenta verificar que el cliente está disponible
@@ -86,6 +130,7 @@ if __name__ == "__main__":
     print(f"  Port: {MINECRAFT_PORT}")
     print(f"\nVerificando conexión...")
     
+    verificar_conexiones()
     if verificar_conexion():
         print(f"\n✅ El cliente parece estar disponible")
         print(f"   Puedes ejecutar: python3 mundo_rl.py")
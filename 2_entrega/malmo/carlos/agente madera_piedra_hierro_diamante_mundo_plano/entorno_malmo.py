@@ -9,6 +9,8 @@ Fecha: Noviembre 2025
 import json
 import time
 
+from analisis_grid import analizar_observacion, MATERIALES_FASE
+
 
 class EntornoMalmoProgresivo:
     """
@@ -159,10 +161,10 @@ class EntornoMalmoProgresivo:
         
         # ACTUALIZAR CONTADORES DE TODOS LOS MATERIALES (para tracking)
         # Esto asegura que siempre veamos el progreso real
-        self.materiales_recolectados['madera'] = self._contar_madera(obs)
-        self.materiales_recolectados['piedra'] = self._contar_piedra(obs)
-        self.materiales_recolectados['hierro'] = self._contar_hierro(obs)
-        self.materiales_recolectados['diamante'] = self._contar_diamante(obs)
+        # (un solo recorrido del inventario para los cuatro materiales)
+        analisis = analizar_observacion(obs)
+        for material in ('madera', 'piedra', 'hierro', 'diamante'):
+            self.materiales_recolectados[material] = analisis.cantidad_material(material)
         
         # DAR RECOMPENSA SOLO POR MATERIAL DE LA FASE ACTUAL
         if fase == 0:  # MADERA
@@ -249,32 +251,10 @@ class EntornoMalmoProgresivo:
         """Recompensa por estar cerca del objetivo"""
         recompensa = 0.0
         
-        # Analizar grid para detectar objetivo
-        materiales_objetivo = self._obtener_materiales_objetivo(fase)
-        grid = obs.get('floor3x3', [])
-        
-        if len(grid) < 125:
-            return 0.0
-        
-        # Buscar objetivo en el grid
-        objetivo_muy_cerca = False  # Distancia <= 2
-        objetivo_cerca = False      # Distancia <= 4
-        
-        for y_offset in range(5):
-            for x in range(5):
-                for z in range(5):
-                    idx = y_offset * 25 + z * 5 + x
-                    if idx >= len(grid):
-                        continue
-                    
-                    bloque = grid[idx]
-                    if bloque in materiales_objetivo:
-                        dist = abs(x - 2) + abs(y_offset - 2) + abs(z - 2)
-                        
-                        if dist <= 2:
-                            objetivo_muy_cerca = True
-                        elif dist <= 4:
-                            objetivo_cerca = True
+        # Analizar grid para detectar objetivo (distancia Manhattan mínima)
+        dist = analizar_observacion(obs).objetivo(fase).distancia_min
+        objetivo_muy_cerca = dist <= 2  # Distancia <= 2
+        objetivo_cerca = dist <= 4      # Distancia <= 4
         
         # Asignar recompensas según distancia
         if objetivo_muy_cerca:
@@ -333,24 +313,7 @@ class EntornoMalmoProgresivo:
         castigo = 0.0
         
         # Detectar si hay objetivo cerca
-        materiales_objetivo = self._obtener_materiales_objetivo(fase)
-        grid = obs.get('floor3x3', [])
-        
-        objetivo_cerca = False
-        if len(grid) >= 125:
-            for y_offset in range(5):
-                for x in range(5):
-                    for z in range(5):
-                        idx = y_offset * 25 + z * 5 + x
-                        if idx >= len(grid):
-                            continue
-                        
-                        bloque = grid[idx]
-                        if bloque in materiales_objetivo:
-                            dist = abs(x - 2) + abs(y_offset - 2) + abs(z - 2)
-                            if dist <= 3:
-                                objetivo_cerca = True
-                                break
+        objetivo_cerca = analizar_observacion(obs).objetivo(fase).distancia_min <= 3
         
         # Contar pasos cerca sin atacar
         if objetivo_cerca:
@@ -375,28 +338,9 @@ class EntornoMalmoProgresivo:
         """Recompensa por usar pitch SOLO cuando hay objetivo en altura cerca"""
         recompensa = 0.0
         
-        # Verificar si hay objetivo cerca VERTICALMENTE
-        materiales_objetivo = self._obtener_materiales_objetivo(fase)
-        grid = obs.get('floor3x3', [])
-        
-        objetivo_encontrado_vertical = False
-        
-        if len(grid) >= 125:
-            # Verificar SOLO capas verticales (no la capa central horizontal)
-            for y_offset in [0, 1, 3, 4]:  # Capas arriba y abajo del centro (excluye 2)
-                for x in range(5):
-                    for z in range(5):
-                        idx = y_offset * 25 + z * 5 + x
-                        if idx >= len(grid):
-                            continue
-                        
-                        bloque = grid[idx]
-                        if bloque in materiales_objetivo:
-                            # Solo recompensar si está MUY cerca horizontalmente
-                            dist_horizontal = abs(x - 2) + abs(z - 2)
-                            if dist_horizontal <= 1:  # Más estricto: solo 1 bloque
-                                objetivo_encontrado_vertical = True
-                                break
+        # Verificar si hay objetivo cerca VERTICALMENTE: solo capas de arriba y
+        # abajo del centro, a 1 bloque horizontal como máximo
+        objetivo_encontrado_vertical = analizar_observacion(obs).objetivo(fase).vertical_cerca
         
         # SOLO recompensa si realmente hay un objetivo vertical cerca
         if objetivo_encontrado_vertical:
@@ -443,16 +387,7 @@ class EntornoMalmoProgresivo:
     
     def _obtener_materiales_objetivo(self, fase):
         """Retorna lista de materiales objetivo según fase"""
-        if fase == 0:
-            return ['log', 'log2', 'oak_wood', 'spruce_wood', 'birch_wood', 
-                    'jungle_wood', 'acacia_wood', 'dark_oak_wood']
-        elif fase == 1:
-            return ['stone', 'cobblestone']
-        elif fase == 2:
-            return ['iron_ore']
-        elif fase == 3:
-            return ['diamond_ore']
-        return []
+        return list(MATERIALES_FASE.get(fase, ()))
     
     def _verificar_objetivo_frente(self, obs, fase):
         """Verifica si hay objetivo frente al agente"""
@@ -488,74 +423,6 @@ class EntornoMalmoProgresivo:
         
         return False
     
-    def _contar_madera(self, obs):
-        """Cuenta bloques de madera en inventario"""
-        count = 0
-        materiales = ['log', 'log2', 'oak_wood', 'spruce_wood', 'birch_wood',
-                      'jungle_wood', 'acacia_wood', 'dark_oak_wood']
-        
-        for slot in range(45):
-            item_key = f'InventorySlot_{slot}_item'
-            size_key = f'InventorySlot_{slot}_size'
-            
-            if item_key in obs:
-                item = obs[item_key]
-                size = obs.get(size_key, 1)
-                if item in materiales:
-                    count += size
-        
-        return count
-    
-    def _contar_piedra(self, obs):
-        """Cuenta bloques de piedra en inventario"""
-        count = 0
-        materiales = ['stone', 'cobblestone']
-        
-        for slot in range(45):
-            item_key = f'InventorySlot_{slot}_item'
-            size_key = f'InventorySlot_{slot}_size'
-            
-            if item_key in obs:
-                item = obs[item_key]
-                size = obs.get(size_key, 1)
-                if item in materiales:
-                    count += size
-        
-        return count
-    
-    def _contar_hierro(self, obs):
-        """Cuenta lingotes de hierro en inventario (mineral convertido)"""
-        count = 0
-        
-        for slot in range(45):
-            item_key = f'InventorySlot_{slot}_item'
-            size_key = f'InventorySlot_{slot}_size'
-            
-            if item_key in obs:
-                item = obs[item_key]
-                size = obs.get(size_key, 1)
-                # Mineral de hierro se convierte automáticamente a lingote
-                if item == 'iron_ingot':
-                    count += size
-        
-        return count
-    
-    def _contar_diamante(self, obs):
-        """Cuenta diamantes en inventario"""
-        count = 0
-        
-        for slot in range(45):
-            item_key = f'InventorySlot_{slot}_item'
-            size_key = f'InventorySlot_{slot}_size'
-            
-            if item_key in obs:
-                item = obs[item_key]
-                size = obs.get(size_key, 1)
-                if item == 'diamond':
-                    count += size
-        
-        return count
-    
     def verificar_progresion_fase(self, obs):
         """
         Verifica si se debe avanzar a la siguiente fase
@@ -256,79 +256,101 @@ def generar_mundo_plano_xml(seed=None):
     return xml
 
 
-def seleccionar_mejor_herramienta(agent_host, obs, fase_actual, grid):
+# Mejor herramienta por material de enfrente (en orden de preferencia)
+HERRAMIENTAS_POR_MATERIAL = {
+    'log': ('iron_axe', 'stone_axe', 'wooden_axe'),
+    'log2': ('iron_axe', 'stone_axe', 'wooden_axe'),
+    'planks': ('iron_axe', 'stone_axe', 'wooden_axe'),
+    'stone': ('iron_pickaxe', 'stone_pickaxe', 'wooden_pickaxe'),
+    'cobblestone': ('iron_pickaxe', 'stone_pickaxe', 'wooden_pickaxe'),
+    'iron_ore': ('iron_pickaxe', 'stone_pickaxe'),
+    'diamond_ore': ('iron_pickaxe',),
+}
+
+# Observaciones que se espera a que Malmo confirme un cambio de slot
+OBSERVACIONES_PENDIENTES = 5
+
+
+class GestorHerramientas:
     """
-    Selecciona y equipa automáticamente la mejor herramienta disponible
-    según el material que está frente al agente
+    Equipa la mejor herramienta disponible según el material de enfrente,
+    enviando hotbar.N solo cuando el slot objetivo cambia
+    
+    - Slot actual: currentItemIndex de la observación (o el último enviado)
+    - Mapa material → slot: se recalcula solo si cambia la barra (slots 0-8)
+    - Malmo refleja el cambio de slot unos ticks después; mientras tanto un
+      currentItemIndex viejo no provoca reenvíos (slot pendiente)
     """
-    # Detectar qué material está frente (posición central del grid)
-    material_frente = None
-    if len(grid) >= 125:
-        # Centro del grid 5x5x5 (índice 62)
-        idx_centro = 2 * 25 + 2 * 5 + 2  # y=2, z=2, x=2
-        if idx_centro < len(grid):
-            material_frente = grid[idx_centro]
-    
-    # Obtener inventario
-    inventario = obs.get('Hotbar', [])
-    
-    # Determinar mejor herramienta según el material
-    herramienta_objetivo = None
-    
-    # Para MADERA: usar hacha si está disponible, sino pico
-    if material_frente in ['log', 'log2', 'planks']:
-        # Buscar hacha (prioridad: hierro > piedra > madera)
-        for item in inventario:
-            item_type = item.get('type', '')
-            if 'iron_axe' in item_type:
-                herramienta_objetivo = 'iron_axe'
-                break
-            elif 'stone_axe' in item_type:
-                herramienta_objetivo = 'stone_axe'
-            elif 'wooden_axe' in item_type and not herramienta_objetivo:
-                herramienta_objetivo = 'wooden_axe'
-    
-    # Para PIEDRA: usar pico de madera o mejor
-    elif material_frente in ['stone', 'cobblestone']:
-        for item in inventario:
-            item_type = item.get('type', '')
-            if 'iron_pickaxe' in item_type:
-                herramienta_objetivo = 'iron_pickaxe'
-                break
-            elif 'stone_pickaxe' in item_type:
-                herramienta_objetivo = 'stone_pickaxe'
-            elif 'wooden_pickaxe' in item_type and not herramienta_objetivo:
-                herramienta_objetivo = 'wooden_pickaxe'
-    
-    # Para HIERRO: usar pico de piedra o mejor
-    elif material_frente in ['iron_ore']:
-        for item in inventario:
-            item_type = item.get('type', '')
-            if 'iron_pickaxe' in item_type:
-                herramienta_objetivo = 'iron_pickaxe'
-                break
-            elif 'stone_pickaxe' in item_type and not herramienta_objetivo:
-                herramienta_objetivo = 'stone_pickaxe'
-    
-    # Para DIAMANTE: usar pico de hierro
-    elif material_frente in ['diamond_ore']:
-        for item in inventario:
-            item_type = item.get('type', '')
-            if 'iron_pickaxe' in item_type:
-                herramienta_objetivo = 'iron_pickaxe'
-                break
     
-    # Equipar herramienta si se encontró
-    if herramienta_objetivo:
-        # Buscar slot de la herramienta
-        for idx, item in enumerate(inventario):
-            if herramienta_objetivo in item.get('type', ''):
-                agent_host.sendCommand(f"hotbar.{idx + 1} 1")  # Equipar slot
-                agent_host.sendCommand(f"hotbar.{idx + 1} 0")
-                time.sleep(0.1)
-                return True
-    
-    return False
+    def __init__(self, agent_host):
+        """
+        Parámetros:
+        -----------
+        agent_host: MalmoPython.AgentHost
+        """
+        self.agent_host = agent_host
+        self.reset()
+    
+    def reset(self):
+        """Al empezar cada episodio (Malmo arranca con el slot 0)"""
+        self.slot_actual = 0
+        self.slot_pendiente = None
+        self.pendientes_restantes = 0
+        self.barra = None
+        self.slot_por_material = {}
+        self.cambios = 0
+        self.cambios_evitados = 0
+    
+    def _actualizar(self, obs):
+        slot_observado = obs.get('currentItemIndex')
+        if slot_observado is not None:
+            if (self.slot_pendiente is None or slot_observado == self.slot_pendiente
+                    or self.pendientes_restantes <= 0):
+                self.slot_actual = slot_observado
+                self.slot_pendiente = None
+            else:
+                self.pendientes_restantes -= 1
+        
+        barra = tuple(obs.get(f'InventorySlot_{i}_item') for i in range(9))
+        if barra != self.barra:
+            self.barra = barra
+            self.slot_por_material = {}
+            for material, herramientas in HERRAMIENTAS_POR_MATERIAL.items():
+                for herramienta in herramientas:
+                    if herramienta in barra:
+                        self.slot_por_material[material] = barra.index(herramienta)
+                        break
+    
+    def seleccionar(self, obs, grid):
+        """
+        Selecciona y equipa la mejor herramienta disponible
+        según el material que está frente al agente
+        
+        Returns:
+        --------
+        bool: True si se envió un cambio de slot
+        """
+        self._actualizar(obs)
+        
+        # Detectar qué material está frente (posición central del grid)
+        idx_centro = 2 * 25 + 2 * 5 + 2  # y=2, z=2, x=2
+        if len(grid) < 125:
+            return False
+        
+        slot = self.slot_por_material.get(grid[idx_centro])
+        if slot is None:
+            return False
+        if slot == self.slot_actual:
+            self.cambios_evitados += 1
+            return False
+        
+        self.agent_host.sendCommand(f"hotbar.{slot + 1} 1")  # Equipar slot
+        self.agent_host.sendCommand(f"hotbar.{slot + 1} 0")
+        self.slot_actual = slot
+        self.slot_pendiente = slot
+        self.pendientes_restantes = OBSERVACIONES_PENDIENTES
+        self.cambios += 1
+        return True
 
 
 def ejecutar_episodio(agent_host, agente, entorno, episodio, seed=None):
@@ -390,6 +412,7 @@ def ejecutar_episodio(agent_host, agente, entorno, episodio, seed=None):
     
     # Resetear entorno
     entorno.reset_episodio()
+    gestor_herramientas = GestorHerramientas(agent_host)
     
     # Variables del episodio
     pasos = 0
@@ -432,7 +455,7 @@ def ejecutar_episodio(agent_host, agente, entorno, episodio, seed=None):
         # Si va a atacar, seleccionar mejor herramienta primero
         if accion in [5, 6]:  # Acciones de ataque
             grid = obs.get('floor3x3', [])
-            seleccionar_mejor_herramienta(agent_host, obs, fase_actual, grid)
+            gestor_herramientas.seleccionar(obs, grid)
         
         # Ejecutar acción
         comando = agente.ACCIONES[accion]
@@ -515,6 +538,7 @@ def ejecutar_episodio(agent_host, agente, entorno, episodio, seed=None):
     print(f"Pasos: {pasos}")
     print(f"Recompensa acumulada: {recompensa_acumulada:.2f}")
     print(f"Objetivo completado: {'✓ SÍ' if objetivo_completado else '✗ NO'}")
+    print(f"Cambios de herramienta: {gestor_herramientas.cambios} ({gestor_herramientas.cambios_evitados} evitados)")
     
     progreso = entorno.obtener_progreso()
     print(f"\nProgreso final:")
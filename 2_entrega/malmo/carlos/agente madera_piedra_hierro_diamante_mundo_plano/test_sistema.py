@@ -138,9 +138,50 @@ def test_estado():
         return False
 
 
+def test_herramientas():
+    """Prueba que GestorHerramientas no reenvía hotbar.N mientras el cambio está pendiente"""
+    print("\n6️⃣  Probando selección de herramienta...")
+    try:
+        from mundo_rl import GestorHerramientas
+        
+        class HostPrueba:
+            def __init__(self):
+                self.comandos = []
+            
+            def sendCommand(self, comando):
+                self.comandos.append(comando)
+        
+        def observacion(slot_actual):
+            return {'currentItemIndex': slot_actual,
+                    'InventorySlot_0_item': 'wooden_axe',
+                    'InventorySlot_1_item': 'wooden_pickaxe'}
+        
+        grid = ['air'] * 125
+        grid[2 * 25 + 2 * 5 + 2] = 'stone'  # material de enfrente
+        
+        host = HostPrueba()
+        gestor = GestorHerramientas(host)
+        gestor.seleccionar(observacion(0), grid)
+        # Malmo todavía reporta el slot 0: no se reenvía el cambio
+        gestor.seleccionar(observacion(0), grid)
+        gestor.seleccionar(observacion(1), grid)
+        
+        if host.comandos == ["hotbar.2 1", "hotbar.2 0"] and gestor.cambios_evitados == 2:
+            print("   ✓ Un solo cambio de slot (2 evitados)")
+            return True
+        print(f"   ✗ Comandos enviados: {host.comandos}")
+        return False
+        
+    except Exception as e:
+        print(f"   ✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def test_minecraft():
     """Prueba conexión con Minecraft"""
-    print("\n6️⃣  Probando conexión con Minecraft...")
+    print("\n7️⃣  Probando conexión con Minecraft...")
     try:
         import MalmoPython
         agent_host = MalmoPython.AgentHost()
@@ -188,6 +229,7 @@ def main():
     resultados.append(("Agente", test_agente()))
     resultados.append(("Mundo", test_mundo()))
     resultados.append(("Estado", test_estado()))
+    resultados.append(("Herramientas", test_herramientas()))
     resultados.append(("Minecraft", test_minecraft()))
     
     # Resumen
@@ -9,7 +9,8 @@ import numpy as np
 import random
 import json
 import pickle
-from collections import defaultdict
+
+from tabla_q import TablaQ
 
 
 class AgenteQLearning:
@@ -52,8 +53,8 @@ class AgenteQLearning:
         self.epsilon_min = epsilon_min
         self.epsilon_decay = epsilon_decay
         
-        # Tabla Q: Q[estado][acción] = valor
-        self.Q = defaultdict(lambda: np.zeros(len(self.ACCIONES)))
+        # Tabla Q: Q[estado][acción] = valor (estados internados + array float32)
+        self.Q = TablaQ(len(self.ACCIONES))
         
         # Estadísticas
         self.episodios_completados = 0
@@ -194,12 +195,12 @@ class AgenteQLearning:
             # Si terminó, no hay siguiente estado
             q_siguiente_max = 0
         else:
-            q_siguiente_max = np.max(self.Q[siguiente_estado])
+            q_siguiente_max = self.Q.max_q(siguiente_estado)
         
         # Ecuación de actualización Q-Learning
         nuevo_q = q_actual + self.alpha * (recompensa + self.gamma * q_siguiente_max - q_actual)
         
-        self.Q[estado][accion] = nuevo_q
+        self.Q.actualizar(estado, accion, nuevo_q)
         
         # Acumular estadísticas
         self.recompensa_total_episodio += recompensa
@@ -242,7 +243,7 @@ class AgenteQLearning:
     def guardar_modelo(self, filepath):
         """Guarda la tabla Q y parámetros del agente"""
         datos = {
-            'Q': dict(self.Q),  # Convertir defaultdict a dict
+            'Q': self.Q.a_datos(),  # Estados (int16) + valores (float32)
             'episodios': self.episodios_completados,
             'epsilon': self.epsilon,
             'historial_recompensas': self.historial_recompensas,
@@ -253,7 +254,7 @@ class AgenteQLearning:
         with open(filepath, 'wb') as f:
             pickle.dump(datos, f)
         
-        print(f"✓ Modelo guardado en: {filepath}")
+        print(f"✓ Modelo guardado en: {filepath} ({len(self.Q)} estados)")
     
     def cargar_modelo(self, filepath):
         """Carga tabla Q y parámetros previamente guardados"""
@@ -261,7 +262,8 @@ class AgenteQLearning:
             with open(filepath, 'rb') as f:
                 datos = pickle.load(f)
             
-            self.Q = defaultdict(lambda: np.zeros(len(self.ACCIONES)), datos['Q'])
+            # Acepta también el formato anterior (dict estado -> array)
+            self.Q = TablaQ.desde_datos(datos['Q'], len(self.ACCIONES))
             self.episodios_completados = datos['episodios']
             self.epsilon = datos['epsilon']
             self.historial_recompensas = datos['historial_recompensas']
@@ -286,7 +288,7 @@ class AgenteQLearning:
         print(f"📊 ESTADÍSTICAS DE ENTRENAMIENTO")
         print("="*60)
         print(f"Episodios completados: {self.episodios_completados}")
-        print(f"Estados en tabla Q: {len(self.Q)}")
+        print(f"Estados en tabla Q: {len(self.Q)} ({self.Q.memoria_bytes() / 1024:.1f} KB)")
         print(f"Epsilon actual: {self.epsilon:.4f}")
         print(f"\nÚltimos 10 episodios:")
         print(f"  Recompensa promedio: {np.mean(self.historial_recompensas[-10:]):.2f}")
@@ -57,9 +57,9 @@ missionXML = '''<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
       <!-- Observaciones compatibles con Malmo 0.37.0 -->
       <ObservationFromFullStats/>
       <ObservationFromRay/>
-      <ObservationFromNearbyEntities>
-        <Range name="entities" xrange="40" yrange="40" zrange="40"/>
-      </ObservationFromNearbyEntities>
+      <!-- Sin ObservationFromNearbyEntities: get_state solo lee posición/vida
+           (FullStats) y LineOfSight (Ray); el rango 40x40x40 agregaba
+           cada entidad cercana al JSON de cada tick -->
       
       <!-- Recompensas -->
       <RewardForTouchingBlockType>
@@ -276,6 +276,7 @@ while world_state.is_mission_running and step_count < max_steps:
             print(f"   Posición: ({x:.1f}, {y:.1f}, {z:.1f}) Yaw: {yaw:.1f}°")
             print(f"   Estado: {current_state}")
             print(f"   Vida: {obs.get('Life', 20):.1f}")
+            print(f"   Observación: {len(obs_text)} bytes")
             print(f"   Pasos en dirección: {steps_in_direction}/{steps_before_turn}, Giros: {turns_made}")
             print(f"   Comando: '{action}'")
             print(f"   Recompensa acumulada: {total_reward:.1f}")
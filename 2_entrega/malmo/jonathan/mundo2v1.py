@@ -4,6 +4,7 @@ import json
 import random
 import MalmoPython as Malmo
 from collections import Counter
+from mundo_reutilizable import cargar_spawns
 
 print(f"Python version: {sys.version}")
 print("MalmoPython importado correctamente")
@@ -11,6 +12,11 @@ print("MalmoPython importado correctamente")
 # Crear el agente host
 agent_host = Malmo.AgentHost()
 
+# --reutilizar-mundo: no regenerar el mundo si el cliente ya lo tiene (misma
+# semilla) y empezar en un spawn válido guardado por mundo_rl.py
+REUTILIZAR_MUNDO = "--reutilizar-mundo" in sys.argv
+SEED = 123456
+
 # Mission XML - Mundo NORMAL generado proceduralmente
 missionXML = '''<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
 <Mission xmlns="http://ProjectMalmo.microsoft.com" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
@@ -29,7 +35,7 @@ missionXML = '''<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
     </ServerInitialConditions>
     <ServerHandlers>
       <!-- Mundo normal generado por defecto - Sin coordenadas fijas -->
-      <DefaultWorldGenerator seed="123456" forceReset="true"/>
+      <DefaultWorldGenerator seed="{seed}" forceReset="{force_reset}"/>
       
       <ServerQuitWhenAnyAgentFinishes/>
     </ServerHandlers>
@@ -37,16 +43,15 @@ missionXML = '''<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
 
   <AgentSection mode="Survival">
     <Name>Navigator</Name>
-    <AgentStart>
-      <!-- Sin coordenadas fijas - spawn aleatorio según el mundo generado -->
+    <AgentStart>{placement}
     </AgentStart>
     <AgentHandlers>
       <!-- Observaciones compatibles con Malmo 0.37.0 -->
       <ObservationFromFullStats/>
       <ObservationFromRay/>
-      <ObservationFromNearbyEntities>
-        <Range name="entities" xrange="40" yrange="40" zrange="40"/>
-      </ObservationFromNearbyEntities>
+      <!-- Sin ObservationFromNearbyEntities: get_state solo lee posición/vida
+           (FullStats) y LineOfSight (Ray); el rango 40x40x40 agregaba
+           cada entidad cercana al JSON de cada tick -->
       
       <!-- Recompensas -->
       <RewardForTouchingBlockType>
@@ -58,6 +63,7 @@ missionXML = '''<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
       
       <!-- Comandos - Solo discretos para movimiento preciso -->
       <DiscreteMovementCommands/>
+      <ChatCommands/>
       
       <!-- Condiciones de salida -->
       <AgentQuitFromTouchingBlockType>
@@ -261,6 +267,19 @@ def select_action(state, direction_hint, probabilities, step_count, current_posi
         print(f"➡️ Avanzando con salto automático... (paso {steps_in_direction}/{steps_before_turn})")
         return "jumpmove 1"  # En vez de "move 1", usar "jumpmove 1" por defecto
 
+# ========== REUTILIZACIÓN DEL MUNDO ==========
+placement = "\n      <!-- Sin coordenadas fijas - spawn aleatorio según el mundo generado -->"
+spawns = cargar_spawns(SEED) if REUTILIZAR_MUNDO else []
+if spawns:
+    x, y, z = random.choice(spawns)
+    placement = f'\n      <Placement x="{x}" y="{y}" z="{z}" yaw="0"/>'
+    print(f"♻️  Reutilizando mundo (seed {SEED}), spawn en ({x}, {y}, {z})")
+elif REUTILIZAR_MUNDO:
+    print(f"⚠️  Sin spawns guardados para seed {SEED} (ver mundo_rl.py --reutilizar-mundo): spawn natural")
+# Con forceReset="false" Malmo solo genera el mundo si el cliente tiene otro
+missionXML = missionXML.format(seed=SEED, force_reset="false" if REUTILIZAR_MUNDO else "true",
+                               placement=placement)
+
 # ========== INICIAR MISIÓN ==========
 mission = Malmo.MissionSpec(missionXML, True)
 mission_record = Malmo.MissionRecordSpec()
@@ -271,6 +290,7 @@ client_pool = Malmo.ClientPool()
 client_pool.add(Malmo.ClientInfo("172.28.224.1", 10000))
 
 print("Iniciando misión en MUNDO NORMAL...")
+inicio_mision = time.time()
 agent_host.startMission(mission, client_pool, mission_record, 0, "NavigatorBot")
 
 print("Esperando cliente...")
@@ -281,7 +301,8 @@ while not world_state.has_mission_begun:
     world_state = agent_host.getWorldState()
     for error in world_state.errors:
         print("Error:", error.text)
-print("\n¡Misión iniciada! 🚀 Explorando mundo natural...")
+print(f"\n¡Misión iniciada en {time.time() - inicio_mision:.1f}s! 🚀 Explorando mundo natural...")
+agent_host.sendCommand("chat /clear")
 
 # ========== LOOP PRINCIPAL ==========
 current_state = State.SEARCHING
@@ -332,6 +353,7 @@ while world_state.is_mission_running and step_count < max_steps:
             print(f"   Posición: ({x:.1f}, {y:.1f}, {z:.1f}) Yaw: {yaw:.1f}°")
             print(f"   Estado: {current_state}")
             print(f"   Vida: {obs.get('Life', 20):.1f}")
+            print(f"   Observación: {len(obs_text)} bytes")
             print(f"   Pasos en dirección: {steps_in_direction}/{steps_before_turn}, Giros: {turns_made}")
             los_info = obs.get('LineOfSight', {})
             if isinstance(los_info, dict):
@@ -12,13 +12,14 @@ import MalmoPython as Malmo
 
 from agente_rl import AgenteQLearning
 from entorno_malmo import EntornoMalmo
+from mundo_reutilizable import MundoReutilizable
 
 
 # ============================================================================
 # CONFIGURACIÓN DEL MUNDO (XML de Malmo)
 # ============================================================================
 
-def obtener_mision_xml(seed=None, spawn_x=None, spawn_z=None):
+def obtener_mision_xml(seed=None, spawn_x=None, spawn_z=None, spawn_y=64, force_reset=True):
     """
     Genera XML de la misión con configuración para RL
     
@@ -28,13 +29,18 @@ def obtener_mision_xml(seed=None, spawn_x=None, spawn_z=None):
         Semilla para generación del mundo (None = aleatorio)
     spawn_x, spawn_z: float o None
         Coordenadas de spawn (None = spawn natural)
+    spawn_y: float
+        Altura del spawn (los spawns de MundoReutilizable traen la exacta)
+    force_reset: bool
+        False = reutilizar el mundo que ya tiene el cliente (misma semilla)
     """
-    seed_attr = f'seed="{seed}" forceReset="true"' if seed is not None else ""
+    reset_attr = "true" if force_reset else "false"
+    seed_attr = f'seed="{seed}" forceReset="{reset_attr}"' if seed is not None else ""
     
     # Configurar spawn
     if spawn_x is not None and spawn_z is not None:
         spawn_placement = f'''
-      <Placement x="{spawn_x}" y="64" z="{spawn_z}" pitch="30" yaw="0"/>'''
+      <Placement x="{spawn_x}" y="{spawn_y}" z="{spawn_z}" pitch="30" yaw="0"/>'''
     else:
         spawn_placement = "\n      <!-- Spawn natural del mundo (sin coordenadas fijas) -->"
     
@@ -97,6 +103,7 @@ def obtener_mision_xml(seed=None, spawn_x=None, spawn_z=None):
       
       <!-- COMANDOS -->
       <DiscreteMovementCommands/>
+      <ChatCommands/>  <!-- /spreadplayers, /tp y /clear (MundoReutilizable) -->
       
       <!-- CONDICIONES DE SALIDA -->
       <AgentQuitFromTouchingBlockType>
@@ -229,7 +236,7 @@ def ejecutar_episodio(agent_host, agente, entorno, max_pasos=500, verbose=True):
     }
 
 
-def entrenar(num_episodios=50, guardar_cada=10, modelo_path="modelo_ql.pkl"):
+def entrenar(num_episodios=50, guardar_cada=10, modelo_path="modelo_ql.pkl", reutilizar_mundo=False):
     """
     Bucle principal de entrenamiento
     
@@ -241,6 +248,9 @@ def entrenar(num_episodios=50, guardar_cada=10, modelo_path="modelo_ql.pkl"):
         Guardar modelo cada N episodios
     modelo_path: str
         Ruta para guardar/cargar el modelo
+    reutilizar_mundo: bool
+        Generar el mundo (semilla 123456) una sola vez y variar el spawn entre
+        puntos válidos (ver mundo_reutilizable.py)
     """
     print("\n" + "="*60)
     print("🚀 INICIANDO ENTRENAMIENTO DE AGENTE RL")
@@ -273,10 +283,22 @@ def entrenar(num_episodios=50, guardar_cada=10, modelo_path="modelo_ql.pkl"):
     # 5. BUCLE DE ENTRENAMIENTO
     exitos = 0
     import random
+    mundo = MundoReutilizable(seed=123456) if reutilizar_mundo else None
     
     for episodio in range(num_episodios):
+        spawn_y = 64
+        force_reset = True
+        if mundo is not None:
+            # Mismo mundo siempre: solo cambia el spawn (forceReset="false")
+            parametros = mundo.parametros_mision()
+            seed = mundo.seed
+            force_reset = parametros["force_reset"]
+            if parametros["spawn"] is not None:
+                spawn_x, spawn_y, spawn_z = parametros["spawn"]
+            else:
+                spawn_x = spawn_z = None
         # Generar misión con spawn ALEATORIO para variar condiciones iniciales
-        if episodio < 10:
+        elif episodio < 10:
             seed = 123456  # Mismo mundo para aprender básicos
             # Spawn aleatorio en área de 100 bloques de radio
             spawn_x = random.uniform(-100, 100)
@@ -286,13 +308,14 @@ def entrenar(num_episodios=50, guardar_cada=10, modelo_path="modelo_ql.pkl"):
             spawn_x = None
             spawn_z = None
         
-        mision_xml = obtener_mision_xml(seed, spawn_x, spawn_z)
+        mision_xml = obtener_mision_xml(seed, spawn_x, spawn_z, spawn_y, force_reset=force_reset)
         mission = Malmo.MissionSpec(mision_xml, True)
         mission_record = Malmo.MissionRecordSpec()
         
         # Iniciar misión
         print(f"\n📡 Iniciando misión (episodio {episodio + 1}/{num_episodios})...")
         
+        inicio_mision = time.time()
         max_reintentos = 3
         for intento in range(max_reintentos):
             try:
@@ -311,7 +334,9 @@ def entrenar(num_episodios=50, guardar_cada=10, modelo_path="modelo_ql.pkl"):
             time.sleep(0.1)
             world_state = agent_host.getWorldState()
         
-        print("✓ Misión iniciada")
+        print(f"✓ Misión iniciada ({time.time() - inicio_mision:.1f}s{', mundo reutilizado' if not force_reset else ''})")
+        if mundo is not None:
+            mundo.preparar_episodio(agent_host)
         
         # Ejecutar episodio
         stats = ejecutar_episodio(agent_host, agente, entorno, max_pasos=500, verbose=(episodio % 5 == 0))
@@ -356,12 +381,15 @@ if __name__ == "__main__":
     # Parámetros de entrenamiento
     NUM_EPISODIOS = 50
     MODELO_PATH = "modelo_agente_agua.pkl"
+    # --reutilizar-mundo: generar el mundo una vez y variar solo el spawn
+    REUTILIZAR_MUNDO = "--reutilizar-mundo" in sys.argv
     
     try:
         entrenar(
             num_episodios=NUM_EPISODIOS,
             guardar_cada=10,
-            modelo_path=MODELO_PATH
+            modelo_path=MODELO_PATH,
+            reutilizar_mundo=REUTILIZAR_MUNDO
         )
     except KeyboardInterrupt:
         print("\n\n⚠ Entrenamiento interrumpido por usuario")
@@ -0,0 +1,195 @@
+"""
+Tabla Q compacta para AgenteQLearning
+
+defaultdict(lambda: np.zeros(4)) creaba un array de NumPy por estado (~112
+bytes de cabecera cada uno), no se podía serializar con pickle (la lambda) y
+el análisis recorría la tabla en Python. Aquí:
+- Cada estado se interna una vez: dict estado -> fila
+- Todos los valores viven en un único array 2D float32 que crece por bloques
+- Estados no visitados valen 0 al leerlos, sin insertarse en la tabla
+- Se guarda como {estados: array int16, valores: array float32}
+- top_estados, distribucion_acciones y estadisticas_valores trabajan
+  directamente sobre el array
+
+Autor: Sistema de IA
+"""
+
+import numpy as np
+
+
+FORMATO = "tabla_q_compacta"
+
+
+class TablaQ:
+    """
+    Q[estado] -> valores de las acciones (solo lectura)
+    actualizar(estado, accion, valor) para escribir
+    """
+
+    def __init__(self, n_acciones, capacidad=64):
+        """
+        Parámetros:
+        -----------
+        n_acciones: int
+            Columnas de la tabla (una por acción)
+        capacidad: int
+            Filas reservadas al inicio (se duplica al llenarse)
+        """
+        self.n_acciones = n_acciones
+        self.indice = {}     # estado -> fila
+        self.estados = []    # fila -> estado
+        self.valores = np.zeros((capacidad, n_acciones), dtype=np.float32)
+        self._ceros = np.zeros(n_acciones, dtype=np.float32)
+        self._ceros.flags.writeable = False
+
+    def __len__(self):
+        return len(self.estados)
+
+    def __contains__(self, estado):
+        return estado in self.indice
+
+    def __getitem__(self, estado):
+        fila = self.indice.get(estado)
+        if fila is None:
+            return self._ceros
+        return self.valores[fila]
+
+    @property
+    def matriz(self):
+        """Vista (n_estados, n_acciones) de las filas ocupadas"""
+        return self.valores[:len(self.estados)]
+
+    def fila(self, estado):
+        """Fila del estado, creándola (con ceros) si no existía"""
+        fila = self.indice.get(estado)
+        if fila is None:
+            fila = len(self.estados)
+            if fila == len(self.valores):
+                nuevos = np.zeros((max(1, fila) * 2, self.n_acciones), dtype=self.valores.dtype)
+                nuevos[:fila] = self.valores
+                self.valores = nuevos
+            self.indice[estado] = fila
+            self.estados.append(estado)
+        return fila
+
+    def max_q(self, estado):
+        fila = self.indice.get(estado)
+        return 0.0 if fila is None else float(self.valores[fila].max())
+
+    def actualizar(self, estado, accion, valor):
+        fila = self.fila(estado)  # Puede reasignar self.valores al crecer
+        self.valores[fila, accion] = valor
+
+    def items(self):
+        """(estado, valores) por cada estado visitado"""
+        return zip(self.estados, self.matriz)
+
+    def memoria_bytes(self):
+        """Bytes del array de valores (filas reservadas incluidas)"""
+        return self.valores.nbytes
+
+    def a_datos(self):
+        """
+        Retorna:
+        --------
+        dict: formato de guardado (sin objetos de Python por estado)
+        """
+        return {
+            'formato': FORMATO,
+            'n_acciones': self.n_acciones,
+            'estados': _empaquetar_estados(self.estados),
+            'valores': self.matriz.copy(),
+        }
+
+    @classmethod
+    def desde_datos(cls, datos, n_acciones=None):
+        """
+        Reconstruye la tabla desde a_datos() o desde el formato anterior
+        (dict estado -> array con los valores Q)
+        """
+        if isinstance(datos, dict) and datos.get('formato') == FORMATO:
+            valores = np.asarray(datos['valores'], dtype=np.float32)
+            tabla = cls(datos['n_acciones'], capacidad=max(64, len(valores)))
+            estados = _desempaquetar_estados(datos['estados'])
+        else:
+            estados = list(datos.keys())
+            if n_acciones is None:
+                n_acciones = len(next(iter(datos.values()))) if datos else 0
+            valores = np.array([datos[e] for e in estados], dtype=np.float32).reshape(len(estados), n_acciones)
+            tabla = cls(n_acciones, capacidad=max(64, len(valores)))
+        tabla.valores[:len(estados)] = valores
+        tabla.estados = estados
+        tabla.indice = {estado: fila for fila, estado in enumerate(estados)}
+        return tabla
+
+    def __getstate__(self):
+        return self.a_datos()
+
+    def __setstate__(self, datos):
+        self.__dict__.update(TablaQ.desde_datos(datos).__dict__)
+
+
+def _empaquetar_estados(estados):
+    """Estados de enteros de igual longitud -> array int16; otros, lista"""
+    if estados and all(isinstance(e, tuple) and len(e) == len(estados[0]) for e in estados):
+        try:
+            return np.array(estados, dtype=np.int16)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return list(estados)
+
+
+def _desempaquetar_estados(estados):
+    if isinstance(estados, np.ndarray):
+        return [tuple(fila) for fila in estados.tolist()]
+    return list(estados)
+
+
+# ============================================================================
+# ANÁLISIS VECTORIZADO
+# ============================================================================
+
+def top_estados(tabla, n=10):
+    """
+    Retorna:
+    --------
+    list: [(estado, max_q, mejor_accion), ...] ordenados por max_q descendente
+    """
+    matriz = tabla.matriz
+    if len(matriz) == 0:
+        return []
+    max_q = matriz.max(axis=1)
+    n = min(n, len(max_q))
+    filas = np.argpartition(-max_q, n - 1)[:n]
+    filas = filas[np.argsort(-max_q[filas], kind='stable')]
+    mejores = matriz[filas].argmax(axis=1)
+    return [(tabla.estados[f], float(max_q[f]), int(a)) for f, a in zip(filas, mejores)]
+
+
+def distribucion_acciones(tabla):
+    """
+    Retorna:
+    --------
+    np.ndarray: cantidad de estados cuya mejor acción es cada índice
+    """
+    matriz = tabla.matriz
+    if len(matriz) == 0:
+        return np.zeros(tabla.n_acciones, dtype=np.int64)
+    return np.bincount(matriz.argmax(axis=1), minlength=tabla.n_acciones)
+
+
+def estadisticas_valores(tabla):
+    """
+    Retorna:
+    --------
+    dict: media, max, min y std de todos los valores Q (None si está vacía)
+    """
+    matriz = tabla.matriz
+    if matriz.size == 0:
+        return None
+    return {
+        'media': float(matriz.mean()),
+        'max': float(matriz.max()),
+        'min': float(matriz.min()),
+        'std': float(matriz.std()),
+    }
@@ -0,0 +1,87 @@
+"""
+Action repeat (frame-skip) para los loops tabulares de 3_entrega y para
+MalmoToolProgressionEnv (3_entrega_final, vía src.action_repeat_wrapper).
+
+`move 1` y `turn 0.5` son comandos continuos: en un solo paso de 20 ms la
+observación casi no cambia, pero cada paso paga una decisión de la política,
+un update y un viaje a Malmo. Con action repeat el comando se mantiene k
+ticks, las recompensas se suman (sin descontar, la definición de recompensa
+no cambia) y solo se devuelve la última observación.
+
+k se configura por tipo de comando (primera palabra de la acción):
+    "4"                         -> k = 4 para todas
+    "move=4,turn=2,attack=1"    -> por comando (el resto k = 1)
+    "3,attack=1"                -> k = 3 salvo attack
+Los crafteos y las opciones (options.py) nunca se repiten.
+"""
+
+import time
+from collections import namedtuple
+
+
+# world_state: último WorldState con observación; reward: suma de las
+# recompensas de los k ticks; steps: ticks (k)
+RepeatResult = namedtuple("RepeatResult", ["world_state", "reward", "steps"])
+
+NEVER_REPEATED = ("craft", "option")
+
+
+def parse_action_repeat(spec):
+    """
+    Args:
+        spec: None, int o string "k" / "cmd=k,..." (ver docstring del módulo)
+
+    Returns:
+        dict {comando: k} con la clave "default"
+    """
+    repeats = {"default": 1}
+    if spec is None:
+        return repeats
+    if isinstance(spec, int):
+        repeats["default"] = spec
+        return repeats
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            command, value = part.split("=", 1)
+            repeats[command.strip()] = int(value)
+        else:
+            repeats["default"] = int(part)
+    for command, value in repeats.items():
+        if value < 1:
+            raise ValueError(f"action repeat de {command} debe ser >= 1: {value}")
+    return repeats
+
+
+def repeat_for(action, repeats):
+    """Ticks que se mantiene `action` (comando Malmo o nombre de acción)."""
+    command = action.split(" ", 1)[0].split("_", 1)[0]
+    if command in NEVER_REPEATED:
+        return 1
+    return repeats.get(command, repeats["default"])
+
+
+def hold_command(agent_host, command, repeat, step_sleep=0.02):
+    """
+    Envía `command` una vez y lo mantiene `repeat` ticks.
+
+    Returns:
+        RepeatResult(world_state, reward, steps)
+    """
+    agent_host.sendCommand(command)
+    reward = 0.0
+    last_ws = None
+    steps = 0
+    for _ in range(repeat):
+        time.sleep(step_sleep)
+        ws = agent_host.getWorldState()
+        reward += sum(r.getValue() for r in ws.rewards)
+        steps += 1
+        if last_ws is None or ws.number_of_observations_since_last_state > 0:
+            last_ws = ws
+        if not ws.is_mission_running:
+            last_ws = ws
+            break
+    return RepeatResult(last_ws, reward, steps)
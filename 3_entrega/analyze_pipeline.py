@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Análisis consolidado del pipeline de 5 etapas (transfer learning).
+
+Descubre el metrics_data/ de cada etapa (madera, piedra, hierro, diamante,
+desde_cero), carga todas las corridas en paralelo con un pool de procesos y
+calcula por algoritmo:
+- Curvas de aprendizaje (reward y tasa de éxito promedio por episodio)
+- Time-to-threshold: primer episodio donde la tasa de éxito móvil supera
+  el umbral
+- Jumpstart frente al agente random de la misma etapa
+- Deltas de transferencia entre etapas consecutivas
+
+Escribe un único reporte (JSON + Markdown, y gráfico si hay matplotlib).
+
+Uso:
+    python analyze_pipeline.py
+    python analyze_pipeline.py --output reporte_pipeline --window 20 --threshold 0.3
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from results_cache import discover_metrics_files, load_metrics_columns
+
+
+# Etapa → columna de material y cantidad que define un episodio exitoso.
+# (diamante y desde_cero registran los diamantes en la columna IronCollected)
+STAGES = [
+    {'id': 1, 'name': 'madera', 'column': 'WoodCollected', 'goal': 3},
+    {'id': 2, 'name': 'piedra', 'column': 'StoneCollected', 'goal': 3},
+    {'id': 3, 'name': 'hierro', 'column': 'IronCollected', 'goal': 3},
+    {'id': 4, 'name': 'diamante', 'column': 'IronCollected', 'goal': 1},
+    {'id': 5, 'name': 'desde_cero', 'column': 'IronCollected', 'goal': 1},
+]
+
+# Orden de las tablas y gráficos; otros algoritmos encontrados van al final
+ALGORITHMS = ['qlearning', 'sarsa', 'expected_sarsa', 'double_q', 'monte_carlo',
+              'q_lambda', 'sarsa_lambda', 'random']
+
+# "<algoritmo>_<Etapa>Agent_<timestamp>.csv|.cols"
+RUN_NAME_PATTERN = re.compile(r'^(?P<algorithm>.+?)_(?P<agent>[A-Za-z]+Agent)_(?P<timestamp>\d+)')
+
+
+def parse_run_name(filename):
+    """
+    Extrae (algoritmo, timestamp) del nombre del archivo de métricas.
+
+    Returns:
+        (algorithm, timestamp) o (None, None) si no sigue el formato
+    """
+    match = RUN_NAME_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return None, None
+    return match.group('algorithm'), int(match.group('timestamp'))
+
+
+def ordered_algorithms(algorithms):
+    """Algoritmos en el orden de ALGORITHMS, seguidos de los desconocidos (ordenados)."""
+    algorithms = set(algorithms)
+    known = [a for a in ALGORITHMS if a in algorithms]
+    return known + sorted(algorithms - set(ALGORITHMS))
+
+
+def moving_average(values, window):
+    """Media móvil (ventana creciente al inicio), vectorizada con cumsum."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return values
+    cumsum = np.cumsum(np.insert(values, 0, 0.0))
+    idx = np.arange(1, len(values) + 1)
+    start = np.maximum(idx - window, 0)
+    return (cumsum[idx] - cumsum[start]) / (idx - start)
+
+
+def time_to_threshold(success, window, threshold):
+    """
+    Primer episodio (índice) donde la tasa de éxito móvil alcanza el umbral.
+
+    Returns:
+        int o None si nunca se alcanza
+    """
+    if len(success) == 0:
+        return None
+    rate = moving_average(success, window)
+    hits = np.nonzero(rate >= threshold)[0]
+    return int(hits[0]) if len(hits) else None
+
+
+def load_run(job):
+    """
+    Worker del pool: carga una corrida y retorna sus arrays compactos.
+
+    Args:
+        job: (stage_name, material_column, goal, path)
+    """
+    stage_name, column, goal, path = job
+    algorithm, timestamp = parse_run_name(path)
+    try:
+        columns = load_metrics_columns(path)
+    except (ValueError, OSError) as e:
+        return {'stage': stage_name, 'path': path, 'error': str(e)}
+
+    rewards = columns.get('TotalReward', np.zeros(0)).astype(np.float32)
+    material = columns.get(column, np.zeros(len(rewards)))
+    return {
+        'stage': stage_name,
+        'path': path,
+        'algorithm': algorithm,
+        'timestamp': timestamp,
+        'rewards': rewards,
+        'success': (material >= goal).astype(np.uint8),
+        'material': material.astype(np.float32),
+        'error': None,
+    }
+
+
+def discover_runs(base_dir):
+    """Lista los trabajos de carga de todas las etapas existentes."""
+    jobs = []
+    for stage in STAGES:
+        metrics_dir = os.path.join(base_dir, stage['name'], 'metrics_data')
+        if not os.path.isdir(metrics_dir):
+            continue
+        for path in discover_metrics_files(metrics_dir):
+            jobs.append((stage['name'], stage['column'], stage['goal'], path))
+    return jobs
+
+
+def _stack_ragged(arrays):
+    """Apila arrays de distinto largo rellenando con NaN."""
+    length = max(len(a) for a in arrays)
+    out = np.full((len(arrays), length), np.nan, dtype=np.float64)
+    for i, a in enumerate(arrays):
+        out[i, :len(a)] = a
+    return out
+
+
+def summarize_group(runs, window, threshold, early_episodes):
+    """
+    Agrega todas las corridas de un (etapa, algoritmo).
+    """
+    rewards = _stack_ragged([r['rewards'] for r in runs])
+    success = _stack_ragged([r['success'] for r in runs])
+
+    with np.errstate(invalid='ignore'):
+        curve_reward = np.nanmean(rewards, axis=0)
+        curve_success = np.nanmean(success, axis=0)
+
+    ttt = [time_to_threshold(r['success'], window, threshold) for r in runs]
+    reached = [t for t in ttt if t is not None]
+    episodes = [len(r['rewards']) for r in runs]
+
+    early = min(early_episodes, rewards.shape[1])
+    last = [r['success'][-window:].mean() if len(r['success']) else 0.0 for r in runs]
+
+    return {
+        'runs': len(runs),
+        'episodes_total': int(sum(episodes)),
+        'mean_reward': float(np.nanmean(rewards)),
+        'success_rate': float(np.nanmean(success)),
+        'early_reward': float(np.nanmean(rewards[:, :early])),
+        'early_success_rate': float(np.nanmean(success[:, :early])),
+        'final_success_rate': float(np.mean(last)),
+        'time_to_threshold_median': float(np.median(reached)) if reached else None,
+        'runs_reaching_threshold': len(reached),
+        'curve_reward': moving_average(curve_reward, window),
+        'curve_success': moving_average(curve_success, window),
+    }
+
+
+def compute_report(runs, window, threshold, early_episodes):
+    """
+    Calcula curvas, time-to-threshold, jumpstart y deltas de transferencia.
+    """
+    groups = defaultdict(list)
+    for run in runs:
+        if run['algorithm'] is not None and len(run['rewards']):
+            groups[(run['stage'], run['algorithm'])].append(run)
+
+    stage_names = [s['name'] for s in STAGES]
+    stages = {}
+    for (stage, algorithm), group in groups.items():
+        stages.setdefault(stage, {})[algorithm] = summarize_group(
+            group, window, threshold, early_episodes)
+
+    # Jumpstart: ventaja inicial frente al agente random de la misma etapa
+    for stage, algos in stages.items():
+        baseline = algos.get('random')
+        for algorithm, summary in algos.items():
+            if baseline is None or algorithm == 'random':
+                summary['jumpstart_vs_random'] = None
+            else:
+                summary['jumpstart_vs_random'] = (summary['early_success_rate']
+                                                  - baseline['early_success_rate'])
+
+    # Deltas de transferencia entre etapas consecutivas presentes
+    present = [s for s in stage_names if s in stages]
+    transfer = []
+    for prev_stage, next_stage in zip(present, present[1:]):
+        for algorithm in ordered_algorithms(set(stages[prev_stage]) & set(stages[next_stage])):
+            prev = stages[prev_stage][algorithm]
+            nxt = stages[next_stage][algorithm]
+            ttt_prev = prev['time_to_threshold_median']
+            ttt_next = nxt['time_to_threshold_median']
+            transfer.append({
+                'algorithm': algorithm,
+                'from': prev_stage,
+                'to': next_stage,
+                'early_success_delta': nxt['early_success_rate'] - prev['early_success_rate'],
+                'final_success_delta': nxt['final_success_rate'] - prev['final_success_rate'],
+                'time_to_threshold_delta': (ttt_next - ttt_prev
+                                            if ttt_prev is not None and ttt_next is not None else None),
+            })
+
+    return {'stages': stages, 'transfer': transfer, 'stage_order': present}
+
+
+def _json_ready(report, window, threshold, errors):
+    stages = {}
+    for stage, algos in report['stages'].items():
+        stages[stage] = {}
+        for algorithm, summary in algos.items():
+            item = dict(summary)
+            item['curve_reward'] = [round(float(v), 3) for v in summary['curve_reward']]
+            item['curve_success'] = [round(float(v), 4) for v in summary['curve_success']]
+            stages[stage][algorithm] = item
+    return {
+        'generated': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'window': window,
+        'threshold': threshold,
+        'stages': stages,
+        'transfer': report['transfer'],
+        'errors': errors,
+    }
+
+
+def _fmt(value, fmt="{:.2f}"):
+    return "-" if value is None else fmt.format(value)
+
+
+def write_markdown(report, path, window, threshold):
+    lines = [
+        "# Reporte consolidado del pipeline",
+        "",
+        f"Ventana móvil: {window} episodios — umbral de éxito: {threshold:.0%}",
+        "",
+    ]
+    for stage in report['stage_order']:
+        lines += [f"## {stage}", "",
+                  "| Algoritmo | Corridas | Episodios | Reward medio | Éxito | Éxito final "
+                  "| Time-to-threshold | Jumpstart vs random |",
+                  "|---|---|---|---|---|---|---|---|"]
+        for algorithm in ordered_algorithms(report['stages'][stage]):
+            s = report['stages'][stage][algorithm]
+            lines.append(
+                f"| {algorithm} | {s['runs']} | {s['episodes_total']} | {s['mean_reward']:.1f} "
+                f"| {s['success_rate']:.1%} | {s['final_success_rate']:.1%} "
+                f"| {_fmt(s['time_to_threshold_median'], '{:.0f}')} "
+                f"| {_fmt(s['jumpstart_vs_random'], '{:+.1%}')} |")
+        lines.append("")
+
+    if report['transfer']:
+        lines += ["## Transferencia entre etapas", "",
+                  "| Algoritmo | De → A | Δ éxito inicial | Δ éxito final | Δ time-to-threshold |",
+                  "|---|---|---|---|---|"]
+        for t in report['transfer']:
+            lines.append(
+                f"| {t['algorithm']} | {t['from']} → {t['to']} "
+                f"| {t['early_success_delta']:+.1%} | {t['final_success_delta']:+.1%} "
+                f"| {_fmt(t['time_to_threshold_delta'], '{:+.0f}')} |")
+        lines.append("")
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+
+
+def plot_learning_curves(report, path):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    present = report['stage_order']
+    fig, axes = plt.subplots(2, len(present), figsize=(5 * len(present), 8), squeeze=False)
+    for col, stage in enumerate(present):
+        for algorithm in ordered_algorithms(report['stages'][stage]):
+            s = report['stages'][stage][algorithm]
+            axes[0, col].plot(s['curve_reward'], label=algorithm)
+            axes[1, col].plot(s['curve_success'], label=algorithm)
+        axes[0, col].set_title(f"{stage} - Reward")
+        axes[1, col].set_title(f"{stage} - Success rate")
+        axes[1, col].set_xlabel('Episode')
+        axes[1, col].set_ylim(-0.05, 1.05)
+    axes[0, 0].legend()
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Análisis consolidado de las 5 etapas del pipeline')
+    parser.add_argument('--base-dir', type=str, default=os.path.dirname(os.path.abspath(__file__)),
+                        help='Directorio 3_entrega (default: el de este script)')
+    parser.add_argument('--output', type=str, default='reporte_pipeline',
+                        help='Directorio de salida del reporte')
+    parser.add_argument('--window', type=int, default=10,
+                        help='Ventana de la media móvil de éxito (default: 10)')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='Tasa de éxito para time-to-threshold (default: 0.5)')
+    parser.add_argument('--early-episodes', type=int, default=10,
+                        help='Episodios iniciales para jumpstart/transfer (default: 10)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos del pool (default: núcleos disponibles)')
+    parser.add_argument('--no-plots', action='store_true', help='No generar gráficos')
+    args = parser.parse_args()
+
+    start = time.time()
+    jobs = discover_runs(args.base_dir)
+    if not jobs:
+        print("❌ No se encontraron métricas en ninguna etapa")
+        sys.exit(1)
+
+    print(f"📂 {len(jobs)} corridas encontradas, cargando en paralelo...")
+    chunksize = max(1, len(jobs) // (4 * (args.workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        runs = list(executor.map(load_run, jobs, chunksize=chunksize))
+
+    errors = [{'path': r['path'], 'error': r['error']} for r in runs if r['error']]
+    runs = [r for r in runs if not r['error']]
+    for e in errors:
+        print(f"⚠ Error leyendo {e['path']}: {e['error']}")
+
+    report = compute_report(runs, args.window, args.threshold, args.early_episodes)
+
+    os.makedirs(args.output, exist_ok=True)
+    json_path = os.path.join(args.output, 'pipeline_report.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(_json_ready(report, args.window, args.threshold, errors), f, indent=2)
+    md_path = os.path.join(args.output, 'pipeline_report.md')
+    write_markdown(report, md_path, args.window, args.threshold)
+
+    print(f"✓ Reporte JSON: {json_path}")
+    print(f"✓ Reporte Markdown: {md_path}")
+    if not args.no_plots:
+        try:
+            plot_path = os.path.join(args.output, 'pipeline_learning_curves.png')
+            plot_learning_curves(report, plot_path)
+            print(f"✓ Curvas de aprendizaje: {plot_path}")
+        except ImportError:
+            print("⚠ matplotlib no disponible, se omiten los gráficos")
+
+    print(f"⏱️  {len(runs)} corridas analizadas en {time.time() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
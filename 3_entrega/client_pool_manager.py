@@ -0,0 +1,476 @@
+"""
+Gestor del pool de clientes de Minecraft con health checks.
+
+Todos los scripts asumían que los clientes en los puertos 10000-10006 estaban
+vivos: startMission reintentaba 3 veces y luego llamaba a exit(1). Este módulo
+centraliza la conexión:
+- Sondea todos los puertos configurados de forma concurrente.
+- Registra por cliente la latencia de startMission y el número de fallos.
+- Pone en cuarentena a los clientes que fallan repetidamente.
+- Si hay un comando de lanzamiento configurado, reinicia en segundo plano
+  los clientes cuyo puerto dejó de responder.
+- Los entrenadores piden un cliente sano (checkout) en lugar de usar un
+  puerto fijo; si no queda ninguno, start_mission() retorna None y el
+  entrenamiento termina de forma ordenada (guardando modelo y métricas).
+
+Uso:
+    manager = ClientPoolManager(ports=[10001, 10002, 10003])
+    manager.probe_all()
+    port = manager.start_mission(agent_host, mission, record, "wood_agent_exp",
+                                 preferred_port=10001)
+    if port is None:
+        ...  # sin clientes disponibles
+    ...
+    manager.release(port)
+
+Comando de lanzamiento (opcional), {port} y {host} se sustituyen:
+    export MALMO_LAUNCH_COMMAND="$MALMO_DIR/Minecraft/launchClient.sh -port {port}"
+"""
+
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORTS = [10001, 10002, 10003, 10004, 10005, 10006]
+
+# Mensaje de Malmo cuando todos los clientes del pool están ocupados.
+# No es un fallo del cliente, solo indica que otro proceso lo está usando.
+BUSY_CLIENT_MESSAGE = "available client"
+
+
+def _replay_backend_active():
+    """True si MalmoPython es el backend de reproducción (malmo_replay)."""
+    return getattr(sys.modules.get("MalmoPython"), "IS_REPLAY", False)
+
+
+class ClientHealth:
+    """
+    Estado de salud de un cliente de Minecraft (host, puerto).
+    """
+
+    def __init__(self, host, port, latency_window=20):
+        self.host = host
+        self.port = port
+        self.alive = None              # Último resultado del probe (None = sin sondear)
+        self.probe_latency = None      # Segundos en abrir el socket
+        self.start_latencies = deque(maxlen=latency_window)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+        self.restarting = False
+        self.restarts = 0
+        self.checked_out = False
+        self.last_error = None
+
+    def is_quarantined(self, now=None):
+        now = time.time() if now is None else now
+        return self.quarantined_until > now
+
+    def is_healthy(self, now=None):
+        """Un cliente es sano si su puerto responde, no está en cuarentena ni reiniciándose."""
+        return self.alive is not False and not self.restarting and not self.is_quarantined(now)
+
+    def mean_start_latency(self):
+        if not self.start_latencies:
+            return None
+        return sum(self.start_latencies) / len(self.start_latencies)
+
+    def to_dict(self):
+        return {
+            "host": self.host,
+            "port": self.port,
+            "alive": self.alive,
+            "healthy": self.is_healthy(),
+            "probe_latency": self.probe_latency,
+            "mean_start_latency": self.mean_start_latency(),
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "quarantined": self.is_quarantined(),
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+        }
+
+
+class ClientPoolManager:
+    """
+    Pool de clientes de Minecraft con health checks, cuarentena y reinicio.
+    """
+
+    def __init__(
+        self,
+        ports=None,
+        host=DEFAULT_HOST,
+        probe_timeout=2.0,
+        max_consecutive_failures=2,
+        quarantine_seconds=60.0,
+        launch_command=None,
+        restart_timeout=180.0,
+        verbose=True
+    ):
+        """
+        Args:
+            ports: Puertos de los clientes (default: 10001-10006)
+            host: IP de los clientes
+            probe_timeout: Timeout del probe de socket (segundos)
+            max_consecutive_failures: Fallos seguidos antes de la cuarentena
+            quarantine_seconds: Duración de la cuarentena
+            launch_command: Comando para relanzar un cliente ({port}, {host}).
+                Si es None se lee MALMO_LAUNCH_COMMAND del entorno.
+            restart_timeout: Máximo de segundos esperando a que un cliente
+                reiniciado abra su puerto
+            verbose: Imprimir eventos de salud
+        """
+        if ports is None:
+            ports = DEFAULT_PORTS
+        if launch_command is None:
+            launch_command = os.environ.get("MALMO_LAUNCH_COMMAND") or None
+
+        self.host = host
+        self.probe_timeout = probe_timeout
+        self.max_consecutive_failures = max_consecutive_failures
+        self.quarantine_seconds = quarantine_seconds
+        self.launch_command = launch_command
+        self.restart_timeout = restart_timeout
+        self.verbose = verbose
+
+        self.clients = OrderedDict()
+        for port in ports:
+            self.clients[int(port)] = ClientHealth(host, int(port))
+
+        self._lock = threading.Lock()
+        self._restart_threads = {}
+
+    def _log(self, message):
+        if self.verbose:
+            print(f"[CLIENT POOL] {message}")
+
+    # ------------------------------------------------------------------
+    # Health checks
+    # ------------------------------------------------------------------
+
+    def probe(self, port):
+        """
+        Comprueba si el puerto del cliente acepta conexiones TCP.
+
+        Returns:
+            True si el puerto está abierto
+        """
+        client = self.clients[port]
+        if _replay_backend_active():
+            # Trayectoria grabada: no hay clientes reales que sondear
+            with self._lock:
+                client.alive = True
+                client.probe_latency = 0.0
+            return True
+        start = time.time()
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(self.probe_timeout)
+            result = sock.connect_ex((client.host, port))
+            sock.close()
+            alive = result == 0
+        except (OSError, socket.error):
+            alive = False
+
+        with self._lock:
+            client.alive = alive
+            client.probe_latency = time.time() - start if alive else None
+        return alive
+
+    def probe_all(self):
+        """
+        Sondea todos los clientes en paralelo.
+
+        Returns:
+            dict {port: alive}
+        """
+        ports = list(self.clients.keys())
+        if not ports:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+            results = dict(zip(ports, executor.map(self.probe, ports)))
+
+        for port, alive in results.items():
+            client = self.clients[port]
+            if not alive and not client.restarting:
+                self._on_client_down(client)
+        return results
+
+    def healthy_ports(self):
+        now = time.time()
+        with self._lock:
+            return [port for port, c in self.clients.items() if c.is_healthy(now)]
+
+    # ------------------------------------------------------------------
+    # Checkout / release
+    # ------------------------------------------------------------------
+
+    def checkout(self, preferred_port=None, wait_timeout=0.0, poll_interval=2.0):
+        """
+        Reserva un cliente sano para este proceso.
+
+        Se prefiere preferred_port; si no está disponible, se elige el cliente
+        sano libre con menor latencia media de startMission.
+
+        Args:
+            preferred_port: Puerto preferido (ej. el asignado al algoritmo)
+            wait_timeout: Segundos a esperar a que algún cliente se recupere
+            poll_interval: Intervalo entre re-sondeos mientras se espera
+
+        Returns:
+            Puerto reservado, o None si no hay clientes sanos
+        """
+        deadline = time.time() + wait_timeout
+        while True:
+            port = self._try_checkout(preferred_port)
+            if port is not None:
+                return port
+            if time.time() >= deadline:
+                return None
+            time.sleep(poll_interval)
+            # Re-sondear los clientes cuya cuarentena expiró
+            now = time.time()
+            for p, client in self.clients.items():
+                if not client.restarting and not client.is_quarantined(now) and client.alive is False:
+                    self.probe(p)
+
+    def _try_checkout(self, preferred_port):
+        now = time.time()
+        with self._lock:
+            candidates = [c for c in self.clients.values()
+                          if c.is_healthy(now) and not c.checked_out]
+            if not candidates:
+                return None
+
+            def sort_key(c):
+                latency = c.mean_start_latency()
+                return (c.port != preferred_port,
+                        c.consecutive_failures,
+                        latency if latency is not None else 0.0)
+
+            client = min(candidates, key=sort_key)
+            client.checked_out = True
+            return client.port
+
+    def release(self, port):
+        """Libera un cliente reservado con checkout()."""
+        if port in self.clients:
+            with self._lock:
+                self.clients[port].checked_out = False
+
+    # ------------------------------------------------------------------
+    # Registro de resultados
+    # ------------------------------------------------------------------
+
+    def report_success(self, port, start_latency):
+        with self._lock:
+            client = self.clients[port]
+            client.alive = True
+            client.successes += 1
+            client.consecutive_failures = 0
+            client.start_latencies.append(start_latency)
+
+    def report_failure(self, port, error=None):
+        """
+        Registra un fallo de startMission. Tras max_consecutive_failures
+        el cliente entra en cuarentena y, si su puerto no responde, se
+        reinicia en segundo plano.
+        """
+        with self._lock:
+            client = self.clients[port]
+            client.failures += 1
+            client.consecutive_failures += 1
+            client.last_error = str(error) if error is not None else None
+            should_quarantine = client.consecutive_failures >= self.max_consecutive_failures
+
+        if should_quarantine:
+            self._quarantine(client)
+            if not self.probe(port):
+                self._on_client_down(client)
+
+    def _quarantine(self, client):
+        with self._lock:
+            client.quarantined_until = time.time() + self.quarantine_seconds
+        self._log(f"Puerto {client.port} en cuarentena por {self.quarantine_seconds:.0f}s "
+                  f"({client.consecutive_failures} fallos seguidos)")
+
+    def _on_client_down(self, client):
+        if self.launch_command:
+            self._restart_in_background(client)
+        elif client.alive is False:
+            self._log(f"Puerto {client.port} no responde (sin MALMO_LAUNCH_COMMAND, no se reinicia)")
+
+    # ------------------------------------------------------------------
+    # Reinicio en segundo plano
+    # ------------------------------------------------------------------
+
+    def _restart_in_background(self, client):
+        with self._lock:
+            if client.restarting:
+                return
+            client.restarting = True
+        thread = threading.Thread(target=self._restart_client, args=(client,), daemon=True)
+        self._restart_threads[client.port] = thread
+        thread.start()
+
+    def _restart_client(self, client):
+        command = self.launch_command.format(port=client.port, host=client.host)
+        self._log(f"Reiniciando cliente en puerto {client.port}: {command}")
+        try:
+            subprocess.Popen(
+                shlex.split(command),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            self._log(f"No se pudo lanzar el cliente {client.port}: {e}")
+            with self._lock:
+                client.restarting = False
+            return
+
+        deadline = time.time() + self.restart_timeout
+        while time.time() < deadline:
+            time.sleep(5.0)
+            if self.probe(client.port):
+                with self._lock:
+                    client.restarting = False
+                    client.restarts += 1
+                    client.consecutive_failures = 0
+                    client.quarantined_until = 0.0
+                self._log(f"Cliente en puerto {client.port} disponible de nuevo")
+                return
+
+        with self._lock:
+            client.restarting = False
+        self._log(f"Cliente en puerto {client.port} no respondió tras {self.restart_timeout:.0f}s")
+
+    # ------------------------------------------------------------------
+    # startMission con failover
+    # ------------------------------------------------------------------
+
+    def start_mission(
+        self,
+        agent_host,
+        mission,
+        mission_record,
+        experiment_id,
+        preferred_port=None,
+        role=0,
+        max_attempts=6,
+        wait_timeout=None,
+        fallback_mission=None
+    ):
+        """
+        Inicia una misión en un cliente sano, cambiando de cliente si falla.
+
+        El cliente queda reservado hasta que se llame a release(port).
+
+        Args:
+            agent_host: MalmoPython.AgentHost
+            mission: MalmoPython.MissionSpec
+            mission_record: MalmoPython.MissionRecordSpec
+            experiment_id: ID del experimento de Malmo
+            preferred_port: Puerto preferido
+            role: Rol del agente en la misión
+            max_attempts: Intentos totales de startMission
+            wait_timeout: Segundos a esperar por un cliente sano en cada
+                intento (default: la duración de la cuarentena)
+            fallback_mission: MissionSpec para cualquier cliente que no sea
+                preferred_port (p. ej. el XML completo cuando `mission`
+                reutiliza el arena que solo tiene el cliente preferido)
+
+        Returns:
+            Puerto donde se inició la misión, o None si no fue posible
+        """
+        import MalmoPython
+
+        if wait_timeout is None:
+            wait_timeout = self.quarantine_seconds
+
+        for attempt in range(max_attempts):
+            port = self.checkout(preferred_port, wait_timeout=wait_timeout)
+            if port is None:
+                self._log("No hay clientes sanos disponibles")
+                return None
+
+            client_pool = MalmoPython.ClientPool()
+            client_pool.add(MalmoPython.ClientInfo(self.host, port))
+
+            spec = mission
+            if fallback_mission is not None and port != preferred_port:
+                spec = fallback_mission
+            start = time.time()
+            try:
+                agent_host.startMission(spec, client_pool, mission_record, role, experiment_id)
+            except RuntimeError as e:
+                self.release(port)
+                if BUSY_CLIENT_MESSAGE in str(e):
+                    # Cliente ocupado por otro proceso: no cuenta como fallo
+                    self._log(f"Puerto {port} ocupado, probando otro cliente...")
+                    with self._lock:
+                        self.clients[port].quarantined_until = time.time() + 2.0 * (attempt + 1)
+                else:
+                    self._log(f"Error en puerto {port} (intento {attempt+1}/{max_attempts}): {e}")
+                    self.report_failure(port, e)
+                time.sleep(1.0 + attempt * 0.5)
+                continue
+
+            self.report_success(port, time.time() - start)
+            if port != preferred_port and preferred_port is not None:
+                self._log(f"Puerto {preferred_port} no disponible, usando {port}")
+            return port
+
+        self._log(f"No se pudo iniciar la misión tras {max_attempts} intentos")
+        return None
+
+    # ------------------------------------------------------------------
+    # Reportes
+    # ------------------------------------------------------------------
+
+    def summary(self):
+        """Retorna el estado de salud de todos los clientes."""
+        with self._lock:
+            return [c.to_dict() for c in self.clients.values()]
+
+    def print_summary(self):
+        print(f"\n{'Puerto':>8} {'Estado':>12} {'Latencia':>10} {'Éxitos':>7} {'Fallos':>7} {'Reinicios':>9}")
+        for info in self.summary():
+            if info["quarantined"]:
+                estado = "cuarentena"
+            elif info["alive"] is False:
+                estado = "caído"
+            elif info["alive"] is None:
+                estado = "sin sondear"
+            else:
+                estado = "sano"
+            latency = info["mean_start_latency"]
+            latency_str = f"{latency:.2f}s" if latency is not None else "-"
+            print(f"{info['port']:>8} {estado:>12} {latency_str:>10} "
+                  f"{info['successes']:>7} {info['failures']:>7} {info['restarts']:>9}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Verifica el estado de los clientes de Minecraft')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST)
+    parser.add_argument('--ports', type=int, nargs='+', default=DEFAULT_PORTS)
+    parser.add_argument('--timeout', type=float, default=2.0)
+    args = parser.parse_args()
+
+    manager = ClientPoolManager(ports=args.ports, host=args.host, probe_timeout=args.timeout)
+    results = manager.probe_all()
+    manager.print_summary()
+    print(f"\n{sum(results.values())}/{len(results)} clientes responden")
@@ -3,55 +3,69 @@ Metrics Collection Module - Stage 3 (Iron Ore)
 Recolecta y visualiza métricas de entrenamiento para el agente de hierro.
 """
 
-import csv
-import time
 import os
-import matplotlib.pyplot as plt
+import sys
+import time
+
+# metrics_store vive en 3_entrega/ (compartido por todas las etapas)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from metrics_store import ColumnarMetricsStore
+
 
 class MetricsLogger:
-    def __init__(self, agent_name, save_dir="metrics_data"):
+    def __init__(self, agent_name, save_dir="metrics_data", export_csv=True,
+                 flush_every=50, flush_interval=30.0):
+        """
+        Args:
+            agent_name: Nombre del agente (prefijo de los archivos)
+            save_dir: Directorio de métricas
+            export_csv: Mantener también el CSV (escrito en lotes)
+            flush_every: Volcar a disco cada N episodios
+            flush_interval: Volcar a disco como máximo cada X segundos
+        """
         self.agent_name = agent_name
         self.save_dir = save_dir
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
         
-        self.filename = os.path.join(save_dir, f"{agent_name}_{int(time.time())}.csv")
+        base_path = os.path.join(save_dir, f"{agent_name}_{int(time.time())}")
+        self.filename = base_path + ".csv"
         self.headers = ["Episode", "Steps", "IronCollected", "TotalReward", "AvgReward", "Epsilon", "MoveActions", "TurnActions", "AttackActions"]
+        dtypes = ["int32", "int32", "int32", "float64", "float64", "float64", "int32", "int32", "int32"]
         
-        with open(self.filename, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(self.headers)
-            
-        self.episode_data = []
-    
+        self.store = ColumnarMetricsStore(
+            base_path,
+            list(zip(self.headers, dtypes)),
+            flush_every=flush_every,
+            flush_interval=flush_interval,
+            csv_path=self.filename if export_csv else None
+        )
+
     def log_episode(self, episode, steps, iron, reward, epsilon, action_counts):
         avg_reward = reward / steps if steps > 0 else 0
         move_count = action_counts.get("move", 0)
         turn_count = action_counts.get("turn", 0)
         attack_count = action_counts.get("attack", 0)
         
-        with open(self.filename, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([episode, steps, iron, reward, avg_reward, epsilon, move_count, turn_count, attack_count])
-        
-        self.episode_data.append({
-            "Episode": episode,
-            "Steps": steps,
-            "IronCollected": iron,
-            "TotalReward": reward,
-            "AvgReward": avg_reward,
-            "Epsilon": epsilon,
-            "MoveActions": move_count,
-            "TurnActions": turn_count,
-            "AttackActions": attack_count
-        })
+        self.store.append((episode, steps, iron, reward, avg_reward, epsilon, move_count, turn_count, attack_count))
         print(f"Episode {episode}: Steps={steps}, Iron={iron}, Reward={reward:.2f}, AvgRew={avg_reward:.2f}, Eps={epsilon:.2f}")
-    
+
+    def flush(self):
+        self.store.flush()
+
+    def export_csv(self, csv_path=None):
+        """Exporta todas las métricas a CSV (por defecto junto al almacén columnar)."""
+        return self.store.export_csv(csv_path or self.filename)
+
     def plot_metrics(self):
-        episodes = [d["Episode"] for d in self.episode_data]
-        rewards = [d["TotalReward"] for d in self.episode_data]
-        iron = [d["IronCollected"] for d in self.episode_data]
-        avg_rewards = [d["AvgReward"] for d in self.episode_data]
+        import matplotlib.pyplot as plt
+        
+        self.store.flush()
+        data = self.store.read_columns()
+        episodes = data["Episode"]
+        rewards = data["TotalReward"]
+        iron = data["IronCollected"]
+        avg_rewards = data["AvgReward"]
         
         plt.figure(figsize=(15, 5))
         
@@ -78,4 +92,5 @@ class MetricsLogger:
         
         plot_path = self.filename.replace('.csv', '.png')
         plt.savefig(plot_path)
+        plt.close()
         print(f"Plots saved to {plot_path}")
@@ -3,6 +3,8 @@ import pickle
 import os
 import math
 
+import numpy as np
+
 class Agent:
     def choose_action(self, state):
         raise NotImplementedError
@@ -21,7 +23,8 @@ class Agent:
                 weights.append(1.0)  # Normal probability for move/turn/attack
         return random.choices(self.actions, weights=weights, k=1)[0]
 
-    def learn(self, state, action, reward, next_state, done=False):
+    def learn(self, state, action, reward, next_state, done=False, steps=1):
+        """steps: pasos primitivos de la acción (opciones, SMDP): el valor siguiente se descuenta con gamma**steps."""
         pass
     
     def start_episode(self):
@@ -73,11 +76,11 @@ class QLearningAgent(Agent):
         best_actions = [a for a, q in zip(self.actions, q_values) if q == max_q]
         return random.choice(best_actions)
 
-    def learn(self, state, action, reward, next_state, done=False):
+    def learn(self, state, action, reward, next_state, done=False, steps=1):
         current_q = self.get_q(state, action)
         max_next_q = max([self.get_q(next_state, a) for a in self.actions]) if not done else 0
         
-        new_q = current_q + self.alpha * (reward + self.gamma * max_next_q - current_q)
+        new_q = current_q + self.alpha * (reward + self.gamma ** steps * max_next_q - current_q)
         self.q_table[(state, action)] = new_q
 
     def end_episode(self):
@@ -109,7 +112,7 @@ class SarsaAgent(QLearningAgent):
         # but standard SARSA requires A' to be chosen by the policy.
         return super().choose_action(state)
 
-    def learn(self, state, action, reward, next_state, next_action=None, done=False):
+    def learn(self, state, action, reward, next_state, next_action=None, done=False, steps=1):
         # This signature differs slightly from Q-Learning if we want true SARSA
         # If next_action is not provided, we must choose it here (but not execute it yet? No, that breaks the loop)
         # The calling loop should provide next_action for SARSA.
@@ -120,12 +123,12 @@ class SarsaAgent(QLearningAgent):
         current_q = self.get_q(state, action)
         next_q = self.get_q(next_state, next_action) if not done else 0
         
-        new_q = current_q + self.alpha * (reward + self.gamma * next_q - current_q)
+        new_q = current_q + self.alpha * (reward + self.gamma ** steps * next_q - current_q)
         self.q_table[(state, action)] = new_q
         return next_action # Return it so the loop can use it if it wants
 
 class ExpectedSarsaAgent(QLearningAgent):
-    def learn(self, state, action, reward, next_state, done=False):
+    def learn(self, state, action, reward, next_state, done=False, steps=1):
         current_q = self.get_q(state, action)
         
         if done:
@@ -143,7 +146,7 @@ class ExpectedSarsaAgent(QLearningAgent):
                 prob = greedy_prob if a in greedy_actions else non_greedy_prob
                 expected_next_q += prob * self.get_q(next_state, a)
 
-        new_q = current_q + self.alpha * (reward + self.gamma * expected_next_q - current_q)
+        new_q = current_q + self.alpha * (reward + self.gamma ** steps * expected_next_q - current_q)
         self.q_table[(state, action)] = new_q
 
 class DoubleQLearningAgent(Agent):
@@ -173,7 +176,8 @@ class DoubleQLearningAgent(Agent):
         best_actions = [a for a, q in zip(self.actions, q_values) if q == max_q]
         return random.choice(best_actions)
 
-    def learn(self, state, action, reward, next_state, done=False):
+    def learn(self, state, action, reward, next_state, done=False, steps=1):
+        gamma = self.gamma ** steps
         if random.random() < 0.5:
             # Update Q1
             current_q1 = self.get_q(state, action, 1)
@@ -188,7 +192,7 @@ class DoubleQLearningAgent(Agent):
                 # Value from Q2
                 max_next_q2 = self.get_q(next_state, best_action, 2)
             
-            new_q1 = current_q1 + self.alpha * (reward + self.gamma * max_next_q2 - current_q1)
+            new_q1 = current_q1 + self.alpha * (reward + gamma * max_next_q2 - current_q1)
             self.q1_table[(state, action)] = new_q1
         else:
             # Update Q2
@@ -204,7 +208,7 @@ class DoubleQLearningAgent(Agent):
                 # Value from Q1
                 max_next_q1 = self.get_q(next_state, best_action, 1)
             
-            new_q2 = current_q2 + self.alpha * (reward + self.gamma * max_next_q1 - current_q2)
+            new_q2 = current_q2 + self.alpha * (reward + gamma * max_next_q1 - current_q2)
             self.q2_table[(state, action)] = new_q2
 
     def end_episode(self):
@@ -228,7 +232,7 @@ class MonteCarloAgent(Agent):
         self.min_epsilon = min_epsilon
         self.q_table = {}
         self.returns = {} # (state, action) -> [returns]
-        self.episode_memory = [] # (state, action, reward)
+        self.episode_memory = [] # (state, action, reward, steps)
 
     def get_q(self, state, action):
         return self.q_table.get((state, action), 0.0)
@@ -242,15 +246,15 @@ class MonteCarloAgent(Agent):
         best_actions = [a for a, q in zip(self.actions, q_values) if q == max_q]
         return random.choice(best_actions)
 
-    def learn(self, state, action, reward, next_state, done=False):
+    def learn(self, state, action, reward, next_state, done=False, steps=1):
         # Store experience
-        self.episode_memory.append((state, action, reward))
+        self.episode_memory.append((state, action, reward, steps))
 
     def end_episode(self):
         G = 0
         # Iterate backwards
-        for state, action, reward in reversed(self.episode_memory):
-            G = self.gamma * G + reward
+        for state, action, reward, steps in reversed(self.episode_memory):
+            G = self.gamma ** steps * G + reward
             
             # First-visit MC (simplified: we just update every time for now or check if first visit)
             # For true first-visit, we need to check if (state, action) appeared earlier in this episode
@@ -273,3 +277,155 @@ class MonteCarloAgent(Agent):
         if os.path.exists(path):
             with open(path, 'rb') as f:
                 self.q_table = pickle.load(f)
+
+
+class ArrayQTable:
+    """
+    Tabla Q con ids internados: (state, action) -> id y un array float64.
+    Expone get/[]/in/len/items como el dict de QLearningAgent y se guarda
+    como ese mismo dict (to_dict), así los modelos siguen siendo compatibles.
+    """
+
+    def __init__(self, capacity=1024):
+        self.ids = {}
+        self.keys = []
+        self.values = np.zeros(capacity)
+
+    def id_of(self, key):
+        sa_id = self.ids.get(key)
+        if sa_id is None:
+            sa_id = len(self.keys)
+            if sa_id == len(self.values):
+                self.values = np.concatenate([self.values, np.zeros(len(self.values))])
+            self.ids[key] = sa_id
+            self.keys.append(key)
+        return sa_id
+
+    def get(self, key, default=0.0):
+        sa_id = self.ids.get(key)
+        return default if sa_id is None else float(self.values[sa_id])
+
+    def __getitem__(self, key):
+        return float(self.values[self.ids[key]])
+
+    def __setitem__(self, key, value):
+        sa_id = self.id_of(key)  # Puede reasignar self.values al crecer
+        self.values[sa_id] = value
+
+    def __contains__(self, key):
+        return key in self.ids
+
+    def __len__(self):
+        return len(self.keys)
+
+    def items(self):
+        return zip(self.keys, self.values[:len(self.keys)].tolist())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, table):
+        q = cls(capacity=max(1024, len(table)))
+        q.keys = list(table.keys())
+        q.ids = {key: i for i, key in enumerate(q.keys)}
+        q.values[:len(q.keys)] = list(table.values())
+        return q
+
+
+class QLambdaAgent(QLearningAgent):
+    """
+    Watkins Q(lambda) con trazas dispersas (replacing traces).
+
+    Las recompensas de las etapas llegan al craftear, cientos de pasos
+    después de las acciones que las hicieron posibles; con un solo paso de
+    backup el crédito retrocede un estado por visita. Aquí cada update
+    reparte el error TD entre los pares (estado, acción) recientes:
+    - Solo se guardan las trazas activas: ids del ArrayQTable + valores
+    - Decaimiento vectorizado por (gamma * lambda) ** steps (opciones: steps > 1)
+    - Trazas por debajo de trace_threshold se descartan
+    - Una acción exploratoria no greedy corta las trazas (Watkins)
+    """
+
+    def __init__(self, actions, alpha=0.1, gamma=0.9, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.01,
+                 lam=0.9, trace_threshold=0.01):
+        super().__init__(actions, alpha, gamma, epsilon, epsilon_decay, min_epsilon)
+        self.lam = lam
+        self.trace_threshold = trace_threshold
+        self.q_table = ArrayQTable()
+        self.reset_traces()
+
+    def reset_traces(self):
+        self.trace_ids = np.empty(0, dtype=np.int64)
+        self.trace_values = np.empty(0)
+
+    def start_episode(self):
+        self.reset_traces()
+
+    def choose_action(self, state):
+        if random.random() < self.epsilon:
+            action = self._choose_weighted_random_action()
+            q_values = [self.get_q(state, a) for a in self.actions]
+            if self.get_q(state, action) < max(q_values):
+                self.reset_traces()  # Acción no greedy: el retorno ya no es el de la política greedy
+            return action
+
+        q_values = [self.get_q(state, a) for a in self.actions]
+        max_q = max(q_values)
+        best_actions = [a for a, q in zip(self.actions, q_values) if q == max_q]
+        return random.choice(best_actions)
+
+    def _td_update(self, state, action, reward, next_q, done, steps):
+        """Reparte el error TD entre las trazas activas y las decae (vectorizado)."""
+        delta = reward + self.gamma ** steps * next_q - self.get_q(state, action)
+
+        sa_id = self.q_table.id_of((state, action))
+        pos = np.flatnonzero(self.trace_ids == sa_id)
+        if pos.size:
+            self.trace_values[pos[0]] = 1.0
+        else:
+            self.trace_ids = np.append(self.trace_ids, sa_id)
+            self.trace_values = np.append(self.trace_values, 1.0)
+
+        self.q_table.values[self.trace_ids] += self.alpha * delta * self.trace_values
+
+        if done:
+            self.reset_traces()
+            return
+        self.trace_values *= (self.gamma * self.lam) ** steps
+        keep = self.trace_values >= self.trace_threshold
+        if not keep.all():
+            self.trace_ids = self.trace_ids[keep]
+            self.trace_values = self.trace_values[keep]
+
+    def learn(self, state, action, reward, next_state, done=False, steps=1):
+        max_next_q = max([self.get_q(next_state, a) for a in self.actions]) if not done else 0
+        self._td_update(state, action, reward, max_next_q, done, steps)
+
+    def end_episode(self):
+        self.reset_traces()
+        super().end_episode()
+
+    def save_model(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self.q_table.to_dict(), f)
+
+    def load_model(self, path):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.q_table = ArrayQTable.from_dict(pickle.load(f))
+
+
+class SarsaLambdaAgent(QLambdaAgent):
+    """SARSA(lambda) on-policy: mismas trazas dispersas, sin corte al explorar."""
+
+    def choose_action(self, state):
+        return QLearningAgent.choose_action(self, state)
+
+    def learn(self, state, action, reward, next_state, next_action=None, done=False, steps=1):
+        # Igual que SarsaAgent: el loop usa la acción devuelta como siguiente acción
+        if next_action is None and not done:
+            next_action = self.choose_action(next_state)
+        next_q = self.get_q(next_state, next_action) if not done else 0
+        self._td_update(state, action, reward, next_q, done, steps)
+        return next_action
@@ -10,7 +10,6 @@ import os
 import sys
 import time
 import json
-import random
 import argparse
 
 # Add parent directory to path for imports
@@ -19,8 +18,18 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, current_dir)
 sys.path.insert(0, parent_dir)
 
-from algorithms import QLearningAgent, SarsaAgent, ExpectedSarsaAgent, DoubleQLearningAgent, MonteCarloAgent, RandomAgent
+from algorithms import QLearningAgent, SarsaAgent, ExpectedSarsaAgent, DoubleQLearningAgent, MonteCarloAgent, RandomAgent, QLambdaAgent, SarsaLambdaAgent
 from metrics import MetricsLogger
+from step_profiler import StepProfiler
+from latency_tracker import TrackedAgentHost
+from trajectory_recorder import maybe_record
+from world_gen import world_layout, keep_arena_drawing_xml, FULL_WORLD_DENSITY
+from options import OptionRunner, OPTION_ACTIONS, STAGE_TARGETS, is_option
+from action_repeat import parse_action_repeat, repeat_for, hold_command
+from tool_cache import ToolManager, STAGE_TOOLS
+from state_abstraction import ABSTRACTIONS, abstract_agent, model_suffix
+from observation_profiles import get_profile, observation_handlers_xml
+from client_pool_manager import ClientPoolManager
 
 # Malmo setup
 malmo_dir = os.environ.get('MALMO_DIR', '')
@@ -37,107 +46,31 @@ except ImportError as e:
     sys.exit(1)
 
 
-def generar_mundo_completo_xml(seed=None):
+def generar_mundo_completo_xml(seed=None, reuse_arena=False):
     """
     Genera el drawing XML del mundo COMPLETO con TODOS los materiales.
-    ESTA FUNCIÓN ES IDÉNTICA EN LOS 5 AGENTES.
+    ESTA FUNCIÓN ES IDÉNTICA EN LOS 5 AGENTES: el layout sale de world_gen
+    (permutación NumPy de las celdas libres, memoizado por seed; bloques
+    contiguos unidos en <DrawCuboid>).
+    Con reuse_arena solo limpia el interior y dibuja el layout (el arena
+    quedó en el cliente de la misión anterior).
     """
-    rng = random.Random(seed) if seed is not None else random
-    
-    radio = 10
-    posiciones_usadas = set()
-    bloques_generados = []
-    
-    def pos_valida(x, z, min_dist_spawn=3):
-        if (x, z) in posiciones_usadas:
-            return False
-        dist_spawn = (x**2 + z**2)**0.5
-        if dist_spawn < min_dist_spawn:
-            return False
-        return True
-    
-    def generar_posicion_aleatoria():
-        x = rng.randint(-radio + 2, radio - 2)
-        z = rng.randint(-radio + 2, radio - 2)
-        return x, z
-    
-    # 1. Wood blocks (40-60)
-    num_madera = rng.randint(40, 60)
-    for _ in range(num_madera):
-        intentos = 0
-        while intentos < 50:
-            x, z = generar_posicion_aleatoria()
-            if pos_valida(x, z):
-                altura = rng.choice([0, 0, 1, 1, 2])
-                tipo = "log"
-                for h in range(altura + 1):
-                    y = 4 + h
-                    bloques_generados.append((x, y, z, tipo))
-                posiciones_usadas.add((x, z))
-                break
-            intentos += 1
-    
-    # 2. Stone blocks (30-40)
-    num_piedra = rng.randint(30, 40)
-    for _ in range(num_piedra):
-        intentos = 0
-        while intentos < 50:
-            x, z = generar_posicion_aleatoria()
-            if pos_valida(x, z):
-                bloques_generados.append((x, 4, z, "stone"))
-                posiciones_usadas.add((x, z))
-                break
-            intentos += 1
-    
-    # 3. Iron ore (20-30) - Se puede minar con stone_pickaxe
-    num_hierro = rng.randint(20, 30)
-    for _ in range(num_hierro):
-        intentos = 0
-        while intentos < 50:
-            x, z = generar_posicion_aleatoria()
-            if pos_valida(x, z):
-                bloques_generados.append((x, 4, z, "iron_ore"))  # ✅ CORRECTO
-                posiciones_usadas.add((x, z))
-                break
-            intentos += 1
-
-    
-    # 4. Diamond ore (3-5 bloques)
-    num_diamante = rng.randint(3, 5)
-    for _ in range(num_diamante):
-        intentos = 0
-        while intentos < 50:
-            x, z = generar_posicion_aleatoria()
-            if pos_valida(x, z):
-                bloques_generados.append((x, 4, z, "diamond_ore"))
-                posiciones_usadas.add((x, z))
-                break
-            intentos += 1
-    
-    drawing_xml = ""
-    
-    # Piso de obsidian (y=3)
-    drawing_xml += '<DrawCuboid x1="-10" y1="3" z1="-10" x2="10" y2="3" z2="10" type="obsidian"/>\n'
-    
-    # Paredes de obsidian
-    drawing_xml += '<DrawCuboid x1="-10" y1="4" z1="-10" x2="-10" y2="10" z2="10" type="obsidian"/>\n'
-    drawing_xml += '<DrawCuboid x1="10" y1="4" z1="-10" x2="10" y2="10" z2="10" type="obsidian"/>\n'
-    drawing_xml += '<DrawCuboid x1="-10" y1="4" z1="-10" x2="10" y2="10" z2="-10" type="obsidian"/>\n'
-    drawing_xml += '<DrawCuboid x1="-10" y1="4" z1="10" x2="10" y2="10" z2="10" type="obsidian"/>\n'
-    
-    # Dibujar todos los bloques
-    for x, y, z, tipo in bloques_generados:
-        drawing_xml += f'<DrawBlock x="{x}" y="{y}" z="{z}" type="{tipo}"/>\n'
-    
-    return drawing_xml
+    layout = world_layout(10, FULL_WORLD_DENSITY, seed=seed)
+    if reuse_arena:
+        return keep_arena_drawing_xml(layout, 10)
+    return layout.drawing_xml
 
 
-def generar_mundo_xml(seed=None):
+def generar_mundo_xml(seed=None, reuse_arena=False, obs_profile="minimal"):
     """
     Genera el XML completo para iron_agent (Stage 3).
     Usa el mismo mundo que todos los demás agentes, solo cambia el inventario.
+    reuse_arena: XML con forceReset="false" que reusa el arena del cliente (ver generar_mundo_completo_xml).
+    obs_profile: "minimal" (solo lo que lee get_state) o "full" (handlers anteriores).
     """
-    drawing_xml = generar_mundo_completo_xml(seed)
+    drawing_xml = generar_mundo_completo_xml(seed, reuse_arena)
+    force_reset = "false" if reuse_arena else "true"
+    observation_xml = observation_handlers_xml(get_profile("stage", obs_profile))
     
     return f'''<?xml version="1.0" encoding="UTF-8" standalone="no"?>
     <Mission xmlns="http://ProjectMalmo.microsoft.com" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
@@ -153,7 +86,7 @@ def generar_mundo_xml(seed=None):
                 <Weather>clear</Weather>
             </ServerInitialConditions>
             <ServerHandlers>
-                <FlatWorldGenerator generatorString="3;7,2*3,2;1;" forceReset="true"/>
+                <FlatWorldGenerator generatorString="3;7,2*3,2;1;" forceReset="{force_reset}"/>
                 <DrawingDecorator>
                     {drawing_xml}
                 </DrawingDecorator>
@@ -174,28 +107,12 @@ def generar_mundo_xml(seed=None):
                 </Inventory>
             </AgentStart>
             <AgentHandlers>
-                <ObservationFromFullStats/>
-                <ObservationFromGrid>
-                    <Grid name="floor5x5">
-                        <min x="-2" y="-1" z="-2"/>
-                        <max x="2" y="-1" z="2"/>
-                    </Grid>
-                     <Grid name="surroundings5x5">
-                        <min x="-2" y="0" z="-2"/>
-                        <max x="2" y="2" z="2"/>
-                    </Grid>
-                </ObservationFromGrid>
+                {observation_xml}
                 <ContinuousMovementCommands turnSpeedDegs="180"/>
                 <DiscreteMovementCommands/>
                 <InventoryCommands/>
                 <SimpleCraftCommands/>
                 <MissionQuitCommands/>
-                <ObservationFromRecentCommands/>
-                <ObservationFromHotBar/>
-                <ObservationFromFullInventory/>
-                <ObservationFromNearbyEntities>
-                    <Range name="entities" xrange="5" yrange="3" zrange="5"/>
-                </ObservationFromNearbyEntities>
                 <RewardForCollectingItem>
                     <Item reward="500" type="log"/>
                     <Item reward="1000" type="stone"/>
@@ -296,32 +213,6 @@ def get_state(world_state):
             planks_count, sticks_count, has_wooden_pickaxe, has_stone_pickaxe, has_iron_pickaxe)
 
 
-def auto_select_tool(world_state, agent_host):
-    """
-    Automatically selects the optimal tool based on the block in front.
-    Stage 3 (Iron): Uses stone_pickaxe for iron_block
-    """
-    if world_state.number_of_observations_since_last_state > 0:
-        try:
-            obs = json.loads(world_state.observations[-1].text)
-            surroundings = obs.get("surroundings5x5", [])
-            
-            if len(surroundings) > 37:
-                front_block = surroundings[37]
-                
-                # Stage 3: Select stone_pickaxe for iron_block
-                if front_block == 'iron_ore':
-                    # Find stone_pickaxe in hotbar (slots 0-8)
-                    for slot in range(9):
-                        item_key = f"InventorySlot_{slot}_item"
-                        if item_key in obs and obs[item_key] == "stone_pickaxe":
-                            agent_host.sendCommand(f"hotbar.{slot+1} 1")
-                            agent_host.sendCommand(f"hotbar.{slot+1} 0")
-                            break
-        except Exception:
-            pass
-
-
 def handle_crafting(action, state, agent_host):
     """
     Handle crafting actions with intelligent sub-crafting
@@ -359,7 +250,9 @@ def handle_crafting(action, state, agent_host):
     return (False, 0, "", False)
 
 
-def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_seed=123456, port=10000):
+def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_seed=123456, port=10000, profile=False, wait_fresh_obs=False,
+                reuse_arena=False, use_options=False, action_repeat=None, obs_profile="minimal",
+                state_abstraction="raw"):
     """
     Entrena un agente en el entorno de recolección de hierro (Stage 3).
 
@@ -380,6 +273,9 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
         "craft_stone_pickaxe",         # 10: Stage 2 craft (not used here)
         "craft_iron_pickaxe"           # 11: Stage 3 craft
     ]
+    if use_options:
+        # Macro-acciones (options.py): mismas 3 opciones en todas las etapas
+        actions = actions + list(OPTION_ACTIONS)
     
     # Initialize agent
     if algorithm == "qlearning":
@@ -392,11 +288,18 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
         agent = DoubleQLearningAgent(actions)
     elif algorithm == "monte_carlo":
         agent = MonteCarloAgent(actions)
+    elif algorithm == "q_lambda":
+        agent = QLambdaAgent(actions)
+    elif algorithm == "sarsa_lambda":
+        agent = SarsaLambdaAgent(actions)
     elif algorithm == "random":
         agent = RandomAgent(actions)
     else:
         raise ValueError(f"Unknown algorithm: {algorithm}")
     
+    # --state-abstraction: clave de la tabla Q (el loop sigue usando el estado completo)
+    agent = abstract_agent(agent, state_abstraction)
+
     # Load pre-trained model from Stage 2 if provided
     if load_model and os.path.exists(load_model):
         print(f"Loading pre-trained model from: {load_model}")
@@ -404,9 +307,12 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
     
     # Initialize metrics
     metrics = MetricsLogger(f"{algorithm}_IronAgent")
+    profiler = StepProfiler(enabled=True if profile else None)  # None: MALMO_PROFILE
     
     # Initialize Malmo
-    agent_host = MalmoPython.AgentHost()
+    # Mide la latencia comando → observación (y opcionalmente espera observaciones nuevas)
+    # MALMO_RECORD=<ruta> graba la trayectoria para reproducirla con malmo_replay
+    agent_host = TrackedAgentHost(maybe_record(MalmoPython.AgentHost()), wait_for_fresh=wait_fresh_obs)
     
     # Map each algorithm to a specific port (10001-10006)
     algorithm_ports = {
@@ -415,7 +321,10 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
         'expected_sarsa': 10003,
         'double_q': 10004,
         'monte_carlo': 10005,
-        'random': 10006
+        'random': 10006,
+        # Las variantes con trazas comparten cliente con su versión de un paso
+        'q_lambda': 10001,
+        'sarsa_lambda': 10002
     }
     # Override port with algorithm-specific port if not manually specified
     if port == 10000:  # default value means user didn't specify --port
@@ -423,29 +332,44 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
     
     print(f"Starting Stage 3 training with {algorithm} on port {port}...")
     
-    # Create ClientPool
-    client_pool = MalmoPython.ClientPool()
-    client_pool.add(MalmoPython.ClientInfo("127.0.0.1", port))
+    # Pool de clientes con health checks: prefiere el puerto del algoritmo
+    # y recurre a los demás clientes sanos si ese deja de responder
+    pool_manager = ClientPoolManager(ports=[port] + [p for p in algorithm_ports.values() if p != port])
+    pool_manager.probe_all()
 
     # Mismo escenario de bloques para todos los episodios
-    mission_xml = generar_mundo_xml(seed=env_seed)
+    mission_xml = generar_mundo_xml(seed=env_seed, obs_profile=obs_profile)
+    # --reuse-arena: desde la 2.a misión en el mismo cliente, sin piso ni paredes
+    reuse_mission_xml = generar_mundo_xml(seed=env_seed, reuse_arena=True, obs_profile=obs_profile) if reuse_arena else None
+    arena_port = None
+    # Herramienta equipada con caché: hotbar.N solo si cambia el slot
+    tool_manager = ToolManager(agent_host, STAGE_TOOLS["iron"])
+    option_runner = OptionRunner(agent_host, STAGE_TARGETS["iron"], gamma=getattr(agent, "gamma", 0.9),
+                                 tool_manager=tool_manager)
+    # --action-repeat: ticks que se mantiene cada comando (k = 1: loop original)
+    repeats = parse_action_repeat(action_repeat)
 
     for episode in range(num_episodes):
         agent.start_episode()
-        my_mission = MalmoPython.MissionSpec(mission_xml, True)
+        tool_manager.reset()
+        reuse = reuse_arena and arena_port == port
+        my_mission = MalmoPython.MissionSpec(reuse_mission_xml if reuse else mission_xml, True)
+        # Failover a otro cliente: ese mundo no tiene el arena, va el XML completo
+        full_mission = MalmoPython.MissionSpec(mission_xml, True) if reuse else None
         my_mission_record = MalmoPython.MissionRecordSpec()
         
-        max_retries = 3
-        for retry in range(max_retries):
-            try:
-                agent_host.startMission(my_mission, client_pool, my_mission_record, 0, "iron_agent_exp")
-                break
-            except RuntimeError as e:
-                if retry == max_retries - 1:
-                    print("Error starting mission:", e)
-                    exit(1)
-                time.sleep(2)
+        mission_start = time.perf_counter()
+        active_port = pool_manager.start_mission(
+            agent_host, my_mission, my_mission_record, "iron_agent_exp", preferred_port=port,
+            fallback_mission=full_mission
+        )
+        if active_port is None:
+            # Sin clientes sanos: terminar ordenadamente guardando lo entrenado
+            print(f"No healthy Minecraft clients available, stopping after {episode} episodes.")
+            pool_manager.print_summary()
+            break
 
+        agent_host.reset_stats()  # TimeAlive se reinicia con cada misión
         print(f"Waiting for mission (Episode {episode})...", end=' ')
         world_state = agent_host.getWorldState()
         while not world_state.has_mission_begun:
@@ -454,7 +378,13 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
             world_state = agent_host.getWorldState()
             for error in world_state.errors:
                 print("Error:", error.text)
-        print()
+        begin_ms = (time.perf_counter() - mission_start) * 1000
+        reuse = reuse and active_port == port
+        episode_xml = reuse_mission_xml if reuse else mission_xml
+        # Latencia por modo de XML: el JSON del profiler compara p50/p95 de ambos
+        profiler.record("mission_begin_keep_arena" if reuse else "mission_begin_compact", int(begin_ms * 1e6))
+        print(f" ({begin_ms:.0f} ms, XML {len(episode_xml)} bytes)")
+        arena_port = active_port
 
         total_reward = 0
         steps = 0
@@ -467,7 +397,8 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
         max_wood = 0
         max_stone = 0
         max_iron = 0
-        action_counts = {"move": 0, "turn": 0, "attack": 0, "craft": 0}
+        action_counts = {"move": 0, "turn": 0, "attack": 0, "craft": 0, "option": 0}
+        decisions = 0
         
         # Track pitch time for auto-reset using observation 'Pitch'
         pitch_start_time = None
@@ -487,16 +418,29 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
 
         while world_state.is_mission_running and steps < max_steps_safety:
             if state and action:
+                profiler.begin()
+                option = None
                 # Check if it's a crafting action
                 if action.startswith("craft_"):
                     success, craft_reward, msg, should_quit = handle_crafting(action, state, agent_host)
                     if msg and success:
                         print(f"  {msg}")
                     total_reward += craft_reward
+                elif is_option(action):
+                    option = option_runner.run(action, world_state)
+                    action_counts["option"] += 1
+                elif repeat_for(action, repeats) > 1:
+                    # Mismo camino que una opción (world_state y recompensa ya leídos)
+                    option = hold_command(agent_host, action, repeat_for(action, repeats))
                 else:
                     agent_host.sendCommand(action)
+                profiler.lap("send_command")
                 
-                steps += 1
+                # SMDP: una opción dura option.steps pasos primitivos; un comando
+                # repetido es una sola decisión (recompensas sumadas, sin descontar)
+                duration = option.steps if option and is_option(action) else 1
+                steps += option.steps if option else 1
+                decisions += 1
                 
                 # Auto-reset pitch
                 if steps % 20 == 0:
@@ -513,7 +457,7 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
                     action_counts["move"] += 1
                 elif "attack" in action:
                     # Auto-select optimal tool before attacking
-                    auto_select_tool(world_state, agent_host)
+                    tool_manager.equip(world_state)
                     
                     action_counts["attack"] += 1
                     # Reward for attacking iron_block
@@ -528,10 +472,17 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
                 elif "craft" in action:
                     action_counts["craft"] += 1
                 
-                time.sleep(0.02)
+                profiler.lap("action_bookkeeping")
+                if not option:
+                    # La opción / hold_command ya esperó entre sus comandos
+                    time.sleep(0.02)
+                profiler.lap("sleep")
                 
-                world_state = agent_host.getWorldState()
+                # La opción / el comando repetido ya leyó el world_state (y sus recompensas)
+                world_state = option.world_state if option else agent_host.getWorldState()
+                profiler.lap("get_world_state")
                 next_state = get_state(world_state)
+                profiler.lap("get_state")
                 
                 # Auto-reset pitch if agent has been looking up/down for >10 seconds
                 if world_state.number_of_observations_since_last_state > 0:
@@ -633,7 +584,14 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
                             else:
                                 print("  ⚠ Warning: Iron pickaxe not confirmed in inventory")
                 
-                reward = sum(r.getValue() for r in world_state.rewards)
+                profiler.lap("env_checks")
+                if option:
+                    # learn() recibe el retorno de la opción (sum gamma^i r_i);
+                    # total_reward y las métricas, la suma sin descontar
+                    reward = option.reward
+                    raw_reward = option.raw_reward if is_option(action) else option.reward
+                else:
+                    reward = raw_reward = sum(r.getValue() for r in world_state.rewards)
                 
                 # Track collection by inventory changes
                 if next_state:
@@ -658,23 +616,25 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
                     prev_stone = cur_stone
                     prev_iron = cur_iron
                 
-                if reward != 0:
-                    print(f"  [REWARD] Step {steps}: {reward}")
+                if raw_reward != 0:
+                    print(f"  [REWARD] Step {steps}: {raw_reward}")
                 
-                total_reward += reward
+                total_reward += raw_reward
                 
+                profiler.lap("reward_tracking")
                 if next_state:
-                    if algorithm == "sarsa":
-                        next_action = agent.learn(state, action, reward, next_state, done=False)
+                    if algorithm in ("sarsa", "sarsa_lambda"):
+                        next_action = agent.learn(state, action, reward, next_state, done=False, steps=duration)
                         action = next_action
                     else:
-                        agent.learn(state, action, reward, next_state, done=False)
+                        agent.learn(state, action, reward, next_state, done=False, steps=duration)
                         action = agent.choose_action(next_state)
                     
                     state = next_state
                 else:
                     if not world_state.is_mission_running:
-                        agent.learn(state, action, reward, state, done=True)
+                        agent.learn(state, action, reward, state, done=True, steps=duration)
+                profiler.lap("learn")
             else:
                 world_state = agent_host.getWorldState()
                 state = get_state(world_state)
@@ -700,21 +660,31 @@ def train_agent(algorithm="qlearning", num_episodes=50, load_model=None, env_see
             episode_success = True
         
         print(f"Episode {episode} ended. Reward: {total_reward}, Iron in inventory: {final_iron_count}, Iron collected: {max_iron}, Stone: {max_stone}, Wood: {max_wood}, Success: {episode_success}")
+        if use_options or action_repeat:
+            print(f"  Decisions: {decisions} ({steps} primitive steps, {action_counts['option']} options)")
+        if tool_manager.switches or tool_manager.skipped:
+            print(f"  Tool switches: {tool_manager.switches} ({tool_manager.skipped} redundant skipped)")
         metrics.log_episode(episode, steps, max_iron, total_reward, agent.epsilon, action_counts)
+        agent_host.print_summary()
         agent.end_episode()
         os.makedirs('../entrenamiento_acumulado', exist_ok=True)
-        agent.save_model(f"../entrenamiento_acumulado/{algorithm}_iron_model.pkl")
+        agent.save_model(f"../entrenamiento_acumulado/{algorithm}{model_suffix(state_abstraction)}_iron_model.pkl")
+        pool_manager.release(active_port)
         time.sleep(0.5)
 
     metrics.plot_metrics()
+    profiler.print_summary()
+    profiler.dump_json(os.path.join(metrics.save_dir, f"{algorithm}_IronAgent_profile.json"),
+                       extra={"episodes": num_episodes})
     os.makedirs('../entrenamiento_acumulado', exist_ok=True)
-    agent.save_model(f"../entrenamiento_acumulado/{algorithm}_iron_model.pkl")
+    agent.save_model(f"../entrenamiento_acumulado/{algorithm}{model_suffix(state_abstraction)}_iron_model.pkl")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run Iron Pickaxe Agent - Stage 3')
     parser.add_argument('--algorithm', type=str, default='qlearning', 
-                        choices=['qlearning', 'sarsa', 'expected_sarsa', 'double_q', 'monte_carlo', 'random'],
+                        choices=['qlearning', 'sarsa', 'expected_sarsa', 'double_q', 'monte_carlo', 'random',
+                                 'q_lambda', 'sarsa_lambda'],
                         help='RL algorithm to use')
     parser.add_argument('--episodes', type=int, default=50, help='Number of episodes')
     parser.add_argument('--load-model', type=str, default=None, 
@@ -723,6 +693,23 @@ if __name__ == "__main__":
                         help='Environment seed (fixed layout of blocks)')
     parser.add_argument('--port', type=int, default=10000,
                         help='Minecraft server port (default: 10000)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Measure step phases (p50/p95/p99) and save a JSON summary')
+    parser.add_argument('--wait-fresh-obs', action='store_true',
+                        help='Block until an observation newer than the last command arrives')
+    parser.add_argument('--reuse-arena', action='store_true',
+                        help='Keep the arena between missions and only redraw the block layout')
+    parser.add_argument('--options', action='store_true',
+                        help='Add macro-actions (mine / face target / advance) with SMDP updates')
+    parser.add_argument('--action-repeat', type=str, default=None,
+                        help='Hold each command for k ticks: "4" or per command, e.g. "move=4,turn=2,attack=1"')
+    parser.add_argument('--obs-profile', type=str, default='minimal', choices=['minimal', 'full'],
+                        help='Observation handlers: only what get_state reads (minimal) or the previous set (full)')
+    parser.add_argument('--state-abstraction', type=str, default='raw', choices=list(ABSTRACTIONS),
+                        help='Q-table key: raw (full state), features, or hashed (fixed-size table)')
     
     args = parser.parse_args()
-    train_agent(args.algorithm, args.episodes, args.load_model, args.env_seed, args.port)
+    train_agent(args.algorithm, args.episodes, args.load_model, args.env_seed, args.port, profile=args.profile,
+                wait_fresh_obs=args.wait_fresh_obs, reuse_arena=args.reuse_arena,
+                use_options=args.options, action_repeat=args.action_repeat,
+                obs_profile=args.obs_profile, state_abstraction=args.state_abstraction)
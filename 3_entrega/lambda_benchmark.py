@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Compara Q-learning / SARSA de un paso con Q(lambda) / SARSA(lambda) en una
+tarea sintética de recompensa dispersa, sin cliente de Minecraft.
+
+La tarea imita una etapa: una cadena de N estados donde solo una acción
+avanza (el resto deja al agente donde está) y la única recompensa es
++10000 al final, como el crafteo. Se mide:
+- updates/s: throughput de learn() + choose_action() (coste por paso)
+- episodios y pasos hasta que la política greedy completa la cadena
+
+    python lambda_benchmark.py --length 60 --episodes 300
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'madera'))
+from algorithms import QLearningAgent, SarsaAgent, QLambdaAgent, SarsaLambdaAgent
+
+
+ACTIONS = [
+    "move 1", "move -1", "strafe 1", "strafe -1", "turn 1", "turn -1",
+    "pitch 0.1", "pitch -0.1", "attack 1",
+    "craft_wooden_pickaxe", "craft_stone_pickaxe", "craft_iron_pickaxe",
+]
+GOOD_ACTION = "attack 1"
+GOAL_REWARD = 10000.0
+
+AGENTS = {
+    'qlearning': QLearningAgent,
+    'sarsa': SarsaAgent,
+    'q_lambda': QLambdaAgent,
+    'sarsa_lambda': SarsaLambdaAgent,
+}
+
+
+def step(state, action, length):
+    """(next_state, reward, done) de la cadena."""
+    if action != GOOD_ACTION:
+        return state, 0.0, False
+    if state + 1 == length:
+        return state + 1, GOAL_REWARD, True
+    return state + 1, 0.0, False
+
+
+def greedy_solves(agent, length):
+    """True si la política greedy (sin exploración) recorre toda la cadena."""
+    for state in range(length):
+        q_values = [agent.get_q((state,), a) for a in ACTIONS]
+        if max(q_values) <= 0 or ACTIONS[q_values.index(max(q_values))] != GOOD_ACTION:
+            return False
+    return True
+
+
+def run(name, length, episodes, max_steps, seed):
+    random.seed(seed)
+    agent = AGENTS[name](ACTIONS, epsilon=1.0, epsilon_decay=0.98, min_epsilon=0.05)
+    sarsa_like = name in ('sarsa', 'sarsa_lambda')
+    total_steps = 0
+    learn_time = 0.0
+    solved_at = None
+
+    for episode in range(episodes):
+        agent.start_episode()
+        state = 0
+        action = agent.choose_action((state,))
+        for _ in range(max_steps):
+            next_state, reward, done = step(state, action, length)
+            start = time.perf_counter()
+            if done:
+                agent.learn((state,), action, reward, (next_state,), done=True)
+            elif sarsa_like:
+                action = agent.learn((state,), action, reward, (next_state,), done=False)
+            else:
+                agent.learn((state,), action, reward, (next_state,), done=False)
+                action = agent.choose_action((next_state,))
+            learn_time += time.perf_counter() - start
+            total_steps += 1
+            state = next_state
+            if done:
+                break
+        agent.end_episode()
+        if solved_at is None and greedy_solves(agent, length):
+            solved_at = (episode + 1, total_steps)
+
+    return {
+        'algorithm': name,
+        'updates_per_s': total_steps / learn_time if learn_time > 0 else 0.0,
+        'steps': total_steps,
+        'solved_episode': solved_at[0] if solved_at else None,
+        'solved_steps': solved_at[1] if solved_at else None,
+        'table_entries': len(agent.q_table),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de trazas de elegibilidad vs. Q-learning de un paso')
+    parser.add_argument('--length', type=int, default=60, help='Estados de la cadena hasta la recompensa')
+    parser.add_argument('--episodes', type=int, default=300)
+    parser.add_argument('--max-steps', type=int, default=2000, help='Pasos máximos por episodio')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--algorithms', nargs='+', default=list(AGENTS), choices=list(AGENTS))
+    parser.add_argument('--output', default=None, help='Guardar el resultado en JSON')
+    args = parser.parse_args()
+
+    results = [run(name, args.length, args.episodes, args.max_steps, args.seed) for name in args.algorithms]
+
+    print("=" * 72)
+    print(f"[LAMBDA] cadena de {args.length} estados, recompensa {GOAL_REWARD:.0f} al final, {args.episodes} episodios")
+    print("=" * 72)
+    print(f"{'Algoritmo':<14} {'updates/s':>10} {'pasos':>9} {'resuelto (ep)':>14} {'resuelto (pasos)':>17}")
+    for r in results:
+        solved_ep = r['solved_episode'] if r['solved_episode'] is not None else '-'
+        solved_steps = r['solved_steps'] if r['solved_steps'] is not None else '-'
+        print(f"{r['algorithm']:<14} {r['updates_per_s']:>10.0f} {r['steps']:>9} {solved_ep:>14} {solved_steps:>17}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"Resultado guardado en: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,18 @@
 import os
+import sys
 import csv
 import matplotlib.pyplot as plt
-import glob
+
+# results_cache vive en 3_entrega/ (compartido por todas las etapas)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from results_cache import MetricsIndex
 
 def analyze_results(metrics_dir="metrics_data"):
-    csv_files = glob.glob(os.path.join(metrics_dir, "*.csv"))
+    # Solo se parsean los archivos nuevos o modificados desde la última corrida
+    index = MetricsIndex(metrics_dir, "WoodCollected", success_threshold=1)
+    index.refresh()
     
-    if not csv_files:
+    if not index.entries:
         print("No metrics files found.")
         return
 
@@ -14,34 +20,17 @@ def analyze_results(metrics_dir="metrics_data"):
     
     plt.figure(figsize=(12, 8))
     
-    for file in csv_files:
-        agent_name = os.path.basename(file).split('_WoodAgent')[0]
-        episodes = []
-        rewards = []
-        wood = []
-        avg_rewards = []
-        
-        with open(file, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                episodes.append(int(row['Episode']))
-                rewards.append(float(row['TotalReward']))
-                wood.append(int(row['WoodCollected']))
-                # Handle backward compatibility if AvgReward missing
-                if 'AvgReward' in row:
-                    avg_rewards.append(float(row['AvgReward']))
-                else:
-                    steps = int(row['Steps'])
-                    avg_rewards.append(float(row['TotalReward'])/steps if steps > 0 else 0)
-
-        if not episodes:
+    for name, entry in index.items():
+        agent_name = name.split('_WoodAgent')[0]
+        n = entry["episodes"]
+        if n == 0:
             continue
             
         # Calculate summary stats
-        avg_total_reward = sum(rewards) / len(rewards)
-        max_wood = max(wood)
-        total_wood = sum(wood)
-        success_rate = sum(1 for w in wood if w > 0) / len(wood) * 100 # Assuming >0 wood is "success"
+        avg_total_reward = entry["reward_sum"] / n
+        max_wood = entry["material_max"]
+        total_wood = entry["material_sum"]
+        success_rate = entry["success_count"] / n * 100 # Assuming >0 wood is "success"
         
         summary_data.append({
             "Agent": agent_name,
@@ -52,7 +41,8 @@ def analyze_results(metrics_dir="metrics_data"):
         })
         
         # Plotting
-        plt.plot(episodes, rewards, label=agent_name)
+        curve = index.load_curve(name)
+        plt.plot(curve["episode"], curve["reward"], label=agent_name)
 
     plt.xlabel('Episode')
     plt.ylabel('Total Reward')
@@ -0,0 +1,199 @@
+"""
+Backend de reproducción: reemplazo de MalmoPython que sirve una trayectoria
+grabada (trajectory_recorder) a máxima velocidad.
+
+Permite correr train_agent() de los agentes y MalmoToolProgressionEnv sin
+cliente de Minecraft, para perfilar los loops completos y hacer pruebas de
+regresión con datos reales.
+
+Uso:
+    import malmo_replay
+    malmo_replay.install("trayectorias/madera.jsonl.gz")   # antes de importar el agente
+    import wood_agent                                       # "import MalmoPython" -> este módulo
+
+La reproducción es en lazo abierto: cada getWorldState() entrega el siguiente
+world state grabado sin importar qué comandos envíe el agente (los comandos
+que difieren de los grabados se cuentan en AgentHost.divergent_commands).
+Cuando se agotan los estados de una misión, la misión termina
+(is_mission_running=False). startMission() avanza a la siguiente misión
+grabada, volviendo a la primera al final si loop=True.
+"""
+
+import sys
+
+from trajectory_recorder import read_trajectory
+
+
+IS_REPLAY = True  # client_pool_manager no sondea sockets con este backend
+
+_missions = []
+_loop = True
+_next_mission = 0
+
+
+def install(path, loop=True):
+    """
+    Carga la trayectoria y registra este módulo como "MalmoPython".
+
+    Args:
+        path: Archivo .jsonl.gz grabado con trajectory_recorder
+        loop: Repetir las misiones grabadas cuando se agotan
+
+    Returns:
+        Número de misiones cargadas
+    """
+    global _missions, _loop, _next_mission
+    _missions = read_trajectory(path)
+    _loop = loop
+    _next_mission = 0
+    if not _missions:
+        raise ValueError(f"La trayectoria {path} no contiene misiones")
+    sys.modules["MalmoPython"] = sys.modules[__name__]
+    return len(_missions)
+
+
+# ----------------------------------------------------------------------
+# Tipos de MalmoPython
+# ----------------------------------------------------------------------
+
+class TimestampedString:
+    __slots__ = ('text', 'timestamp')
+
+    def __init__(self, text, timestamp=0):
+        self.text = text
+        self.timestamp = timestamp
+
+
+class TimestampedReward:
+    __slots__ = ('value', 'timestamp')
+
+    def __init__(self, value, timestamp=0):
+        self.value = value
+        self.timestamp = timestamp
+
+    def getValue(self, dimension=0):
+        return self.value
+
+
+class WorldState:
+    def __init__(self, event=None):
+        event = event or {}
+        t = event.get("t", 0)
+        self.has_mission_begun = bool(event.get("begun"))
+        self.is_mission_running = bool(event.get("run"))
+        self.observations = [TimestampedString(text, t) for text in event.get("o", ())]
+        self.rewards = [TimestampedReward(value, t) for value in event.get("r", ())]
+        self.errors = [TimestampedString(text, t) for text in event.get("err", ())]
+        self.number_of_observations_since_last_state = event.get("n", len(self.observations))
+        self.number_of_rewards_since_last_state = event.get("nr", len(self.rewards))
+        self.number_of_video_frames_since_last_state = 0
+        self.video_frames = []
+        self.mission_control_messages = []
+
+
+_ENDED_STATE = {"begun": 1}
+
+
+class MissionSpec:
+    def __init__(self, xml="", validate=True):
+        self.xml = xml
+
+    def getAsXML(self, pretty_print=False):
+        return self.xml
+
+    def __getattr__(self, name):
+        # forceWorldReset, timeLimitInSeconds, etc.: no-ops
+        return lambda *args, **kwargs: None
+
+
+class MissionRecordSpec:
+    def __init__(self, destination=""):
+        self.destination = destination
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class ClientInfo:
+    def __init__(self, ip_address="127.0.0.1", control_port=10000, command_port=0):
+        self.ip_address = ip_address
+        self.control_port = control_port
+        self.command_port = command_port
+
+
+class ClientPool:
+    def __init__(self):
+        self.clients = []
+
+    def add(self, client_info):
+        self.clients.append(client_info)
+
+
+class MissionException(RuntimeError):
+    pass
+
+
+class AgentHost:
+    """
+    AgentHost que reproduce las misiones grabadas.
+    """
+
+    def __init__(self):
+        self.mission = None
+        self.state_index = 0
+        self.command_index = 0
+        self.commands_sent = 0
+        self.divergent_commands = 0
+        self.states_served = 0
+
+    def startMission(self, mission_spec, *args):
+        global _next_mission
+        if _next_mission >= len(_missions):
+            if not _loop:
+                raise MissionException("Replay: no quedan misiones grabadas")
+            _next_mission = 0
+        self.mission = _missions[_next_mission]
+        _next_mission += 1
+        self.state_index = 0
+        self.command_index = 0
+
+    def _current(self):
+        if self.mission is None or self.state_index >= len(self.mission["states"]):
+            return _ENDED_STATE
+        return self.mission["states"][self.state_index]
+
+    def getWorldState(self):
+        event = self._current()
+        if event is not _ENDED_STATE:
+            self.state_index += 1
+            self.states_served += 1
+        return WorldState(event)
+
+    def peekWorldState(self):
+        return WorldState(self._current())
+
+    def sendCommand(self, command, *args):
+        self.commands_sent += 1
+        if self.mission is not None:
+            recorded = self.mission["commands"]
+            if self.command_index >= len(recorded) or recorded[self.command_index] != command:
+                self.divergent_commands += 1
+            self.command_index += 1
+
+    def setObservationsPolicy(self, policy):
+        pass
+
+    def setRewardsPolicy(self, policy):
+        pass
+
+    def setVideoPolicy(self, policy):
+        pass
+
+    def parse(self, args):
+        pass
+
+    def receivedArgument(self, name):
+        return False
+
+    def getUsage(self):
+        return ""
@@ -0,0 +1,191 @@
+"""
+Almacén columnar de métricas con escritura en lotes.
+
+Reemplaza el patrón "abrir CSV → escribir una fila → cerrar" por episodio:
+- Las filas se acumulan en arrays NumPy tipados (una columna por métrica).
+- Se vuelcan a disco en lotes: cada N episodios, cada X segundos (hilo en
+  segundo plano) y al terminar el proceso (atexit).
+- El formato en disco es un directorio <nombre>.cols/ con un archivo binario
+  por columna (append-only, leído con np.fromfile) y un schema.json.
+- El CSV se mantiene como exportación opcional (también en lotes).
+
+Uso:
+    store = ColumnarMetricsStore("metrics_data/qlearning_WoodAgent_123",
+                                 [("Episode", "int32"), ("TotalReward", "float64")])
+    store.append((0, 12.5))
+    columns = store.read_columns()   # {"Episode": array, "TotalReward": array}
+    store.close()
+"""
+
+import os
+import csv
+import json
+import time
+import atexit
+import threading
+
+import numpy as np
+
+
+COLUMNS_SUFFIX = ".cols"
+SCHEMA_FILE = "schema.json"
+
+
+def load_columns(cols_dir):
+    """
+    Lee un directorio .cols completo.
+
+    Args:
+        cols_dir: Ruta al directorio <nombre>.cols
+
+    Returns:
+        dict {columna: np.ndarray}; todas las columnas con el mismo largo
+    """
+    with open(os.path.join(cols_dir, SCHEMA_FILE), 'r') as f:
+        schema = json.load(f)
+
+    columns = {}
+    for name, dtype in schema["columns"]:
+        path = os.path.join(cols_dir, f"{name}.bin")
+        if os.path.exists(path):
+            columns[name] = np.fromfile(path, dtype=np.dtype(dtype))
+        else:
+            columns[name] = np.zeros(0, dtype=np.dtype(dtype))
+
+    # Si el proceso murió a mitad de un volcado, recortar al largo común
+    if columns:
+        n = min(len(v) for v in columns.values())
+        columns = {k: v[:n] for k, v in columns.items()}
+    return columns
+
+
+class ColumnarMetricsStore:
+    """
+    Buffer de columnas NumPy con volcado en lotes a un almacén columnar.
+    """
+
+    def __init__(
+        self,
+        base_path,
+        columns,
+        flush_every=50,
+        flush_interval=30.0,
+        csv_path=None
+    ):
+        """
+        Args:
+            base_path: Ruta base sin extensión (se crea base_path + ".cols")
+            columns: Lista de (nombre, dtype) en orden de fila
+            flush_every: Volcar cada N filas
+            flush_interval: Volcar como máximo cada X segundos (0 = sin hilo)
+            csv_path: Si no es None, también se agregan las filas a este CSV
+        """
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in columns]
+        # Rutas absolutas: el flush de atexit puede correr tras un chdir
+        self.cols_dir = os.path.abspath(base_path) + COLUMNS_SUFFIX
+        self.csv_path = os.path.abspath(csv_path) if csv_path is not None else None
+        self.flush_every = max(1, int(flush_every))
+        self.flush_interval = flush_interval
+
+        os.makedirs(self.cols_dir, exist_ok=True)
+        self._buffers = [np.zeros(self.flush_every, dtype=dtype) for _, dtype in self.columns]
+        self._pending = 0
+        self._rows_on_disk = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._write_schema()
+        if self.csv_path is not None:
+            with open(self.csv_path, mode='w', newline='') as file:
+                csv.writer(file).writerow([name for name, _ in self.columns])
+
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+        if self.flush_interval and self.flush_interval > 0:
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
+
+        atexit.register(self.close)
+
+    def __len__(self):
+        return self._rows_on_disk + self._pending
+
+    def _write_schema(self):
+        schema = {
+            "columns": [[name, dtype.str] for name, dtype in self.columns],
+            "rows": self._rows_on_disk,
+            "updated": time.time(),
+        }
+        tmp_path = os.path.join(self.cols_dir, SCHEMA_FILE + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(schema, f)
+        os.replace(tmp_path, os.path.join(self.cols_dir, SCHEMA_FILE))
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def append(self, row):
+        """
+        Agrega una fila (tupla en el orden de `columns`).
+        """
+        with self._lock:
+            i = self._pending
+            for buf, value in zip(self._buffers, row):
+                buf[i] = value
+            self._pending += 1
+            full = self._pending >= self.flush_every
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Escribe las filas pendientes en disco (columnar y, opcionalmente, CSV)."""
+        with self._lock:
+            n = self._pending
+            if n == 0:
+                return
+            for (name, _), buf in zip(self.columns, self._buffers):
+                with open(os.path.join(self.cols_dir, f"{name}.bin"), 'ab') as f:
+                    buf[:n].tofile(f)
+
+            if self.csv_path is not None:
+                with open(self.csv_path, mode='a', newline='') as file:
+                    writer = csv.writer(file)
+                    writer.writerows(zip(*[buf[:n].tolist() for buf in self._buffers]))
+
+            self._rows_on_disk += n
+            self._pending = 0
+            self._write_schema()
+
+    def read_columns(self):
+        """
+        Retorna todas las filas registradas (en disco + pendientes).
+
+        Returns:
+            dict {columna: np.ndarray}
+        """
+        with self._lock:
+            on_disk = load_columns(self.cols_dir)
+            n = self._pending
+            return {
+                name: np.concatenate([on_disk[name], buf[:n]])
+                for (name, _), buf in zip(self.columns, self._buffers)
+            }
+
+    def export_csv(self, csv_path):
+        """Exporta el almacén completo a CSV."""
+        columns = self.read_columns()
+        names = [name for name, _ in self.columns]
+        with open(csv_path, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(names)
+            writer.writerows(zip(*[columns[name].tolist() for name in names]))
+        return csv_path
+
+    def close(self):
+        """Detiene el hilo de volcado y escribe lo pendiente."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop_event.set()
+        self.flush()
@@ -0,0 +1,355 @@
+"""
+Opciones (macro-acciones) para los loops tabulares de 3_entrega y para
+MalmoToolProgressionEnv (3_entrega_final, vía src.option_wrapper).
+
+Romper un tronco o un mineral toma muchas decisiones `attack 1` seguidas, y
+cada una es una evaluación de la política, un update y un viaje a Malmo. Una
+opción repite un comando primitivo hasta su condición de término:
+- option_mine: ataca hasta que cambia el inventario (llegó el ítem); si el
+  grid muestra el bloque de enfrente roto, espera unos pasos el ítem y termina,
+- option_face: gira hacia el objetivo más cercano del grid (surroundings5x5
+  o floor5x5); sin objetivo visible da un paso de giro (búsqueda),
+- option_advance: avanza hasta quedar bloqueado (bloque sólido enfrente o
+  posición sin cambios).
+Todas terminan además al agotar su presupuesto de pasos.
+
+Descuento SMDP: una opción de k pasos devuelve R = sum_i gamma^i r_i y el
+update usa gamma^k para el valor siguiente (learn(..., steps=k)).
+
+Los nombres de las opciones no contienen "move", "turn", "attack" ni "craft",
+así que el conteo de acciones de los agentes no las confunde con primitivas.
+"""
+
+import json
+import math
+import time
+from collections import namedtuple
+
+
+OPTION_ACTIONS = ("option_mine", "option_face", "option_advance")
+
+# Objetivos de option_face por etapa de 3_entrega
+STAGE_TARGETS = {
+    "wood": ("log", "log2"),
+    "stone": ("stone",),
+    "iron": ("iron_ore",),
+    "diamond": ("diamond_ore",),
+    "all": ("log", "log2", "stone", "iron_ore", "diamond_ore"),
+}
+
+# Objetivos según el required_material de la etapa del curriculum (env)
+MATERIAL_TARGETS = {
+    "log": ("log", "log2"),
+    "stone": ("stone",),
+    "iron_ore": ("iron_ore",),
+    "diamond": ("diamond_ore",),
+}
+
+PASSABLE_BLOCKS = frozenset(["air", "tallgrass", "double_plant", "red_flower", "yellow_flower"])
+
+# Grid de observación: nombre en el JSON y capa (0-2) a la altura de los pies
+# surroundings5x5 (agentes de 3_entrega): y de 0 a 2; floor5x5 (env): y de -1 a 1
+GridSpec = namedtuple("GridSpec", ["name", "feet_layer"])
+SURROUNDINGS_GRID = GridSpec("surroundings5x5", 0)
+FLOOR_GRID = GridSpec("floor5x5", 1)
+
+# world_state: último WorldState con observación; reward: sum_i gamma^i r_i;
+# steps: pasos primitivos (k); discount: gamma^k; raw_reward: sum_i r_i (métricas)
+OptionResult = namedtuple("OptionResult", ["world_state", "reward", "steps", "discount", "raw_reward"])
+
+
+def is_option(action):
+    return action in OPTION_ACTIONS
+
+
+def grid_index(dx, layer, dz):
+    """Índice en un grid 5x5x3 de Malmo (x varía más rápido, luego z, luego y)."""
+    return layer * 25 + (dz + 2) * 5 + (dx + 2)
+
+
+def facing_offset(yaw):
+    """Celda (dx, dz) de enfrente para un yaw de Minecraft (0 = +z, 90 = -x)."""
+    rad = math.radians(yaw)
+    return int(round(-math.sin(rad))), int(round(math.cos(rad)))
+
+
+def yaw_towards(dx, dz):
+    return math.degrees(math.atan2(-dx, dz))
+
+
+def yaw_error(yaw, target_yaw):
+    """Diferencia target - yaw en (-180, 180]."""
+    return (target_yaw - yaw + 180.0) % 360.0 - 180.0
+
+
+def nearest_target(grid, targets, layers):
+    """
+    Celda objetivo más cercana al agente en las capas dadas.
+
+    Returns:
+        (dx, dz) o None si no hay objetivos en el grid
+    """
+    best = None
+    best_dist = None
+    for layer in layers:
+        for dz in range(-2, 3):
+            for dx in range(-2, 3):
+                if dx == 0 and dz == 0:
+                    continue
+                index = grid_index(dx, layer, dz)
+                if index < len(grid) and grid[index] in targets:
+                    dist = dx * dx + dz * dz
+                    if best_dist is None or dist < best_dist:
+                        best, best_dist = (dx, dz), dist
+    return best
+
+
+def inventory_signature(obs):
+    """Contenido del inventario (tupla comparable) de una observación JSON."""
+    items = []
+    for i in range(45):
+        item = obs.get(f"InventorySlot_{i}_item")
+        if item is not None:
+            items.append((item, obs.get(f"InventorySlot_{i}_size", 1)))
+    for item in obs.get("inventory", ()):
+        items.append((item.get("type", ""), item.get("quantity", 0)))
+    return tuple(items)
+
+
+class Option:
+    """
+    Macro-acción: un comando primitivo por paso hasta should_stop().
+    """
+
+    name = None
+    stop_command = None
+
+    def __init__(self, grid=SURROUNDINGS_GRID, max_steps=40):
+        """
+        Args:
+            grid: GridSpec del grid de observación
+            max_steps: Presupuesto de pasos primitivos
+        """
+        self.grid = grid
+        self.max_steps = max_steps
+
+    def start(self, obs):
+        """Prepara la opción desde la observación (dict JSON) actual."""
+        self.start_obs = obs
+
+    def command(self, obs):
+        raise NotImplementedError
+
+    def should_stop(self, obs, steps):
+        return steps >= self.max_steps
+
+    def _front_blocks(self, obs):
+        grid = obs.get(self.grid.name, [])
+        dx, dz = facing_offset(obs.get("Yaw", 0.0))
+        blocks = []
+        for layer in (self.grid.feet_layer, self.grid.feet_layer + 1):
+            index = grid_index(dx, layer, dz)
+            blocks.append(grid[index] if index < len(grid) else "air")
+        return blocks
+
+
+class MineOption(Option):
+    """Ataca el bloque de enfrente hasta recibir el ítem."""
+
+    name = "option_mine"
+    stop_command = "attack 0"
+
+    def __init__(self, grid=SURROUNDINGS_GRID, max_steps=40, pickup_steps=5):
+        """
+        Args:
+            grid: GridSpec del grid de observación
+            max_steps: Presupuesto de pasos primitivos
+            pickup_steps: Pasos de espera del ítem después de romper el bloque
+        """
+        super().__init__(grid, max_steps)
+        self.pickup_steps = pickup_steps
+
+    def start(self, obs):
+        super().start(obs)
+        self.start_inventory = inventory_signature(obs)
+        self.start_front = self._front_blocks(obs)
+        self.broken_at = None
+
+    def command(self, obs):
+        return "attack 1"
+
+    def should_stop(self, obs, steps):
+        if steps >= self.max_steps:
+            return True
+        if all(block in PASSABLE_BLOCKS for block in self.start_front):
+            return True  # no había nada que minar
+        if inventory_signature(obs) != self.start_inventory:
+            return True
+        if self.broken_at is None:
+            front = self._front_blocks(obs)
+            if any(before not in PASSABLE_BLOCKS and after in PASSABLE_BLOCKS
+                   for before, after in zip(self.start_front, front)):
+                self.broken_at = steps
+        return self.broken_at is not None and steps - self.broken_at >= self.pickup_steps
+
+
+class FaceTargetOption(Option):
+    """Gira hacia el objetivo más cercano visible en el grid."""
+
+    name = "option_face"
+    stop_command = "turn 0"
+
+    def __init__(self, targets, grid=SURROUNDINGS_GRID, max_steps=20, tolerance=20.0, turn_speed=0.5):
+        """
+        Args:
+            targets: Tipos de bloque objetivo
+            grid: GridSpec del grid de observación
+            max_steps: Presupuesto de pasos primitivos
+            tolerance: Error de yaw (grados) para darse por orientado
+            turn_speed: Velocidad del comando turn
+        """
+        super().__init__(grid, max_steps)
+        self.targets = frozenset(targets)
+        self.tolerance = tolerance
+        self.turn_speed = turn_speed
+
+    def _error(self, obs):
+        grid = obs.get(self.grid.name, [])
+        target = nearest_target(grid, self.targets, (self.grid.feet_layer, self.grid.feet_layer + 1))
+        if target is None:
+            return None
+        return yaw_error(obs.get("Yaw", 0.0), yaw_towards(*target))
+
+    def command(self, obs):
+        error = self._error(obs)
+        # Sin objetivo visible: girar para buscar
+        if error is None or error > 0:
+            return f"turn {self.turn_speed}"
+        return f"turn {-self.turn_speed}"
+
+    def should_stop(self, obs, steps):
+        if steps >= self.max_steps:
+            return True
+        error = self._error(obs)
+        return error is None or abs(error) <= self.tolerance
+
+
+class AdvanceOption(Option):
+    """Avanza hasta quedar bloqueado."""
+
+    name = "option_advance"
+    stop_command = "move 0"
+
+    def __init__(self, grid=SURROUNDINGS_GRID, max_steps=30, stuck_steps=3, min_progress=0.05):
+        """
+        Args:
+            grid: GridSpec del grid de observación
+            max_steps: Presupuesto de pasos primitivos
+            stuck_steps: Pasos seguidos sin moverse para darse por bloqueado
+            min_progress: Desplazamiento mínimo por paso (bloques)
+        """
+        super().__init__(grid, max_steps)
+        self.stuck_steps = stuck_steps
+        self.min_progress = min_progress
+
+    def start(self, obs):
+        super().start(obs)
+        self.last_pos = (obs.get("XPos"), obs.get("ZPos"))
+        self.stuck = 0
+
+    def command(self, obs):
+        return "move 1"
+
+    def should_stop(self, obs, steps):
+        if steps >= self.max_steps:
+            return True
+        if any(block not in PASSABLE_BLOCKS for block in self._front_blocks(obs)):
+            return True
+        pos = (obs.get("XPos"), obs.get("ZPos"))
+        if None not in pos and None not in self.last_pos:
+            moved = math.hypot(pos[0] - self.last_pos[0], pos[1] - self.last_pos[1])
+            self.stuck = self.stuck + 1 if moved < self.min_progress else 0
+        self.last_pos = pos
+        return self.stuck >= self.stuck_steps
+
+
+def make_options(targets, grid=SURROUNDINGS_GRID):
+    """Opciones estándar {nombre: Option} para un conjunto de objetivos."""
+    options = [MineOption(grid), FaceTargetOption(targets, grid), AdvanceOption(grid)]
+    return {option.name: option for option in options}
+
+
+def _last_obs(world_state):
+    if world_state is None or world_state.number_of_observations_since_last_state == 0:
+        return None
+    return json.loads(world_state.observations[-1].text)
+
+
+class OptionRunner:
+    """
+    Ejecuta opciones directamente sobre un AgentHost (loops tabulares).
+    """
+
+    def __init__(self, agent_host, targets, gamma=0.9, step_sleep=0.02, grid=SURROUNDINGS_GRID,
+                 tool_manager=None):
+        """
+        Args:
+            agent_host: AgentHost (o TrackedAgentHost) de la misión
+            targets: Tipos de bloque objetivo de option_face
+            gamma: Descuento por paso primitivo
+            step_sleep: Pausa entre comandos (igual que el loop del agente)
+            grid: GridSpec del grid de observación
+            tool_manager: ToolManager de la etapa (tool_cache); equipa la
+                herramienta antes de option_mine, como antes de cada `attack`
+        """
+        self.agent_host = agent_host
+        self.tool_manager = tool_manager
+        self.gamma = gamma
+        self.step_sleep = step_sleep
+        self.options = make_options(targets, grid)
+        self.obs = {}
+
+    def run(self, name, world_state):
+        """
+        Ejecuta la opción `name` desde world_state hasta que termina.
+
+        Returns:
+            OptionResult(world_state, reward, steps, discount, raw_reward)
+        """
+        option = self.options[name]
+        obs = _last_obs(world_state) or self.obs
+        option.start(obs)
+        if self.tool_manager is not None and isinstance(option, MineOption):
+            self.tool_manager.equip(world_state)
+
+        reward = 0.0
+        raw_reward = 0.0
+        discount = 1.0
+        steps = 0
+        last_ws = world_state
+        command = option.command(obs)
+        while True:
+            self.agent_host.sendCommand(command)
+            time.sleep(self.step_sleep)
+            ws = self.agent_host.getWorldState()
+            step_reward = sum(r.getValue() for r in ws.rewards)
+            reward += discount * step_reward
+            raw_reward += step_reward
+            discount *= self.gamma
+            steps += 1
+
+            new_obs = _last_obs(ws)
+            if new_obs is not None:
+                obs = new_obs
+                last_ws = ws
+            if not ws.is_mission_running:
+                last_ws = ws
+                break
+            if option.should_stop(obs, steps):
+                break
+            command = option.command(obs)
+
+        if last_ws.is_mission_running and option.stop_command:
+            self.agent_host.sendCommand(option.stop_command)
+        self.obs = obs
+        return OptionResult(last_ws, reward, steps, discount, raw_reward)
@@ -1,12 +1,18 @@
 import os
+import sys
 import csv
 import matplotlib.pyplot as plt
-import glob
+
+# results_cache vive en 3_entrega/ (compartido por todas las etapas)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from results_cache import MetricsIndex
 
 def analyze_results(metrics_dir="metrics_data"):
-    csv_files = glob.glob(os.path.join(metrics_dir, "*.csv"))
+    # Solo se parsean los archivos nuevos o modificados desde la última corrida
+    index = MetricsIndex(metrics_dir, "StoneCollected")
+    index.refresh()
     
-    if not csv_files:
+    if not index.entries:
         print("No metrics files found.")
         return
 
@@ -14,37 +20,20 @@ def analyze_results(metrics_dir="metrics_data"):
     
     plt.figure(figsize=(15, 5))
     
-    for file in csv_files:
-        agent_name = os.path.basename(file).split('_StoneAgent')[0]
-        if '_StoneAgent' not in os.path.basename(file):
+    for name, entry in index.items():
+        agent_name = name.split('_StoneAgent')[0]
+        if '_StoneAgent' not in name:
             # Try other patterns
-            agent_name = os.path.basename(file).replace('.csv', '').split('_')[0]
+            agent_name = name.replace('.csv', '').split('_')[0]
             
-        episodes = []
-        rewards = []
-        stone = []
-        avg_rewards = []
-        
-        with open(file, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                episodes.append(int(row['Episode']))
-                rewards.append(float(row['TotalReward']))
-                stone.append(int(row['StoneCollected']))
-                # Handle backward compatibility if AvgReward missing
-                if 'AvgReward' in row:
-                    avg_rewards.append(float(row['AvgReward']))
-                else:
-                    steps = int(row['Steps'])
-                    avg_rewards.append(float(row['TotalReward'])/steps if steps > 0 else 0)
-
-        if not episodes:
+        n = entry["episodes"]
+        if n == 0:
             continue
             
         # Calculate summary stats
-        avg_total_reward = sum(rewards) / len(rewards)
-        total_stone = sum(stone)
-        max_stone = max(stone)
+        avg_total_reward = entry["reward_sum"] / n
+        total_stone = entry["material_sum"]
+        max_stone = entry["material_max"]
         
         summary_data.append({
             "Agent": agent_name,
@@ -53,17 +42,20 @@ def analyze_results(metrics_dir="metrics_data"):
             "MaxStone": max_stone
         })
         
+        curve = index.load_curve(name)
+        episodes = curve["episode"]
+        
         # Plotting rewards comparison
         plt.subplot(1, 3, 1)
-        plt.plot(episodes, rewards, label=agent_name)
+        plt.plot(episodes, curve["reward"], label=agent_name)
         
         # Plotting stone collection
         plt.subplot(1, 3, 2)
-        plt.plot(episodes, stone, label=agent_name)
+        plt.plot(episodes, curve["material"], label=agent_name)
         
         # Plotting average reward efficiency
         plt.subplot(1, 3, 3)
-        plt.plot(episodes, avg_rewards, label=agent_name)
+        plt.plot(episodes, curve["avg_reward"], label=agent_name)
 
     # Configure subplots
     plt.subplot(1, 3, 1)
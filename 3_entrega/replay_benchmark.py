@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Ejecuta train_agent() de una etapa sobre una trayectoria grabada, sin
+cliente de Minecraft, y reporta el rendimiento del loop completo.
+
+1. Grabar una corrida real:
+       MALMO_RECORD=trayectorias/ python madera/wood_agent.py --episodes 5
+2. Reproducirla a máxima velocidad (con profiler de fases):
+       python replay_benchmark.py trayectorias/trajectory_*.jsonl.gz --stage madera --episodes 5 --skip-sleep
+
+Las salidas del agente (metrics_data/, modelos .pkl) se escriben en un
+directorio temporal para no tocar los resultados reales.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import tempfile
+
+import malmo_replay
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+STAGE_MODULES = {
+    'madera': 'wood_agent',
+    'piedra': 'stone_agent',
+    'hierro': 'iron_agent',
+    'diamante': 'diamond_agent',
+    'desde_cero': 'from_scratch_agent',
+}
+
+
+class _NoSleepTime:
+    """Módulo time con sleep() inmediato (el resto se delega al real)."""
+
+    def __init__(self, real_time):
+        self._time = real_time
+
+    def sleep(self, seconds):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._time, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offline de train_agent() con una trayectoria grabada')
+    parser.add_argument('trajectory', help='Archivo .jsonl.gz grabado con MALMO_RECORD')
+    parser.add_argument('--stage', choices=sorted(STAGE_MODULES.keys()), default='madera')
+    parser.add_argument('--algorithm', default='qlearning')
+    parser.add_argument('--episodes', type=int, default=None,
+                        help='Episodios (default: número de misiones grabadas)')
+    parser.add_argument('--skip-sleep', action='store_true',
+                        help='Anular time.sleep() del agente (máxima velocidad)')
+    parser.add_argument('--workdir', default=None,
+                        help='Directorio de trabajo para las salidas (default: temporal)')
+    parser.add_argument('--output', default=None, help='Guardar el resultado en JSON')
+    args = parser.parse_args()
+
+    trajectory = os.path.abspath(args.trajectory)
+    n_missions = malmo_replay.install(trajectory)
+    episodes = args.episodes or n_missions
+
+    # Importar el agente de la etapa (su "import MalmoPython" toma el backend de replay)
+    sys.path.insert(0, os.path.join(HERE, args.stage))
+    agent_module = importlib.import_module(STAGE_MODULES[args.stage])
+    if args.skip_sleep:
+        agent_module.time = _NoSleepTime(time)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='replay_')
+    run_dir = os.path.join(workdir, 'run')  # los agentes guardan en ../entrenamiento_acumulado
+    os.makedirs(run_dir, exist_ok=True)
+    original_cwd = os.getcwd()
+    os.chdir(run_dir)
+
+    # Contar lo servido por todos los AgentHost creados
+    hosts = []
+    original_agent_host = malmo_replay.AgentHost
+
+    def tracking_agent_host():
+        host = original_agent_host()
+        hosts.append(host)
+        return host
+
+    agent_module.MalmoPython.AgentHost = tracking_agent_host
+
+    print(f"[REPLAY] {n_missions} misiones en {trajectory}")
+    print(f"[REPLAY] {args.stage}/{args.algorithm}, {episodes} episodios, salidas en {workdir}")
+
+    start = time.perf_counter()
+    try:
+        agent_module.train_agent(args.algorithm, num_episodes=episodes, profile=True)
+    finally:
+        elapsed = time.perf_counter() - start
+        agent_module.MalmoPython.AgentHost = original_agent_host
+        os.chdir(original_cwd)
+
+    states = sum(h.states_served for h in hosts)
+    commands = sum(h.commands_sent for h in hosts)
+    divergent = sum(h.divergent_commands for h in hosts)
+    result = {
+        'trajectory': trajectory,
+        'stage': args.stage,
+        'algorithm': args.algorithm,
+        'episodes': episodes,
+        'skip_sleep': args.skip_sleep,
+        'elapsed_s': elapsed,
+        'world_states': states,
+        'commands': commands,
+        'divergent_commands': divergent,
+        'states_per_s': states / elapsed if elapsed > 0 else 0.0,
+        'workdir': workdir,
+    }
+
+    print("\n" + "=" * 60)
+    print(f"Tiempo total: {elapsed:.2f}s | {states} world states ({result['states_per_s']:.0f}/s) | "
+          f"{commands} comandos ({divergent} distintos a la grabación)")
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Resultado guardado en: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
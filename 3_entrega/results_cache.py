@@ -0,0 +1,219 @@
+"""
+Caché incremental de agregados para analyze_results.py.
+
+metrics_data/ crece con cada corrida (miles de archivos tras semanas de
+entrenamiento) y analyze_results() volvía a parsear todas las filas de todos
+los CSV en cada invocación. Este módulo mantiene un índice en
+metrics_data/.analysis_index.json con, por archivo:
+- la firma (tamaño, mtime) para detectar archivos nuevos o modificados,
+- los agregados (episodios, suma de rewards, éxitos, máximo/total de material),
+- la ruta a la curva (Episode, TotalReward, material, AvgReward) en .npz.
+
+Solo se leen los archivos nuevos o cambiados, con carga vectorizada NumPy.
+Acepta tanto los CSV como los directorios columnar <nombre>.cols de
+metrics_store (si existen ambos para la misma corrida se usa el .cols).
+"""
+
+import io
+import os
+import glob
+import json
+import hashlib
+
+import numpy as np
+
+from metrics_store import COLUMNS_SUFFIX, SCHEMA_FILE, load_columns
+
+
+INDEX_FILE = ".analysis_index.json"
+CURVES_DIR = ".analysis_curves"
+INDEX_VERSION = 1
+
+
+def _file_signature(path):
+    """Firma (tamaño, mtime_ns) de un CSV o de un directorio .cols."""
+    if path.endswith(COLUMNS_SUFFIX):
+        path = os.path.join(path, SCHEMA_FILE)
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def discover_metrics_files(metrics_dir):
+    """
+    Lista los archivos de métricas; un .cols reemplaza a su CSV gemelo.
+    """
+    cols_dirs = [d for d in glob.glob(os.path.join(metrics_dir, "*" + COLUMNS_SUFFIX))
+                 if os.path.exists(os.path.join(d, SCHEMA_FILE))]
+    cols_bases = set(d[:-len(COLUMNS_SUFFIX)] for d in cols_dirs)
+    csv_files = [f for f in glob.glob(os.path.join(metrics_dir, "*.csv"))
+                 if f[:-len(".csv")] not in cols_bases]
+    return sorted(cols_dirs + csv_files)
+
+
+def _load_csv_columns(path):
+    """
+    Carga un CSV de métricas en columnas NumPy (sin DictReader).
+
+    Returns:
+        dict {columna: np.ndarray float64}
+    """
+    with open(path, 'r') as f:
+        header = f.readline().strip().split(',')
+        body = f.read()
+
+    if not body.strip():
+        return {name: np.zeros(0) for name in header}
+    data = np.loadtxt(io.StringIO(body), delimiter=',', ndmin=2)
+    return {name: data[:, i] for i, name in enumerate(header)}
+
+
+def load_metrics_columns(path):
+    """Carga un archivo de métricas (CSV o .cols) como dict de columnas."""
+    if path.endswith(COLUMNS_SUFFIX):
+        return {k: v.astype(np.float64) for k, v in load_columns(path).items()}
+    return _load_csv_columns(path)
+
+
+def _downsample(n, max_points):
+    if n <= max_points:
+        return slice(None)
+    return slice(None, None, int(np.ceil(n / max_points)))
+
+
+class MetricsIndex:
+    """
+    Índice incremental de agregados por archivo de métricas.
+    """
+
+    def __init__(self, metrics_dir, material_column, success_threshold=1, max_curve_points=1000):
+        """
+        Args:
+            metrics_dir: Directorio con los archivos de métricas
+            material_column: Columna de material (ej. "WoodCollected")
+            success_threshold: Material mínimo para contar un episodio como éxito
+            max_curve_points: Puntos máximos guardados por curva
+        """
+        self.metrics_dir = metrics_dir
+        self.material_column = material_column
+        self.success_threshold = success_threshold
+        self.max_curve_points = max_curve_points
+        self.index_path = os.path.join(metrics_dir, INDEX_FILE)
+        self.curves_dir = os.path.join(metrics_dir, CURVES_DIR)
+        self.entries = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (ValueError, OSError):
+            return {}
+        if (index.get("version") != INDEX_VERSION
+                or index.get("material_column") != self.material_column
+                or index.get("success_threshold") != self.success_threshold):
+            return {}
+        return index.get("files", {})
+
+    def _save_index(self):
+        index = {
+            "version": INDEX_VERSION,
+            "material_column": self.material_column,
+            "success_threshold": self.success_threshold,
+            "files": self.entries,
+        }
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _curve_path(self, name):
+        digest = hashlib.md5(name.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.curves_dir, f"{digest}.npz")
+
+    def _aggregate(self, path, name):
+        columns = load_metrics_columns(path)
+        episodes = columns.get("Episode", np.zeros(0))
+        rewards = columns.get("TotalReward", np.zeros(0))
+        material = columns.get(self.material_column, np.zeros(len(episodes)))
+        if "AvgReward" in columns:
+            avg_rewards = columns["AvgReward"]
+        else:
+            steps = columns.get("Steps", np.zeros(len(episodes)))
+            avg_rewards = np.divide(rewards, steps, out=np.zeros_like(rewards), where=steps > 0)
+
+        n = len(episodes)
+        entry = {
+            "signature": _file_signature(path),
+            "episodes": int(n),
+            "reward_sum": float(rewards.sum()),
+            "material_sum": int(material.sum()),
+            "material_max": int(material.max()) if n else 0,
+            "success_count": int((material >= self.success_threshold).sum()),
+            "curve": None,
+        }
+
+        if n:
+            os.makedirs(self.curves_dir, exist_ok=True)
+            sl = _downsample(n, self.max_curve_points)
+            curve_path = self._curve_path(name)
+            np.savez(curve_path,
+                     episode=episodes[sl].astype(np.int64),
+                     reward=rewards[sl],
+                     material=material[sl],
+                     avg_reward=avg_rewards[sl])
+            entry["curve"] = os.path.basename(curve_path)
+        return entry
+
+    def refresh(self, verbose=True):
+        """
+        Actualiza el índice: parsea solo archivos nuevos o modificados y
+        elimina las entradas de archivos borrados.
+
+        Returns:
+            Número de archivos (re)parseados
+        """
+        files = discover_metrics_files(self.metrics_dir)
+        names = set(os.path.basename(p) for p in files)
+        parsed = 0
+
+        for path in files:
+            name = os.path.basename(path)
+            entry = self.entries.get(name)
+            if entry is not None and entry["signature"] == _file_signature(path):
+                continue
+            try:
+                self.entries[name] = self._aggregate(path, name)
+                parsed += 1
+            except (ValueError, OSError) as e:
+                print(f"Error leyendo {path}: {e}")
+
+        for name in list(self.entries.keys()):
+            if name not in names:
+                curve = self.entries[name].get("curve")
+                if curve and os.path.exists(os.path.join(self.curves_dir, curve)):
+                    os.remove(os.path.join(self.curves_dir, curve))
+                del self.entries[name]
+
+        self._save_index()
+        if verbose:
+            print(f"Índice de métricas: {len(self.entries)} archivos ({parsed} parseados, "
+                  f"{len(self.entries) - parsed} desde caché)")
+        return parsed
+
+    def load_curve(self, name):
+        """
+        Retorna la curva cacheada de un archivo.
+
+        Returns:
+            dict con episode, reward, material y avg_reward (np.ndarray), o None
+        """
+        curve = self.entries.get(name, {}).get("curve")
+        if not curve:
+            return None
+        with np.load(os.path.join(self.curves_dir, curve)) as data:
+            return {k: data[k] for k in data.files}
+
+    def items(self):
+        """Itera (nombre_archivo, entrada) ordenados por nombre."""
+        return sorted(self.entries.items())
@@ -0,0 +1,208 @@
+"""
+Abstracción de estados para las tablas Q de las etapas de 3_entrega.
+
+get_state() devuelve el grid surroundings5x5 completo (una tupla con el
+nombre de cada bloque) más seis conteos de inventario y tres flags de pico.
+Como clave de la tabla Q eso explota de forma combinatoria: casi todos los
+estados se visitan una sola vez y la tabla crece sin límite. Una abstracción
+convierte ese estado en la clave que ve el agente (el loop sigue usando el
+estado completo para sus chequeos de inventario):
+- "raw": el estado tal cual (modelos existentes),
+- "features": objetivo del tech tree según los picos que ya tiene, dirección
+  y distancia al objetivo más cercano del grid, si hay un objetivo pegado al
+  agente a la altura de los pies e inventario con conteos topeados,
+- "hashed": las features + el grid completo en una tabla de tamaño fijo
+  (crc32, estable entre ejecuciones).
+
+Las tres dependen solo de la tupla de 10 elementos de get_state, así que la
+clave es la misma en todas las etapas y los .pkl se siguen pasando entre
+ellas (ver test_compatibility.py).
+"""
+
+import zlib
+
+import numpy as np
+
+
+ABSTRACTIONS = ("raw", "features", "hashed")
+
+# Conteos por encima de esto no cambian la decisión (las recetas piden 3)
+INVENTORY_CAP = 3
+HASH_BUCKETS = 2 ** 16
+
+# Siguiente bloque del tech tree según los picos del inventario
+TARGET_BLOCKS = (
+    ("log", "log2"),                  # sin wooden_pickaxe
+    ("stone", "cobblestone"),         # sin stone_pickaxe
+    ("iron_ore", "iron_block"),       # sin iron_pickaxe
+    ("diamond_ore",),                 # con todos los picos
+)
+
+# Dirección al objetivo más cercano (ejes del mundo: el estado no lleva yaw)
+NO_TARGET, HERE, NORTH, SOUTH, EAST, WEST = range(6)
+
+# surroundings5x5 (y de 0 a 2, x varía más rápido, luego z): celdas
+# norte, oeste, este y sur del agente en la capa de los pies. El estado no
+# lleva yaw, así que "enfrente" no se puede saber; se usan las cuatro.
+ADJACENT_INDICES = (7, 11, 13, 17)
+
+_GRID_SIDE = 5
+_GRID_CACHE = {}
+
+
+def _grid_offsets(size):
+    """(dx, dz, distancia horizontal) por celda, para grids de capas 5x5."""
+    offsets = _GRID_CACHE.get(size)
+    if offsets is None:
+        cells = np.arange(size)
+        dx = cells % _GRID_SIDE - _GRID_SIDE // 2
+        dz = (cells // _GRID_SIDE) % _GRID_SIDE - _GRID_SIDE // 2
+        offsets = (dx, dz, np.abs(dx) + np.abs(dz))
+        _GRID_CACHE[size] = offsets
+    return offsets
+
+
+def target_blocks(has_wood_pick, has_stone_pick, has_iron_pick):
+    if not has_wood_pick:
+        return TARGET_BLOCKS[0]
+    if not has_stone_pick:
+        return TARGET_BLOCKS[1]
+    if not has_iron_pick:
+        return TARGET_BLOCKS[2]
+    return TARGET_BLOCKS[3]
+
+
+def nearest_target(surroundings, targets):
+    """
+    Returns:
+        (dirección, distancia) al objetivo más cercano; distancia 0..3
+        (3 = a 3 bloques o más), (NO_TARGET, 0) si no hay ninguno
+    """
+    size = len(surroundings)
+    if not size or size % (_GRID_SIDE * _GRID_SIDE):
+        return NO_TARGET, 0
+    mask = np.fromiter((block in targets for block in surroundings), dtype=bool, count=size)
+    if not mask.any():
+        return NO_TARGET, 0
+
+    dx, dz, dist = _grid_offsets(size)
+    cells = np.flatnonzero(mask)
+    cell = cells[np.argmin(dist[cells])]
+    x, z = dx[cell], dz[cell]
+    if x == 0 and z == 0:
+        direction = HERE
+    elif abs(z) >= abs(x):
+        direction = NORTH if z < 0 else SOUTH
+    else:
+        direction = EAST if x > 0 else WEST
+    return direction, int(min(dist[cell], 3))
+
+
+def target_adjacent(surroundings, targets):
+    """True si hay un objetivo en la vecindad 4 del agente, a la altura de los pies."""
+    if len(surroundings) <= ADJACENT_INDICES[-1]:
+        return False
+    return any(surroundings[i] in targets for i in ADJACENT_INDICES)
+
+
+class RawAbstraction:
+    """Estado completo como clave (comportamiento original)."""
+
+    name = "raw"
+
+    def __call__(self, state):
+        return state
+
+
+class FeatureAbstraction:
+    """Features del grid + inventario topeado (ver docstring del módulo)."""
+
+    name = "features"
+
+    def __init__(self, inventory_cap=INVENTORY_CAP):
+        self.inventory_cap = inventory_cap
+
+    def __call__(self, state):
+        if state is None:
+            return None
+        surroundings, counts, picks = state[0], state[1:7], state[7:10]
+        targets = target_blocks(*picks)
+        direction, distance = nearest_target(surroundings, targets)
+        capped = tuple(min(int(c), self.inventory_cap) for c in counts)
+        return (direction, distance, target_adjacent(surroundings, targets)) + capped + tuple(bool(p) for p in picks)
+
+
+class HashedAbstraction:
+    """
+    Features + grid completo en HASH_BUCKETS claves enteras: la tabla Q queda
+    acotada (buckets x acciones) y las colisiones se reparten entre estados
+    raros del grid.
+    """
+
+    name = "hashed"
+
+    def __init__(self, buckets=HASH_BUCKETS, inventory_cap=INVENTORY_CAP):
+        self.buckets = buckets
+        self.features = FeatureAbstraction(inventory_cap)
+
+    def __call__(self, state):
+        if state is None:
+            return None
+        key = (tuple(state[0]),) + self.features(state)
+        return zlib.crc32(repr(key).encode("utf-8")) % self.buckets
+
+
+def make_abstraction(name="raw", buckets=HASH_BUCKETS, inventory_cap=INVENTORY_CAP):
+    if name == "raw":
+        return RawAbstraction()
+    if name == "features":
+        return FeatureAbstraction(inventory_cap)
+    if name == "hashed":
+        return HashedAbstraction(buckets, inventory_cap)
+    raise ValueError(f"Abstracción de estados desconocida: {name} (usar {', '.join(ABSTRACTIONS)})")
+
+
+def model_suffix(abstraction="raw"):
+    """Sufijo del .pkl tras el algoritmo (las claves dependen de la abstracción)."""
+    return "" if abstraction == "raw" else f"_{abstraction}"
+
+
+class AbstractedAgent:
+    """
+    Envuelve un agente de algorithms.py: choose_action/learn reciben el
+    estado completo y el agente interno ve solo la clave abstracta. El resto
+    de atributos (epsilon, save_model, ...) pasan al agente interno.
+    """
+
+    def __init__(self, agent, abstraction):
+        self.__dict__["agent"] = agent
+        self.__dict__["abstraction"] = abstraction
+        self.__dict__["_last"] = (None, None)
+
+    def key(self, state):
+        # learn(next_state) y choose_action(next_state) llegan seguidos
+        last_state, last_key = self._last
+        if state is last_state and state is not None:
+            return last_key
+        key = self.abstraction(state)
+        self.__dict__["_last"] = (state, key)
+        return key
+
+    def choose_action(self, state):
+        return self.agent.choose_action(self.key(state))
+
+    def learn(self, state, action, reward, next_state, *args, **kwargs):
+        return self.agent.learn(self.key(state), action, reward, self.key(next_state), *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.agent, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.agent, name, value)
+
+
+def abstract_agent(agent, name="raw", **kwargs):
+    """El agente tal cual con "raw"; si no, envuelto en AbstractedAgent."""
+    if name == "raw":
+        return agent
+    return AbstractedAgent(agent, make_abstraction(name, **kwargs))
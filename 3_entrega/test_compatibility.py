@@ -6,6 +6,8 @@ import sys
 import os
 import json
 
+from state_abstraction import ABSTRACTIONS, make_abstraction
+
 # Add paths
 sys.path.append(os.path.join(os.path.dirname(__file__), 'madera'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'piedra'))
@@ -47,6 +49,23 @@ def test_stage(stage_name, module_name):
         print(f"   ✗ {stage_name:15} -> ERROR: {e}")
         return (False, 0)
 
+def test_abstractions(stages):
+    """La clave abstracta (--state-abstraction) debe ser la misma en todos los stages"""
+    states = []
+    for _, module_name in stages:
+        mod = __import__(module_name, fromlist=['get_state'])
+        states.append(mod.get_state(MockWorldState()))
+
+    ok = True
+    for name in ABSTRACTIONS:
+        keys = [make_abstraction(name)(state) for state in states]
+        if all(key == keys[0] for key in keys):
+            print(f"   ✓ {name:15} -> misma clave en los {len(keys)} stages")
+        else:
+            print(f"   ✗ {name:15} -> claves distintas entre stages")
+            ok = False
+    return ok
+
 def main():
     print("="*60)
     print("Test de Compatibilidad de Estados - Tech Tree Completo")
@@ -71,7 +90,10 @@ def main():
     
     print("\n" + "="*60)
     
-    all_success = all(success for _, success, _ in results)
+    print("\nAbstracciones de estado:")
+    abstractions_ok = test_abstractions(stages)
+    
+    all_success = all(success for _, success, _ in results) and abstractions_ok
     all_same_size = len(set(size for _, _, size in results)) == 1
     
     if all_success and all_same_size:
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test de las trazas de elegibilidad (QLambdaAgent / SarsaLambdaAgent en
+*/algorithms.py)
+
+Verifica sin Malmo que:
+- una recompensa terminal llega en un solo update a los pares recientes
+- las trazas se descartan bajo el umbral y se cortan al explorar (Watkins)
+- el modelo se guarda con el mismo dict (state, action) -> q que Q-learning
+"""
+import os
+import pickle
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'madera'))
+from algorithms import QLearningAgent, QLambdaAgent, SarsaLambdaAgent
+
+
+def test_terminal_reward_reaches_recent_pairs():
+    agent = QLambdaAgent(["a", "b"], alpha=1.0, gamma=0.9, epsilon=0.0, lam=1.0, trace_threshold=1e-6)
+    agent.start_episode()
+    agent.learn("s0", "a", 0.0, "s1")
+    agent.learn("s1", "a", 0.0, "s2")
+    agent.learn("s2", "a", 100.0, "s3", done=True)
+
+    assert abs(agent.get_q("s2", "a") - 100.0) < 1e-9
+    assert abs(agent.get_q("s1", "a") - 90.0) < 1e-9
+    assert abs(agent.get_q("s0", "a") - 81.0) < 1e-9
+    assert len(agent.trace_ids) == 0
+
+    # Un paso: solo el último par recibe la recompensa
+    one_step = QLearningAgent(["a", "b"], alpha=1.0, gamma=0.9)
+    one_step.learn("s0", "a", 0.0, "s1")
+    one_step.learn("s1", "a", 0.0, "s2")
+    one_step.learn("s2", "a", 100.0, "s3", done=True)
+    assert one_step.get_q("s0", "a") == 0.0
+
+
+def test_traces_truncated_and_cut():
+    agent = QLambdaAgent(["a", "b"], gamma=0.5, lam=0.5, trace_threshold=0.1)
+    for i in range(5):
+        agent.learn(f"s{i}", "a", 0.0, f"s{i + 1}")
+    # (0.25)^k >= 0.1 solo para k = 1: queda la traza del último par
+    assert len(agent.trace_ids) == 1
+
+    agent.q_table[("s5", "b")] = 1.0
+    agent.epsilon = 1.0
+    agent._choose_weighted_random_action = lambda: "a"  # exploración no greedy en s5
+    agent.choose_action("s5")
+    assert len(agent.trace_ids) == 0
+
+    sarsa = SarsaLambdaAgent(["a"], epsilon=0.0)
+    assert sarsa.learn("s0", "a", 0.0, "s1") == "a"
+    assert len(sarsa.trace_ids) == 1
+
+
+def test_model_format_matches_qlearning():
+    agent = QLambdaAgent(["a", "b"], alpha=1.0)
+    agent.learn("s0", "b", 5.0, "s1", done=True)
+    path = os.path.join(tempfile.mkdtemp(), "q_lambda_model.pkl")
+    agent.save_model(path)
+
+    with open(path, "rb") as f:
+        assert pickle.load(f) == {("s0", "b"): 5.0}
+    qlearning = QLearningAgent(["a", "b"])
+    qlearning.load_model(path)
+    assert qlearning.get_q("s0", "b") == 5.0
+
+    reloaded = QLambdaAgent(["a", "b"])
+    reloaded.load_model(path)
+    assert reloaded.get_q("s0", "b") == 5.0
+
+
+def main():
+    print("="*60)
+    print("Test de trazas de elegibilidad")
+    print("="*60)
+    test_terminal_reward_reaches_recent_pairs()
+    test_traces_truncated_and_cut()
+    test_model_format_matches_qlearning()
+    print("✓ Q(lambda) / SARSA(lambda) propagan el crédito y mantienen el formato")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Test del descuento SMDP de las macro-acciones en los agentes tabulares
+(*/algorithms.py; las opciones se prueban en 3_entrega_final/test_options.py)
+
+Verifica sin Malmo que los updates con steps=k bootstrapean con gamma^k.
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'madera'))
+from algorithms import QLearningAgent
+
+
+def test_tabular_smdp_update():
+    agent = QLearningAgent(["a", "b"], alpha=1.0, gamma=0.9)
+    agent.q_table[("s1", "a")] = 100.0
+    agent.learn("s0", "a", 10.0, "s1", steps=3)
+    assert abs(agent.q_table[("s0", "a")] - (10.0 + 0.9 ** 3 * 100.0)) < 1e-9
+
+
+def main():
+    print("="*60)
+    print("Test de descuento SMDP (agentes tabulares)")
+    print("="*60)
+    test_tabular_smdp_update()
+    print("✓ Updates de opciones con gamma^k")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test de la abstracción de estados (state_abstraction.py)
+
+Verifica sin Malmo que:
+- grids distintos con el mismo objetivo cercano comparten clave "features"
+- el objetivo sigue al tech tree (picos del inventario), igual en toda etapa
+- "hashed" acota la tabla a HASH_BUCKETS claves estables
+- AbstractedAgent aprende sobre la clave y deja el estado completo al loop
+"""
+import os
+import random
+import sys
+
+from state_abstraction import (make_abstraction, abstract_agent, AbstractedAgent, NORTH, EAST, NO_TARGET,
+                               HASH_BUCKETS)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'madera'))
+from algorithms import QLearningAgent
+
+
+def grid_with(blocks, filler="air"):
+    """surroundings5x5 (75 celdas) con {índice: bloque}."""
+    grid = [filler] * 75
+    for index, block in blocks.items():
+        grid[index] = block
+    return tuple(grid)
+
+
+def state(grid, wood=0, stone=0, picks=(False, False, False)):
+    return (grid, wood, stone, 0, 0, 0, 0) + tuple(picks)
+
+
+def test_features_collapse_equivalent_grids():
+    features = make_abstraction("features")
+    # log a 1 bloque al norte (z - 1) en distintas capas y con ruido distinto
+    a = features(state(grid_with({25 + 7: "log", 3: "dirt", 60: "grass"}), wood=5))
+    b = features(state(grid_with({50 + 7: "log", 20: "stone"}), wood=9))
+    assert a == b
+    assert a[:2] == (NORTH, 1) and a[3] == 3  # madera topeada en 3
+
+    # Con wooden_pickaxe el objetivo pasa a ser la piedra
+    c = features(state(grid_with({25 + 13: "stone", 25 + 7: "log"}), picks=(True, False, False)))
+    assert c[:2] == (EAST, 1)
+    assert features(state(grid_with({}), picks=(True, True, True)))[:2] == (NO_TARGET, 0)
+
+    # Objetivo pegado a la altura de los pies (capa 0); en la cabeza no cuenta
+    assert features(state(grid_with({13: "log"})))[2] is True
+    assert features(state(grid_with({25 + 13: "log"})))[2] is False
+    assert a[2] is False  # log a 1 bloque pero en la capa 1
+
+
+def test_hashed_is_bounded_and_stable():
+    hashed = make_abstraction("hashed")
+    rng = random.Random(0)
+    keys = set()
+    for _ in range(500):
+        grid = tuple(rng.choice(["air", "dirt", "log", "stone"]) for _ in range(75))
+        key = hashed(state(grid, wood=rng.randint(0, 5)))
+        assert 0 <= key < HASH_BUCKETS
+        keys.add(key)
+    assert hashed(state(grid_with({}))) == make_abstraction("hashed")(state(grid_with({})))
+    assert len(keys) > 400
+
+
+def test_abstracted_agent_learns_on_keys():
+    agent = abstract_agent(QLearningAgent(["a", "b"], alpha=1.0, epsilon=0.0), "features")
+    assert isinstance(agent, AbstractedAgent)
+    assert abstract_agent(QLearningAgent(["a"]), "raw").__class__ is QLearningAgent
+
+    s0 = state(grid_with({25 + 7: "log", 3: "dirt"}))
+    s1 = state(grid_with({50 + 7: "log", 4: "sand"}))  # otro grid, mismas features
+    agent.learn(s0, "b", 10.0, s0, done=True)
+    assert agent.choose_action(s1) == "b"
+
+    agent.epsilon = 0.5  # pasa al agente interno
+    assert agent.agent.epsilon == 0.5
+
+    rng = random.Random(1)
+    raw = QLearningAgent(["a", "b"])
+    for _ in range(300):
+        s = state(tuple(rng.choice(["air", "dirt", "log"]) for _ in range(75)), wood=rng.randint(0, 6))
+        raw.learn(s, "a", 1.0, s, done=True)
+        agent.learn(s, "a", 1.0, s, done=True)
+    assert len(agent.q_table) < len(raw.q_table) / 5
+
+
+def main():
+    print("="*60)
+    print("Test de abstracción de estados")
+    print("="*60)
+    test_features_collapse_equivalent_grids()
+    test_hashed_is_bounded_and_stable()
+    test_abstracted_agent_learns_on_keys()
+    print("✓ Claves compactas, acotadas y compatibles entre etapas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
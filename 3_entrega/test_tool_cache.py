@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test de la herramienta equipada con caché (tool_cache.py)
+
+Usa un AgentHost falso (sin Malmo) para verificar que:
+- solo se envía hotbar.N cuando el slot objetivo difiere del seleccionado
+- un currentItemIndex viejo (cambio aún no aplicado) no provoca reenvíos
+- el mapa bloque -> slot se recalcula cuando cambia la barra
+- el bloque de enfrente es la celda vecina según el Yaw (no la de la cabeza)
+"""
+import json
+import sys
+
+from tool_cache import ToolManager, STAGE_TOOLS
+from options import facing_offset, grid_index
+
+
+class _Obs:
+    def __init__(self, obs):
+        self.text = json.dumps(obs)
+
+
+class FakeWorldState:
+    def __init__(self, obs):
+        self.observations = [_Obs(obs)]
+        self.number_of_observations_since_last_state = 1
+
+
+class FakeHost:
+    def __init__(self):
+        self.commands = []
+
+    def sendCommand(self, command):
+        self.commands.append(command)
+
+
+def observation(front, hotbar, current=0, yaw=0.0, cell=None):
+    """surroundings5x5 con `front` en la celda de enfrente a los pies (o en `cell`)."""
+    if cell is None:
+        dx, dz = facing_offset(yaw)
+        cell = grid_index(dx, 0, dz)
+    grid = ["air"] * 75
+    grid[cell] = front
+    obs = {"surroundings5x5": grid, "currentItemIndex": current, "Yaw": yaw}
+    for slot, item in enumerate(hotbar):
+        obs[f"InventorySlot_{slot}_item"] = item
+    return obs
+
+
+def test_switch_only_when_slot_differs():
+    host = FakeHost()
+    tools = ToolManager(host, STAGE_TOOLS["all"])
+    hotbar = ["diamond_axe", "wooden_pickaxe"]
+
+    assert not tools.equip(FakeWorldState(observation("log", hotbar)))
+    assert tools.equip(FakeWorldState(observation("stone", hotbar)))
+    # Malmo todavía reporta el slot 0: no se reenvía el cambio
+    assert not tools.equip(FakeWorldState(observation("stone", hotbar, current=0)))
+    assert not tools.equip(FakeWorldState(observation("stone", hotbar, current=1)))
+    assert tools.equip(FakeWorldState(observation("log", hotbar, current=1)))
+
+    assert host.commands == ["hotbar.2 1", "hotbar.2 0", "hotbar.1 1", "hotbar.1 0"]
+    assert tools.switches == 2 and tools.skipped == 3
+
+
+def test_slot_map_follows_inventory():
+    host = FakeHost()
+    tools = ToolManager(host, STAGE_TOOLS["all"])
+
+    assert not tools.equip(FakeWorldState(observation("iron_ore", ["diamond_axe"])))
+    assert tools.equip(FakeWorldState(observation("iron_ore", ["diamond_axe", "wooden_pickaxe", "stone_pickaxe"])))
+    assert host.commands == ["hotbar.3 1", "hotbar.3 0"]
+    assert tools.slot_map["iron_ore"] == 2
+
+
+def test_front_block_follows_yaw():
+    host = FakeHost()
+    tools = ToolManager(host, STAGE_TOOLS["all"])
+    hotbar = ["wooden_pickaxe", "diamond_axe"]
+
+    # Celda de la cabeza (centro de la capa y=1) y celda de atrás: no cuentan
+    assert not tools.equip(FakeWorldState(observation("log", hotbar, cell=37)))
+    assert not tools.equip(FakeWorldState(observation("log", hotbar, yaw=90.0, cell=grid_index(1, 0, 0))))
+    assert host.commands == []
+
+    # Yaw 90 mira a -x: log en (dx=-1, y=0, dz=0)
+    assert facing_offset(90.0) == (-1, 0)
+    assert tools.equip(FakeWorldState(observation("log", hotbar, yaw=90.0, cell=grid_index(-1, 0, 0))))
+    assert host.commands == ["hotbar.2 1", "hotbar.2 0"]
+    # Pies libres: se mira la celda de enfrente a la altura de la cabeza
+    assert tools.front_block(observation("stone", hotbar, yaw=180.0, cell=grid_index(0, 1, -1))) == "stone"
+
+
+def main():
+    print("="*60)
+    print("Test de herramienta equipada con caché")
+    print("="*60)
+    test_switch_only_when_slot_differs()
+    test_slot_map_follows_inventory()
+    test_front_block_follows_yaw()
+    print("✓ Cambios de slot solo cuando hacen falta")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Herramienta equipada con caché para los loops tabulares de 3_entrega.
+
+auto_select_tool() volvía a parsear el JSON, recorría los 9 slots de la barra
+y enviaba `hotbar.N 1` / `hotbar.N 0` en cada `attack`, aunque la herramienta
+correcta ya estuviera en la mano. ToolManager:
+- sigue el slot seleccionado (currentItemIndex de la observación o, si no
+  viene, el último slot que se envió),
+- recalcula el mapa bloque -> slot solo cuando cambia la barra (crafteo,
+  ítem recogido),
+- envía el cambio de slot solo si el slot objetivo es distinto al actual.
+
+Malmo refleja el cambio de slot unos ticks después; mientras tanto un
+currentItemIndex viejo no provoca reenvíos (slot pendiente).
+
+El bloque de enfrente sale del Yaw (options.facing_offset): la celda vecina
+en esa dirección a la altura de los pies o, si está libre, de la cabeza.
+"""
+
+import json
+
+from options import SURROUNDINGS_GRID, PASSABLE_BLOCKS, facing_offset, grid_index
+
+
+HOTBAR_SLOTS = 9
+
+# Observaciones que se espera la confirmación de un cambio de slot
+PENDING_OBSERVATIONS = 5
+
+# Herramienta por bloque de enfrente (en orden de preferencia), por etapa
+STAGE_TOOLS = {
+    "wood": {},  # el diamond_axe inicial ya es la herramienta óptima
+    "stone": {"stone": ("wooden_pickaxe",)},
+    "iron": {"iron_ore": ("stone_pickaxe",)},
+    "diamond": {"diamond_ore": ("iron_pickaxe",)},
+    "all": {
+        "log": ("diamond_axe",),
+        "stone": ("wooden_pickaxe",),
+        "iron_ore": ("stone_pickaxe",),
+        "iron_block": ("stone_pickaxe",),
+        "diamond_ore": ("iron_pickaxe",),
+    },
+}
+
+
+def hotbar_items(obs):
+    """Ítems de la barra (tupla de 9, None si el slot está vacío)."""
+    items = []
+    for slot in range(HOTBAR_SLOTS):
+        item = obs.get(f"InventorySlot_{slot}_item")
+        if item is None:
+            item = obs.get(f"Hotbar_{slot}_item")
+        items.append(None if item == "air" else item)
+    return tuple(items)
+
+
+def block_slot_map(items, block_tools):
+    """
+    Args:
+        items: Ítems de la barra (hotbar_items)
+        block_tools: dict {bloque: (herramienta preferida, ...)}
+
+    Returns:
+        dict {bloque: slot} solo con los bloques cuya herramienta está en la barra
+    """
+    slot_map = {}
+    for block, tools in block_tools.items():
+        for tool in tools:
+            if tool in items:
+                slot_map[block] = items.index(tool)
+                break
+    return slot_map
+
+
+class ToolManager:
+    """
+    Selecciona la herramienta para el bloque de enfrente sin comandos redundantes.
+    """
+
+    def __init__(self, agent_host, block_tools, grid=SURROUNDINGS_GRID):
+        """
+        Args:
+            agent_host: AgentHost de Malmo (o TrackedAgentHost)
+            block_tools: dict {bloque: (herramienta preferida, ...)} (ver STAGE_TOOLS)
+            grid: GridSpec (options) del grid donde se lee el bloque de enfrente
+        """
+        self.agent_host = agent_host
+        self.block_tools = block_tools
+        self.grid = grid
+        self.reset()
+
+    def reset(self):
+        """Al empezar cada misión (Malmo arranca con el slot 0 seleccionado)."""
+        self.selected_slot = 0
+        self.pending_slot = None
+        self.pending_left = 0
+        self.items = None
+        self.slot_map = {}
+        self._last_text = None
+        self._last_obs = None
+        # Por episodio: cambios enviados y cambios evitados (ya equipada)
+        self.switches = 0
+        self.skipped = 0
+
+    def observe(self, obs):
+        """Sincroniza slot seleccionado y mapa bloque -> slot con una observación JSON."""
+        observed = obs.get("currentItemIndex")
+        if observed is not None:
+            if self.pending_slot is None or observed == self.pending_slot or self.pending_left <= 0:
+                self.selected_slot = observed
+                self.pending_slot = None
+            else:
+                self.pending_left -= 1
+
+        items = hotbar_items(obs)
+        if items != self.items:
+            self.items = items
+            self.slot_map = block_slot_map(items, self.block_tools)
+
+    def front_block(self, obs):
+        """Bloque de enfrente según el Yaw (pies; cabeza si los pies están libres)."""
+        grid = obs.get(self.grid.name, [])
+        dx, dz = facing_offset(obs.get("Yaw", 0.0))
+        block = "air"
+        for layer in (self.grid.feet_layer, self.grid.feet_layer + 1):
+            index = grid_index(dx, layer, dz)
+            if index < len(grid):
+                block = grid[index]
+                if block not in PASSABLE_BLOCKS:
+                    break
+        return block
+
+    def select_for(self, block):
+        """
+        Equipa la herramienta para `block` si no es la seleccionada.
+
+        Returns:
+            True si se envió un cambio de slot
+        """
+        slot = self.slot_map.get(block)
+        if slot is None:
+            return False
+        if slot == self.selected_slot:
+            self.skipped += 1
+            return False
+        self.agent_host.sendCommand(f"hotbar.{slot + 1} 1")
+        self.agent_host.sendCommand(f"hotbar.{slot + 1} 0")
+        self.selected_slot = slot
+        self.pending_slot = slot
+        self.pending_left = PENDING_OBSERVATIONS
+        self.switches += 1
+        return True
+
+    def equip(self, world_state):
+        """
+        Reemplazo de auto_select_tool(world_state, agent_host).
+
+        Returns:
+            True si se envió un cambio de slot
+        """
+        if not self.block_tools or world_state.number_of_observations_since_last_state == 0:
+            return False
+        text = world_state.observations[-1].text
+        if text is not self._last_text:
+            try:
+                self._last_obs = json.loads(text)
+            except ValueError:
+                return False
+            self._last_text = text
+            self.observe(self._last_obs)
+        return self.select_for(self.front_block(self._last_obs))
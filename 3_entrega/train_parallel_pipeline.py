@@ -17,6 +17,8 @@ from pathlib import Path
 import signal
 import os
 
+from client_pool_manager import ClientPoolManager
+
 # Mapeo de etapas
 STAGES = {
     1: {
@@ -286,6 +288,18 @@ Notas:
     
     print("\n⚠️  IMPORTANTE: Asegúrate de tener 6 clientes de Minecraft abiertos")
     print("   en puertos 10001, 10002, 10003, 10004, 10005, 10006")
+    
+    # Sondeo concurrente de todos los clientes
+    pool_manager = ClientPoolManager(ports=list(ALGORITHM_PORTS.values()))
+    health = pool_manager.probe_all()
+    pool_manager.print_summary()
+    alive = sum(health.values())
+    if alive == 0:
+        print("\n❌ ERROR: Ningún cliente de Minecraft responde")
+        sys.exit(1)
+    elif alive < len(health):
+        print(f"\n⚠️  Solo {alive}/{len(health)} clientes responden: los algoritmos sin cliente")
+        print("   compartirán los clientes sanos (menor throughput, sin abortar)")
     print("\n¿Continuar? (Presiona Enter para iniciar o Ctrl+C para cancelar)")
     input()
     
@@ -322,6 +336,8 @@ Notas:
     print(f"   - entrenamiento_acumulado/")
     print("\n📈 Para analizar los resultados, ejecuta en cada carpeta:")
     print("   python analyze_results.py")
+    print("   o el reporte consolidado de todas las etapas:")
+    print("   python analyze_pipeline.py")
     print("="*80)
 
 
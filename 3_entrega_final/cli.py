@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada único para entrenar, evaluar y comparar modelos.
+
+Los imports pesados (torch, stable_baselines3, sb3_contrib, matplotlib,
+MalmoPython) se difieren hasta que el subcomando realmente los necesita, así
+que --help, la validación de argumentos y --dry-run responden al instante.
+
+Uso:
+    python cli.py train ppo --episodes 50 --curriculum --port 10000
+    python cli.py train dqn --help
+    python cli.py evaluate --algorithm ppo --model models/ppo_final.zip
+    python cli.py compare --models a.zip b.zip --algorithms ppo dqn
+    python cli.py train a2c --episodes 50 --dry-run
+    python cli.py export --algorithm ppo --model models/ppo_final.zip
+    python cli.py distill --algorithm ppo --qtable ../3_entrega/entrenamiento_acumulado/qlearning_model.pkl
+"""
+
+import sys
+import argparse
+import importlib
+
+
+TRAIN_MODULES = {
+    'ppo': 'train_ppo',
+    'dqn': 'train_dqn',
+    'a2c': 'train_a2c',
+    'trpo': 'train_trpo',
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Tool progression RL - train / evaluate / compare',
+        epilog='Los argumentos restantes se pasan al script correspondiente '
+               '(ej. "python cli.py train ppo --help").'
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    # add_help=False: "-h" llega al parser del script delegado
+    train = subparsers.add_parser('train', add_help=False,
+                                  help='Entrenar un algoritmo (train_<algo>.py)')
+    train.add_argument('algorithm', choices=sorted(TRAIN_MODULES.keys()))
+
+    subparsers.add_parser('evaluate', add_help=False,
+                          help='Evaluar un modelo (evaluate.py)')
+    subparsers.add_parser('compare', add_help=False,
+                          help='Comparar modelos (compare_algorithms.py)')
+    subparsers.add_parser('export', add_help=False,
+                          help='Exportar la política a NumPy (export_numpy_policy.py)')
+    subparsers.add_parser('distill', add_help=False,
+                          help='Destilar tablas Q de 3_entrega en un modelo SB3 (distill_qtable.py)')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    if args.command == 'train':
+        module = importlib.import_module(TRAIN_MODULES[args.algorithm])
+        module.train(rest)
+    elif args.command == 'evaluate':
+        module = importlib.import_module('evaluate')
+        module.main(rest)
+    elif args.command == 'compare':
+        module = importlib.import_module('compare_algorithms')
+        module.main(rest)
+    elif args.command == 'export':
+        module = importlib.import_module('export_numpy_policy')
+        return module.main(rest)
+    elif args.command == 'distill':
+        module = importlib.import_module('distill_qtable')
+        return module.main(rest)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,27 +10,28 @@ import sys
 import argparse
 import json
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 from typing import Dict, List, Tuple
 
-from stable_baselines3 import PPO, DQN, A2C
-from sb3_contrib import TRPO
-from stable_baselines3.common.monitor import Monitor
-
-from src.malmo_env_wrapper import MalmoToolProgressionEnv
-from src.curriculum_manager import CurriculumManager
 
 
 def load_model(model_path: str, algorithm: str, env):
     """Carga un modelo según el algoritmo especificado"""
+    if model_path.endswith('.npz'):
+        # Política exportada con export_numpy_policy.py (sin torch)
+        from src.numpy_policy import NumpyPolicy
+        return NumpyPolicy.load(model_path)
     if algorithm == 'ppo':
+        from stable_baselines3 import PPO
         return PPO.load(model_path, env=env)
     elif algorithm == 'dqn':
+        from stable_baselines3 import DQN
         return DQN.load(model_path, env=env)
     elif algorithm == 'a2c':
+        from stable_baselines3 import A2C
         return A2C.load(model_path, env=env)
     elif algorithm == 'trpo':
+        from sb3_contrib import TRPO
         return TRPO.load(model_path, env=env)
     else:
         raise ValueError(f"Unknown algorithm: {algorithm}")
@@ -74,6 +75,7 @@ def evaluate_model(model, env, num_episodes: int = 10) -> Dict:
 
 def plot_comparison(results: Dict, output_dir: str):
     """Genera gráficos comparativos entre algoritmos"""
+    import matplotlib.pyplot as plt
     
     algorithms = list(results.keys())
     stages = sorted([int(s.split('_')[1]) for s in results[algorithms[0]].keys()])
@@ -172,11 +174,11 @@ def plot_comparison(results: Dict, output_dir: str):
     plt.close()
 
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description='Compare multiple RL algorithm models')
     
     parser.add_argument('--models', type=str, nargs='+', required=True,
-                       help='Paths to trained models (.zip files)')
+                       help='Paths to trained models (.zip files, or exported .npz)')
     parser.add_argument('--algorithms', type=str, nargs='+', required=True,
                        choices=['ppo', 'dqn', 'a2c', 'trpo'],
                        help='Algorithms corresponding to each model')
@@ -193,12 +195,64 @@ def parse_args():
                        help='Output directory for results (default: results)')
     parser.add_argument('--no-plot', action='store_true',
                        help='Skip generating plots')
+    parser.add_argument('--ports', type=int, nargs='+', default=None,
+                       help='Evaluate in parallel across these Malmo ports (one env per port)')
+    parser.add_argument('--replay', type=str, default=None,
+                       help='Evaluate on a recorded trajectory (.jsonl.gz) instead of live clients')
+    parser.add_argument('--num-envs', type=int, default=None,
+                       help='Parallel envs with --replay (default: len(--ports) or 4)')
+    parser.add_argument('--results-stream', type=str, default=None,
+                       help='JSON Lines file with one line per finished episode; re-running skips '
+                            'episodes already in it (default: <output-dir>/comparison_episodes.jsonl)')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Solo validar argumentos y salir (sin cargar torch/SB3/Malmo)')
+    
+    return parser.parse_args(argv)
+
+
+def evaluate_parallel(args) -> Dict:
+    """
+    Evalúa todos los (modelo, stage) a la vez sobre un pool de entornos
+    (src.eval_scheduler). Los episodios de los distintos modelos se
+    intercalan y cada modelo hace un predict por batch.
+    
+    Returns:
+        Dict {algoritmo: {stage_N: métricas}}
+    """
+    from src.eval_scheduler import EvaluationScheduler, build_jobs, make_env_factory, summarize
+    from src.numpy_policy import load_policy
+    
+    stream_path = args.results_stream or os.path.join(args.output_dir, 'comparison_episodes.jsonl')
+    env_factory, n_envs = make_env_factory(
+        ports=args.ports, replay=args.replay, n_envs=args.num_envs,
+        max_episode_steps=2000, seed=args.seed
+    )
+    scheduler = EvaluationScheduler(
+        env_factory, n_envs, stream_path,
+        model_loader=lambda algorithm, path: load_policy(path, algorithm),
+        max_episode_steps=2000
+    )
+    models = list(zip(args.algorithms, args.models))
+    results = scheduler.run(build_jobs(models, args.stages, args.episodes, args.seed))
+    print(f"\n[EVAL] Episode stream: {stream_path}")
     
-    return parser.parse_args()
+    all_results = {}
+    for algorithm, model_path in models:
+        algo_results = {}
+        for stage_id in args.stages:
+            metrics = summarize(results, algorithm, model_path, stage_id)
+            if metrics is None:
+                metrics = {"mean_reward": 0, "std_reward": 0, "mean_length": 0, "std_length": 0,
+                           "success_rate": 0, "episode_rewards": [], "episode_lengths": []}
+            algo_results[f'stage_{stage_id}'] = metrics
+            print(f"  {algorithm.upper()} stage {stage_id}: {metrics['success_rate']:.1%} success, "
+                  f"{metrics['mean_reward']:.1f} avg reward")
+        all_results[algorithm] = algo_results
+    return all_results
 
 
-def main():
-    args = parse_args()
+def main(argv=None):
+    args = parse_args(argv)
     
     # Validate inputs
     if len(args.models) != len(args.algorithms):
@@ -210,6 +264,10 @@ def main():
             print(f"[ERROR] Model not found: {model_path}")
             sys.exit(1)
     
+    if args.dry_run:
+        print("[DRY RUN] Arguments OK")
+        return
+    
     # Create output directory
     os.makedirs(args.output_dir, exist_ok=True)
     
@@ -224,57 +282,72 @@ def main():
     print(f"{'='*70}\n")
     
     # Store all results
-    all_results = {}
-    
-    # Evaluate each model
-    for model_path, algorithm in zip(args.models, args.algorithms):
-        print(f"\n{'='*70}")
-        print(f"EVALUATING {algorithm.upper()} MODEL")
-        print(f"{'='*70}")
+    if args.ports or args.replay:
+        all_results = evaluate_parallel(args)
+    else:
+        # Imports pesados solo en la evaluación en serie: con --replay,
+        # malmo_replay.install() tiene que registrar MalmoPython antes de
+        # importar el entorno (ver make_env_factory).
+        # Con políticas .npz exportadas no hace falta torch/SB3.
+        use_monitor = not all(path.endswith('.npz') for path in args.models)
+        if use_monitor:
+            from stable_baselines3.common.monitor import Monitor
+    
+        from src.malmo_env_wrapper import MalmoToolProgressionEnv
+        from src.curriculum_manager import CurriculumManager
+    
+        all_results = {}
+    
+        # Evaluate each model
+        for model_path, algorithm in zip(args.models, args.algorithms):
+            print(f"\n{'='*70}")
+            print(f"EVALUATING {algorithm.upper()} MODEL")
+            print(f"{'='*70}")
         
-        algo_results = {}
+            algo_results = {}
         
-        for stage_id in args.stages:
-            print(f"\nStage {stage_id}...")
+            for stage_id in args.stages:
+                print(f"\nStage {stage_id}...")
             
-            # Create environment
-            curriculum = CurriculumManager(start_stage=stage_id)
-            env = MalmoToolProgressionEnv(
-                curriculum_manager=curriculum,
-                port=args.port,
-                max_episode_steps=2000,
-                seed=args.seed
-            )
-            env = Monitor(env)
+                # Create environment
+                curriculum = CurriculumManager(start_stage=stage_id)
+                env = MalmoToolProgressionEnv(
+                    curriculum_manager=curriculum,
+                    port=args.port,
+                    max_episode_steps=2000,
+                    seed=args.seed
+                )
+                if use_monitor:
+                    env = Monitor(env)
             
-            try:
-                # Load model
-                model = load_model(model_path, algorithm, env)
+                try:
+                    # Load model
+                    model = load_model(model_path, algorithm, env)
                 
-                # Evaluate
-                metrics = evaluate_model(model, env, args.episodes)
+                    # Evaluate
+                    metrics = evaluate_model(model, env, args.episodes)
                 
-                # Store results
-                algo_results[f'stage_{stage_id}'] = metrics
+                    # Store results
+                    algo_results[f'stage_{stage_id}'] = metrics
                 
-                print(f"  Success Rate: {metrics['success_rate']:.1%}")
-                print(f"  Mean Reward: {metrics['mean_reward']:.1f} ± {metrics['std_reward']:.1f}")
+                    print(f"  Success Rate: {metrics['success_rate']:.1%}")
+                    print(f"  Mean Reward: {metrics['mean_reward']:.1f} ± {metrics['std_reward']:.1f}")
                 
-            except Exception as e:
-                print(f"  [ERROR] Failed to evaluate: {e}")
-                algo_results[f'stage_{stage_id}'] = {
-                    "mean_reward": 0,
-                    "std_reward": 0,
-                    "mean_length": 0,
-                    "std_length": 0,
-                    "success_rate": 0,
-                    "episode_rewards": [],
-                    "episode_lengths": []
-                }
-            finally:
-                env.close()
+                except Exception as e:
+                    print(f"  [ERROR] Failed to evaluate: {e}")
+                    algo_results[f'stage_{stage_id}'] = {
+                        "mean_reward": 0,
+                        "std_reward": 0,
+                        "mean_length": 0,
+                        "std_length": 0,
+                        "success_rate": 0,
+                        "episode_rewards": [],
+                        "episode_lengths": []
+                    }
+                finally:
+                    env.close()
         
-        all_results[algorithm] = algo_results
+            all_results[algorithm] = algo_results
     
     # Save results to JSON
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
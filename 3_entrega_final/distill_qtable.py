@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Destila tablas Q de 3_entrega (entrenamiento_acumulado/*.pkl) en la
+MlpPolicy de PPO / A2C / TRPO y guarda un .zip para --resume.
+
+Los estados visitados de cada tabla se convierten a la observación de 117
+dims de MalmoToolProgressionEnv (src/distillation.py) y la red de la política
+se entrena por aprendizaje supervisado (cross-entropy contra softmax de los
+Q-values, en minibatches). La cabeza de valor no se toca: las escalas de
+recompensa de las etapas y del env son distintas y el crítico se ajusta en
+las primeras actualizaciones.
+
+Uso:
+    python distill_qtable.py --algorithm ppo \\
+        --qtable ../3_entrega/entrenamiento_acumulado/qlearning_model.pkl \\
+                 ../3_entrega/entrenamiento_acumulado/qlearning_stone_model.pkl \\
+        --output models/ppo_distilled.zip
+    python train_ppo.py --curriculum --resume models/ppo_distilled.zip
+"""
+
+import os
+import sys
+import json
+import argparse
+
+
+# Mismos hiperparámetros por defecto que train_<algo>.py: --resume los
+# restaura desde el .zip
+TRAIN_DEFAULTS = {
+    'ppo': {'learning_rate': 3e-4, 'n_steps': 2048, 'batch_size': 64, 'n_epochs': 10, 'clip_range': 0.2},
+    'a2c': {'learning_rate': 7e-4, 'n_steps': 5},
+    'trpo': {'learning_rate': 1e-3, 'n_steps': 2048, 'batch_size': 128, 'target_kl': 0.01},
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Distill tabular Q-tables into an SB3 MlpPolicy')
+    parser.add_argument('--qtable', type=str, nargs='+', required=True,
+                       help='Q-table pickles from 3_entrega/entrenamiento_acumulado (raw states)')
+    parser.add_argument('--algorithm', type=str, default='ppo', choices=sorted(TRAIN_DEFAULTS),
+                       help='Algorithm of the output model (default: ppo)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Output .zip (default: models/<algo>_distilled.zip)')
+    parser.add_argument('--epochs', type=int, default=50,
+                       help='Supervised epochs over the dataset (default: 50)')
+    parser.add_argument('--batch-size', type=int, default=256,
+                       help='Minibatch size (default: 256)')
+    parser.add_argument('--learning-rate', type=float, default=1e-3,
+                       help='Distillation learning rate (default: 1e-3)')
+    parser.add_argument('--temperature', type=float, default=0.25,
+                       help='Softmax temperature over range-normalized Q (0 = argmax, default: 0.25)')
+    parser.add_argument('--stage-feature', action='store_true',
+                       help='Write the stage one-hot in obs[91:95] (for --mixed-curriculum runs)')
+    parser.add_argument('--gamma', type=float, default=0.99,
+                       help='Discount factor stored in the model (default: 0.99)')
+    parser.add_argument('--seed', type=int, default=123456,
+                       help='Random seed (default: 123456)')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Only build the dataset and report it (no torch/SB3)')
+    return parser.parse_args(argv)
+
+
+def make_spaces_env():
+    """Entorno sin Malmo con los espacios de MalmoToolProgressionEnv."""
+    import gym
+    import numpy as np
+    from gym import spaces
+
+    class SpacesEnv(gym.Env):
+        observation_space = spaces.Box(low=-100.0, high=100.0, shape=(117,), dtype=np.float32)
+        action_space = spaces.Discrete(9)
+
+        def reset(self):
+            return np.zeros(117, dtype=np.float32)
+
+        def step(self, action):
+            return np.zeros(117, dtype=np.float32), 0.0, True, {}
+
+    return SpacesEnv()
+
+
+def make_model(algorithm, gamma, seed):
+    if algorithm == 'ppo':
+        from stable_baselines3 import PPO as Algo
+    elif algorithm == 'a2c':
+        from stable_baselines3 import A2C as Algo
+    else:
+        from sb3_contrib import TRPO as Algo
+    return Algo("MlpPolicy", make_spaces_env(), gamma=gamma, seed=seed, device='cpu',
+                **TRAIN_DEFAULTS[algorithm])
+
+
+def distill(policy, observations, targets, epochs, batch_size, learning_rate, seed):
+    """
+    Entrena la red de la política (mlp_extractor.policy_net + action_net)
+    contra los targets; la cabeza de valor no recibe gradiente.
+
+    Returns:
+        Lista con la pérdida media por época
+    """
+    import numpy as np
+    import torch
+
+    from src.distillation import iterate_minibatches
+
+    rng = np.random.RandomState(seed)
+    obs_t = torch.as_tensor(observations, device=policy.device)
+    targets_t = torch.as_tensor(targets, device=policy.device)
+    optimizer = torch.optim.Adam(policy.parameters(), lr=learning_rate)
+
+    policy.set_training_mode(True)
+    losses = []
+    for epoch in range(epochs):
+        total = 0.0
+        for idx in iterate_minibatches(len(observations), batch_size, rng):
+            idx_t = torch.as_tensor(idx, device=policy.device)
+            logits = policy.get_distribution(obs_t[idx_t]).distribution.logits
+            loss = -(targets_t[idx_t] * torch.log_softmax(logits, dim=1)).sum(dim=1).mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(idx)
+        losses.append(total / len(observations))
+        if epoch == 0 or (epoch + 1) % 10 == 0 or epoch + 1 == epochs:
+            print(f"  Epoch {epoch + 1}/{epochs}: loss {losses[-1]:.4f}")
+    policy.set_training_mode(False)
+    return losses
+
+
+def policy_logits(policy, observations):
+    import torch
+
+    with torch.no_grad():
+        obs_t = torch.as_tensor(observations, device=policy.device)
+        return policy.get_distribution(obs_t).distribution.logits.cpu().numpy()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    for path in args.qtable:
+        if not os.path.exists(path):
+            print(f"[ERROR] Q-table not found: {path}")
+            return 1
+    output = args.output or os.path.join('models', f"{args.algorithm}_distilled.zip")
+
+    from src.distillation import build_dataset, action_agreement
+
+    observations, targets, stats = build_dataset(args.qtable, temperature=args.temperature,
+                                                 stage_feature=args.stage_feature)
+    print(f"[DISTILL] {len(args.qtable)} tabla(s): {stats['states']} estados usados, "
+          f"{stats['skipped_keys']} claves no mapeables, {stats['skipped_flat']} sin preferencia")
+    if stats['states'] == 0:
+        print("[ERROR] No hay estados para destilar (¿tablas con abstracción features/hashed?)")
+        return 1
+    if args.dry_run:
+        print("[DRY RUN] Dataset OK")
+        return 0
+
+    model = make_model(args.algorithm, args.gamma, args.seed)
+    before = action_agreement(policy_logits(model.policy, observations), targets)
+    losses = distill(model.policy, observations, targets, args.epochs, args.batch_size,
+                     args.learning_rate, args.seed)
+    after = action_agreement(policy_logits(model.policy, observations), targets)
+    print(f"\n[DISTILL] Acción greedy igual a la tabla: {before:.2%} -> {after:.2%}")
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    model.save(output)
+    print(f"[DISTILL] {args.algorithm.upper()} -> {output}")
+    print(f"  Continuar con: python train_{args.algorithm}.py --resume {output}")
+
+    report = {
+        "qtables": args.qtable,
+        "algorithm": args.algorithm,
+        "dataset": stats,
+        "loss": losses,
+        "agreement_before": before,
+        "agreement_after": after,
+    }
+    with open(os.path.splitext(output)[0] + "_report.json", 'w') as f:
+        json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
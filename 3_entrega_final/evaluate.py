@@ -12,12 +12,6 @@ import numpy as np
 from datetime import datetime
 from typing import Dict, List
 
-from stable_baselines3 import PPO, DQN, A2C
-from sb3_contrib import TRPO
-from stable_baselines3.common.monitor import Monitor
-
-from src.malmo_env_wrapper import MalmoToolProgressionEnv
-from src.curriculum_manager import CurriculumManager
 
 
 def evaluate_model(
@@ -92,11 +86,11 @@ def evaluate_model(
     return metrics
 
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description='Evaluate trained RL models')
     
     parser.add_argument('--model', type=str, required=True,
-                       help='Path to trained model (.zip file)')
+                       help='Path to trained model (.zip, or .npz from export_numpy_policy.py)')
     parser.add_argument('--algorithm', type=str, required=True, 
                        choices=['ppo', 'dqn', 'a2c', 'trpo'],
                        help='Algorithm used to train the model')
@@ -112,12 +106,61 @@ def parse_args():
                        help='Output file for results (default: results/evaluation_results.json)')
     parser.add_argument('--verbose', action='store_true',
                        help='Print detailed progress')
+    parser.add_argument('--ports', type=int, nargs='+', default=None,
+                       help='Evaluate in parallel across these Malmo ports (one env per port)')
+    parser.add_argument('--replay', type=str, default=None,
+                       help='Evaluate on a recorded trajectory (.jsonl.gz) instead of live clients')
+    parser.add_argument('--num-envs', type=int, default=None,
+                       help='Parallel envs with --replay (default: len(--ports) or 4)')
+    parser.add_argument('--results-stream', type=str, default=None,
+                       help='JSON Lines file with one line per finished episode; '
+                            're-running skips episodes already in it (default: <output>.episodes.jsonl)')
+    parser.add_argument('--options', action='store_true',
+                       help='Modelo entrenado con --options (acciones primitivas + macro-acciones)')
+    parser.add_argument('--action-repeat', type=str, default=None,
+                       help='El mismo --action-repeat usado al entrenar')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Solo validar argumentos y salir (sin cargar torch/SB3/Malmo)')
+    
+    return parser.parse_args(argv)
+
+
+def evaluate_parallel(args, stages):
+    """
+    Evalúa los stages repartiendo los episodios en un pool de entornos
+    (src.eval_scheduler). Episodio i usa la semilla args.seed + i.
+    
+    Returns:
+        Dict {stage_N: métricas} con el formato de evaluate_model()
+    """
+    from src.eval_scheduler import EvaluationScheduler, build_jobs, make_env_factory, summarize
+    from src.numpy_policy import load_policy
     
-    return parser.parse_args()
+    stream_path = args.results_stream or os.path.splitext(args.output)[0] + '.episodes.jsonl'
+    env_factory, n_envs = make_env_factory(
+        ports=args.ports, replay=args.replay, n_envs=args.num_envs,
+        max_episode_steps=2000, seed=args.seed, options=args.options,
+        action_repeat=args.action_repeat
+    )
+    scheduler = EvaluationScheduler(
+        env_factory, n_envs, stream_path,
+        model_loader=lambda algorithm, path: load_policy(path, algorithm),
+        max_episode_steps=2000
+    )
+    jobs = build_jobs([(args.algorithm, args.model)], stages, args.episodes, args.seed)
+    results = scheduler.run(jobs)
+    print(f"\n[EVAL] Episode stream: {stream_path}")
+    
+    all_results = {}
+    for stage_id in stages:
+        metrics = summarize(results, args.algorithm, args.model, stage_id)
+        if metrics is not None:
+            all_results[f"stage_{stage_id}"] = metrics
+    return all_results
 
 
-def main():
-    args = parse_args()
+def main(argv=None):
+    args = parse_args(argv)
     
     # Create output directory
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
@@ -127,6 +170,10 @@ def main():
         print(f"[ERROR] Model file not found: {args.model}")
         sys.exit(1)
     
+    if args.dry_run:
+        print("[DRY RUN] Arguments OK")
+        return
+    
     print(f"\n{'='*70}")
     print(f"MODEL EVALUATION")
     print(f"{'='*70}")
@@ -139,66 +186,94 @@ def main():
     # Determine stages to evaluate
     stages_to_eval = [args.stage] if args.stage else [1, 2, 3, 4]
     
-    all_results = {}
+    if args.ports or args.replay:
+        all_results = evaluate_parallel(args, stages_to_eval)
+    else:
+        # Imports pesados solo en la evaluación en serie: con --replay,
+        # malmo_replay.install() tiene que registrar MalmoPython antes de
+        # importar el entorno (ver make_env_factory).
+        # Con una política exportada (.npz) no se importa torch ni SB3.
+        numpy_policy = args.model.endswith('.npz')
+        if not numpy_policy:
+            from stable_baselines3.common.monitor import Monitor
     
-    for stage_id in stages_to_eval:
-        print(f"\n{'='*70}")
-        print(f"EVALUATING STAGE {stage_id}")
-        print(f"{'='*70}")
+        from src.malmo_env_wrapper import MalmoToolProgressionEnv
+        from src.curriculum_manager import CurriculumManager
+    
+        all_results = {}
+    
+        for stage_id in stages_to_eval:
+            print(f"\n{'='*70}")
+            print(f"EVALUATING STAGE {stage_id}")
+            print(f"{'='*70}")
         
-        # Create curriculum manager for specific stage
-        curriculum = CurriculumManager(start_stage=stage_id)
+            # Create curriculum manager for specific stage
+            curriculum = CurriculumManager(start_stage=stage_id)
         
-        # Create environment
-        env = MalmoToolProgressionEnv(
-            curriculum_manager=curriculum,
-            port=args.port,
-            max_episode_steps=2000,  # Longer for evaluation
-            seed=args.seed
-        )
-        env = Monitor(env)
+            # Create environment
+            env = MalmoToolProgressionEnv(
+                curriculum_manager=curriculum,
+                port=args.port,
+                max_episode_steps=2000,  # Longer for evaluation
+                seed=args.seed
+            )
+            if args.action_repeat:
+                from src.action_repeat_wrapper import ActionRepeatWrapper
+                env = ActionRepeatWrapper(env, args.action_repeat)
+            if args.options:
+                from src.option_wrapper import OptionWrapper
+                env = OptionWrapper(env, gamma=1.0)  # recompensa sin descontar al evaluar
+            if not numpy_policy:
+                env = Monitor(env)
         
-        # Load model
-        try:
-            if args.algorithm == 'ppo':
-                model = PPO.load(args.model, env=env)
-            elif args.algorithm == 'dqn':
-                model = DQN.load(args.model, env=env)
-            elif args.algorithm == 'a2c':
-                model = A2C.load(args.model, env=env)
-            elif args.algorithm == 'trpo':
-                model = TRPO.load(args.model, env=env)
-            else:
-                raise ValueError(f"Unknown algorithm: {args.algorithm}")
-        except Exception as e:
-            print(f"[ERROR] Failed to load model: {e}")
-            env.close()
-            continue
+            # Load model
+            try:
+                if numpy_policy:
+                    from src.numpy_policy import NumpyPolicy
+                    model = NumpyPolicy.load(args.model)
+                elif args.algorithm == 'ppo':
+                    from stable_baselines3 import PPO
+                    model = PPO.load(args.model, env=env)
+                elif args.algorithm == 'dqn':
+                    from stable_baselines3 import DQN
+                    model = DQN.load(args.model, env=env)
+                elif args.algorithm == 'a2c':
+                    from stable_baselines3 import A2C
+                    model = A2C.load(args.model, env=env)
+                elif args.algorithm == 'trpo':
+                    from sb3_contrib import TRPO
+                    model = TRPO.load(args.model, env=env)
+                else:
+                    raise ValueError(f"Unknown algorithm: {args.algorithm}")
+            except Exception as e:
+                print(f"[ERROR] Failed to load model: {e}")
+                env.close()
+                continue
         
-        # Evaluate
-        print(f"\nRunning {args.episodes} evaluation episodes...")
-        metrics = evaluate_model(
-            model=model,
-            env=env,
-            num_episodes=args.episodes,
-            verbose=args.verbose
-        )
+            # Evaluate
+            print(f"\nRunning {args.episodes} evaluation episodes...")
+            metrics = evaluate_model(
+                model=model,
+                env=env,
+                num_episodes=args.episodes,
+                verbose=args.verbose
+            )
         
-        # Print summary
-        print(f"\n{'='*70}")
-        print(f"STAGE {stage_id} RESULTS")
-        print(f"{'='*70}")
-        print(f"Success Rate: {metrics['success_rate']:.1%} ({metrics['success_count']}/{metrics['num_episodes']})")
-        print(f"Mean Reward: {metrics['mean_reward']:.1f} ± {metrics['std_reward']:.1f}")
-        print(f"Mean Length: {metrics['mean_length']:.1f} ± {metrics['std_length']:.1f}")
-        print(f"Reward Range: [{metrics['min_reward']:.1f}, {metrics['max_reward']:.1f}]")
-        print(f"{'='*70}\n")
+            # Print summary
+            print(f"\n{'='*70}")
+            print(f"STAGE {stage_id} RESULTS")
+            print(f"{'='*70}")
+            print(f"Success Rate: {metrics['success_rate']:.1%} ({metrics['success_count']}/{metrics['num_episodes']})")
+            print(f"Mean Reward: {metrics['mean_reward']:.1f} ± {metrics['std_reward']:.1f}")
+            print(f"Mean Length: {metrics['mean_length']:.1f} ± {metrics['std_length']:.1f}")
+            print(f"Reward Range: [{metrics['min_reward']:.1f}, {metrics['max_reward']:.1f}]")
+            print(f"{'='*70}\n")
         
-        # Store results
-        all_results[f"stage_{stage_id}"] = metrics
+            # Store results
+            all_results[f"stage_{stage_id}"] = metrics
         
-        # Close environment
-        env.close()
+            # Close environment
+            env.close()
     
     # Save results to file
     output_data = {
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Exporta la MlpPolicy de un modelo SB3 (.zip) a NumPy (.npz), verifica la
+paridad de acciones y reporta la aceleración por step.
+
+Uso:
+    python export_numpy_policy.py --algorithm ppo --model models/ppo_final.zip
+    python evaluate.py --algorithm ppo --model models/ppo_final_numpy.npz   # sin torch
+"""
+
+import os
+import sys
+import json
+import argparse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Exportar política SB3 a NumPy')
+    parser.add_argument('--model', type=str, required=True,
+                       help='Path to trained model (.zip)')
+    parser.add_argument('--algorithm', type=str, required=True,
+                       choices=['ppo', 'dqn', 'a2c', 'trpo'],
+                       help='Algorithm type')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Archivo .npz (default: <modelo>_numpy.npz)')
+    parser.add_argument('--parity-obs', type=int, default=2000,
+                       help='Observaciones para la prueba de paridad (default: 2000)')
+    parser.add_argument('--benchmark-steps', type=int, default=2000,
+                       help='Steps para medir la aceleración (0 = no medir)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if not os.path.exists(args.model):
+        print(f"[ERROR] Model file not found: {args.model}")
+        return 1
+    output = args.output or os.path.splitext(args.model)[0] + "_numpy.npz"
+
+    from src.numpy_policy import _load_sb3_model, export_policy, NumpyPolicy, check_parity, benchmark
+
+    model = _load_sb3_model(args.model, args.algorithm)
+    export_policy(args.model, args.algorithm, output, model=model)
+    policy = NumpyPolicy.load(output)
+    print(f"[EXPORT] {args.algorithm.upper()} -> {output}")
+    print(f"  Capas: {[w.shape for w in policy.weights]}, activaciones: {policy.activation_names}")
+
+    parity = check_parity(model, policy, n_obs=args.parity_obs)
+    print(f"\n[PARITY] {parity['n_obs']} obs: acciones iguales {parity['action_match']:.2%}, "
+          f"max |diff| = {parity['max_abs_diff']:.2e}")
+
+    report = {"output": output, "parity": parity}
+    if args.benchmark_steps > 0:
+        bench = benchmark(model, policy, n_steps=args.benchmark_steps)
+        report["benchmark"] = bench
+        print(f"\n[BENCHMARK] predict() con una observación:")
+        print(f"  SB3 (torch): {bench['sb3_us']:8.1f} us/step")
+        print(f"  NumPy:       {bench['numpy_us']:8.1f} us/step")
+        print(f"  Speedup:     {bench['speedup']:8.1f}x")
+
+    with open(os.path.splitext(output)[0] + "_report.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    return 0 if parity["action_match"] == 1.0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline de MalmoToolProgressionEnv sobre una trayectoria grabada.
+
+1. Grabar episodios reales:
+       MALMO_RECORD=trayectorias/ python train_ppo.py --episodes 5
+2. Reproducirlos sin Minecraft, con el profiler de fases activo:
+       python replay_env.py trayectorias/trajectory_*.jsonl.gz --episodes 5 --skip-sleep
+
+Las acciones son aleatorias (o de un modelo con --model); la reproducción es
+en lazo abierto, así que lo que se mide es el costo del entorno y del agente,
+no la dinámica del juego.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+
+class _NoSleepTime:
+    """Módulo time con sleep() inmediato (el resto se delega al real)."""
+
+    def __init__(self, real_time):
+        self._time = real_time
+
+    def sleep(self, seconds):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._time, name)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark offline del entorno con una trayectoria grabada')
+    parser.add_argument('trajectory', help='Archivo .jsonl.gz grabado con MALMO_RECORD')
+    parser.add_argument('--episodes', type=int, default=None,
+                        help='Episodios (default: número de misiones grabadas)')
+    parser.add_argument('--max-steps', type=int, default=1000)
+    parser.add_argument('--stage', type=int, default=1, help='Etapa del curriculum (1-4)')
+    parser.add_argument('--algorithm', type=str, default=None, choices=['ppo', 'dqn', 'a2c', 'trpo'],
+                        help='Algoritmo del modelo (requerido con --model)')
+    parser.add_argument('--model', type=str, default=None, help='Modelo SB3 para elegir acciones')
+    parser.add_argument('--skip-sleep', action='store_true',
+                        help='Anular time.sleep() del entorno (máxima velocidad)')
+    parser.add_argument('--output', type=str, default=None, help='Guardar el resultado en JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from src import malmo_replay
+    n_missions = malmo_replay.install(args.trajectory)
+    episodes = args.episodes or n_missions
+
+    from src import malmo_env_wrapper
+    from src.malmo_env_wrapper import MalmoToolProgressionEnv
+    from src.curriculum_manager import CurriculumManager
+    from src.step_profiler import StepProfiler
+
+    if args.skip_sleep:
+        malmo_env_wrapper.time = _NoSleepTime(time)
+
+    model = None
+    if args.model:
+        if args.algorithm == 'trpo':
+            from sb3_contrib import TRPO as Algo
+        elif args.algorithm in ('ppo', 'dqn', 'a2c'):
+            from stable_baselines3 import PPO, DQN, A2C
+            Algo = {'ppo': PPO, 'dqn': DQN, 'a2c': A2C}[args.algorithm]
+        else:
+            print("[ERROR] --algorithm es requerido con --model")
+            return 1
+        model = Algo.load(args.model)
+
+    profiler = StepProfiler(enabled=True)
+    curriculum = CurriculumManager(start_stage=args.stage, log_dir=os.path.join('logs', 'replay_curriculum'))
+    env = MalmoToolProgressionEnv(
+        curriculum_manager=curriculum,
+        max_episode_steps=args.max_steps,
+        profiler=profiler
+    )
+
+    print(f"[REPLAY] {n_missions} misiones en {args.trajectory}, {episodes} episodios")
+    total_steps = 0
+    start = time.perf_counter()
+    for episode in range(episodes):
+        obs = env.reset()
+        done = False
+        while not done:
+            if model is not None:
+                action, _ = model.predict(obs, deterministic=True)
+            else:
+                action = env.action_space.sample()
+            obs, reward, done, info = env.step(int(action))
+            total_steps += 1
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    profiler.print_summary()
+    result = {
+        'trajectory': os.path.abspath(args.trajectory),
+        'episodes': episodes,
+        'steps': total_steps,
+        'elapsed_s': elapsed,
+        'steps_per_s': total_steps / elapsed if elapsed > 0 else 0.0,
+        'skip_sleep': args.skip_sleep,
+        'phases': profiler.summary(),
+    }
+    print(f"\nTiempo total: {elapsed:.2f}s | {total_steps} steps ({result['steps_per_s']:.0f}/s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Resultado guardado en: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -78,6 +78,19 @@ echo "  A2C: $PORT_A2C"
 echo "  TRPO: $PORT_TRPO"
 echo ""
 
+################################################################################
+# PHASE 0: ARGUMENT CHECKS (sin cargar torch/SB3/Malmo)
+################################################################################
+
+for algo in ppo dqn a2c trpo; do
+    if ! python cli.py train $algo --episodes $EPISODES --curriculum --dry-run > /dev/null; then
+        echo -e "${RED}[ERROR] Invalid arguments for ${algo}${NC}"
+        exit 1
+    fi
+done
+echo -e "${GREEN}[INFO] ✓ Training arguments validated${NC}"
+echo ""
+
 ################################################################################
 # PHASE 1: PARALLEL TRAINING
 ################################################################################
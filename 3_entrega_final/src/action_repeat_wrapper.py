@@ -0,0 +1,41 @@
+"""
+Action repeat para MalmoToolProgressionEnv (ver src.action_repeat).
+
+Cada decisión de la política ejecuta env.step() k veces con la misma acción
+(k según el comando), suma las recompensas y devuelve solo la última
+observación. Penalidades, auto-crafteo y pitch auto-reset se siguen
+aplicando en cada tick, así que la definición de recompensa no cambia;
+lo que baja es el número de evaluaciones de la política y de updates.
+"""
+
+import gym
+
+from src.action_repeat import parse_action_repeat, repeat_for
+
+
+class ActionRepeatWrapper(gym.Wrapper):
+    """
+    Mantiene cada acción k ticks y acumula la recompensa.
+    """
+
+    def __init__(self, env, action_repeat):
+        """
+        Args:
+            env: MalmoToolProgressionEnv (o un wrapper de él)
+            action_repeat: int o string "k" / "move=4,turn=2,attack=1"
+        """
+        super().__init__(env)
+        self.repeats = parse_action_repeat(action_repeat)
+        actions = env.unwrapped.ACTIONS
+        self.action_repeats = [repeat_for(actions[i], self.repeats) for i in range(len(actions))]
+
+    def step(self, action):
+        repeat = self.action_repeats[int(action)]
+        total = 0.0
+        for tick in range(repeat):
+            obs, reward, done, info = self.env.step(action)
+            total += reward
+            if done:
+                break
+        info["repeat_steps"] = tick + 1
+        return obs, total, done, info
@@ -0,0 +1,200 @@
+"""
+Callbacks de SB3 compartidos por los scripts de entrenamiento.
+
+Se importa de forma diferida desde train_*.py (solo al entrenar), ya que
+cargar stable_baselines3 arrastra torch.
+"""
+
+import os
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+from src.step_profiler import _now_ns
+
+
+class CurriculumCallback(BaseCallback):
+    """
+    Callback para integrar el curriculum manager con SB3.
+    """
+    
+    def __init__(self, curriculum_manager, save_path, checkpoint_prefix="", verbose=0):
+        """
+        Args:
+            curriculum_manager: Instancia de CurriculumManager
+            save_path: Directorio donde guardar los checkpoints de etapa
+            checkpoint_prefix: Prefijo del archivo (ej. "dqn_")
+            verbose: Nivel de verbosidad de SB3
+        """
+        super().__init__(verbose)
+        self.curriculum = curriculum_manager
+        self.save_path = save_path
+        self.checkpoint_prefix = checkpoint_prefix
+        self.episode_rewards = []
+        self.episode_lengths = []
+        self.current_episode_reward = 0
+        self.current_episode_length = 0
+    
+    def _on_step(self) -> bool:
+        """
+        Called at each step.
+        """
+        # Accumulate reward
+        self.current_episode_reward += self.locals['rewards'][0]
+        self.current_episode_length += 1
+        
+        # Check if episode ended
+        if self.locals['dones'][0]:
+            info = self.locals['infos'][0]
+            success = info.get("tool_crafted", False)
+            
+            # Log to curriculum
+            advanced = self.curriculum.log_episode(
+                success=success,
+                total_reward=self.current_episode_reward,
+                episode_info=info
+            )
+            
+            # Save episode stats
+            self.episode_rewards.append(self.current_episode_reward)
+            self.episode_lengths.append(self.current_episode_length)
+            
+            # Log to tensorboard
+            self.logger.record("curriculum/stage", self.curriculum.current_stage.stage_id)
+            self.logger.record("curriculum/stage_episodes", self.curriculum.current_stage.episodes_completed)
+            self.logger.record("curriculum/episode_reward", self.current_episode_reward)
+            self.logger.record("curriculum/episode_length", self.current_episode_length)
+            self.logger.record("curriculum/success", 1.0 if success else 0.0)
+            
+            # Latencia comando → observación del episodio (TrackedAgentHost)
+            latency = info.get("latency_stats")
+            if latency:
+                cmd_latency = latency["command_latency"]
+                if cmd_latency.get("count"):
+                    self.logger.record("latency/cmd_obs_p50_ms", cmd_latency["p50_ms"])
+                    self.logger.record("latency/cmd_obs_p95_ms", cmd_latency["p95_ms"])
+                    self.logger.record("latency/cmd_obs_p99_ms", cmd_latency["p99_ms"])
+                self.logger.record("latency/stale_reads", latency["stale_reads"])
+                self.logger.record("latency/dropped_obs", latency["dropped_obs"])
+                self.logger.record("latency/duplicate_obs", latency["duplicate_obs"])
+            
+            # Reset counters
+            self.current_episode_reward = 0
+            self.current_episode_length = 0
+            
+            # Si avanzó de etapa, guardar modelo
+            if advanced:
+                print(f"\n[CALLBACK] Stage advanced! Saving model...")
+                model_path = os.path.join(
+                    self.save_path,
+                    f"{self.checkpoint_prefix}stage_{self.curriculum.current_stage.stage_id - 1}_checkpoint.zip"
+                )
+                self.model.save(model_path)
+                print(f"  Saved to: {model_path}")
+        
+        return True
+    
+    def _on_training_end(self) -> None:
+        # El checkpoint del curriculum se escribe en segundo plano y con throttling
+        self.curriculum.flush_checkpoint()
+
+
+class ProfilerCallback(BaseCallback):
+    """
+    Callback que exporta el StepProfiler del entorno al logger de SB3
+    (TensorBoard) y agrega las fases propias de SB3:
+    - sb3_step: tiempo entre dos _on_step (policy + env.step + buffer)
+    - rollout: recolección completa de un rollout
+    - train_update: actualización de la red entre rollouts
+    """
+    
+    def __init__(self, profiler, log_path, log_every_rollouts=1, verbose=0):
+        """
+        Args:
+            profiler: StepProfiler compartido con MalmoToolProgressionEnv
+            log_path: Directorio donde escribir profile_summary.json
+            log_every_rollouts: Cada cuántos rollouts enviar los percentiles al logger
+            verbose: Nivel de verbosidad de SB3
+        """
+        super().__init__(verbose)
+        self.profiler = profiler
+        self.log_path = log_path
+        self.log_every_rollouts = max(1, log_every_rollouts)
+        self.rollouts = 0
+        self._last_step_ns = None
+        self._rollout_start_ns = None
+        self._rollout_end_ns = None
+    
+    def _on_rollout_start(self) -> None:
+        now = _now_ns()
+        if self._rollout_end_ns is not None:
+            self.profiler.record("train_update", now - self._rollout_end_ns)
+        self._rollout_start_ns = now
+        self._last_step_ns = now
+    
+    def _on_step(self) -> bool:
+        now = _now_ns()
+        self.profiler.record("sb3_step", now - self._last_step_ns)
+        self._last_step_ns = now
+        return True
+    
+    def _on_rollout_end(self) -> None:
+        now = _now_ns()
+        self.profiler.record("rollout", now - self._rollout_start_ns)
+        self._rollout_end_ns = now
+        self.rollouts += 1
+        if self.rollouts % self.log_every_rollouts == 0:
+            self.profiler.record_to_logger(self.logger, prefix="profile")
+    
+    def _on_training_end(self) -> None:
+        path = self.profiler.dump_json(
+            os.path.join(self.log_path, "profile_summary.json"),
+            extra={"num_timesteps": self.num_timesteps, "rollouts": self.rollouts}
+        )
+        if path:
+            self.profiler.print_summary()
+            print(f"\n[PROFILER] Resumen guardado en: {path}")
+
+
+class MixedCurriculumCallback(BaseCallback):
+    """
+    Exporta al logger de SB3 la distribución de etapas del curriculum mixto
+    (probabilidad, progreso de aprendizaje, episodios y éxito por etapa).
+    """
+    
+    def __init__(self, sampler, verbose=0):
+        """
+        Args:
+            sampler: StageSampler de MixedCurriculumVecEnv
+            verbose: Nivel de verbosidad de SB3
+        """
+        super().__init__(verbose)
+        self.sampler = sampler
+    
+    def _on_step(self) -> bool:
+        return True
+    
+    def _on_rollout_end(self) -> None:
+        for key, value in self.sampler.stats().items():
+            self.logger.record(f"mixed_curriculum/{key}", value)
+    
+    def _on_training_end(self) -> None:
+        stats = self.sampler.stats()
+        print("\n[MIXED CURRICULUM] Episodios / éxito (últimos 50) por etapa:")
+        for stage_id in range(1, self.sampler.n_stages + 1):
+            print(f"  Stage {stage_id}: {stats[f'stage_{stage_id}/episodes']} episodios, "
+                  f"{stats[f'stage_{stage_id}/success_rate']:.1%} éxito, "
+                  f"p={stats[f'stage_{stage_id}/prob']:.2f}")
+
+
+class SMDPCallback(BaseCallback):
+    """
+    Copia el gamma^k de cada transición (info["option_discount"] de
+    OptionWrapper) al SMDPRolloutBuffer, antes de que SB3 la agregue.
+    """
+    
+    def _on_step(self) -> bool:
+        buffer = self.model.rollout_buffer
+        buffer.discounts[buffer.pos] = [
+            info.get("option_discount", buffer.gamma) for info in self.locals["infos"]
+        ]
+        return True
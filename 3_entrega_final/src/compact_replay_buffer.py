@@ -0,0 +1,149 @@
+"""
+Replay buffer compacto para DQN sobre la observación de 117 dimensiones.
+
+El ReplayBuffer de SB3 guarda obs y next_obs como float32 (buffer_size, 117):
+~940 bytes por transición. CompactReplayBuffer:
+- guarda cada observación una sola vez en un pool codificado (src.obs_codec,
+  33 bytes: bits empaquetados, conteos int16, pose float16),
+- cada transición referencia obs y next_obs por índice (next_obs de un paso
+  es la obs del siguiente, así que no se duplica),
+- acciones uint8, dones/timeouts bool,
+- decodifica los batches con NumPy vectorizado al muestrear.
+
+Resultado: ~80 bytes por transición (≈12x menos RAM con el mismo buffer_size).
+
+Uso:
+    DQN("MlpPolicy", env, buffer_size=1_000_000,
+        replay_buffer_class=CompactReplayBuffer)
+"""
+
+import numpy as np
+from gym import spaces
+
+from stable_baselines3.common.buffers import BaseBuffer, ReplayBuffer
+from stable_baselines3.common.type_aliases import ReplayBufferSamples
+
+from src.obs_codec import OBS_DIM, ENCODED_DTYPE, encode_observations, decode_observations
+
+
+class CompactReplayBuffer(ReplayBuffer):
+    """
+    ReplayBuffer con observaciones codificadas y referenciadas por índice.
+    """
+
+    def __init__(
+        self,
+        buffer_size,
+        observation_space,
+        action_space,
+        device="auto",
+        n_envs=1,
+        optimize_memory_usage=False,
+        handle_timeout_termination=True,
+    ):
+        """
+        Args:
+            buffer_size: Transiciones máximas (por entorno)
+            observation_space: Box de 117 dimensiones de MalmoToolProgressionEnv
+            action_space: Espacio de acciones Discrete
+            device: Dispositivo de PyTorch para los batches
+            n_envs: Número de entornos paralelos
+            optimize_memory_usage: Ignorado (el buffer ya evita duplicar next_obs)
+            handle_timeout_termination: Tratar TimeLimit.truncated como no terminal
+        """
+        if observation_space.shape != (OBS_DIM,):
+            raise ValueError(f"CompactReplayBuffer requiere observaciones ({OBS_DIM},), "
+                             f"recibió {observation_space.shape}")
+        if not isinstance(action_space, spaces.Discrete):
+            raise ValueError("CompactReplayBuffer solo soporta acciones Discrete")
+
+        # BaseBuffer directamente: ReplayBuffer.__init__ reservaría los arrays float32
+        BaseBuffer.__init__(self, buffer_size, observation_space, action_space, device, n_envs=n_envs)
+        self.optimize_memory_usage = False
+        self.handle_timeout_termination = handle_timeout_termination
+
+        # Cada transición agrega a lo sumo 2 observaciones (obs tras un reset + next_obs),
+        # así que un pool de 2 * buffer_size nunca pisa observaciones aún referenciadas
+        self.pool_size = 2 * self.buffer_size + 2
+        self.obs_pool = np.zeros((self.pool_size, self.n_envs), dtype=ENCODED_DTYPE)
+        self.pool_pos = 0
+
+        self.obs_index = np.zeros((self.buffer_size, self.n_envs), dtype=np.int32)
+        self.next_obs_index = np.zeros((self.buffer_size, self.n_envs), dtype=np.int32)
+        action_dtype = np.uint8 if action_space.n <= 256 else np.int32
+        self.actions = np.zeros((self.buffer_size, self.n_envs), dtype=action_dtype)
+        self.rewards = np.zeros((self.buffer_size, self.n_envs), dtype=np.float32)
+        self.dones = np.zeros((self.buffer_size, self.n_envs), dtype=bool)
+        self.timeouts = np.zeros((self.buffer_size, self.n_envs), dtype=bool)
+
+        # Última next_obs guardada por entorno, para reutilizar su índice
+        self._last_next_obs = np.zeros((self.n_envs, OBS_DIM), dtype=np.float32)
+        self._last_next_index = np.full(self.n_envs, -1, dtype=np.int64)
+
+    def _store(self, obs):
+        """Guarda un batch (n_envs, 117) en el pool y retorna su índice."""
+        index = self.pool_pos
+        encode_observations(obs, out=self.obs_pool[index])
+        self.pool_pos = (self.pool_pos + 1) % self.pool_size
+        return index
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        obs = np.asarray(obs, dtype=np.float32).reshape(self.n_envs, OBS_DIM)
+        next_obs = np.asarray(next_obs, dtype=np.float32).reshape(self.n_envs, OBS_DIM)
+
+        # obs == next_obs del paso anterior en todos los entornos: reutilizar el índice
+        if (self._last_next_index >= 0).all() and np.array_equal(obs, self._last_next_obs):
+            obs_index = self._last_next_index[0]
+        else:
+            obs_index = self._store(obs)
+        next_index = self._store(next_obs)
+
+        self.obs_index[self.pos] = obs_index
+        self.next_obs_index[self.pos] = next_index
+        self.actions[self.pos] = np.asarray(action).reshape(self.n_envs)
+        self.rewards[self.pos] = np.asarray(reward).reshape(self.n_envs)
+        self.dones[self.pos] = np.asarray(done).reshape(self.n_envs)
+        if self.handle_timeout_termination:
+            self.timeouts[self.pos] = [info.get("TimeLimit.truncated", False) for info in infos]
+
+        self._last_next_obs[:] = next_obs
+        self._last_next_index[:] = next_index
+
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+            self.pos = 0
+
+    def _get_samples(self, batch_inds, env=None):
+        env_indices = np.random.randint(0, high=self.n_envs, size=(len(batch_inds),))
+
+        obs = decode_observations(self.obs_pool[self.obs_index[batch_inds, env_indices], env_indices])
+        next_obs = decode_observations(self.obs_pool[self.next_obs_index[batch_inds, env_indices], env_indices])
+
+        # Como ReplayBuffer de SB3: también sirve con dones float (src.smdp)
+        dones = self.dones[batch_inds, env_indices] * (1 - self.timeouts[batch_inds, env_indices])
+        data = (
+            self._normalize_obs(obs, env),
+            self.actions[batch_inds, env_indices].astype(np.int64).reshape(-1, 1),
+            self._normalize_obs(next_obs, env),
+            dones.astype(np.float32).reshape(-1, 1),
+            self._normalize_reward(self.rewards[batch_inds, env_indices].reshape(-1, 1), env),
+        )
+        return ReplayBufferSamples(*tuple(map(self.to_torch, data)))
+
+    def nbytes(self):
+        """Bytes ocupados por los arrays del buffer."""
+        arrays = (self.obs_pool, self.obs_index, self.next_obs_index, self.actions,
+                  self.rewards, self.dones, self.timeouts)
+        return sum(a.nbytes for a in arrays)
+
+    @staticmethod
+    def estimate_bytes(buffer_size, n_envs=1):
+        """
+        Estimación de RAM: (compacto, ReplayBuffer de SB3) en bytes.
+        """
+        per_transition = (2 * ENCODED_DTYPE.itemsize   # pool (2 obs por transición, peor caso)
+                          + 2 * 4                      # índices int32
+                          + 1 + 4 + 1 + 1)             # acción, reward, done, timeout
+        default = (2 * OBS_DIM * 4) + 8 + 4 + 4 + 4    # obs + next_obs float32, acción int64, ...
+        return per_transition * buffer_size * n_envs, default * buffer_size * n_envs
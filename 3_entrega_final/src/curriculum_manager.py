@@ -8,14 +8,146 @@ Stage 3: Recolectar 3 hierro → craftear pico de hierro (con modelo pre-entrena
 Stage 4: Recolectar 1 diamante → craftear pico de diamante (con modelo pre-entrenado de Stage 3)
 
 Basado en el sistema de 3_entrega con auto-crafteo y penalizaciones por pitch.
+
+Costo por episodio: las ventanas de éxito son buffers circulares con suma
+acumulada (O(1)) y el checkpoint JSON no se escribe en cada episodio, sino al
+cambiar de etapa, cada N episodios o cada X segundos, desde un hilo en segundo
+plano y de forma atómica (archivo .tmp + os.replace).
 """
 
 import os
 import json
+import time
+import atexit
+import threading
 from typing import Dict, Tuple, Optional
 import numpy as np
 
 
+class RollingWindow:
+    """
+    Ventana de los últimos `size` valores con suma acumulada: append y mean en O(1).
+    """
+    
+    __slots__ = ("size", "_values", "_pos", "_count", "_sum")
+    
+    def __init__(self, size: int = 50):
+        self.size = size
+        self._values = [0] * size
+        self._pos = 0
+        self._count = 0
+        self._sum = 0
+    
+    def append(self, value):
+        if self._count == self.size:
+            self._sum -= self._values[self._pos]
+        else:
+            self._count += 1
+        self._values[self._pos] = value
+        self._sum += value
+        self._pos = (self._pos + 1) % self.size
+    
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+    
+    def __len__(self):
+        return self._count
+    
+    def to_list(self):
+        """Valores en orden cronológico (para el checkpoint)."""
+        if self._count < self.size:
+            return self._values[:self._count]
+        return self._values[self._pos:] + self._values[:self._pos]
+    
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+    
+    def clear(self):
+        self._values = [0] * self.size
+        self._pos = self._count = self._sum = 0
+
+
+class CheckpointWriter:
+    """
+    Escribe checkpoints JSON en un hilo en segundo plano.
+    
+    submit() solo guarda la última instantánea y despierta al hilo; si llegan
+    varias antes de que el hilo escriba, se escribe únicamente la más reciente.
+    Cada escritura es atómica: .tmp + os.replace.
+    """
+    
+    def __init__(self, path: str, background: bool = True):
+        # Ruta absoluta: el flush de atexit puede correr tras un chdir
+        self.path = os.path.abspath(path)
+        self.background = background
+        self.writes = 0
+        self._pending = None
+        self._cond = threading.Condition()
+        self._writing = False
+        self._thread = None
+        self._closed = False
+        atexit.register(self.close)
+    
+    def _write(self, data: Dict):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.writes += 1
+    
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                data, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self._write(data)
+            except OSError as e:
+                print(f"[CURRICULUM] Error writing checkpoint: {e}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+    
+    def submit(self, data: Dict):
+        if not self.background or self._closed:
+            self._write(data)
+            return
+        with self._cond:
+            self._pending = data
+            if self._thread is None:
+                # Hilo creado al primer checkpoint (los managers de evaluación nunca escriben)
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+    
+    def flush(self):
+        """Bloquea hasta que la última instantánea esté en disco."""
+        with self._cond:
+            while self._pending is not None or self._writing:
+                if self._thread is None or not self._thread.is_alive():
+                    break
+                self._cond.wait()
+            data, self._pending = self._pending, None
+        if data is not None:
+            self._write(data)
+    
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+
 class CurriculumStage:
     """Representa una etapa del curriculum"""
     
@@ -43,7 +175,7 @@ class CurriculumStage:
         self.episodes_completed = 0
         self.successes = 0
         self.total_reward = 0.0
-        self.success_history = []  # Last 50 episodes
+        self.success_history = RollingWindow(50)  # Last 50 episodes
 
 
 class CurriculumManager:
@@ -57,14 +189,30 @@ class CurriculumManager:
     4. Diamante (Stage 4): Recolecta 1 diamond → craftea diamond_pickaxe (requiere iron_pickaxe)
     """
     
-    def __init__(self, start_stage: int = 1, log_dir: str = "curriculum_logs"):
+    def __init__(
+        self,
+        start_stage: int = 1,
+        log_dir: str = "curriculum_logs",
+        checkpoint_every: int = 25,
+        checkpoint_interval: float = 60.0,
+        async_checkpoint: bool = True
+    ):
         """
         Args:
             start_stage: Etapa inicial (1-4)
             log_dir: Directorio para logs del curriculum
+            checkpoint_every: Guardar checkpoint cada N episodios (además de al cambiar de etapa)
+            checkpoint_interval: Guardar checkpoint si pasaron X segundos desde el último
+            async_checkpoint: Escribir el checkpoint en un hilo en segundo plano
         """
         self.log_dir = log_dir
         os.makedirs(log_dir, exist_ok=True)
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_writer = CheckpointWriter(
+            os.path.join(log_dir, "curriculum_checkpoint.json"), background=async_checkpoint)
+        self._episodes_since_checkpoint = 0
+        self._last_checkpoint_time = time.monotonic()
         
         # Definir las 4 etapas del curriculum
         # NOTA: episodes_per_stage reducido a 30 para testing rápido
@@ -130,6 +278,15 @@ class CurriculumManager:
         """Retorna la etapa actual"""
         return self.stages[self.current_stage_idx]
     
+    def set_stage(self, stage_id: int):
+        """
+        Fija la etapa actual sin registrar episodios (curriculum mixto:
+        la etapa de cada sub-entorno la elige un StageSampler).
+        """
+        if not 1 <= stage_id <= len(self.stages):
+            raise ValueError(f"Invalid stage: {stage_id}")
+        self.current_stage_idx = stage_id - 1
+    
     def log_episode(self, success: bool, total_reward: float, episode_info: Dict) -> bool:
         """
         Registra el resultado de un episodio.
@@ -152,12 +309,8 @@ class CurriculumManager:
         stage.total_reward += total_reward
         stage.success_history.append(1 if success else 0)
         
-        # Mantener solo últimos 50 episodios
-        if len(stage.success_history) > 50:
-            stage.success_history.pop(0)
-        
-        # Calcular success rate de últimos episodios
-        recent_success_rate = np.mean(stage.success_history) if stage.success_history else 0.0
+        # Success rate de los últimos 50 episodios (suma acumulada del buffer circular)
+        recent_success_rate = stage.success_history.mean()
         overall_success_rate = stage.successes / stage.episodes_completed if stage.episodes_completed > 0 else 0.0
         
         # Log progress
@@ -173,8 +326,12 @@ class CurriculumManager:
         if self._should_advance(stage, recent_success_rate, overall_success_rate):
             advanced = self._advance_stage()
         
-        # Guardar checkpoint
-        self._save_checkpoint()
+        # Guardar checkpoint: al cambiar de etapa, cada N episodios o por tiempo
+        self._episodes_since_checkpoint += 1
+        if (advanced
+                or self._episodes_since_checkpoint >= self.checkpoint_every
+                or time.monotonic() - self._last_checkpoint_time >= self.checkpoint_interval):
+            self._save_checkpoint()
         
         return advanced
     
@@ -319,9 +476,18 @@ class CurriculumManager:
             return None
     
     def _save_checkpoint(self):
-        """Guarda el estado del curriculum"""
-        checkpoint_path = os.path.join(self.log_dir, "curriculum_checkpoint.json")
-        
+        """Encola una instantánea del curriculum para el hilo de escritura"""
+        self._episodes_since_checkpoint = 0
+        self._last_checkpoint_time = time.monotonic()
+        self.checkpoint_writer.submit(self._checkpoint_data())
+    
+    def flush_checkpoint(self):
+        """Escribe el estado actual y espera a que esté en disco"""
+        self._save_checkpoint()
+        self.checkpoint_writer.flush()
+    
+    def _checkpoint_data(self) -> Dict:
+        """Instantánea serializable del estado (copias, el hilo no comparte listas)"""
         data = {
             "current_stage_idx": self.current_stage_idx,
             "total_episodes": self.total_episodes,
@@ -335,12 +501,11 @@ class CurriculumManager:
                 "episodes_completed": stage.episodes_completed,
                 "successes": stage.successes,
                 "total_reward": stage.total_reward,
-                "success_history": stage.success_history
+                "success_history": stage.success_history.to_list()
             }
             data["stages"].append(stage_data)
         
-        with open(checkpoint_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        return data
     
     def load_checkpoint(self, checkpoint_path: str):
         """Carga el estado del curriculum desde un checkpoint"""
@@ -359,7 +524,8 @@ class CurriculumManager:
             stage.episodes_completed = stage_data["episodes_completed"]
             stage.successes = stage_data["successes"]
             stage.total_reward = stage_data["total_reward"]
-            stage.success_history = stage_data["success_history"]
+            stage.success_history.clear()
+            stage.success_history.extend(stage_data["success_history"])
         
         print(f"\n[CURRICULUM] Loaded checkpoint")
         print(f"  Current Stage: {self.current_stage.stage_id} - {self.current_stage.name}")
@@ -0,0 +1,209 @@
+"""
+Destilación de las tablas Q de 3_entrega a la MlpPolicy de SB3.
+
+Los agentes tabulares de 3_entrega guardan {(estado, acción): q} en
+entrenamiento_acumulado/*.pkl, con el estado de 10 elementos de get_state():
+(surroundings5x5, wood, stone, iron, diamond, planks, sticks,
+has_wood_pick, has_stone_pick, has_iron_pick). Este módulo (solo NumPy)
+arma el dataset supervisado para inicializar PPO / A2C / TRPO:
+- state_to_observation(): estado tabular -> observación de 117 dims de
+  MalmoToolProgressionEnv (ver src/obs_codec.py para el layout),
+- action_targets(): Q-values de las acciones que existen en el env ->
+  distribución softmax sobre Q normalizado por su rango en el estado (las
+  recompensas de las etapas van de -300 a +10000, así que la temperatura es
+  relativa y no depende de la escala),
+- build_dataset(): recorre los estados visitados de una o más tablas.
+
+Diferencias entre ambos lados:
+- surroundings5x5 va de y=0 a y=2 y floor5x5 de y=-1 a y=1: las capas y=0 e
+  y=1 se copian, la capa del suelo (y=-1) se marca sólida (mundo plano) y la
+  capa y=2 se descarta,
+- el estado tabular no tiene pose: posición, yaw, pitch y TimeAlive quedan
+  en 0 y la vida en 20,
+- "turn 1" / "turn -1" pasan a "turn 0.5" / "turn -0.5"; los crafteos y las
+  opciones no existen en el env y se ignoran,
+- solo las tablas con abstracción "raw" tienen el grid completo; las claves
+  de "features" / "hashed" no se pueden mapear y se cuentan como omitidas.
+"""
+
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+from src.obs_codec import OBS_DIM
+
+
+# Acción de los agentes de 3_entrega -> índice en MalmoToolProgressionEnv.ACTIONS
+STAGE_TO_ENV_ACTION = {
+    "move 1": 0,
+    "move -1": 1,
+    "strafe 1": 2,
+    "strafe -1": 3,
+    "turn 1": 4,
+    "turn -1": 5,
+    "pitch 0.1": 6,
+    "pitch -0.1": 7,
+    "attack 1": 8,
+}
+N_ENV_ACTIONS = 9
+
+# Igual que src.malmo_env_wrapper (sin importar gym / Malmo)
+STAGE_FEATURE_START = 91
+
+GRID_CELLS = 75
+LAYER_CELLS = 25
+DEFAULT_LIFE = 20.0
+DEFAULT_TEMPERATURE = 0.25
+
+
+def is_stage_state(state):
+    """True si la clave es el estado de 10 elementos de get_state()."""
+    return (isinstance(state, tuple) and len(state) == 10
+            and isinstance(state[0], tuple) and len(state[0]) == GRID_CELLS)
+
+
+def stage_of_state(state):
+    """Etapa del curriculum (1-4): el primer pico que falta en el inventario."""
+    return 1 + sum(1 for has_pick in state[7:10] if has_pick)
+
+
+def state_to_observation(state, stage_feature=False, out=None):
+    """
+    Args:
+        state: Estado de 10 elementos de los agentes de 3_entrega
+        stage_feature: Escribir la etapa one-hot en obs[91:95]
+            (igual que MalmoToolProgressionEnv(stage_feature=True))
+        out: Vector (117,) float32 donde escribir (opcional)
+
+    Returns:
+        np.ndarray (117,) float32 con el layout de _get_observation()
+    """
+    obs = out if out is not None else np.empty(OBS_DIM, dtype=np.float32)
+    obs[:] = 0.0
+    surroundings = state[0]
+
+    obs[:LAYER_CELLS] = 1.0  # suelo bajo los pies
+    solid = np.fromiter((block != "air" for block in surroundings[:2 * LAYER_CELLS]),
+                        dtype=np.float32, count=2 * LAYER_CELLS)
+    obs[LAYER_CELLS:GRID_CELLS] = solid
+
+    wood, stone, iron, diamond = state[1:5]
+    obs[75:79] = (wood, stone, iron, diamond)
+    obs[79:82] = [1.0 if has_pick else 0.0 for has_pick in state[7:10]]
+    obs[89] = DEFAULT_LIFE
+    np.clip(obs, -100.0, 100.0, out=obs)
+
+    if stage_feature:
+        obs[STAGE_FEATURE_START + stage_of_state(state) - 1] = 1.0
+    return obs
+
+
+def group_q_values(q_table):
+    """
+    {(estado, acción): q} -> {estado: {acción: q}} conservando el orden de
+    inserción (los estados se recorren en el orden en que se visitaron).
+    """
+    grouped = OrderedDict()
+    for (state, action), value in q_table.items():
+        grouped.setdefault(state, {})[action] = value
+    return grouped
+
+
+def action_targets(q_values, temperature=DEFAULT_TEMPERATURE):
+    """
+    Args:
+        q_values: {acción de 3_entrega: q} de un estado
+        temperature: Temperatura del softmax sobre (Q - max Q) / rango de Q
+            (0 = one-hot del argmax)
+
+    Returns:
+        np.ndarray (9,) con la distribución objetivo sobre las acciones del
+        env, o None si el estado no distingue ninguna acción (todas iguales)
+    """
+    q = np.zeros(N_ENV_ACTIONS, dtype=np.float64)  # acción no probada: q = 0
+    for action, value in q_values.items():
+        index = STAGE_TO_ENV_ACTION.get(action)
+        if index is not None:
+            q[index] = value
+    if np.ptp(q) == 0.0:
+        return None
+
+    if temperature <= 0:
+        targets = np.zeros(N_ENV_ACTIONS)
+        targets[np.argmax(q)] = 1.0
+        return targets
+    scaled = (q - q.max()) / (np.ptp(q) * temperature)
+    weights = np.exp(scaled)
+    return weights / weights.sum()
+
+
+def load_q_table(path):
+    """
+    Lee un .pkl de entrenamiento_acumulado como {(estado, acción): q}.
+
+    DoubleQLearningAgent guarda (q1, q2) y elige con q1 + q2, así que se
+    suman; el modelo de RandomAgent (sin tabla) queda vacío.
+    """
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    if isinstance(data, tuple) and len(data) == 2 and all(isinstance(t, dict) for t in data):
+        q1_table, q2_table = data
+        keys = list(q1_table) + [key for key in q2_table if key not in q1_table]
+        return {key: q1_table.get(key, 0.0) + q2_table.get(key, 0.0) for key in keys}
+    if not isinstance(data, dict):
+        return {}
+    return {key: value for key, value in data.items()
+            if isinstance(key, tuple) and len(key) == 2}
+
+
+def build_dataset(q_tables, temperature=DEFAULT_TEMPERATURE, stage_feature=False):
+    """
+    Args:
+        q_tables: Lista de dicts {(estado, acción): q} (o paths a los .pkl)
+        temperature: Ver action_targets()
+        stage_feature: Ver state_to_observation()
+
+    Returns:
+        (obs (N, 117) float32, targets (N, 9) float32, stats) donde stats
+        cuenta estados usados, omitidos por clave no mapeable y omitidos por
+        no tener preferencia entre acciones
+    """
+    observations = []
+    targets = []
+    stats = {"states": 0, "skipped_keys": 0, "skipped_flat": 0}
+
+    for q_table in q_tables:
+        if isinstance(q_table, str):
+            q_table = load_q_table(q_table)
+        for state, q_values in group_q_values(q_table).items():
+            if not is_stage_state(state):
+                stats["skipped_keys"] += 1
+                continue
+            target = action_targets(q_values, temperature)
+            if target is None:
+                stats["skipped_flat"] += 1
+                continue
+            observations.append(state_to_observation(state, stage_feature))
+            targets.append(target)
+            stats["states"] += 1
+
+    if not observations:
+        return (np.zeros((0, OBS_DIM), dtype=np.float32),
+                np.zeros((0, N_ENV_ACTIONS), dtype=np.float32), stats)
+    return (np.stack(observations).astype(np.float32),
+            np.stack(targets).astype(np.float32), stats)
+
+
+def iterate_minibatches(n, batch_size, rng):
+    """Índices barajados de una época, en lotes de batch_size."""
+    order = rng.permutation(n)
+    for start in range(0, n, batch_size):
+        yield order[start:start + batch_size]
+
+
+def action_agreement(logits, targets):
+    """Fracción de estados donde el argmax de la red coincide con el de la tabla."""
+    if len(targets) == 0:
+        return 0.0
+    return float(np.mean(np.argmax(logits, axis=1) == np.argmax(targets, axis=1)))
@@ -0,0 +1,333 @@
+"""
+Evaluación en paralelo: reparte trabajos (modelo, stage, seed) entre un pool
+de entornos.
+
+evaluate_model() corre los episodios uno tras otro en un solo entorno; una
+matriz completa de 4 algoritmos × 4 stages × 20 episodios son horas de
+Minecraft en serie. EvaluationScheduler:
+- mantiene un entorno por puerto (clientes reales) o N entornos sobre el
+  backend de reproducción (src.malmo_replay),
+- agrupa por modelo las observaciones de todos los entornos activos y hace
+  un solo model.predict por batch,
+- ejecuta los step()/reset() de los entornos en hilos (son I/O + sleep),
+- escribe cada episodio terminado en un archivo JSON Lines (flush inmediato)
+  y, al reiniciar, salta los trabajos que ya están en ese archivo.
+
+Cada trabajo es un episodio: (algoritmo, modelo, stage, episodio) con
+seed = seed_base + episodio.
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class EvalJob:
+    __slots__ = ('algorithm', 'model_path', 'stage', 'episode', 'seed')
+
+    def __init__(self, algorithm, model_path, stage, episode, seed):
+        self.algorithm = algorithm
+        self.model_path = model_path
+        self.stage = stage
+        self.episode = episode
+        self.seed = seed
+
+    def key(self):
+        return (self.algorithm, self.model_path, self.stage, self.episode)
+
+
+def build_jobs(models, stages, num_episodes, seed):
+    """
+    Args:
+        models: Lista de (algoritmo, ruta_modelo)
+        stages: Stages a evaluar
+        num_episodes: Episodios por (modelo, stage)
+        seed: Semilla base (episodio i usa seed + i)
+
+    Returns:
+        Lista de EvalJob, intercalando modelos para balancear el pool
+    """
+    jobs = []
+    for stage in stages:
+        for episode in range(num_episodes):
+            for algorithm, model_path in models:
+                jobs.append(EvalJob(algorithm, model_path, stage, episode, seed + episode))
+    return jobs
+
+
+def load_results(results_path):
+    """Lee los episodios ya evaluados (JSON Lines); ignora líneas truncadas."""
+    results = []
+    if not os.path.exists(results_path):
+        return results
+    with open(results_path, 'r') as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue  # última línea incompleta tras un corte
+    return results
+
+
+def _result_key(result):
+    return (result["algorithm"], result["model_path"], result["stage"], result["episode"])
+
+
+def summarize(results, algorithm, model_path, stage):
+    """
+    Métricas de un (modelo, stage) con el mismo formato que evaluate_model().
+    """
+    episodes = sorted((r for r in results
+                       if r["algorithm"] == algorithm and r["model_path"] == model_path and r["stage"] == stage),
+                      key=lambda r: r["episode"])
+    if not episodes:
+        return None
+    rewards = [r["reward"] for r in episodes]
+    lengths = [r["length"] for r in episodes]
+    success_count = sum(1 for r in episodes if r["success"])
+    return {
+        "num_episodes": len(episodes),
+        "mean_reward": float(np.mean(rewards)),
+        "std_reward": float(np.std(rewards)),
+        "min_reward": float(np.min(rewards)),
+        "max_reward": float(np.max(rewards)),
+        "mean_length": float(np.mean(lengths)),
+        "std_length": float(np.std(lengths)),
+        "success_rate": success_count / len(episodes),
+        "success_count": success_count,
+        "episode_rewards": rewards,
+        "episode_lengths": lengths,
+    }
+
+
+class _Slot:
+    """Un entorno del pool y el episodio que está corriendo."""
+
+    def __init__(self, env):
+        self.env = env
+        self.job = None
+        self.obs = None
+        self.reward = 0.0
+        self.length = 0
+        self.action = None
+        self.start_time = None
+        self.pending = None  # Future del reset en curso
+
+
+class EvaluationScheduler:
+    """
+    Scheduler de evaluación sobre un pool de entornos.
+    """
+
+    def __init__(self, env_factory, n_envs, results_path, model_loader, max_episode_steps=2000,
+                 max_reset_retries=3, verbose=True):
+        """
+        Args:
+            env_factory: Función (índice) -> MalmoToolProgressionEnv
+            n_envs: Número de entornos del pool
+            results_path: Archivo JSON Lines donde se agregan los episodios
+            model_loader: Función (algoritmo, ruta) -> objeto con predict()
+            max_episode_steps: Corte de seguridad por episodio
+            max_reset_retries: Reintentos de reset por trabajo antes de descartarlo
+            verbose: Imprimir progreso
+        """
+        self.env_factory = env_factory
+        self.n_envs = n_envs
+        self.results_path = results_path
+        self.model_loader = model_loader
+        self.max_episode_steps = max_episode_steps
+        self.max_reset_retries = max_reset_retries
+        self.verbose = verbose
+        self.models = {}
+        self.curricula = {}
+
+    def _log(self, message):
+        if self.verbose:
+            print(f"[EVAL POOL] {message}")
+
+    def _model(self, job):
+        key = (job.algorithm, job.model_path)
+        if key not in self.models:
+            self.models[key] = self.model_loader(job.algorithm, job.model_path)
+        return self.models[key]
+
+    def _curriculum(self, stage):
+        from src.curriculum_manager import CurriculumManager
+        if stage not in self.curricula:
+            self.curricula[stage] = CurriculumManager(
+                start_stage=stage, log_dir=os.path.join("logs", "eval_curriculum", f"stage_{stage}"))
+        return self.curricula[stage]
+
+    def _reset(self, slot):
+        base = getattr(slot.env, "unwrapped", slot.env)  # OptionWrapper
+        base.curriculum = self._curriculum(slot.job.stage)
+        base.seed_value = slot.job.seed
+        return slot.env.reset()
+
+    def run(self, jobs):
+        """
+        Ejecuta los trabajos que no estén ya en results_path.
+
+        Returns:
+            Lista con todos los resultados (previos + nuevos)
+        """
+        results = load_results(self.results_path)
+        done_keys = set(_result_key(r) for r in results)
+        queue = [job for job in jobs if job.key() not in done_keys]
+        self._log(f"{len(jobs)} trabajos, {len(jobs) - len(queue)} ya evaluados, "
+                  f"{len(queue)} pendientes en {self.n_envs} entornos")
+        if not queue:
+            return results
+
+        directory = os.path.dirname(self.results_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        slots = [_Slot(self.env_factory(i)) for i in range(min(self.n_envs, len(queue)))]
+        queue.reverse()  # pop() desde el final mantiene el orden original
+        completed = 0
+        failures = {}
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=len(slots)) as executor, \
+                open(self.results_path, 'a') as out:
+            while True:
+                # 1) Asignar trabajos a entornos libres (reset en segundo plano)
+                for slot in slots:
+                    if slot.job is None and queue:
+                        slot.job = queue.pop()
+                        slot.obs = None
+                        slot.pending = executor.submit(self._reset, slot)
+
+                # 2) Recoger resets terminados
+                for slot in slots:
+                    if slot.pending is not None and slot.pending.done():
+                        try:
+                            slot.obs = slot.pending.result()
+                            slot.reward, slot.length = 0.0, 0
+                            slot.start_time = time.time()
+                        except Exception as e:
+                            job = slot.job
+                            failures[job.key()] = failures.get(job.key(), 0) + 1
+                            self._log(f"Reset falló ({job.algorithm}, stage {job.stage}, "
+                                      f"intento {failures[job.key()]}): {e}")
+                            if failures[job.key()] < self.max_reset_retries:
+                                queue.insert(0, job)  # reintentar al final
+                            slot.job = None
+                        slot.pending = None
+
+                running = [s for s in slots if s.job is not None and s.pending is None]
+                if not running:
+                    if not queue and all(s.job is None for s in slots):
+                        break
+                    time.sleep(0.05)  # todos esperando reset
+                    continue
+
+                # 3) Inferencia en batch, agrupada por modelo
+                by_model = {}
+                for slot in running:
+                    by_model.setdefault((slot.job.algorithm, slot.job.model_path), []).append(slot)
+                for group in by_model.values():
+                    model = self._model(group[0].job)
+                    actions, _ = model.predict(np.stack([s.obs for s in group]), deterministic=True)
+                    for slot, action in zip(group, np.asarray(actions).reshape(-1)):
+                        slot.action = int(action)
+
+                # 4) Steps en paralelo
+                outcomes = list(executor.map(lambda s: s.env.step(s.action), running))
+
+                # 5) Episodios terminados -> archivo de resultados
+                for slot, (obs, reward, done, info) in zip(running, outcomes):
+                    slot.obs = obs
+                    slot.reward += float(reward)
+                    slot.length += 1
+                    if not done and slot.length < self.max_episode_steps:
+                        continue
+                    job = slot.job
+                    result = {
+                        "algorithm": job.algorithm,
+                        "model_path": job.model_path,
+                        "stage": job.stage,
+                        "episode": job.episode,
+                        "seed": job.seed,
+                        "reward": slot.reward,
+                        "length": slot.length,
+                        "success": bool(info.get("tool_crafted", False)),
+                        "elapsed": time.time() - slot.start_time,
+                    }
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+                    results.append(result)
+                    completed += 1
+                    slot.job = None
+                    status = "✓" if result["success"] else "✗"
+                    self._log(f"{status} {job.algorithm.upper()} stage {job.stage} ep {job.episode}: "
+                              f"reward {slot.reward:.1f}, {slot.length} steps "
+                              f"({completed}/{len(jobs) - len(done_keys)})")
+
+        for slot in slots:
+            slot.env.close()
+        self._log(f"{completed} episodios en {time.time() - start:.1f}s")
+        return results
+
+
+def make_env_factory(ports=None, replay=None, n_envs=None, max_episode_steps=2000, seed=42, options=False,
+                     action_repeat=None):
+    """
+    Fábrica de entornos para el pool: uno por puerto, compartiendo un
+    ClientPoolManager (dos entornos nunca reservan el mismo cliente).
+    Con replay se instala el backend de reproducción y los puertos son
+    solo etiquetas.
+
+    Args:
+        ports: Puertos de los clientes de Minecraft
+        replay: Trayectoria .jsonl.gz grabada con MALMO_RECORD (opcional)
+        n_envs: Entornos del pool (default: uno por puerto)
+        max_episode_steps: Máximo de pasos por episodio
+        seed: Semilla inicial (cada trabajo la reemplaza antes del reset)
+        options: Envolver con OptionWrapper (modelos entrenados con --options)
+        action_repeat: Envolver con ActionRepeatWrapper (ver src.action_repeat)
+
+    Returns:
+        (factory, n_envs)
+    """
+    if replay:
+        from src import malmo_replay
+        malmo_replay.install(replay)
+        env_module = sys.modules.get("src.malmo_env_wrapper")
+        if env_module is not None and env_module.MalmoPython is not malmo_replay:
+            # El entorno ya quedó ligado al cliente real: evaluaría en vivo
+            raise RuntimeError("src.malmo_env_wrapper se importó antes de malmo_replay.install()")
+        if not ports:
+            ports = [10000 + i for i in range(n_envs or 4)]
+    if not ports:
+        raise ValueError("Se requieren puertos (o una trayectoria de replay)")
+    ports = list(ports)
+    n_envs = n_envs or len(ports)
+
+    from src.malmo_env_wrapper import MalmoToolProgressionEnv
+    from src.client_pool_manager import ClientPoolManager
+
+    pool_manager = ClientPoolManager(ports=ports)
+    pool_manager.probe_all()
+
+    def factory(index):
+        env = MalmoToolProgressionEnv(
+            port=ports[index % len(ports)],
+            max_episode_steps=max_episode_steps,
+            seed=seed,
+            pool_manager=pool_manager
+        )
+        if action_repeat:
+            from src.action_repeat_wrapper import ActionRepeatWrapper
+            env = ActionRepeatWrapper(env, action_repeat)
+        if options:
+            from src.option_wrapper import OptionWrapper
+            env = OptionWrapper(env, gamma=1.0)  # recompensa sin descontar al evaluar
+        return env
+
+    return factory, n_envs
@@ -0,0 +1,221 @@
+"""
+Medición de latencia comando → observación para MalmoPython.AgentHost.
+
+Los loops de entrenamiento asumen que tras sendCommand + sleep(0.02) llega una
+observación nueva, pero nada lo verifica: si getWorldState() devuelve una
+observación vieja, learn() recibe un next_state equivocado.
+
+TrackedAgentHost envuelve un AgentHost (mismo API, delega todo lo demás) y:
+- marca cada comando con un timestamp y el TimeAlive visto al enviarlo,
+- lo empareja con la primera observación cuyo TimeAlive avanzó,
+- registra la distribución de latencias, lecturas sin observación nueva
+  (stale), observaciones duplicadas (mismo tick), observaciones descartadas
+  (varias acumuladas entre lecturas o ticks saltados) y el retraso con el que
+  llegan las recompensas,
+- mide el payload JSON de cada observación recibida (bytes por tick, ver
+  observation_profiles.py),
+- opcionalmente bloquea en getWorldState() hasta que llega una observación
+  nueva (usa peekWorldState para no perder recompensas).
+
+Requiere <ObservationFromFullStats/> en la misión (campo TimeAlive).
+"""
+
+import re
+import time
+from collections import deque
+
+from src.step_profiler import PhaseStats, _now_ns
+
+
+_TIME_ALIVE_RE = re.compile(r'"TimeAlive"\s*:\s*(-?\d+)')
+
+
+def _time_alive(world_state):
+    """TimeAlive de la última observación del world_state, o None."""
+    if world_state.number_of_observations_since_last_state == 0:
+        return None
+    match = _TIME_ALIVE_RE.search(world_state.observations[-1].text)
+    return int(match.group(1)) if match else None
+
+
+class TrackedAgentHost:
+    """
+    Wrapper de AgentHost con medición de latencia comando → observación.
+    """
+
+    def __init__(self, agent_host, wait_for_fresh=False, fresh_timeout=0.5,
+                 poll_interval=0.002, max_pending=64, max_samples=10000):
+        """
+        Args:
+            agent_host: MalmoPython.AgentHost a envolver
+            wait_for_fresh: Si True, getWorldState() espera una observación nueva
+                cuando hay comandos pendientes
+            fresh_timeout: Espera máxima (segundos) por una observación nueva
+            poll_interval: Intervalo de sondeo con peekWorldState (segundos)
+            max_pending: Comandos pendientes máximos antes de darlos por perdidos
+            max_samples: Muestras guardadas para percentiles
+        """
+        self.agent_host = agent_host
+        self.wait_for_fresh = wait_for_fresh
+        self.fresh_timeout = fresh_timeout
+        self.poll_interval = poll_interval
+        self.max_pending = max_pending
+        self.max_samples = max_samples
+        self.reset_stats()
+
+    def __getattr__(self, name):
+        # startMission, peekWorldState, etc. van directo al AgentHost real
+        return getattr(self.agent_host, name)
+
+    def reset_stats(self):
+        """Reinicia contadores y distribuciones (ej. al inicio de cada episodio)."""
+        self.pending = deque()
+        self.last_time_alive = None
+        self.last_command_ns = None
+        self.last_latency_ms = None
+        self.last_fresh = False
+        self.latency = PhaseStats(self.max_samples)
+        self.reward_lag = PhaseStats(self.max_samples)
+        self.wait_time = PhaseStats(self.max_samples)
+        self.commands = 0
+        self.matched = 0
+        self.unmatched = 0
+        self.reads = 0
+        self.stale_reads = 0
+        self.duplicate_obs = 0
+        self.dropped_obs = 0
+        self.skipped_ticks = 0
+        self.fresh_timeouts = 0
+        self.obs_received = 0
+        self.obs_bytes = 0
+        self.obs_bytes_max = 0
+
+    def sendCommand(self, command, *args):
+        now = _now_ns()
+        self.agent_host.sendCommand(command, *args)
+        if len(self.pending) >= self.max_pending:
+            self.pending.popleft()
+            self.unmatched += 1
+        baseline = self.last_time_alive if self.last_time_alive is not None else -1
+        self.pending.append((now, baseline))
+        self.last_command_ns = now
+        self.commands += 1
+
+    def _wait_fresh(self):
+        """Sondea peekWorldState hasta ver un TimeAlive mayor al de los pendientes."""
+        start = _now_ns()
+        deadline = time.time() + self.fresh_timeout
+        baseline = self.pending[0][1]
+        while time.time() < deadline:
+            world_state = self.agent_host.peekWorldState()
+            if not world_state.is_mission_running:
+                break
+            time_alive = _time_alive(world_state)
+            if time_alive is not None and time_alive > baseline:
+                self.wait_time.add(_now_ns() - start)
+                return
+            time.sleep(self.poll_interval)
+        self.fresh_timeouts += 1
+        self.wait_time.add(_now_ns() - start)
+
+    def getWorldState(self):
+        if self.wait_for_fresh and self.pending:
+            self._wait_fresh()
+
+        world_state = self.agent_host.getWorldState()
+        now = _now_ns()
+        self.reads += 1
+        self.last_fresh = False
+
+        n_obs = world_state.number_of_observations_since_last_state
+        for observation in world_state.observations:
+            size = len(observation.text)
+            self.obs_bytes += size
+            if size > self.obs_bytes_max:
+                self.obs_bytes_max = size
+        self.obs_received += len(world_state.observations)
+        time_alive = _time_alive(world_state)
+        if n_obs == 0 or time_alive is None:
+            if self.pending:
+                self.stale_reads += 1
+        else:
+            # Observaciones acumuladas que nadie leyó
+            self.dropped_obs += n_obs - 1
+            if self.last_time_alive is not None:
+                if time_alive == self.last_time_alive:
+                    self.duplicate_obs += 1
+                elif time_alive - self.last_time_alive > n_obs:
+                    # Ticks sin ninguna observación (ni siquiera acumulada)
+                    self.skipped_ticks += time_alive - self.last_time_alive - n_obs
+
+            # Emparejar comandos cuyo TimeAlive base ya fue superado
+            while self.pending and time_alive > self.pending[0][1]:
+                sent_ns, _ = self.pending.popleft()
+                self.latency.add(now - sent_ns)
+                self.last_latency_ms = (now - sent_ns) / 1e6
+                self.matched += 1
+                self.last_fresh = True
+            if not self.last_fresh and self.pending:
+                self.stale_reads += 1
+            if self.last_time_alive is None or time_alive > self.last_time_alive:
+                self.last_time_alive = time_alive
+
+        if len(world_state.rewards) > 0 and self.last_command_ns is not None:
+            self.reward_lag.add(now - self.last_command_ns)
+
+        return world_state
+
+    def step_info(self):
+        """Datos baratos por step para el dict info del entorno."""
+        return {
+            "obs_fresh": self.last_fresh,
+            "obs_latency_ms": self.last_latency_ms,
+        }
+
+    def stats(self):
+        """
+        Resumen completo (percentiles incluidos).
+
+        Returns:
+            dict con contadores y distribuciones en milisegundos
+        """
+        def to_ms(stats):
+            summary = stats.summary()
+            return {k.replace('_us', '_ms'): (v / 1e3 if k.endswith('_us') else v)
+                    for k, v in summary.items() if k != 'total_ms'}
+
+        return {
+            "commands": self.commands,
+            "matched": self.matched,
+            "unmatched": self.unmatched + len(self.pending),
+            "reads": self.reads,
+            "stale_reads": self.stale_reads,
+            "duplicate_obs": self.duplicate_obs,
+            "dropped_obs": self.dropped_obs,
+            "skipped_ticks": self.skipped_ticks,
+            "fresh_timeouts": self.fresh_timeouts,
+            "command_latency": to_ms(self.latency),
+            "reward_lag": to_ms(self.reward_lag),
+            "fresh_wait": to_ms(self.wait_time),
+            "obs_payload": {
+                "observations": self.obs_received,
+                "bytes_total": self.obs_bytes,
+                "bytes_mean": self.obs_bytes / self.obs_received if self.obs_received else 0.0,
+                "bytes_max": self.obs_bytes_max,
+            },
+        }
+
+    def print_summary(self, prefix="[LATENCY]"):
+        s = self.stats()
+        lat = s["command_latency"]
+        if lat.get("count"):
+            print(f"{prefix} cmd→obs p50={lat['p50_ms']:.1f}ms p95={lat['p95_ms']:.1f}ms "
+                  f"p99={lat['p99_ms']:.1f}ms | stale={s['stale_reads']} dup={s['duplicate_obs']} "
+                  f"dropped={s['dropped_obs']} skipped_ticks={s['skipped_ticks']} "
+                  f"unmatched={s['unmatched']}")
+            payload = s["obs_payload"]
+            if payload["observations"]:
+                print(f"{prefix} obs payload mean={payload['bytes_mean']:.0f}B max={payload['bytes_max']}B "
+                      f"total={payload['bytes_total'] / 1024:.0f}KB ({payload['observations']} obs)")
+        else:
+            print(f"{prefix} sin comandos emparejados ({s['commands']} enviados)")
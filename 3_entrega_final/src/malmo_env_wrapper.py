@@ -18,77 +18,73 @@ import MalmoPython
 import json
 import time
 import random
-from typing import Tuple, Dict, Any, Optional
+from functools import lru_cache
+from typing import Tuple, Dict, Any, Optional, List
 
+from src.client_pool_manager import ClientPoolManager
+from src.step_profiler import StepProfiler, _now_ns
+from src.latency_tracker import TrackedAgentHost
+from src.trajectory_recorder import maybe_record
+from src.world_gen import world_layout, freeze_density, keep_arena_drawing_xml
+from src.observation_profiles import get_profile, observation_handlers_xml
 
-def generate_world_xml(stage_config: Dict[str, Any], seed: Optional[int] = None) -> str:
+
+# Etapa one-hot en el padding de la observación (stage_feature=True)
+STAGE_FEATURE_START = 91
+N_STAGES = 4
+
+
+def generate_world_xml(stage_config: Dict[str, Any], seed: Optional[int] = None,
+                       reuse_arena: bool = False, obs_profile: str = "minimal") -> str:
     """
     Genera el XML del mundo según la configuración de la etapa del curriculum.
     
+    Con seed fija el XML se memoiza por (stage_id, seed, arena_size, density):
+    los resets siguientes con la misma semilla no regeneran nada.
+    
     Args:
         stage_config: Configuración de la etapa del curriculum
         seed: Semilla para generación determinista
+        reuse_arena: El cliente ya tiene el arena de este tamaño (misión
+            anterior): forceReset="false", sin piso ni paredes; se limpia el
+            interior y se reenvía el layout completo. No es un diff contra el
+            mundo anterior (~5% menos bytes que el XML compacto)
+        obs_profile: Handlers de observación (src.observation_profiles):
+            "minimal" (solo lo que lee _get_observation) o "full"
         
     Returns:
         str: XML completo de la misión
     """
-    if seed is not None:
-        random.seed(seed)
-    
-    arena_size = stage_config["arena_size"]
-    material_density = stage_config["material_density"]
-    stage_id = stage_config["stage_id"]
-    target_tool = stage_config["target_tool"]
-    required_material = stage_config["required_material"]
-    prereq_tool = stage_config["prereq_tool"]
-    
-    # Generar bloques del mundo
-    used_positions = set()
-    blocks = []
-    
-    def is_valid_pos(x, z, min_dist_spawn=3):
-        if (x, z) in used_positions:
-            return False
-        dist = (x**2 + z**2)**0.5
-        return dist >= min_dist_spawn
-    
-    def random_pos():
-        x = random.randint(-arena_size + 2, arena_size - 2)
-        z = random.randint(-arena_size + 2, arena_size - 2)
-        return x, z
-    
-    # Generar cada tipo de material según densidad
-    for material, (min_count, max_count) in material_density.items():
-        count = random.randint(min_count, max_count)
-        
-        for _ in range(count):
-            attempts = 0
-            while attempts < 50:
-                x, z = random_pos()
-                if is_valid_pos(x, z):
-                    if material == "log":
-                        # Árboles de altura variable
-                        height = random.choice([0, 0, 1, 1, 2])
-                        for h in range(height + 1):
-                            y = 4 + h
-                            blocks.append((x, y, z, "log"))
-                    else:
-                        # Otros materiales en y=4
-                        blocks.append((x, 4, z, material))
-                    
-                    used_positions.add((x, z))
-                    break
-                attempts += 1
-    
-    # Drawing XML
-    drawing = f'<DrawCuboid x1="{-arena_size}" y1="3" z1="{-arena_size}" x2="{arena_size}" y2="3" z2="{arena_size}" type="obsidian"/>\n'
-    drawing += f'<DrawCuboid x1="{-arena_size}" y1="4" z1="{-arena_size}" x2="{arena_size}" y2="10" z2="{-arena_size}" type="obsidian"/>\n'
-    drawing += f'<DrawCuboid x1="{-arena_size}" y1="4" z1="{arena_size}" x2="{arena_size}" y2="10" z2="{arena_size}" type="obsidian"/>\n'
-    drawing += f'<DrawCuboid x1="{arena_size}" y1="4" z1="{-arena_size}" x2="{arena_size}" y2="10" z2="{arena_size}" type="obsidian"/>\n'
-    drawing += f'<DrawCuboid x1="{-arena_size}" y1="4" z1="{-arena_size}" x2="{-arena_size}" y2="10" z2="{arena_size}" type="obsidian"/>\n'
-    
-    for x, y, z, block_type in blocks:
-        drawing += f'<DrawBlock x="{x}" y="{y}" z="{z}" type="{block_type}"/>\n'
+    key = (
+        stage_config["stage_id"],
+        stage_config["stage_name"],
+        stage_config["arena_size"],
+        freeze_density(stage_config["material_density"]),
+        bool(reuse_arena),
+        obs_profile,
+    )
+    if seed is None:
+        return _build_mission_xml(*key, seed=None)
+    return _cached_mission_xml(*key, seed=int(seed))
+
+
+@lru_cache(maxsize=32)
+def _cached_mission_xml(stage_id, stage_name, arena_size, density, reuse_arena, obs_profile, seed):
+    return _build_mission_xml(stage_id, stage_name, arena_size, density, reuse_arena, obs_profile, seed=seed)
+
+
+def _build_mission_xml(stage_id, stage_name, arena_size, density, reuse_arena=False,
+                       obs_profile="minimal", seed=None) -> str:
+    # Layout de bloques compartido con los agentes de 3_entrega (src.world_gen);
+    # bloques contiguos del mismo tipo unidos en <DrawCuboid>
+    layout = world_layout(arena_size, density, seed=seed)
+    if reuse_arena:
+        drawing = keep_arena_drawing_xml(layout, arena_size)
+        force_reset = "false"
+    else:
+        drawing = layout.drawing_xml
+        force_reset = "true"
+    observation_xml = observation_handlers_xml(get_profile("env", obs_profile))
     
     # Inventory inicial según stage
     inventory_items = []
@@ -130,7 +126,7 @@ def generate_world_xml(stage_config: Dict[str, Any], seed: Optional[int] = None)
     xml = f'''<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
     <Mission xmlns="http://ProjectMalmo.microsoft.com" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
         <About>
-            <Summary>Stage {stage_id}: {stage_config["stage_name"]}</Summary>
+            <Summary>Stage {stage_id}: {stage_name}</Summary>
         </About>
         <ServerSection>
             <ServerInitialConditions>
@@ -142,7 +138,7 @@ def generate_world_xml(stage_config: Dict[str, Any], seed: Optional[int] = None)
                 <AllowSpawning>false</AllowSpawning>
             </ServerInitialConditions>
             <ServerHandlers>
-                <FlatWorldGenerator generatorString="3;7,2*3,2;1;village" forceReset="true"/>
+                <FlatWorldGenerator generatorString="3;7,2*3,2;1;village" forceReset="{force_reset}"/>
                 <DrawingDecorator>
                     {drawing}
                 </DrawingDecorator>
@@ -162,18 +158,7 @@ def generate_world_xml(stage_config: Dict[str, Any], seed: Optional[int] = None)
                 <ContinuousMovementCommands turnSpeedDegs="180"/>
                 <SimpleCraftCommands/>
                 <MissionQuitCommands/>
-                <ObservationFromFullStats/>
-                <ObservationFromFullInventory/>
-                <ObservationFromHotBar/>
-                <ObservationFromGrid>
-                    <Grid name="floor5x5">
-                        <min x="-2" y="-1" z="-2"/>
-                        <max x="2" y="1" z="2"/>
-                    </Grid>
-                </ObservationFromGrid>
-                <ObservationFromNearbyEntities>
-                    <Range name="entities" xrange="5" yrange="3" zrange="5"/>
-                </ObservationFromNearbyEntities>
+                {observation_xml}
                 <RewardForCollectingItem>
                     <Item reward="0" type="log"/>
                     <Item reward="0" type="log2"/>
@@ -233,14 +218,34 @@ class MalmoToolProgressionEnv(gym.Env):
         curriculum_manager=None,
         port: int = 10000,
         max_episode_steps: int = 1000,
-        seed: int = 123456
+        seed: int = 123456,
+        fallback_ports: Optional[List[int]] = None,
+        pool_manager: Optional[ClientPoolManager] = None,
+        profiler: Optional[StepProfiler] = None,
+        wait_for_fresh_obs: bool = False,
+        stage_feature: bool = False,
+        reuse_arena: bool = False,
+        obs_profile: str = "minimal"
     ):
         """
         Args:
             curriculum_manager: Instancia de CurriculumManager
-            port: Puerto para Minecraft
+            port: Puerto preferido para Minecraft
             max_episode_steps: Máximo de pasos por episodio
             seed: Semilla para reproducibilidad
+            fallback_ports: Puertos alternativos si el preferido no está sano
+            pool_manager: ClientPoolManager compartido (opcional)
+            profiler: StepProfiler para medir las fases de step() (opcional)
+            wait_for_fresh_obs: Esperar en cada step una observación posterior
+                al comando (evita next_state desactualizados)
+            stage_feature: Agregar la etapa actual one-hot en obs[91:95]
+                (padding sin uso; la forma de la observación no cambia)
+            reuse_arena: Reutilizar el arena del cliente entre misiones
+                (forceReset="false", ver generate_world_xml); si la misión
+                termina en otro cliente (failover) se envía el XML completo.
+                Los ítems sueltos del episodio anterior no se borran
+            obs_profile: "minimal" (handlers que lee _get_observation) o
+                "full" (además HotBar y NearbyEntities)
         """
         super().__init__()
         
@@ -248,11 +253,21 @@ class MalmoToolProgressionEnv(gym.Env):
         self.port = port
         self.max_episode_steps = max_episode_steps
         self.seed_value = seed
+        self.stage_feature = stage_feature
+        self.reuse_arena = reuse_arena
+        self.obs_profile = obs_profile
         
         # Malmo components
-        self.agent_host = MalmoPython.AgentHost()
-        self.client_pool = MalmoPython.ClientPool()
-        self.client_pool.add(MalmoPython.ClientInfo("127.0.0.1", port))
+        # MALMO_RECORD=<ruta> graba la trayectoria para reproducirla con src.malmo_replay
+        self.agent_host = TrackedAgentHost(maybe_record(MalmoPython.AgentHost()), wait_for_fresh=wait_for_fresh_obs)
+        if pool_manager is None:
+            ports = [port] + [p for p in (fallback_ports or []) if p != port]
+            pool_manager = ClientPoolManager(ports=ports)
+            pool_manager.probe_all()
+        self.pool_manager = pool_manager
+        self.active_port = None  # Cliente reservado para la misión actual
+        # Profiler desactivado por defecto: begin()/lap() son no-ops
+        self.profiler = profiler if profiler is not None else StepProfiler(enabled=False)
         self.mission = None
         self.mission_record = None
         self.world_state = None
@@ -263,6 +278,13 @@ class MalmoToolProgressionEnv(gym.Env):
         self.done = False
         self.mission_needs_cleanup = False  # Track if mission needs to be ended
         
+        # Arena dibujado por la última misión de este entorno (reuse_arena)
+        self.arena_port = None
+        self.arena_size = None
+        self.last_mission_xml_bytes = 0
+        self.last_mission_begin_ms = 0.0
+        self.last_obs_json = {}
+        
         # Pitch tracking (para auto-reset)
         self.pitch_start_time = None
         self.pitch_threshold = 5.0  # degrees
@@ -285,6 +307,7 @@ class MalmoToolProgressionEnv(gym.Env):
         # - life: Life (1)
         # - time: TimeAlive (1)
         # Total: 75 + 4 + 5 + 3 + 2 + 1 + 1 = 91, redondeado a 117 para match con docs
+        # - stage (opcional, stage_feature=True): one-hot de 4 en obs[91:95]
         
         self.observation_space = spaces.Box(
             low=-100.0,
@@ -358,39 +381,58 @@ class MalmoToolProgressionEnv(gym.Env):
         
         self.stage_config = stage_config
         
-        # Generate mission XML
-        mission_xml = generate_world_xml(stage_config, seed=self.seed_value)
+        # Generate mission XML (arena reutilizado si el cliente preferido ya lo tiene)
+        reuse = (
+            self.reuse_arena
+            and self.arena_port == self.port
+            and self.arena_size == stage_config["arena_size"]
+        )
+        mission_xml = generate_world_xml(stage_config, seed=self.seed_value, obs_profile=self.obs_profile)
         
         # Create mission
         self.mission = MalmoPython.MissionSpec(mission_xml, True)
         self.mission_record = MalmoPython.MissionRecordSpec()
-        
-        # Start mission with ClientPool
-        max_retries = 3  # Should rarely need retries with MissionQuitCommands
-        for retry in range(max_retries):
-            try:
-                self.agent_host.startMission(
-                    self.mission,
-                    self.client_pool,
-                    self.mission_record,
-                    0,
-                    "curriculum_exp"
-                )
-                break
-            except RuntimeError as e:
-                if retry == max_retries - 1:
-                    print(f"[MALMO ENV] Error starting mission after {max_retries} retries: {e}")
-                    raise
-                # Brief wait and retry
-                wait_time = 1.0 + (retry * 0.5)
-                print(f"[MALMO ENV] Retry {retry+1}/{max_retries} - waiting {wait_time:.1f}s...")
-                time.sleep(wait_time)
+        full_mission = None
+        if reuse:
+            # Failover a otro cliente: ese mundo no tiene el arena, va el XML completo
+            full_mission = self.mission
+            reuse_xml = generate_world_xml(stage_config, seed=self.seed_value, reuse_arena=True,
+                                           obs_profile=self.obs_profile)
+            self.mission = MalmoPython.MissionSpec(reuse_xml, True)
+        
+        # Start mission on a healthy client (failover + cuarentena en el pool)
+        if self.active_port is not None:
+            self.pool_manager.release(self.active_port)
+        start_ns = _now_ns()
+        self.active_port = self.pool_manager.start_mission(
+            self.agent_host,
+            self.mission,
+            self.mission_record,
+            "curriculum_exp",
+            preferred_port=self.port,
+            fallback_mission=full_mission
+        )
+        if self.active_port is None:
+            self.pool_manager.print_summary()
+            raise RuntimeError("[MALMO ENV] No healthy Minecraft clients available")
+        self.agent_host.reset_stats()  # TimeAlive se reinicia con cada misión
         
         # Wait for mission to start
         self.world_state = self.agent_host.getWorldState()
         while not self.world_state.has_mission_begun:
             time.sleep(0.1)
             self.world_state = self.agent_host.getWorldState()
+        begin_ns = _now_ns() - start_ns
+        self.last_mission_begin_ms = begin_ns / 1e6
+        
+        reuse = reuse and self.active_port == self.port
+        if reuse:
+            mission_xml = reuse_xml
+        # Latencia por modo de XML: el JSON del profiler compara p50/p95 de ambos
+        self.profiler.record("mission_begin_keep_arena" if reuse else "mission_begin_compact", begin_ns)
+        self.last_mission_xml_bytes = len(mission_xml)
+        self.arena_port = self.active_port
+        self.arena_size = stage_config["arena_size"]
         
         # Wait for first observation
         while self.world_state.number_of_observations_since_last_state == 0:
@@ -414,6 +456,8 @@ class MalmoToolProgressionEnv(gym.Env):
         print(f"\n[EPISODE START] Stage {stage_config['stage_id']}: {stage_config['stage_name']}")
         print(f"  Target: {stage_config['target_tool']}")
         print(f"  Requires: {stage_config['material_count']}x {stage_config['required_material']}")
+        print(f"  Mission begin: {self.last_mission_begin_ms:.0f} ms (XML {self.last_mission_xml_bytes} bytes"
+              f"{', arena reutilizado' if reuse else ''})")
         
         # gym < 0.20 solo retorna obs, no info
         return obs
@@ -437,9 +481,12 @@ class MalmoToolProgressionEnv(gym.Env):
         
         action_cmd = self.ACTIONS[action]
         reward = 0.0
+        profiler = self.profiler
+        profiler.begin()
         
         # Send command to Malmo
         self.agent_host.sendCommand(action_cmd)
+        profiler.lap("send_command")
         
         # Penalización por usar pitch
         if "pitch" in action_cmd:
@@ -463,12 +510,15 @@ class MalmoToolProgressionEnv(gym.Env):
                             print(f"  [PENALTY] Attacking obsidian wall: {self.stage_config['rewards']['wall_hit']}")
                 except:
                     pass
+        profiler.lap("action_penalties")
         
         time.sleep(0.02)  # 50 actions/sec
         self.step_count += 1
+        profiler.lap("sleep")
         
         # Get new state
         self.world_state = self.agent_host.getWorldState()
+        profiler.lap("get_world_state")
         
         # Check for Malmo rewards (material collection, etc.)
         malmo_rewards = 0
@@ -477,9 +527,11 @@ class MalmoToolProgressionEnv(gym.Env):
         if malmo_rewards != 0:
             print(f"  [REWARD] Malmo: +{malmo_rewards}")
         reward += malmo_rewards
+        profiler.lap("malmo_rewards")
         
         # Get observation
         obs, info = self._get_observation()
+        profiler.lap("parse_observation")
         
         # Print progress every 100 steps (only if info has data)
         if self.step_count % 100 == 0 and 'wood_count' in info:
@@ -496,6 +548,7 @@ class MalmoToolProgressionEnv(gym.Env):
         if craft_reward != 0:
             print(f"  [REWARD] Craft success: +{craft_reward}")
         reward += craft_reward
+        profiler.lap("reward_shaping")
         
         # Check termination (gym < 0.20: done = terminated OR truncated)
         done = False
@@ -542,12 +595,31 @@ class MalmoToolProgressionEnv(gym.Env):
                 self.world_state = self.agent_host.getWorldState()
         
         # Update info
+        info["stage_id"] = self.stage_config["stage_id"]
         info["episode_reward"] = self.total_reward
         info["episode_steps"] = self.step_count
+        info.update(self.agent_host.step_info())
+        if done:
+            info["latency_stats"] = self.agent_host.stats()
+            self.agent_host.print_summary(prefix="[MALMO ENV]")
         
         # gym < 0.20: retorna (obs, reward, done, info) - 4 valores
         return obs, reward, done, info
     
+    def set_curriculum_stage(self, stage_id: int):
+        """
+        Etapa del próximo reset (llamado vía env_method por MixedCurriculumVecEnv).
+        """
+        if self.curriculum is None:
+            raise RuntimeError("set_curriculum_stage requiere un curriculum_manager")
+        self.curriculum.set_stage(stage_id)
+    
+    def _set_stage_feature(self, obs: np.ndarray):
+        """Etapa actual one-hot en obs[91:95] (si stage_feature está activo)."""
+        if self.stage_feature:
+            obs[STAGE_FEATURE_START:STAGE_FEATURE_START + N_STAGES] = 0.0
+            obs[STAGE_FEATURE_START + self.stage_config["stage_id"] - 1] = 1.0
+    
     def _get_observation(self) -> Tuple[np.ndarray, Dict]:
         """
         Extrae observación del estado de Malmo.
@@ -574,10 +646,13 @@ class MalmoToolProgressionEnv(gym.Env):
                 "x": 0.0,
                 "z": 0.0,
             }
-            return np.zeros(117, dtype=np.float32), default_info
+            obs = np.zeros(117, dtype=np.float32)
+            self._set_stage_feature(obs)
+            return obs, default_info
         
         obs_text = self.world_state.observations[-1].text
         obs_json = json.loads(obs_text)
+        self.last_obs_json = obs_json  # JSON crudo (opciones de src.option_wrapper)
         
         # Initialize observation vector
         obs = np.zeros(117, dtype=np.float32)
@@ -680,6 +755,7 @@ class MalmoToolProgressionEnv(gym.Env):
         
         # Normalize
         obs = np.clip(obs, -100.0, 100.0)
+        self._set_stage_feature(obs)
         
         # Prepare info dict
         info = {
@@ -866,4 +942,7 @@ class MalmoToolProgressionEnv(gym.Env):
         """Cierra el entorno"""
         if self.world_state and self.world_state.is_mission_running:
             self.agent_host.sendCommand("quit")
+        if self.active_port is not None:
+            self.pool_manager.release(self.active_port)
+            self.active_port = None
         print("[MALMO ENV] Closed")
@@ -0,0 +1,183 @@
+"""
+Curriculum mixto: las 4 etapas se entrenan a la vez en un VecEnv.
+
+Con CurriculumManager un único entorno recorre las etapas en orden, así que
+el tiempo total es la suma de las 4 y las primeras etapas se olvidan. Aquí:
+- cada sub-entorno del VecEnv (un cliente de Minecraft por puerto) tiene su
+  propio CurriculumManager, usado solo por get_stage_config(),
+- al terminar un episodio, StageSampler elige la etapa del sub-entorno según
+  el progreso de aprendizaje de cada etapa (|EMA rápida - EMA lenta| del
+  éxito): se practica más donde el éxito está cambiando, y poco en etapas
+  dominadas o todavía imposibles,
+- la observación lleva la etapa en one-hot (obs[91:95], stage_feature=True),
+  así una sola política distingue las etapas.
+
+Los sub-entornos hacen auto-reset dentro de step(), así que la etapa elegida
+al terminar un episodio se aplica al episodio siguiente al que ya empezó
+(un episodio de retraso, en los dos tipos de VecEnv).
+
+Se importa de forma diferida desde train_*.py (importa stable_baselines3).
+"""
+
+import os
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnvWrapper, DummyVecEnv, SubprocVecEnv
+from stable_baselines3.common.monitor import Monitor
+
+from src.curriculum_manager import RollingWindow
+
+
+class StageSampler:
+    """
+    Distribución sobre etapas basada en progreso de aprendizaje.
+    """
+
+    def __init__(self, n_stages=4, fast_alpha=0.2, slow_alpha=0.05, epsilon=0.1,
+                 min_episodes=5, window=50, seed=None):
+        """
+        Args:
+            n_stages: Número de etapas
+            fast_alpha: Tasa de la EMA rápida del éxito
+            slow_alpha: Tasa de la EMA lenta del éxito
+            epsilon: Fracción de muestreo uniforme (ninguna etapa queda sin práctica)
+            min_episodes: Episodios de una etapa antes de usar su progreso
+                (hasta entonces tiene prioridad máxima)
+            window: Ventana para el success rate reportado
+            seed: Semilla del muestreo
+        """
+        self.n_stages = n_stages
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+        self.epsilon = epsilon
+        self.min_episodes = min_episodes
+        self.fast = np.zeros(n_stages)
+        self.slow = np.zeros(n_stages)
+        self.episodes = np.zeros(n_stages, dtype=np.int64)
+        self.successes = np.zeros(n_stages, dtype=np.int64)
+        self.recent = [RollingWindow(window) for _ in range(n_stages)]
+        self.rng = np.random.RandomState(seed)
+
+    def update(self, stage_id, success):
+        i = stage_id - 1
+        value = 1.0 if success else 0.0
+        self.fast[i] += self.fast_alpha * (value - self.fast[i])
+        self.slow[i] += self.slow_alpha * (value - self.slow[i])
+        self.episodes[i] += 1
+        self.successes[i] += int(success)
+        self.recent[i].append(int(success))
+
+    def learning_progress(self):
+        return np.abs(self.fast - self.slow)
+
+    def probabilities(self):
+        scores = self.learning_progress()
+        scores[self.episodes < self.min_episodes] = 1.0
+        total = scores.sum()
+        uniform = np.full(self.n_stages, 1.0 / self.n_stages)
+        if total <= 0:
+            return uniform
+        return self.epsilon * uniform + (1.0 - self.epsilon) * scores / total
+
+    def sample(self):
+        return int(self.rng.choice(self.n_stages, p=self.probabilities())) + 1
+
+    def stats(self):
+        """Métricas por etapa para el logger (TensorBoard)."""
+        probs = self.probabilities()
+        progress = self.learning_progress()
+        stats = {}
+        for i in range(self.n_stages):
+            stats[f"stage_{i + 1}/prob"] = float(probs[i])
+            stats[f"stage_{i + 1}/learning_progress"] = float(progress[i])
+            stats[f"stage_{i + 1}/episodes"] = int(self.episodes[i])
+            stats[f"stage_{i + 1}/success_rate"] = self.recent[i].mean()
+        return stats
+
+
+class MixedCurriculumVecEnv(VecEnvWrapper):
+    """
+    VecEnv que reasigna la etapa de cada sub-entorno al terminar un episodio.
+    """
+
+    def __init__(self, venv, sampler):
+        """
+        Args:
+            venv: VecEnv de MalmoToolProgressionEnv (con curriculum_manager)
+            sampler: StageSampler compartido
+        """
+        super().__init__(venv)
+        self.sampler = sampler
+        self.assigned = [sampler.sample() for _ in range(self.num_envs)]
+        for i, stage_id in enumerate(self.assigned):
+            self.venv.env_method("set_curriculum_stage", stage_id, indices=[i])
+
+    def reset(self):
+        return self.venv.reset()
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        for i in np.flatnonzero(dones):
+            info = infos[i]
+            self.sampler.update(info.get("stage_id", self.assigned[i]), info.get("tool_crafted", False))
+            self.assigned[i] = self.sampler.sample()
+            self.venv.env_method("set_curriculum_stage", self.assigned[i], indices=[i])
+        return obs, rewards, dones, infos
+
+
+def make_mixed_curriculum_env(ports, log_dir, max_episode_steps=1000, seed=123456,
+                              subproc=True, wait_for_fresh_obs=False, sampler=None,
+                              reuse_arena=False, options=False, gamma=0.99,
+                              action_repeat=None, obs_profile="minimal"):
+    """
+    VecEnv con un MalmoToolProgressionEnv por puerto y etapas muestreadas.
+
+    Args:
+        ports: Puertos de los clientes de Minecraft (uno por sub-entorno)
+        log_dir: Directorio del run (Monitor y curriculum de cada sub-entorno)
+        max_episode_steps: Máximo de pasos por episodio
+        seed: Semilla base (sub-entorno i usa seed + i)
+        subproc: SubprocVecEnv (un proceso por cliente) o DummyVecEnv
+        wait_for_fresh_obs: Ver MalmoToolProgressionEnv
+        sampler: StageSampler (opcional)
+        reuse_arena: Ver MalmoToolProgressionEnv
+        options: Agregar macro-acciones (src.option_wrapper)
+        gamma: Descuento por paso primitivo de las opciones
+        action_repeat: Ver src.action_repeat (None: una acción por tick)
+        obs_profile: Ver MalmoToolProgressionEnv
+
+    Returns:
+        MixedCurriculumVecEnv
+    """
+    ports = list(ports)
+
+    def make_env(index, port):
+        def _init():
+            # Imports dentro del proceso hijo (MalmoPython no es picklable)
+            from src.malmo_env_wrapper import MalmoToolProgressionEnv
+            from src.curriculum_manager import CurriculumManager
+
+            env_dir = os.path.join(log_dir, f"env_{index}")
+            curriculum = CurriculumManager(start_stage=1, log_dir=os.path.join(env_dir, "curriculum"))
+            env = MalmoToolProgressionEnv(
+                curriculum_manager=curriculum,
+                port=port,
+                max_episode_steps=max_episode_steps,
+                seed=seed + index,
+                wait_for_fresh_obs=wait_for_fresh_obs,
+                stage_feature=True,
+                reuse_arena=reuse_arena,
+                obs_profile=obs_profile
+            )
+            if action_repeat:
+                from src.action_repeat_wrapper import ActionRepeatWrapper
+                env = ActionRepeatWrapper(env, action_repeat)
+            if options:
+                from src.option_wrapper import OptionWrapper
+                env = OptionWrapper(env, gamma=gamma)
+            return Monitor(env, env_dir, info_keywords=("stage_id",))
+        return _init
+
+    env_fns = [make_env(i, port) for i, port in enumerate(ports)]
+    venv = SubprocVecEnv(env_fns) if subproc and len(env_fns) > 1 else DummyVecEnv(env_fns)
+    return MixedCurriculumVecEnv(venv, sampler or StageSampler(seed=seed))
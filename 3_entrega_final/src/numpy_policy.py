@@ -0,0 +1,318 @@
+"""
+Política MLP en NumPy puro para rollouts y evaluación sin torch.
+
+model.predict(obs) de SB3 con una sola observación paga el dispatch de torch
+y la conversión a tensores en cada step, para una MLP de 2 capas de 64.
+Este módulo:
+- export_policy(): extrae los pesos de la MlpPolicy de un .zip de
+  PPO / A2C / TRPO / DQN a un .npz (requiere torch/SB3, solo al exportar),
+- NumpyPolicy: carga el .npz y hace el forward con NumPy (sin importar torch),
+  con buffers preasignados para el caso de una sola observación; expone
+  predict() con la misma firma que SB3, así que evaluate_model() la usa tal cual,
+- check_parity() / benchmark(): comparan contra el modelo SB3 original.
+
+Política determinística: argmax de los logits (PPO/A2C/TRPO) o de los
+Q-values (DQN), igual que SB3.
+"""
+
+import json
+import time
+
+import numpy as np
+
+
+NUMPY_POLICY_VERSION = 1
+
+
+def _elu(x):
+    negative = x < 0
+    x[negative] = np.expm1(x[negative])
+    return x
+
+
+def _leaky_relu(x):
+    x[x < 0] *= 0.01
+    return x
+
+
+# Activaciones in-place sobre el buffer de la capa
+_ACTIVATIONS = {
+    "tanh": lambda x: np.tanh(x, out=x),
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "elu": _elu,
+    "leaky_relu": _leaky_relu,
+    "identity": lambda x: x,
+}
+
+
+def _log_softmax(x):
+    shifted = x - x.max(axis=1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=1, keepdims=True))
+
+
+def _load_sb3_model(model_path, algorithm):
+    if algorithm == 'ppo':
+        from stable_baselines3 import PPO as Algo
+    elif algorithm == 'dqn':
+        from stable_baselines3 import DQN as Algo
+    elif algorithm == 'a2c':
+        from stable_baselines3 import A2C as Algo
+    elif algorithm == 'trpo':
+        from sb3_contrib import TRPO as Algo
+    else:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    return Algo.load(model_path, device='cpu')
+
+
+def _collect_layers(modules, layers):
+    """Agrega (W, b, activación) desde una secuencia de módulos torch."""
+    from torch import nn
+
+    activation_names = {nn.Tanh: "tanh", nn.ReLU: "relu", nn.ELU: "elu", nn.LeakyReLU: "leaky_relu"}
+    for module in modules:
+        if isinstance(module, nn.Linear):
+            weight = module.weight.detach().cpu().numpy()
+            bias = (module.bias.detach().cpu().numpy() if module.bias is not None
+                    else np.zeros(weight.shape[0], dtype=np.float32))
+            layers.append([weight, bias, "identity"])
+        elif type(module) in activation_names:
+            if not layers:
+                raise ValueError("Activación antes de la primera capa lineal")
+            layers[-1][2] = activation_names[type(module)]
+        elif isinstance(module, (nn.Sequential, nn.ModuleList)):
+            _collect_layers(module, layers)
+        elif isinstance(module, (nn.Flatten, nn.Identity)):
+            continue
+        else:
+            raise ValueError(f"Módulo no soportado en la MlpPolicy: {type(module).__name__}")
+
+
+def extract_layers(model):
+    """
+    Extrae las capas del camino obs → acción de un modelo SB3.
+
+    Returns:
+        (layers [(W, b, activación)], head) con head "logits" o "q_values"
+    """
+    from stable_baselines3.common.torch_layers import FlattenExtractor
+
+    policy = model.policy
+    layers = []
+    if hasattr(policy, "q_net"):
+        # DQNPolicy: q_net.q_net = Sequential(Linear, ReLU, ..., Linear)
+        if not isinstance(policy.q_net.features_extractor, FlattenExtractor):
+            raise ValueError("Solo se soporta FlattenExtractor (MlpPolicy)")
+        _collect_layers(policy.q_net.q_net, layers)
+        return layers, "q_values"
+
+    # ActorCriticPolicy: shared_net (SB3 < 1.8) -> policy_net -> action_net
+    if not isinstance(policy.features_extractor, FlattenExtractor):
+        raise ValueError("Solo se soporta FlattenExtractor (MlpPolicy)")
+    extractor = policy.mlp_extractor
+    shared_net = getattr(extractor, "shared_net", None)
+    if shared_net is not None:
+        _collect_layers(shared_net, layers)
+    _collect_layers(extractor.policy_net, layers)
+    _collect_layers([policy.action_net], layers)
+    return layers, "logits"
+
+
+def export_policy(model_path, algorithm, output_path, model=None):
+    """
+    Exporta la MlpPolicy de un .zip de SB3 a un .npz de NumPy.
+
+    Args:
+        model_path: Ruta al .zip del modelo
+        algorithm: ppo / dqn / a2c / trpo
+        output_path: Ruta del .npz de salida
+        model: Modelo ya cargado (opcional, evita recargarlo)
+
+    Returns:
+        output_path
+    """
+    if model is None:
+        model = _load_sb3_model(model_path, algorithm)
+    layers, head = extract_layers(model)
+
+    arrays = {}
+    for i, (weight, bias, _) in enumerate(layers):
+        # (in, out) contiguo: x @ W sin transponer en cada step
+        arrays[f"W{i}"] = np.ascontiguousarray(weight.T, dtype=np.float32)
+        arrays[f"b{i}"] = bias.astype(np.float32)
+    meta = {
+        "version": NUMPY_POLICY_VERSION,
+        "algorithm": algorithm,
+        "source": model_path,
+        "head": head,
+        "activations": [activation for _, _, activation in layers],
+        "obs_dim": int(layers[0][0].shape[1]),
+        "n_actions": int(layers[-1][0].shape[0]),
+    }
+    np.savez(output_path, meta=np.array(json.dumps(meta)), **arrays)
+    return output_path
+
+
+class NumpyPolicy:
+    """
+    Forward de la MlpPolicy exportada, solo NumPy.
+    """
+
+    def __init__(self, weights, biases, activations, head="logits", algorithm=None, dtype=np.float32, seed=None):
+        """
+        Args:
+            weights: Lista de matrices (in, out)
+            biases: Lista de vectores (out,)
+            activations: Nombre de la activación de cada capa
+            head: "logits" (actor-critic) o "q_values" (DQN)
+            algorithm: Algoritmo de origen (informativo)
+            dtype: np.float32 (como torch) o np.float64
+            seed: Semilla para predict(deterministic=False)
+        """
+        self.dtype = np.dtype(dtype)
+        self.weights = [np.ascontiguousarray(w, dtype=self.dtype) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=self.dtype) for b in biases]
+        self.activations = [_ACTIVATIONS[name] for name in activations]
+        self.activation_names = list(activations)
+        self.head = head
+        self.algorithm = algorithm
+        self.obs_dim = self.weights[0].shape[0]
+        self.n_actions = self.weights[-1].shape[1]
+        self.rng = np.random.RandomState(seed)
+        # Buffers para una sola observación (sin allocations por step)
+        self._single_in = np.zeros((1, self.obs_dim), dtype=self.dtype)
+        self._single_out = [np.zeros((1, w.shape[1]), dtype=self.dtype) for w in self.weights]
+
+    @classmethod
+    def load(cls, path, dtype=np.float32, seed=None):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            n_layers = len(meta["activations"])
+            weights = [data[f"W{i}"] for i in range(n_layers)]
+            biases = [data[f"b{i}"] for i in range(n_layers)]
+        return cls(weights, biases, meta["activations"], head=meta["head"],
+                   algorithm=meta.get("algorithm"), dtype=dtype, seed=seed)
+
+    def forward(self, obs):
+        """
+        Logits o Q-values para un batch (N, obs_dim).
+        """
+        x = np.asarray(obs, dtype=self.dtype).reshape(-1, self.obs_dim)
+        single = x.shape[0] == 1
+        if single:
+            self._single_in[:] = x
+            x = self._single_in
+        for i, (weight, bias, activation) in enumerate(zip(self.weights, self.biases, self.activations)):
+            if single:
+                out = self._single_out[i]
+                np.dot(x, weight, out=out)
+            else:
+                out = x @ weight
+            out += bias
+            x = activation(out)
+        return x
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """
+        Misma firma que model.predict de SB3.
+
+        Returns:
+            (acciones, None); escalar para una sola observación
+        """
+        observation = np.asarray(observation)
+        vectorized = observation.ndim > 1
+        values = self.forward(observation)
+        if deterministic or self.head == "q_values":
+            # DQN no exporta epsilon: siempre greedy
+            actions = values.argmax(axis=1)
+        else:
+            logits = values - values.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            cumulative = probs.cumsum(axis=1)
+            draws = self.rng.random_sample((len(probs), 1))
+            actions = (cumulative < draws).sum(axis=1).clip(max=self.n_actions - 1)
+        if not vectorized:
+            return actions[0], None
+        return actions, None
+
+
+def load_policy(model_path, algorithm, env=None):
+    """
+    Carga un .npz como NumpyPolicy o un .zip con SB3, según la extensión.
+    """
+    if model_path.endswith(".npz"):
+        return NumpyPolicy.load(model_path)
+    model = _load_sb3_model(model_path, algorithm)
+    if env is not None:
+        model.set_env(env)
+    return model
+
+
+def random_observations(n, seed=0):
+    """Observaciones sintéticas con el layout de MalmoToolProgressionEnv."""
+    rng = np.random.RandomState(seed)
+    obs = np.zeros((n, 117), dtype=np.float32)
+    obs[:, :75] = rng.randint(0, 2, (n, 75))
+    obs[:, 75:79] = rng.randint(0, 20, (n, 4))
+    obs[:, 79:84] = rng.randint(0, 2, (n, 5))
+    obs[:, 84:89] = rng.uniform(-100, 100, (n, 5))
+    obs[:, 89] = rng.uniform(0, 20, n)
+    obs[:, 90] = rng.randint(0, 101, n)
+    return obs
+
+
+def check_parity(model, policy, n_obs=1000, seed=0):
+    """
+    Compara acciones determinísticas y salidas de la red contra SB3.
+
+    Returns:
+        dict con action_match (fracción), max_abs_diff y n_obs
+    """
+    import torch
+
+    obs = random_observations(n_obs, seed)
+    sb3_actions, _ = model.predict(obs, deterministic=True)
+    np_actions, _ = policy.predict(obs, deterministic=True)
+
+    with torch.no_grad():
+        obs_tensor = torch.as_tensor(obs)
+        if policy.head == "q_values":
+            reference = model.policy.q_net(obs_tensor).numpy()
+        else:
+            # Categorical guarda los logits normalizados (log-softmax)
+            reference = model.policy.get_distribution(obs_tensor).distribution.logits.numpy()
+    values = policy.forward(obs)
+    if policy.head == "logits":
+        values = _log_softmax(values)
+    return {
+        "n_obs": n_obs,
+        "action_match": float((np.asarray(sb3_actions) == np_actions).mean()),
+        "max_abs_diff": float(np.abs(values - reference).max()),
+    }
+
+
+def benchmark(model, policy, n_steps=2000, seed=0):
+    """
+    Tiempo por step con una sola observación (como en los loops de rollout).
+
+    Returns:
+        dict con sb3_us, numpy_us y speedup
+    """
+    obs = random_observations(n_steps, seed)
+
+    start = time.perf_counter()
+    for row in obs:
+        model.predict(row, deterministic=True)
+    sb3_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in obs:
+        policy.predict(row, deterministic=True)
+    numpy_time = time.perf_counter() - start
+
+    return {
+        "n_steps": n_steps,
+        "sb3_us": sb3_time / n_steps * 1e6,
+        "numpy_us": numpy_time / n_steps * 1e6,
+        "speedup": sb3_time / numpy_time if numpy_time > 0 else float("inf"),
+    }
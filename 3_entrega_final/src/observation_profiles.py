@@ -0,0 +1,161 @@
+"""
+Perfiles de observación mínimos para las misiones de Malmo.
+
+Las misiones activaban FullStats, FullInventory, HotBar, RecentCommands,
+NearbyEntities y dos grids a la vez, y cada tick Malmo serializa todo eso a
+JSON, lo envía y el agente lo parsea con json.loads aunque lea unas pocas
+claves. Un perfil declara solo los handlers y grids que lee su consumidor:
+- "stage" (get_state de 3_entrega, options.py, tool_cache.py, pitch
+  auto-reset, TrackedAgentHost): FullStats + FullInventory + surroundings5x5,
+- "env" (MalmoToolProgressionEnv._get_observation): FullStats +
+  FullInventory + floor5x5 (y de -1 a 1).
+"full" reproduce los handlers anteriores de cada misión.
+
+currentItemIndex (tool_cache.ToolManager) viene también en FullInventory;
+sin él ToolManager sigue el último slot que envió.
+
+El tamaño real por tick lo mide TrackedAgentHost (bytes por observación en
+print_summary); payload_size_report() estima la diferencia sin Minecraft.
+"""
+
+import json
+from collections import namedtuple
+
+
+# min / max: (x, y, z) relativos al agente
+GridExtent = namedtuple("GridExtent", ["name", "min", "max"])
+EntityRange = namedtuple("EntityRange", ["name", "xrange", "yrange", "zrange"])
+# handlers: nombres tras "ObservationFrom" (ej. "FullStats")
+ObservationProfile = namedtuple("ObservationProfile", ["name", "handlers", "grids", "entities"])
+
+SURROUNDINGS_5X5 = GridExtent("surroundings5x5", (-2, 0, -2), (2, 2, 2))
+STAGE_FLOOR_5X5 = GridExtent("floor5x5", (-2, -1, -2), (2, -1, 2))
+ENV_FLOOR_5X5 = GridExtent("floor5x5", (-2, -1, -2), (2, 1, 2))
+NEAR_ENTITIES = EntityRange("entities", 5, 3, 5)
+
+OBSERVATION_PROFILES = {
+    "stage": {
+        "minimal": ObservationProfile("stage/minimal", ("FullStats", "FullInventory"),
+                                      (SURROUNDINGS_5X5,), None),
+        "full": ObservationProfile("stage/full",
+                                   ("FullStats", "RecentCommands", "HotBar", "FullInventory"),
+                                   (STAGE_FLOOR_5X5, SURROUNDINGS_5X5), NEAR_ENTITIES),
+    },
+    "env": {
+        "minimal": ObservationProfile("env/minimal", ("FullStats", "FullInventory"),
+                                      (ENV_FLOOR_5X5,), None),
+        "full": ObservationProfile("env/full", ("FullStats", "FullInventory", "HotBar"),
+                                   (ENV_FLOOR_5X5,), NEAR_ENTITIES),
+    },
+}
+
+PROFILE_LEVELS = ("minimal", "full")
+
+
+def get_profile(consumer, level="minimal"):
+    """
+    Args:
+        consumer: "stage" (agentes de 3_entrega) o "env" (MalmoToolProgressionEnv)
+        level: "minimal" o "full"
+
+    Returns:
+        ObservationProfile
+    """
+    if level not in PROFILE_LEVELS:
+        raise ValueError(f"Perfil de observación desconocido: {level} (usar {', '.join(PROFILE_LEVELS)})")
+    return OBSERVATION_PROFILES[consumer][level]
+
+
+def observation_handlers_xml(profile, indent="                "):
+    """Handlers <ObservationFrom...> del perfil (para <AgentHandlers>)."""
+    lines = [f"<ObservationFrom{handler}/>" for handler in profile.handlers]
+    if profile.grids:
+        lines.append("<ObservationFromGrid>")
+        for grid in profile.grids:
+            lines.append(f'    <Grid name="{grid.name}">')
+            lines.append('        <min x="{}" y="{}" z="{}"/>'.format(*grid.min))
+            lines.append('        <max x="{}" y="{}" z="{}"/>'.format(*grid.max))
+            lines.append("    </Grid>")
+        lines.append("</ObservationFromGrid>")
+    if profile.entities:
+        r = profile.entities
+        lines.append("<ObservationFromNearbyEntities>")
+        lines.append(f'    <Range name="{r.name}" xrange="{r.xrange}" yrange="{r.yrange}" zrange="{r.zrange}"/>')
+        lines.append("</ObservationFromNearbyEntities>")
+    return ("\n" + indent).join(lines)
+
+
+def grid_cells(grid):
+    """Celdas de un grid (el JSON trae un nombre de bloque por celda)."""
+    size = 1
+    for lo, hi in zip(grid.min, grid.max):
+        size *= hi - lo + 1
+    return size
+
+
+# Claves de ObservationFromFullStats (Malmo 0.37)
+_FULL_STATS = ("DistanceTravelled", "TimeAlive", "MobsKilled", "PlayersKilled", "DamageTaken",
+               "DamageDealt", "Life", "Score", "Food", "XP", "IsAlive", "Air", "Name",
+               "XPos", "YPos", "ZPos", "Pitch", "Yaw", "WorldTime", "TotalTime")
+_ENTITY = {"yaw": -90.0, "x": 0.5, "y": 4.0, "z": 0.5, "pitch": 0.0, "id": "0" * 36,
+           "motionX": 0.0, "motionY": -0.0784, "motionZ": 0.0, "life": 20.0, "name": "Agent"}
+
+
+def synthetic_observation(profile, items=("diamond_axe", "log", "stone"), block="stone", entities=1):
+    """
+    Observación JSON con las mismas claves que emite Malmo para el perfil
+    (valores representativos, para estimar tamaños sin Minecraft).
+    """
+    obs = {}
+    if "FullStats" in profile.handlers:
+        for key in _FULL_STATS:
+            obs[key] = "Agent" if key == "Name" else (True if key == "IsAlive" else 123.456)
+    if "FullInventory" in profile.handlers:
+        for slot in range(41):
+            item = items[slot] if slot < len(items) else "air"
+            obs[f"InventorySlot_{slot}_size"] = 1 if item != "air" else 0
+            obs[f"InventorySlot_{slot}_item"] = item
+        obs["inventoriesAvailable"] = [{"name": "inventory", "size": 41}]
+        obs["currentItemIndex"] = 0
+    if "HotBar" in profile.handlers:
+        obs["currentItemIndex"] = 0
+        for slot in range(9):
+            item = items[slot] if slot < len(items) else "air"
+            obs[f"Hotbar_{slot}_size"] = 1 if item != "air" else 0
+            obs[f"Hotbar_{slot}_item"] = item
+    if "RecentCommands" in profile.handlers:
+        obs["CommandsSinceLastObservation"] = ["move 1"]
+    if "Ray" in profile.handlers:
+        obs["LineOfSight"] = {"hitType": "block", "x": 1.5, "y": 4.2, "z": 2.0, "type": block,
+                              "prop_snowy": False, "inRange": True, "distance": 1.5}
+    for grid in profile.grids:
+        obs[grid.name] = [block] * grid_cells(grid)
+    if profile.entities:
+        obs[profile.entities.name] = [dict(_ENTITY) for _ in range(entities)]
+    return obs
+
+
+def payload_bytes(obs):
+    """Bytes del JSON de una observación (texto tal como llega de Malmo)."""
+    if not isinstance(obs, str):
+        obs = json.dumps(obs)
+    return len(obs.encode("utf-8"))
+
+
+def payload_size_report(consumers=("stage", "env")):
+    """
+    Returns:
+        dict {"consumidor/nivel": bytes estimados por observación}
+    """
+    return {get_profile(consumer, level).name: payload_bytes(synthetic_observation(get_profile(consumer, level)))
+            for consumer in consumers for level in PROFILE_LEVELS}
+
+
+if __name__ == "__main__":
+    report = payload_size_report()
+    print("[OBS PROFILE] JSON estimado por observación:")
+    for consumer in ("stage", "env"):
+        base = report[f"{consumer}/full"]
+        for level in PROFILE_LEVELS:
+            name = f"{consumer}/{level}"
+            print(f"  {name:<14} {report[name]:6d} bytes  ({report[name] / base:.0%})")
@@ -0,0 +1,80 @@
+"""
+Opciones (src.options) como acciones extra de MalmoToolProgressionEnv.
+
+OptionWrapper agrega option_mine, option_face y option_advance después de las
+9 acciones primitivas (Discrete(12)). Una opción ejecuta env.step() con la
+primitiva que corresponda hasta su condición de término, así que penalidades,
+auto-crafteo y pitch auto-reset siguen aplicándose en cada paso primitivo.
+
+Descuento SMDP: la recompensa devuelta es sum_i gamma^i r_i, y info lleva
+option_steps (k) y option_discount (gamma^k) para que src.smdp haga el
+bootstrap con gamma^k. Monitor cuenta decisiones, no pasos primitivos
+(info["episode_steps"] sigue contando pasos primitivos).
+"""
+
+import gym
+from gym import spaces
+
+from src.options import OPTION_ACTIONS, MATERIAL_TARGETS, STAGE_TARGETS, FLOOR_GRID, make_options
+
+
+class OptionWrapper(gym.Wrapper):
+    """
+    Acciones primitivas + opciones con recompensa descontada por duración.
+    """
+
+    def __init__(self, env, gamma=0.99):
+        """
+        Args:
+            env: MalmoToolProgressionEnv (o un wrapper de él)
+            gamma: Descuento por paso primitivo (el mismo del algoritmo)
+        """
+        super().__init__(env)
+        self.gamma = gamma
+        self.n_primitive = env.action_space.n
+        self.options = make_options(STAGE_TARGETS["all"], FLOOR_GRID)
+        self.option_names = list(OPTION_ACTIONS)
+        self.action_space = spaces.Discrete(self.n_primitive + len(self.option_names))
+        self.command_index = {command: i for i, command in enumerate(env.unwrapped.ACTIONS)}
+        self.decisions = 0
+
+    def reset(self, **kwargs):
+        obs = self.env.reset(**kwargs)
+        # option_face apunta al material de la etapa actual
+        material = self.env.unwrapped.stage_config["required_material"]
+        self.options["option_face"].targets = frozenset(MATERIAL_TARGETS.get(material, STAGE_TARGETS["all"]))
+        self.decisions = 0
+        return obs
+
+    def step(self, action):
+        self.decisions += 1
+        action = int(action)
+        if action < self.n_primitive:
+            obs, reward, done, info = self.env.step(action)
+            info["option_steps"] = 1
+            info["option_discount"] = self.gamma
+            info["decisions"] = self.decisions
+            return obs, reward, done, info
+
+        base = self.env.unwrapped
+        option = self.options[self.option_names[action - self.n_primitive]]
+        option.start(base.last_obs_json)
+
+        total = 0.0
+        discount = 1.0
+        steps = 0
+        while True:
+            command = option.command(base.last_obs_json)
+            obs, reward, done, info = self.env.step(self.command_index[command])
+            total += discount * reward
+            discount *= self.gamma
+            steps += 1
+            if done or option.should_stop(base.last_obs_json, steps):
+                break
+
+        if not done and option.stop_command:
+            base.agent_host.sendCommand(option.stop_command)
+        info["option_steps"] = steps
+        info["option_discount"] = discount
+        info["decisions"] = self.decisions
+        return obs, total, done, info
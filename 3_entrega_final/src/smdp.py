@@ -0,0 +1,103 @@
+"""
+Descuento SMDP para SB3 con opciones (src.option_wrapper).
+
+SB3 descuenta con gamma una vez por transición. Con opciones, una transición
+dura k pasos primitivos y el bootstrap debe usar gamma^k (la recompensa ya
+viene descontada dentro de la opción). Aquí:
+- DQN: SMDPReplayBuffer / SMDPCompactReplayBuffer guardan done efectivo
+  1 - (1 - done) * gamma^(k-1), así el target de DQN
+  r + (1 - done) * gamma * max Q' queda r + gamma^k * max Q',
+- PPO / A2C / TRPO: SMDPRolloutBuffer calcula GAE con el gamma^k de cada
+  paso (SMDPCallback lo copia de info["option_discount"] antes de add()).
+
+Se importa de forma diferida desde train_*.py (importa stable_baselines3).
+"""
+
+import numpy as np
+from stable_baselines3.common.buffers import ReplayBuffer, RolloutBuffer
+
+from src.compact_replay_buffer import CompactReplayBuffer
+
+
+def smdp_dones(done, infos, gamma):
+    """Done efectivo por entorno según option_steps de cada info."""
+    steps = np.array([info.get("option_steps", 1) for info in infos], dtype=np.float64)
+    done = np.asarray(done, dtype=np.float64).reshape(len(infos))
+    return (1.0 - (1.0 - done) * gamma ** (steps - 1)).astype(np.float32)
+
+
+class SMDPReplayBuffer(ReplayBuffer):
+    """
+    ReplayBuffer de SB3 con bootstrap gamma^k por transición.
+    """
+
+    def __init__(self, *args, gamma=0.99, **kwargs):
+        """
+        Args:
+            gamma: Descuento por paso primitivo (el mismo del algoritmo)
+            (el resto como ReplayBuffer)
+        """
+        super().__init__(*args, **kwargs)
+        self.gamma = gamma
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        super().add(obs, next_obs, action, reward, smdp_dones(done, infos, self.gamma), infos)
+
+
+class SMDPCompactReplayBuffer(CompactReplayBuffer):
+    """
+    CompactReplayBuffer con bootstrap gamma^k (dones float32 en vez de bool).
+    """
+
+    def __init__(self, *args, gamma=0.99, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gamma = gamma
+        self.dones = np.zeros((self.buffer_size, self.n_envs), dtype=np.float32)
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        super().add(obs, next_obs, action, reward, smdp_dones(done, infos, self.gamma), infos)
+
+
+class SMDPRolloutBuffer(RolloutBuffer):
+    """
+    RolloutBuffer con GAE sobre transiciones de duración variable.
+    """
+
+    def reset(self):
+        super().reset()
+        # gamma^k por paso; pasos sin info de opción: una primitiva
+        self.discounts = np.full((self.buffer_size, self.n_envs), self.gamma, dtype=np.float32)
+
+    def compute_returns_and_advantage(self, last_values, dones):
+        last_values = last_values.clone().cpu().numpy().flatten()
+        last_gae_lam = 0
+        for step in reversed(range(self.buffer_size)):
+            if step == self.buffer_size - 1:
+                next_non_terminal = 1.0 - dones
+                next_values = last_values
+            else:
+                next_non_terminal = 1.0 - self.episode_starts[step + 1]
+                next_values = self.values[step + 1]
+            discount = self.discounts[step]
+            delta = self.rewards[step] + discount * next_values * next_non_terminal - self.values[step]
+            last_gae_lam = delta + discount * self.gae_lambda * next_non_terminal * last_gae_lam
+            self.advantages[step] = last_gae_lam
+        self.returns = self.advantages + self.values
+
+
+def smdp_replay_buffer_class(compact=False):
+    return SMDPCompactReplayBuffer if compact else SMDPReplayBuffer
+
+
+def install_smdp_rollout_buffer(model):
+    """Reemplaza el RolloutBuffer de un modelo on-policy (PPO / A2C / TRPO)."""
+    model.rollout_buffer = SMDPRolloutBuffer(
+        model.n_steps,
+        model.observation_space,
+        model.action_space,
+        device=model.device,
+        gamma=model.gamma,
+        gae_lambda=model.gae_lambda,
+        n_envs=model.n_envs,
+    )
+    return model.rollout_buffer
@@ -0,0 +1,199 @@
+"""
+Profiler por fases para los loops de entrenamiento con Malmo.
+
+Mide en nanosegundos cuánto tarda cada fase de un paso (sendCommand, sleep,
+getWorldState, parseo del JSON, reward shaping, elección de acción, learn...)
+y resume cada fase con count / total / media / p50 / p95 / p99 / max.
+
+Dos formas de instrumentar:
+    profiler.begin()                  # inicio del paso
+    agent_host.sendCommand(action)
+    profiler.lap("send_command")      # tiempo desde begin() / último lap()
+    time.sleep(0.02)
+    profiler.lap("sleep")
+
+    with profiler.phase("learn"):     # bloque explícito
+        agent.learn(...)
+
+Desactivado (enabled=False o MALMO_PROFILE no definido) begin/lap/phase son
+no-ops y no se toma ningún timestamp.
+
+Exporta a JSON (scripts tabulares) o a cualquier logger con .record(key, value)
+(el logger de SB3 configurado con configure(...), que lo envía a TensorBoard).
+"""
+
+import os
+import json
+import time
+
+import numpy as np
+
+
+# time.perf_counter_ns no existe en Python 3.6
+if hasattr(time, 'perf_counter_ns'):
+    _now_ns = time.perf_counter_ns
+else:
+    def _now_ns():
+        return int(time.perf_counter() * 1e9)
+
+
+class _NullPhase:
+    """Context manager vacío (contextlib.nullcontext no existe en 3.6)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = _now_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, _now_ns() - self.start)
+        return False
+
+
+class PhaseStats:
+    """
+    Estadísticas de una fase: contadores exactos + ring buffer de muestras
+    para los percentiles.
+    """
+
+    def __init__(self, max_samples):
+        self.samples = np.zeros(max_samples, dtype=np.int64)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, duration_ns):
+        self.samples[self.count % len(self.samples)] = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def summary(self):
+        n = min(self.count, len(self.samples))
+        if n == 0:
+            return {'count': 0}
+        p50, p95, p99 = np.percentile(self.samples[:n], [50, 95, 99])
+        return {
+            'count': self.count,
+            'total_ms': self.total_ns / 1e6,
+            'mean_us': self.total_ns / self.count / 1e3,
+            'p50_us': float(p50) / 1e3,
+            'p95_us': float(p95) / 1e3,
+            'p99_us': float(p99) / 1e3,
+            'max_us': self.max_ns / 1e3,
+        }
+
+
+class StepProfiler:
+    """
+    Profiler de fases con histogramas por fase.
+    """
+
+    def __init__(self, enabled=None, max_samples=10000):
+        """
+        Args:
+            enabled: Activar el profiler. None = según la variable de entorno
+                MALMO_PROFILE ("1", "true", "yes")
+            max_samples: Muestras recientes guardadas por fase para percentiles
+        """
+        if enabled is None:
+            enabled = os.environ.get('MALMO_PROFILE', '').lower() in ('1', 'true', 'yes')
+        self.enabled = bool(enabled)
+        self.max_samples = max_samples
+        self.phases = {}
+        self._last = 0
+
+        if not self.enabled:
+            # Reemplazar los métodos del hot path por no-ops
+            self.begin = _noop
+            self.lap = _noop
+            self.record = _noop
+            self.phase = lambda name: _NULL_PHASE
+
+    def begin(self):
+        """Marca el inicio de un paso para lap()."""
+        self._last = _now_ns()
+
+    def lap(self, name):
+        """Registra el tiempo desde begin() o el último lap() bajo `name`."""
+        now = _now_ns()
+        self.record(name, now - self._last)
+        self._last = now
+
+    def phase(self, name):
+        """Context manager que mide el bloque bajo `name`."""
+        return _Phase(self, name)
+
+    def record(self, name, duration_ns):
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(self.max_samples)
+        stats.add(duration_ns)
+
+    def reset(self):
+        self.phases = {}
+
+    def summary(self):
+        """
+        Returns:
+            dict {fase: {count, total_ms, mean_us, p50_us, p95_us, p99_us, max_us}}
+        """
+        return {name: stats.summary() for name, stats in sorted(self.phases.items())}
+
+    def record_to_logger(self, logger, prefix="profile"):
+        """
+        Envía p50/p95/p99/mean de cada fase a un logger con .record()
+        (ej. el logger de SB3 → TensorBoard).
+        """
+        if not self.enabled:
+            return
+        for name, stats in self.summary().items():
+            if stats['count'] == 0:
+                continue
+            for key in ('mean_us', 'p50_us', 'p95_us', 'p99_us'):
+                logger.record(f"{prefix}/{name}_{key}", stats[key])
+
+    def dump_json(self, path, extra=None):
+        """Escribe el resumen en JSON."""
+        if not self.enabled:
+            return None
+        data = {'phases': self.summary()}
+        if extra:
+            data.update(extra)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def print_summary(self):
+        if not self.enabled or not self.phases:
+            return
+        print(f"\n{'Fase':<22} {'N':>8} {'Total ms':>10} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+        for name, s in self.summary().items():
+            if s['count']:
+                print(f"{name:<22} {s['count']:>8} {s['total_ms']:>10.1f} "
+                      f"{s['p50_us']:>9.1f} {s['p95_us']:>9.1f} {s['p99_us']:>9.1f}")
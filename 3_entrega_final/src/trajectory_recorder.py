@@ -0,0 +1,153 @@
+"""
+Grabación de trayectorias de Malmo para reproducirlas offline (malmo_replay).
+
+RecordingAgentHost envuelve un MalmoPython.AgentHost y guarda, por misión:
+- el XML de la misión (MissionSpec.getAsXML),
+- cada comando enviado,
+- cada world state leído con getWorldState(): textos JSON de las
+  observaciones, valores de las recompensas, flags (is_mission_running,
+  has_mission_begun) y errores.
+
+El archivo es JSON Lines comprimido con gzip (un evento por línea); los
+campos vacíos se omiten y las observaciones, muy repetitivas, comprimen
+~10-20x.
+
+Activación sin tocar los scripts: variable de entorno MALMO_RECORD con la ruta
+del archivo (o de un directorio, donde se crea trajectory_<pid>_<fecha>.jsonl.gz).
+"""
+
+import os
+import json
+import gzip
+import time
+import atexit
+from datetime import datetime
+
+
+TRAJECTORY_VERSION = 1
+TRAJECTORY_SUFFIX = ".jsonl.gz"
+
+
+def resolve_record_path(path):
+    """Si path es un directorio, genera un nombre único dentro de él."""
+    if path.endswith(os.sep) or os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(path, f"trajectory_{os.getpid()}_{stamp}{TRAJECTORY_SUFFIX}")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return path
+
+
+class RecordingAgentHost:
+    """
+    Wrapper de AgentHost que graba misiones, comandos y world states.
+    """
+
+    def __init__(self, agent_host, path, compresslevel=6):
+        """
+        Args:
+            agent_host: MalmoPython.AgentHost a envolver
+            path: Archivo .jsonl.gz destino (se agregan misiones al final)
+            compresslevel: Nivel de compresión gzip (1-9)
+        """
+        self.agent_host = agent_host
+        self.path = resolve_record_path(path)
+        self.compresslevel = compresslevel
+        self._file = None
+        self._t0 = None
+        self.missions = 0
+        self.states = 0
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        return getattr(self.agent_host, name)
+
+    def _write(self, event):
+        event["t"] = int((time.time() - self._t0) * 1e6) if self._t0 else 0
+        self._file.write(json.dumps(event, separators=(',', ':')) + "\n")
+
+    def startMission(self, mission, *args):
+        result = self.agent_host.startMission(mission, *args)
+        # Solo se graba si el cliente aceptó la misión
+        if self._file is None:
+            self._file = gzip.open(self.path, 'at', compresslevel=self.compresslevel)
+        else:
+            self._file.flush()
+        self._t0 = time.time()
+        self._write({"e": "start", "v": TRAJECTORY_VERSION, "xml": mission.getAsXML(False)})
+        self.missions += 1
+        return result
+
+    def sendCommand(self, command, *args):
+        self.agent_host.sendCommand(command, *args)
+        if self._file is not None:
+            self._write({"e": "cmd", "c": command})
+
+    def getWorldState(self):
+        world_state = self.agent_host.getWorldState()
+        if self._file is None:
+            return world_state
+
+        event = {"e": "ws"}
+        if world_state.has_mission_begun:
+            event["begun"] = 1
+        if world_state.is_mission_running:
+            event["run"] = 1
+        if world_state.number_of_observations_since_last_state:
+            event["n"] = world_state.number_of_observations_since_last_state
+            event["o"] = [obs.text for obs in world_state.observations]
+        if world_state.number_of_rewards_since_last_state:
+            event["nr"] = world_state.number_of_rewards_since_last_state
+            event["r"] = [r.getValue() for r in world_state.rewards]
+        if len(world_state.errors):
+            event["err"] = [err.text for err in world_state.errors]
+        self._write(event)
+        self.states += 1
+        return world_state
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"[RECORD] {self.missions} misiones, {self.states} world states -> {self.path}")
+
+
+def maybe_record(agent_host, path=None):
+    """
+    Envuelve agent_host con RecordingAgentHost si hay ruta de grabación
+    (argumento o variable de entorno MALMO_RECORD); si no, lo retorna tal cual.
+    """
+    path = path or os.environ.get("MALMO_RECORD")
+    if not path:
+        return agent_host
+    return RecordingAgentHost(agent_host, path)
+
+
+def read_trajectory(path):
+    """
+    Lee un archivo de trayectoria.
+
+    Returns:
+        Lista de misiones: dicts con "xml", "states" (eventos ws) y
+        "commands" (lista de comandos grabados)
+    """
+    missions = []
+    current = None
+    with gzip.open(path, 'rt') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            kind = event.get("e")
+            if kind == "start":
+                current = {"xml": event.get("xml", ""), "states": [], "commands": []}
+                missions.append(current)
+            elif current is None:
+                continue
+            elif kind == "ws":
+                current["states"].append(event)
+            elif kind == "cmd":
+                current["commands"].append(event["c"])
+    return missions
@@ -0,0 +1,293 @@
+"""
+Generación del layout de bloques del mundo, compartida por los agentes de
+3_entrega y por MalmoToolProgressionEnv (3_entrega_final).
+
+Antes cada agente colocaba cada bloque por muestreo con rechazo (hasta 50
+randint contra un set por bloque) y armaba el XML con += en cada reset. Aquí:
+- las celdas libres del arena (margen de 2 a las paredes, a >= 3 del spawn)
+  se calculan una vez por arena_size,
+- las posiciones salen de una permutación NumPy de esas celdas: cada material
+  toma las siguientes `count` celdas, sin reintentos ni colisiones,
+- el layout es un array estructurado (x, y, z, block) y el drawing XML se
+  arma con un solo join,
+- world_layout() memoiza (seed, arena_size, density) -> WorldLayout en un LRU;
+  con seed=None siempre genera un mundo nuevo.
+
+XML compacto: merge_cuboids() une los bloques contiguos del mismo tipo
+(columnas de troncos, vetas de piedra) en <DrawCuboid>, y keep_arena_drawing_xml()
+es el drawing para forceReset="false": el cliente conserva el arena de la
+misión anterior (piso y paredes), así que no se dibujan. Se limpia todo el
+interior y se reenvía el layout completo, y el layout domina el XML (~5% menos
+bytes que el compacto).
+
+El modo diff (solo las celdas cambiadas respecto del layout enviado antes a
+ese cliente) NO está implementado: el layout enviado no es el mundo actual
+(el agente minó bloques durante el episodio y eso no se registra), y con
+layouts de seeds distintas casi ninguna celda coincide, así que borrar el
+layout anterior celda por celda ocupa más que un solo cuboide de aire.
+
+    python world_gen.py     # tamaño del XML: por bloque vs compacto vs keep_arena
+
+Nota: para una misma seed el mundo no coincide con el del generador anterior
+(otro RNG), pero sigue siendo determinista.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+
+BLOCK_DTYPE = np.dtype([('x', np.int16), ('y', np.int16), ('z', np.int16), ('block', 'U16')])
+
+# Altura extra de los troncos (igual que random.choice([0, 0, 1, 1, 2]))
+LOG_EXTRA_HEIGHTS = np.array([0, 0, 1, 1, 2])
+
+# Mundo completo de los agentes de 3_entrega (los 5 usan el mismo)
+FULL_WORLD_DENSITY = (
+    ("log", (40, 60)),
+    ("stone", (30, 40)),
+    ("iron_ore", (20, 30)),
+    ("diamond_ore", (3, 5)),
+)
+
+FLOOR_Y = 4
+CACHE_SIZE = 64
+
+CUBOID_DTYPE = np.dtype([('x1', np.int16), ('y1', np.int16), ('z1', np.int16),
+                         ('x2', np.int16), ('y2', np.int16), ('z2', np.int16), ('block', 'U16')])
+
+# blocks: array de BLOCK_DTYPE; cuboids: bloques unidos (CUBOID_DTYPE);
+# drawing_xml: arena + layout; layout_xml: solo el layout (keep_arena_drawing_xml)
+WorldLayout = namedtuple("WorldLayout", ["blocks", "cuboids", "drawing_xml", "layout_xml"])
+
+
+def freeze_density(density):
+    """
+    dict {material: (min, max)} o secuencia de pares -> tupla hashable
+    (mantiene el orden de inserción, que define el orden de colocación).
+    """
+    items = density.items() if hasattr(density, "items") else density
+    return tuple((material, (int(low), int(high))) for material, (low, high) in items)
+
+
+@lru_cache(maxsize=16)
+def free_cells(arena_size, margin=2, spawn_clearance=3):
+    """
+    Celdas (x, z) donde se puede colocar un bloque.
+
+    Returns:
+        np.ndarray int16 (N, 2), en orden x-major (solo lectura)
+    """
+    coords = np.arange(-arena_size + margin, arena_size - margin + 1)
+    xs, zs = np.meshgrid(coords, coords, indexing="ij")
+    xs, zs = xs.ravel(), zs.ravel()
+    keep = xs * xs + zs * zs >= spawn_clearance * spawn_clearance
+    cells = np.stack([xs[keep], zs[keep]], axis=1).astype(np.int16)
+    cells.setflags(write=False)
+    return cells
+
+
+def generate_layout(arena_size, density, seed=None):
+    """
+    Coloca los materiales en celdas distintas del arena.
+
+    Args:
+        arena_size: Radio del arena (paredes en ±arena_size)
+        density: Materiales en orden de colocación con su rango (min, max) de cantidad
+        seed: Semilla (None: aleatorio)
+
+    Returns:
+        Array estructurado de BLOCK_DTYPE (un registro por bloque)
+    """
+    rng = np.random.RandomState(seed)
+    cells = free_cells(arena_size)
+    order = rng.permutation(len(cells))
+
+    counts = [rng.randint(low, high + 1) for _, (low, high) in density]
+    parts = []
+    start = 0
+    for (material, _), count in zip(density, counts):
+        # Sin celdas libres suficientes: se colocan las que quedan (como al agotar reintentos)
+        chosen = cells[order[start:start + count]]
+        start += len(chosen)
+        if material == "log":
+            heights = LOG_EXTRA_HEIGHTS[rng.randint(0, len(LOG_EXTRA_HEIGHTS), len(chosen))] + 1
+            column = np.repeat(chosen, heights, axis=0)
+            # y = 4, 5, ... dentro de cada columna de tronco
+            offsets = np.arange(heights.sum()) - np.repeat(np.cumsum(heights) - heights, heights)
+            part = np.zeros(len(column), dtype=BLOCK_DTYPE)
+            part['x'], part['z'] = column[:, 0], column[:, 1]
+            part['y'] = FLOOR_Y + offsets
+        else:
+            part = np.zeros(len(chosen), dtype=BLOCK_DTYPE)
+            part['x'], part['z'] = chosen[:, 0], chosen[:, 1]
+            part['y'] = FLOOR_Y
+        part['block'] = material
+        parts.append(part)
+
+    if not parts:
+        return np.zeros(0, dtype=BLOCK_DTYPE)
+    return np.concatenate(parts)
+
+
+def arena_drawing_xml(arena_size):
+    """Piso y paredes de obsidiana."""
+    r = arena_size
+    return "".join([
+        f'<DrawCuboid x1="{-r}" y1="3" z1="{-r}" x2="{r}" y2="3" z2="{r}" type="obsidian"/>\n',
+        f'<DrawCuboid x1="{-r}" y1="4" z1="{-r}" x2="{r}" y2="10" z2="{-r}" type="obsidian"/>\n',
+        f'<DrawCuboid x1="{-r}" y1="4" z1="{r}" x2="{r}" y2="10" z2="{r}" type="obsidian"/>\n',
+        f'<DrawCuboid x1="{r}" y1="4" z1="{-r}" x2="{r}" y2="10" z2="{r}" type="obsidian"/>\n',
+        f'<DrawCuboid x1="{-r}" y1="4" z1="{-r}" x2="{-r}" y2="10" z2="{r}" type="obsidian"/>\n',
+    ])
+
+
+def blocks_drawing_xml(blocks):
+    """Un <DrawBlock> por registro del layout."""
+    return "".join(
+        f'<DrawBlock x="{x}" y="{y}" z="{z}" type="{block}"/>\n'
+        for x, y, z, block in zip(blocks['x'].tolist(), blocks['y'].tolist(),
+                                  blocks['z'].tolist(), blocks['block'].tolist())
+    )
+
+
+def merge_cuboids(blocks):
+    """
+    Une bloques contiguos del mismo tipo en cuboides (greedy: crece primero
+    en y, luego en z y luego en x, sin solaparse).
+
+    Args:
+        blocks: Array de BLOCK_DTYPE (posiciones distintas)
+
+    Returns:
+        Array de CUBOID_DTYPE que cubre exactamente los mismos bloques
+    """
+    cuboids = []
+    for block in dict.fromkeys(blocks['block'].tolist()):
+        sel = blocks[blocks['block'] == block]
+        origin = np.array([sel['x'].min(), sel['y'].min(), sel['z'].min()], dtype=np.int64)
+        cells = np.stack([sel['x'], sel['y'], sel['z']], axis=1).astype(np.int64) - origin
+        grid = np.zeros(tuple(cells.max(axis=0) + 1), dtype=bool)
+        grid[cells[:, 0], cells[:, 1], cells[:, 2]] = True
+        nx, ny, nz = grid.shape
+
+        for x, y, z in np.argwhere(grid).tolist():
+            if not grid[x, y, z]:
+                continue  # ya cubierto por un cuboide anterior
+            y2 = y
+            while y2 + 1 < ny and grid[x, y2 + 1, z]:
+                y2 += 1
+            z2 = z
+            while z2 + 1 < nz and grid[x, y:y2 + 1, z2 + 1].all():
+                z2 += 1
+            x2 = x
+            while x2 + 1 < nx and grid[x2 + 1, y:y2 + 1, z:z2 + 1].all():
+                x2 += 1
+            grid[x:x2 + 1, y:y2 + 1, z:z2 + 1] = False
+            ox, oy, oz = origin.tolist()
+            cuboids.append((x + ox, y + oy, z + oz, x2 + ox, y2 + oy, z2 + oz, block))
+
+    return np.array(cuboids, dtype=CUBOID_DTYPE)
+
+
+def cuboids_drawing_xml(cuboids):
+    """<DrawCuboid> por cuboide (<DrawBlock> si es de un solo bloque, es más corto)."""
+    parts = []
+    for x1, y1, z1, x2, y2, z2, block in cuboids.tolist():
+        if x1 == x2 and y1 == y2 and z1 == z2:
+            parts.append(f'<DrawBlock x="{x1}" y="{y1}" z="{z1}" type="{block}"/>\n')
+        else:
+            parts.append(f'<DrawCuboid x1="{x1}" y1="{y1}" z1="{z1}" '
+                         f'x2="{x2}" y2="{y2}" z2="{z2}" type="{block}"/>\n')
+    return "".join(parts)
+
+
+def interior_clear_xml(arena_size):
+    """Aire en todo el interior del arena (piso y paredes intactos)."""
+    r = arena_size - 1
+    return f'<DrawCuboid x1="{-r}" y1="4" z1="{-r}" x2="{r}" y2="10" z2="{r}" type="air"/>\n'
+
+
+def keep_arena_drawing_xml(layout, arena_size):
+    """
+    Drawing con el arena ya existente en el cliente (misión anterior con el
+    mismo arena_size y forceReset="false"); se limpia el interior (bloques
+    minados o sobrantes) y se dibuja el layout completo, no un diff. Solo lo
+    puede usar el cliente que dibujó ese arena.
+
+    Los ítems sueltos de la misión anterior no se borran (DrawingDecorator
+    no elimina entidades).
+    """
+    return interior_clear_xml(arena_size) + layout.layout_xml
+
+
+def _build_world(arena_size, density, seed):
+    blocks = generate_layout(arena_size, density, seed)
+    blocks.setflags(write=False)
+    cuboids = merge_cuboids(blocks)
+    cuboids.setflags(write=False)
+    layout_xml = cuboids_drawing_xml(cuboids)
+    return WorldLayout(blocks, cuboids, arena_drawing_xml(arena_size) + layout_xml, layout_xml)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_world(arena_size, density, seed):
+    return _build_world(arena_size, density, seed)
+
+
+def world_layout(arena_size, density, seed=None):
+    """
+    Layout y drawing XML del mundo, memoizados por (seed, arena_size, density).
+
+    Args:
+        arena_size: Radio del arena
+        density: dict o pares (material, (min, max)) en orden de colocación
+        seed: Semilla; None genera un mundo nuevo (sin caché)
+
+    Returns:
+        WorldLayout(blocks, cuboids, drawing_xml, layout_xml); arrays de solo lectura
+    """
+    density = freeze_density(density)
+    if seed is None:
+        return _build_world(arena_size, density, None)
+    return _cached_world(int(arena_size), density, int(seed))
+
+
+def cache_info():
+    """Estadísticas del LRU (hits, misses, maxsize, currsize)."""
+    return _cached_world.cache_info()
+
+
+def xml_size_report(arena_size=10, density=FULL_WORLD_DENSITY, seeds=range(100)):
+    """
+    Tamaño promedio del drawing XML: un <DrawBlock> por bloque (generador
+    anterior), compacto (cuboides) y con el arena conservado (keep_arena).
+
+    Returns:
+        dict {modo: {"bytes": promedio, "elements": promedio}}
+    """
+    totals = {"per_block": [0, 0], "compact": [0, 0], "keep_arena": [0, 0]}
+    seeds = list(seeds)
+    for seed in seeds:
+        layout = world_layout(arena_size, density, seed=seed)
+        shell = arena_drawing_xml(arena_size)
+        variants = {
+            "per_block": shell + blocks_drawing_xml(layout.blocks),
+            "compact": layout.drawing_xml,
+            "keep_arena": keep_arena_drawing_xml(layout, arena_size),
+        }
+        for mode, xml in variants.items():
+            totals[mode][0] += len(xml.encode("utf-8"))
+            totals[mode][1] += xml.count("<Draw")
+    return {mode: {"bytes": b / len(seeds), "elements": n / len(seeds)}
+            for mode, (b, n) in totals.items()}
+
+
+if __name__ == "__main__":
+    report = xml_size_report()
+    base = report["per_block"]["bytes"]
+    print("[WORLD GEN] Drawing XML del mundo completo (promedio de 100 seeds):")
+    for mode, values in report.items():
+        print(f"  {mode:<10} {values['bytes']:8.0f} bytes  {values['elements']:6.1f} elementos  "
+              f"({values['bytes'] / base:.0%})")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test del action repeat (src/action_repeat.py)
+
+Usa un AgentHost falso (sin Malmo) para verificar que:
+- la especificación "k,cmd=k" se interpreta por comando y nunca repite crafteos ni opciones
+- hold_command envía el comando una sola vez, suma las recompensas de los k
+  ticks y devuelve la última observación
+"""
+import sys
+
+from src.action_repeat import parse_action_repeat, repeat_for, hold_command
+
+
+class _Reward:
+    def __init__(self, value):
+        self.value = value
+
+    def getValue(self):
+        return self.value
+
+
+class FakeWorldState:
+    def __init__(self, tick):
+        self.tick = tick
+        self.observations = ["obs"]
+        self.number_of_observations_since_last_state = 1
+        self.rewards = [_Reward(float(tick))]
+        self.is_mission_running = True
+
+
+class FakeHost:
+    def __init__(self):
+        self.tick = 0
+        self.commands = []
+
+    def sendCommand(self, command):
+        self.commands.append(command)
+
+    def getWorldState(self):
+        self.tick += 1
+        return FakeWorldState(self.tick)
+
+
+def test_parse_action_repeat():
+    repeats = parse_action_repeat("3,attack=1,move=5")
+    assert repeat_for("move 1", repeats) == 5
+    assert repeat_for("attack 1", repeats) == 1
+    assert repeat_for("turn -0.5", repeats) == 3
+    assert repeat_for("craft_wooden_pickaxe", repeats) == 1
+    assert repeat_for("option_mine", repeats) == 1
+    assert parse_action_repeat(None) == {"default": 1}
+    try:
+        parse_action_repeat("move=0")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("k = 0 debería ser inválido")
+
+
+def test_hold_command():
+    host = FakeHost()
+    result = hold_command(host, "move 1", 4, step_sleep=0.0)
+    assert host.commands == ["move 1"]
+    assert result.steps == 4
+    assert result.reward == 1.0 + 2.0 + 3.0 + 4.0
+    assert result.world_state.tick == 4
+
+
+def main():
+    print("="*60)
+    print("Test de action repeat")
+    print("="*60)
+    test_parse_action_repeat()
+    test_hold_command()
+    print("✓ Repeticiones por comando y acumulación de recompensa correctas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
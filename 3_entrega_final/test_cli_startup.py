@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test de tiempo de arranque del CLI (cli.py)
+
+Ejecuta los subcomandos con `python -X importtime` y verifica que:
+- torch, stable_baselines3, sb3_contrib, matplotlib, gym y MalmoPython
+  NO se importan para --help / --dry-run
+- El tiempo total de imports queda muy por debajo de 1 segundo
+"""
+import os
+import sys
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = ['torch', 'stable_baselines3', 'sb3_contrib', 'matplotlib', 'gym', 'MalmoPython']
+MAX_IMPORT_SECONDS = 0.5
+
+COMMANDS = [
+    ['train', 'ppo', '--help'],
+    ['train', 'dqn', '--episodes', '10', '--dry-run'],
+    ['train', 'a2c', '--dry-run'],
+    ['train', 'trpo', '--dry-run'],
+    ['compare', '--help'],
+    ['evaluate', '--help'],
+    ['export', '--help'],
+    ['distill', '--help'],
+    ['distill', '--qtable', '../3_entrega/entrenamiento_acumulado/qlearning_model.pkl', '--dry-run'],
+]
+
+
+def run_importtime(cli_args):
+    """
+    Ejecuta cli.py con -X importtime.
+
+    Returns:
+        (returncode, {modulo: microsegundos acumulados}, total_segundos)
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.join(HERE, 'cli.py')] + cli_args,
+        cwd=HERE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+    modules = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        cumulative = int(parts[1].strip())
+        modules[parts[2].strip()] = cumulative
+        # Los módulos de primer nivel (sin sangría extra) suman el total
+        if not parts[2].startswith('  '):
+            total_us += cumulative
+    return proc.returncode, modules, total_us / 1e6
+
+
+def check_command(cli_args):
+    returncode, modules, total = run_importtime(cli_args)
+    label = ' '.join(cli_args)
+
+    heavy = [m for m in modules if m.split('.')[0] in HEAVY_MODULES]
+    ok = returncode == 0 and not heavy and total < MAX_IMPORT_SECONDS
+
+    if ok:
+        print(f"   ✓ {label:40} -> {total*1000:6.1f} ms de imports")
+    else:
+        print(f"   ✗ {label:40} -> exit={returncode}, {total*1000:.1f} ms, pesados={heavy}")
+    return ok
+
+
+def test_cli_startup():
+    for cli_args in COMMANDS:
+        assert check_command(cli_args), ' '.join(cli_args)
+
+
+def main():
+    print("="*60)
+    print("Test de arranque del CLI (-X importtime)")
+    print("="*60)
+    print(f"Límite: {MAX_IMPORT_SECONDS*1000:.0f} ms y sin {', '.join(HEAVY_MODULES)}\n")
+
+    results = [check_command(cli_args) for cli_args in COMMANDS]
+
+    print("\n" + "="*60)
+    if all(results):
+        print("✓ El CLI arranca sin imports pesados")
+        return 0
+    print("✗ Algún subcomando importa módulos pesados o es lento")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test del failover de misiones (src/client_pool_manager.py)
+
+Usa el backend de reproducción como MalmoPython (sin Minecraft) para
+verificar que:
+- en el cliente preferido se inicia la misión pedida (p. ej. la que reutiliza
+  el arena con forceReset="false")
+- si la misión termina en otro cliente se usa fallback_mission (XML completo)
+"""
+import sys
+
+from src import malmo_replay
+from src.client_pool_manager import ClientPoolManager
+
+
+class RecordingHost:
+    def __init__(self):
+        self.started = []
+
+    def startMission(self, mission, client_pool, mission_record, role, experiment_id):
+        self.started.append((client_pool.clients[0].control_port, mission.getAsXML()))
+
+
+def start(manager, host, preferred_port):
+    return manager.start_mission(
+        host, malmo_replay.MissionSpec("reuse"), malmo_replay.MissionRecordSpec(), "test",
+        preferred_port=preferred_port, fallback_mission=malmo_replay.MissionSpec("full"), wait_timeout=0.0
+    )
+
+
+def test_fallback_mission_on_failover():
+    previous = sys.modules.get("MalmoPython")
+    sys.modules["MalmoPython"] = malmo_replay
+    try:
+        manager = ClientPoolManager(ports=[10000, 10001], verbose=False)
+        host = RecordingHost()
+
+        port = start(manager, host, 10000)
+        assert port == 10000
+        assert host.started[-1] == (10000, "reuse")
+        manager.release(port)
+
+        # El cliente preferido está ocupado: failover al otro con el XML completo
+        assert manager.checkout(10000) == 10000
+        port = start(manager, host, 10000)
+        assert port == 10001
+        assert host.started[-1] == (10001, "full")
+    finally:
+        if previous is None:
+            del sys.modules["MalmoPython"]
+        else:
+            sys.modules["MalmoPython"] = previous
+
+
+def main():
+    print("="*60)
+    print("Test de failover del pool de clientes")
+    print("="*60)
+    test_fallback_mission_on_failover()
+    print("✓ La misión que reutiliza el arena solo va al cliente que lo tiene")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test del dataset de destilación (src/distillation.py)
+
+Verifica sin torch / SB3 / Malmo que:
+- el estado tabular cae en el layout de 117 dims del env (capas del grid
+  desplazadas, inventario, picos, etapa one-hot)
+- los targets siguen el argmax de Q sobre las acciones del env e ignoran
+  crafteos y estados sin preferencia
+- las tablas de Double Q y las claves abstractas se manejan al cargar
+"""
+import os
+import pickle
+import sys
+import tempfile
+
+import numpy as np
+
+from src.distillation import (state_to_observation, action_targets, build_dataset, load_q_table,
+                              iterate_minibatches, action_agreement, STAGE_TO_ENV_ACTION)
+from src.obs_codec import OBS_DIM
+
+
+def stage_state(blocks=None, wood=0, stone=0, iron=0, picks=(False, False, False)):
+    grid = ["air"] * 75
+    for index, block in (blocks or {}).items():
+        grid[index] = block
+    return (tuple(grid), wood, stone, iron, 0, 0, 0) + tuple(picks)
+
+
+def test_state_to_observation_layout():
+    # log enfrente a la altura de los pies (surroundings capa 0, índice 17)
+    state = stage_state({17: "log", 25 + 12: "stone", 50 + 3: "dirt"}, wood=2, stone=150,
+                        picks=(True, False, False))
+    obs = state_to_observation(state)
+    assert obs.shape == (OBS_DIM,) and obs.dtype == np.float32
+
+    assert obs[:25].sum() == 25          # suelo (y=-1) sólido
+    assert obs[25 + 17] == 1.0           # capa y=0 -> capa 1 del floor5x5
+    assert obs[50 + 12] == 1.0           # capa y=1 -> capa 2
+    assert obs[25:75].sum() == 2         # la capa y=2 no entra
+    assert obs[75] == 2 and obs[76] == 100  # clip como el env
+    assert list(obs[79:84]) == [1, 0, 0, 0, 0]
+    assert obs[89] == 20.0 and obs[91:].sum() == 0
+
+    staged = state_to_observation(state, stage_feature=True)
+    assert list(staged[91:95]) == [0, 1, 0, 0]
+
+
+def test_action_targets():
+    q = {"attack 1": 50.0, "move 1": 10.0, "craft_wooden_pickaxe": 10000.0}
+    targets = action_targets(q)
+    assert targets.argmax() == STAGE_TO_ENV_ACTION["attack 1"]
+    assert abs(targets.sum() - 1.0) < 1e-9
+
+    greedy = action_targets(q, temperature=0)
+    assert greedy[STAGE_TO_ENV_ACTION["attack 1"]] == 1.0 and greedy.sum() == 1.0
+    # Misma preferencia relativa con recompensas 100x: la temperatura no depende de la escala
+    scaled = action_targets({a: v * 100 for a, v in q.items()})
+    assert np.allclose(targets, scaled)
+
+    assert action_targets({"craft_wooden_pickaxe": 5.0}) is None
+    assert action_targets({"move 1": 0.0}) is None
+
+
+def test_build_dataset_and_loading():
+    s0 = stage_state({17: "log"})
+    s1 = stage_state(picks=(True, False, False))
+    table = {(s0, "attack 1"): 9.0, (s0, "move 1"): 1.0, (s1, "turn 1"): 0.0}
+    tmp = tempfile.mkdtemp()
+
+    double_path = os.path.join(tmp, "double_q_model.pkl")
+    with open(double_path, 'wb') as f:
+        pickle.dump(({(s0, "attack 1"): 1.0}, {(s0, "attack 1"): 2.0, (s1, "move -1"): 3.0}), f)
+    merged = load_q_table(double_path)
+    assert merged[(s0, "attack 1")] == 3.0 and merged[(s1, "move -1")] == 3.0
+
+    random_path = os.path.join(tmp, "random_model.pkl")
+    with open(random_path, 'wb') as f:
+        pickle.dump({'type': 'RandomAgent', 'epsilon': 1.0}, f)
+    assert load_q_table(random_path) == {}
+
+    obs, targets, stats = build_dataset([table, {((1, 2, 0), "move 1"): 4.0}, random_path])
+    assert obs.shape == (1, OBS_DIM) and targets.shape == (1, 9)
+    assert stats == {"states": 1, "skipped_keys": 1, "skipped_flat": 1}
+    assert action_agreement(targets, targets) == 1.0
+
+    batches = list(iterate_minibatches(10, 4, np.random.RandomState(0)))
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert sorted(np.concatenate(batches)) == list(range(10))
+
+
+def main():
+    print("="*60)
+    print("Test de destilación de tablas Q")
+    print("="*60)
+    test_state_to_observation_layout()
+    test_action_targets()
+    test_build_dataset_and_loading()
+    print("✓ Estados tabulares -> observaciones del env y targets de la política")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
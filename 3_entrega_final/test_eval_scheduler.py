@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test del scheduler de evaluación en paralelo (src/eval_scheduler.py)
+
+Usa entornos falsos (sin Malmo) y una política que cuenta las llamadas para
+verificar que:
+- cada trabajo (modelo, stage, episodio) se evalúa exactamente una vez
+- la inferencia se hace en batch (menos llamadas a predict que steps)
+- al reejecutar con el mismo archivo de resultados no se repite ningún episodio
+- summarize() produce el formato de evaluate_model()
+- evaluate.py --replay corre sin MalmoPython instalado
+"""
+import os
+import sys
+import gzip
+import json
+import subprocess
+import tempfile
+
+import numpy as np
+
+from src.eval_scheduler import EvaluationScheduler, build_jobs, load_results, summarize
+
+
+class FakeEnv:
+    """Episodios de longitud stage + seed % 3; éxito si la seed es par."""
+
+    def __init__(self):
+        self.curriculum = None
+        self.seed_value = 0
+        self.t = 0
+        self.length = 0
+
+    def reset(self):
+        self.t = 0
+        self.length = self.curriculum.current_stage.stage_id + self.seed_value % 3
+        return np.zeros(117, dtype=np.float32)
+
+    def step(self, action):
+        self.t += 1
+        done = self.t >= self.length
+        info = {"tool_crafted": done and self.seed_value % 2 == 0}
+        return np.zeros(117, dtype=np.float32), 1.0, done, info
+
+    def close(self):
+        pass
+
+
+class CountingPolicy:
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        self.calls += 1
+        self.rows += len(observation)
+        return np.zeros(len(observation), dtype=np.int64), None
+
+
+def run_scheduler(results_path, jobs, policies):
+    def loader(algorithm, path):
+        return policies.setdefault((algorithm, path), CountingPolicy())
+
+    scheduler = EvaluationScheduler(lambda i: FakeEnv(), 4, results_path, loader, verbose=False)
+    return scheduler.run(jobs)
+
+
+def check_scheduler(tmp_dir):
+    os.chdir(tmp_dir)  # CurriculumManager crea su directorio de logs
+    results_path = os.path.join(tmp_dir, "episodes.jsonl")
+    models = [("ppo", "ppo.zip"), ("dqn", "dqn.zip")]
+    jobs = build_jobs(models, [1, 2], num_episodes=5, seed=10)
+
+    policies = {}
+    results = run_scheduler(results_path, jobs, policies)
+    keys = [(r["algorithm"], r["stage"], r["episode"]) for r in results]
+    assert len(keys) == len(jobs) == len(set(keys)), keys
+
+    steps = sum(r["length"] for r in results)
+    assert sum(p.rows for p in policies.values()) == steps
+    assert sum(p.calls for p in policies.values()) < steps, "predict no se hizo en batch"
+
+    # Reejecución: todo está en el archivo, no se corre nada
+    policies = {}
+    results = run_scheduler(results_path, jobs, policies)
+    assert len(results) == len(jobs)
+    assert len(load_results(results_path)) == len(jobs)
+    assert not policies
+
+    metrics = summarize(results, "ppo", "ppo.zip", 2)
+    assert metrics["num_episodes"] == 5
+    assert metrics["episode_lengths"] == [2 + (10 + i) % 3 for i in range(5)]
+    assert metrics["success_count"] == 3  # seeds 10, 12, 14
+    return True
+
+
+def test_eval_scheduler():
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            assert check_scheduler(tmp_dir)
+    finally:
+        os.chdir(cwd)
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_replay_fixtures(tmp_dir, n_states=6):
+    """Trayectoria mínima (una misión) y una política .npz de una capa."""
+    trajectory = os.path.join(tmp_dir, "trajectory.jsonl.gz")
+    observation = json.dumps({"floor5x5": ["air"] * 75, "Yaw": 0.0, "Pitch": 0.0})
+    with gzip.open(trajectory, 'wt') as f:
+        f.write(json.dumps({"e": "start", "v": 1, "xml": ""}) + "\n")
+        for _ in range(n_states):
+            f.write(json.dumps({"e": "ws", "begun": 1, "run": 1, "n": 1, "o": [observation]}) + "\n")
+    policy = os.path.join(tmp_dir, "policy.npz")
+    meta = {"activations": ["identity"], "head": "logits", "algorithm": "ppo"}
+    np.savez(policy, meta=np.array(json.dumps(meta)),
+             W0=np.zeros((117, 9), dtype=np.float32), b0=np.zeros(9, dtype=np.float32))
+    return trajectory, policy
+
+
+def check_replay_without_malmo(tmp_dir):
+    trajectory, policy = write_replay_fixtures(tmp_dir)
+    output = os.path.join(tmp_dir, "results", "evaluation.json")
+    # Intérprete nuevo: MalmoPython solo puede venir de malmo_replay.install()
+    code = ("import sys, builtins\n"
+            "real_import = builtins.__import__\n"
+            "def no_malmo(name, *args, **kwargs):\n"
+            "    if name == 'MalmoPython' and 'MalmoPython' not in sys.modules:\n"
+            "        raise ModuleNotFoundError(\"No module named 'MalmoPython'\")\n"
+            "    return real_import(name, *args, **kwargs)\n"
+            "builtins.__import__ = no_malmo\n"
+            "import evaluate\n"
+            "evaluate.main(sys.argv[1:])\n")
+    proc = subprocess.run(
+        [sys.executable, '-c', code, '--model', policy, '--algorithm', 'ppo', '--replay', trajectory,
+         '--stage', '1', '--episodes', '2', '--num-envs', '2', '--output', output],
+        cwd=HERE, env=dict(os.environ, PYTHONPATH=HERE), capture_output=True, text=True, timeout=120
+    )
+    assert proc.returncode == 0, proc.stdout[-2000:] + proc.stderr[-2000:]
+    with open(output) as f:
+        stage = json.load(f)["results"]["stage_1"]
+    assert stage["num_episodes"] == 2
+    return True
+
+
+def test_evaluate_replay_without_malmo():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        assert check_replay_without_malmo(tmp_dir)
+
+
+def main():
+    print("="*60)
+    print("Test del scheduler de evaluación")
+    print("="*60)
+    test_eval_scheduler()
+    print("✓ Trabajos completos, inferencia en batch y reanudación correctas")
+    test_evaluate_replay_without_malmo()
+    print("✓ evaluate.py --replay sin MalmoPython")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test de los perfiles de observación (src/observation_profiles.py)
+
+Verifica sin Malmo que:
+- el perfil mínimo no pide HotBar, NearbyEntities ni grids sin uso
+- la observación del perfil mínimo trae todo lo que leen los consumidores
+- el perfil mínimo pesa menos que el anterior
+- TrackedAgentHost mide los bytes de cada observación recibida
+"""
+import json
+import sys
+
+from src.observation_profiles import (get_profile, observation_handlers_xml, synthetic_observation,
+                                      payload_bytes)
+from src.latency_tracker import TrackedAgentHost
+
+
+def test_minimal_handlers():
+    xml = observation_handlers_xml(get_profile("env", "minimal"))
+    assert "ObservationFromHotBar" not in xml
+    assert "ObservationFromNearbyEntities" not in xml
+    assert '<Grid name="floor5x5">' in xml
+
+    xml = observation_handlers_xml(get_profile("stage", "minimal"))
+    assert "floor5x5" not in xml and "surroundings5x5" in xml
+    assert "ObservationFromRecentCommands" not in xml
+
+
+def test_minimal_covers_consumers():
+    env_obs = synthetic_observation(get_profile("env", "minimal"))
+    for key in ("floor5x5", "InventorySlot_0_item", "XPos", "YPos", "ZPos", "Yaw", "Pitch", "Life", "TimeAlive"):
+        assert key in env_obs, key
+    assert len(env_obs["floor5x5"]) == 75
+
+    stage_obs = synthetic_observation(get_profile("stage", "minimal"))
+    for key in ("surroundings5x5", "InventorySlot_0_item", "Pitch", "Yaw", "XPos", "ZPos", "TimeAlive",
+                "currentItemIndex"):
+        assert key in stage_obs, key
+    assert len(stage_obs["surroundings5x5"]) == 75
+
+    for consumer in ("env", "stage"):
+        minimal = payload_bytes(synthetic_observation(get_profile(consumer, "minimal")))
+        full = payload_bytes(synthetic_observation(get_profile(consumer, "full")))
+        assert minimal < full
+
+
+class _Obs:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeWorldState:
+    def __init__(self, texts):
+        self.observations = [_Obs(t) for t in texts]
+        self.number_of_observations_since_last_state = len(texts)
+        self.rewards = []
+        self.is_mission_running = True
+
+
+class FakeHost:
+    def __init__(self, world_states):
+        self.world_states = list(world_states)
+
+    def getWorldState(self):
+        return self.world_states.pop(0)
+
+
+def test_payload_meter():
+    a = json.dumps({"TimeAlive": 1, "floor5x5": ["air"] * 75})
+    b = json.dumps({"TimeAlive": 2})
+    host = TrackedAgentHost(FakeHost([FakeWorldState([a]), FakeWorldState([]), FakeWorldState([a, b])]))
+    for _ in range(3):
+        host.getWorldState()
+
+    payload = host.stats()["obs_payload"]
+    assert payload["observations"] == 3
+    assert payload["bytes_total"] == 2 * len(a) + len(b)
+    assert payload["bytes_max"] == len(a)
+
+
+def main():
+    print("="*60)
+    print("Test de perfiles de observación")
+    print("="*60)
+    test_minimal_handlers()
+    test_minimal_covers_consumers()
+    test_payload_meter()
+    print("✓ Perfiles mínimos completos y payload medido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test de las macro-acciones (src/options.py)
+
+Usa un AgentHost falso (sin Malmo) para verificar que:
+- option_mine termina al cambiar el inventario, no al agotar el presupuesto
+- option_mine equipa la herramienta (tool_manager) antes del primer `attack 1`
+- la recompensa de la opción es sum_i gamma^i r_i y discount = gamma^k
+  (raw_reward guarda la suma sin descontar para las métricas)
+- option_face termina orientado al objetivo del grid
+"""
+import json
+import sys
+
+from src.options import (OptionRunner, FaceTargetOption, FLOOR_GRID, grid_index,
+                         yaw_error, yaw_towards)
+
+
+class _Reward:
+    def __init__(self, value):
+        self.value = value
+
+    def getValue(self):
+        return self.value
+
+
+class _Obs:
+    def __init__(self, obs):
+        self.text = json.dumps(obs)
+
+
+class FakeWorldState:
+    def __init__(self, obs, reward=0.0, running=True):
+        self.observations = [_Obs(obs)]
+        self.number_of_observations_since_last_state = 1
+        self.rewards = [_Reward(reward)] if reward else []
+        self.is_mission_running = running
+
+
+class MiningHost:
+    """Tronco enfrente: se rompe en el tick 3 y el ítem llega en el tick 5."""
+
+    def __init__(self):
+        self.t = 0
+        self.commands = []
+
+    @staticmethod
+    def observation(t):
+        grid = ["air"] * 75
+        if t < 3:
+            grid[grid_index(0, 1, 1)] = "log"
+        obs = {"surroundings5x5": grid, "Yaw": 0.0}
+        if t >= 5:
+            obs["InventorySlot_0_item"] = "log"
+        return obs
+
+    def sendCommand(self, command):
+        self.commands.append(command)
+
+    def getWorldState(self):
+        self.t += 1
+        return FakeWorldState(self.observation(self.t), reward=1000.0 if self.t == 5 else 0.0)
+
+
+def test_mine_option_smdp_reward():
+    host = MiningHost()
+    runner = OptionRunner(host, ("log",), gamma=0.9, step_sleep=0.0)
+    result = runner.run("option_mine", FakeWorldState(host.observation(0)))
+
+    assert result.steps == 5
+    assert abs(result.reward - 1000.0 * 0.9 ** 4) < 1e-6
+    assert abs(result.discount - 0.9 ** 5) < 1e-9
+    assert result.raw_reward == 1000.0
+    assert host.commands == ["attack 1"] * 5 + ["attack 0"]
+
+
+class RecordingToolManager:
+    """Misma interfaz que tool_cache.ToolManager: equip(world_state)."""
+
+    def __init__(self, host):
+        self.host = host
+        self.calls = 0
+
+    def equip(self, world_state):
+        self.calls += 1
+        self.host.sendCommand("hotbar.2 1")
+        self.host.sendCommand("hotbar.2 0")
+        return True
+
+
+def test_mine_option_equips_tool():
+    host = MiningHost()
+    tools = RecordingToolManager(host)
+    runner = OptionRunner(host, ("log",), gamma=0.9, step_sleep=0.0, tool_manager=tools)
+    runner.run("option_mine", FakeWorldState(host.observation(0)))
+    assert tools.calls == 1
+    assert host.commands[:3] == ["hotbar.2 1", "hotbar.2 0", "attack 1"]
+
+    # Las demás opciones no tocan la herramienta
+    runner.run("option_advance", FakeWorldState(host.observation(0)))
+    assert tools.calls == 1
+
+
+def test_face_target_option():
+    grid = ["air"] * 75
+    grid[grid_index(1, FLOOR_GRID.feet_layer, 0)] = "iron_ore"  # a +x: yaw -90
+    option = FaceTargetOption(("iron_ore",), grid=FLOOR_GRID)
+    obs = {"floor5x5": grid, "Yaw": 0.0}
+    option.start(obs)
+
+    assert yaw_towards(1, 0) == -90.0
+    assert option.command(obs) == "turn -0.5"
+    assert not option.should_stop(obs, 1)
+    assert option.should_stop(dict(obs, Yaw=-80.0), 2)
+    assert abs(yaw_error(170.0, -170.0) - 20.0) < 1e-9
+
+
+def main():
+    print("="*60)
+    print("Test de macro-acciones (opciones)")
+    print("="*60)
+    test_mine_option_smdp_reward()
+    test_mine_option_equips_tool()
+    test_face_target_option()
+    print("✓ Términos de las opciones y descuento SMDP correctos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test del descuento SMDP para DQN (src/smdp.py)
+
+Verifica sin Malmo que:
+- smdp_dones da 1 - (1 - done) * gamma^(k-1) por entorno
+- SMDPReplayBuffer y SMDPCompactReplayBuffer guardan ese done y sample()
+  lo devuelve (el buffer compacto no rompe con dones float)
+- un TimeLimit.truncated sigue siendo no terminal en los dos buffers
+"""
+import sys
+
+import numpy as np
+from gym import spaces
+
+from src.obs_codec import OBS_DIM
+from src.smdp import smdp_dones, SMDPReplayBuffer, SMDPCompactReplayBuffer
+
+GAMMA = 0.9
+
+
+def make_buffer(buffer_class):
+    observation_space = spaces.Box(low=-100.0, high=100.0, shape=(OBS_DIM,), dtype=np.float32)
+    return buffer_class(4, observation_space, spaces.Discrete(12), device="cpu", gamma=GAMMA)
+
+
+def test_smdp_dones():
+    infos = [{"option_steps": 3}, {}, {"option_steps": 5}]
+    dones = smdp_dones([False, False, True], infos, GAMMA)
+    assert dones.dtype == np.float32
+    assert np.allclose(dones, [1.0 - GAMMA ** 2, 0.0, 1.0])
+
+
+def check_buffer(buffer_class):
+    buffer = make_buffer(buffer_class)
+    obs = np.zeros((1, OBS_DIM), dtype=np.float32)
+    buffer.add(obs, obs, np.array([1]), np.array([5.0]), np.array([False]), [{"option_steps": 3}])
+    buffer.add(obs, obs, np.array([2]), np.array([1.0]), np.array([True]),
+               [{"option_steps": 2, "TimeLimit.truncated": True}])
+
+    samples = buffer._get_samples(np.array([0, 1]))
+    dones = samples.dones.numpy().reshape(-1)
+    # Opción de 3 pasos: target r + gamma^3 max Q'; corte por tiempo: no terminal
+    assert np.allclose(dones, [1.0 - GAMMA ** 2, 0.0], atol=1e-6), dones
+    assert samples.actions.numpy().reshape(-1).tolist() == [1, 2]
+
+    batch = buffer.sample(8)
+    assert batch.dones.shape == (8, 1)
+
+
+def test_smdp_replay_buffers():
+    check_buffer(SMDPReplayBuffer)
+    check_buffer(SMDPCompactReplayBuffer)
+
+
+def main():
+    print("="*60)
+    print("Test de descuento SMDP (DQN)")
+    print("="*60)
+    test_smdp_dones()
+    test_smdp_replay_buffers()
+    print("✓ Dones SMDP correctos en ReplayBuffer y CompactReplayBuffer")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
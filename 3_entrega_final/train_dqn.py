@@ -10,81 +10,9 @@ import os
 import sys
 import argparse
 from datetime import datetime
-import torch
-import numpy as np
 
-from stable_baselines3 import DQN
-from stable_baselines3.common.callbacks import BaseCallback
-from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.logger import configure
 
-from src.malmo_env_wrapper import MalmoToolProgressionEnv
-from src.curriculum_manager import CurriculumManager
-
-
-class CurriculumCallback(BaseCallback):
-    """
-    Callback para integrar el curriculum manager con SB3.
-    """
-    
-    def __init__(self, curriculum_manager, save_path, verbose=0):
-        super().__init__(verbose)
-        self.curriculum = curriculum_manager
-        self.save_path = save_path
-        self.episode_rewards = []
-        self.episode_lengths = []
-        self.current_episode_reward = 0
-        self.current_episode_length = 0
-    
-    def _on_step(self) -> bool:
-        """
-        Called at each step.
-        """
-        # Accumulate reward
-        self.current_episode_reward += self.locals['rewards'][0]
-        self.current_episode_length += 1
-        
-        # Check if episode ended
-        if self.locals['dones'][0]:
-            info = self.locals['infos'][0]
-            success = info.get("tool_crafted", False)
-            
-            # Log to curriculum
-            advanced = self.curriculum.log_episode(
-                success=success,
-                total_reward=self.current_episode_reward,
-                episode_info=info
-            )
-            
-            # Save episode stats
-            self.episode_rewards.append(self.current_episode_reward)
-            self.episode_lengths.append(self.current_episode_length)
-            
-            # Log to tensorboard
-            self.logger.record("curriculum/stage", self.curriculum.current_stage.stage_id)
-            self.logger.record("curriculum/stage_episodes", self.curriculum.current_stage.episodes_completed)
-            self.logger.record("curriculum/episode_reward", self.current_episode_reward)
-            self.logger.record("curriculum/episode_length", self.current_episode_length)
-            self.logger.record("curriculum/success", 1.0 if success else 0.0)
-            
-            # Reset counters
-            self.current_episode_reward = 0
-            self.current_episode_length = 0
-            
-            # Si avanzó de etapa, guardar modelo
-            if advanced:
-                print(f"\n[CALLBACK] Stage advanced! Saving model...")
-                model_path = os.path.join(
-                    self.save_path,
-                    f"dqn_stage_{self.curriculum.current_stage.stage_id - 1}_checkpoint.zip"
-                )
-                self.model.save(model_path)
-                print(f"  Saved to: {model_path}")
-        
-        return True
-
-
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description='Train DQN agent with curriculum learning')
     
     # Training parameters
@@ -100,6 +28,8 @@ def parse_args():
                        help='Learning rate (default: 1e-4)')
     parser.add_argument('--buffer-size', type=int, default=100000,
                        help='Replay buffer size (default: 100000)')
+    parser.add_argument('--compact-buffer', action='store_true',
+                       help='Replay buffer compacto (uint8/float16, ~12x menos RAM)')
     parser.add_argument('--learning-starts', type=int, default=1000,
                        help='Steps before learning starts (default: 1000)')
     parser.add_argument('--batch-size', type=int, default=32,
@@ -120,6 +50,23 @@ def parse_args():
     # Environment parameters
     parser.add_argument('--port', type=int, default=10000,
                        help='Malmo port (default: 10000)')
+    parser.add_argument('--fallback-ports', type=int, nargs='*', default=[],
+                       help='Puertos alternativos si el cliente principal falla')
+    parser.add_argument('--wait-fresh-obs', action='store_true',
+                       help='Esperar una observación nueva tras cada comando')
+    parser.add_argument('--reuse-arena', action='store_true',
+                       help='Reutilizar el arena entre misiones (forceReset="false"; se reenvía el layout completo)')
+    parser.add_argument('--options', action='store_true',
+                       help='Agregar macro-acciones (minar / mirar al objetivo / avanzar) con descuento SMDP')
+    parser.add_argument('--action-repeat', type=str, default=None,
+                       help='Mantener cada acción k ticks: "4" o por comando, ej. "move=4,turn=2,attack=1"')
+    parser.add_argument('--obs-profile', type=str, default='minimal', choices=['minimal', 'full'],
+                       help='Handlers de observación: solo los que lee el entorno (minimal) o los anteriores (full)')
+    parser.add_argument('--mixed-curriculum', action='store_true',
+                       help='Entrenar las 4 etapas a la vez: un sub-entorno por puerto, '
+                            'etapa muestreada según el progreso de aprendizaje')
+    parser.add_argument('--ports', type=int, nargs='+', default=None,
+                       help='Puertos de los sub-entornos con --mixed-curriculum (default: --port)')
     parser.add_argument('--seed', type=int, default=123456,
                        help='Random seed (default: 123456)')
     parser.add_argument('--max-steps', type=int, default=1000,
@@ -131,11 +78,39 @@ def parse_args():
     parser.add_argument('--model-dir', type=str, default='models',
                        help='Directory for saved models (default: models)')
     
-    return parser.parse_args()
+    # Profiling de fases del step (TensorBoard + profile_summary.json)
+    parser.add_argument('--profile', action='store_true',
+                       help='Medir fases del step (p50/p95/p99) y exportarlas a TensorBoard')
+    
+    # Validación rápida sin importar torch/SB3/Malmo
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Solo validar argumentos y salir (sin cargar torch/SB3/Malmo)')
+    
+    return parser.parse_args(argv)
 
 
-def train():
-    args = parse_args()
+def train(argv=None):
+    args = parse_args(argv)
+    
+    if args.dry_run:
+        resume = getattr(args, "resume", None)
+        if resume and not os.path.exists(resume):
+            print(f"[ERROR] Model to resume not found: {resume}")
+            sys.exit(1)
+        print("[DRY RUN] Arguments OK")
+        return
+    
+    # Imports pesados solo cuando realmente se entrena
+    import torch
+    import numpy as np
+    from stable_baselines3 import DQN
+    from stable_baselines3.common.monitor import Monitor
+    from stable_baselines3.common.logger import configure
+    
+    from src.malmo_env_wrapper import MalmoToolProgressionEnv
+    from src.curriculum_manager import CurriculumManager
+    from src.callbacks import CurriculumCallback, ProfilerCallback, MixedCurriculumCallback
+    from src.step_profiler import StepProfiler
     
     # Create directories
     os.makedirs(args.log_dir, exist_ok=True)
@@ -147,7 +122,7 @@ def train():
     
     # Initialize curriculum manager
     curriculum = None
-    if args.curriculum:
+    if args.curriculum and not args.mixed_curriculum:
         curriculum = CurriculumManager(
             start_stage=args.start_stage,
             log_dir=os.path.join(args.log_dir, "curriculum")
@@ -156,13 +131,42 @@ def train():
         print(curriculum.get_summary())
     
     # Create environment
-    env = MalmoToolProgressionEnv(
-        curriculum_manager=curriculum,
-        port=args.port,
-        max_episode_steps=args.max_steps,
-        seed=args.seed
-    )
-    env = Monitor(env)
+    profiler = StepProfiler(enabled=True if args.profile else None)  # None: MALMO_PROFILE
+    if args.mixed_curriculum:
+        # Las 4 etapas a la vez: un sub-entorno por puerto, etapa elegida por StageSampler
+        from src.mixed_curriculum import make_mixed_curriculum_env
+        env = make_mixed_curriculum_env(
+            ports=args.ports or [args.port],
+            log_dir=os.path.join(args.log_dir, "mixed_curriculum", datetime.now().strftime("%Y%m%d_%H%M%S")),
+            max_episode_steps=args.max_steps,
+            seed=args.seed,
+            wait_for_fresh_obs=args.wait_fresh_obs,
+            reuse_arena=args.reuse_arena,
+            options=args.options,
+            gamma=args.gamma,
+            action_repeat=args.action_repeat,
+            obs_profile=args.obs_profile
+        )
+    else:
+        env = MalmoToolProgressionEnv(
+            curriculum_manager=curriculum,
+            port=args.port,
+            max_episode_steps=args.max_steps,
+            seed=args.seed,
+            fallback_ports=args.fallback_ports,
+            profiler=profiler,
+            wait_for_fresh_obs=args.wait_fresh_obs,
+            reuse_arena=args.reuse_arena,
+            obs_profile=args.obs_profile
+        )
+        if args.action_repeat:
+            from src.action_repeat_wrapper import ActionRepeatWrapper
+            env = ActionRepeatWrapper(env, args.action_repeat)
+        if args.options:
+            # Macro-acciones con recompensa descontada por duración (SMDP)
+            from src.option_wrapper import OptionWrapper
+            env = OptionWrapper(env, gamma=args.gamma)
+        env = Monitor(env)
     
     # Setup logging
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -175,6 +179,19 @@ def train():
     print(f"  Algorithm: DQN (Deep Q-Network)")
     print(f"  Learning rate: {args.learning_rate}")
     print(f"  Buffer size: {args.buffer_size:,}")
+    replay_buffer_class = None
+    replay_buffer_kwargs = None
+    if args.compact_buffer:
+        from src.compact_replay_buffer import CompactReplayBuffer
+        replay_buffer_class = CompactReplayBuffer
+        compact_bytes, default_bytes = CompactReplayBuffer.estimate_bytes(args.buffer_size)
+        print(f"  Compact buffer: {compact_bytes / 2**20:,.0f} MB (default: {default_bytes / 2**20:,.0f} MB)")
+    if args.options:
+        # Target r + gamma^k max Q' para opciones de k pasos
+        from src.smdp import smdp_replay_buffer_class
+        replay_buffer_class = smdp_replay_buffer_class(compact=args.compact_buffer)
+        replay_buffer_kwargs = {"gamma": args.gamma}
+        print(f"  Options: SMDP replay buffer ({replay_buffer_class.__name__})")
     print(f"  Batch size: {args.batch_size}")
     print(f"  Gamma: {args.gamma}")
     print(f"  Exploration: {args.exploration_final_eps} (final epsilon)")
@@ -192,7 +209,10 @@ def train():
         if os.path.exists(pretrained_path):
             try:
                 print(f"\n[TRAIN] Loading pretrained model from stage {prev_stage}...")
-                model = DQN.load(pretrained_path, env=env)
+                # El buffer guardado en el checkpoint no sigue --compact-buffer / --options
+                model = DQN.load(pretrained_path, env=env,
+                                 replay_buffer_class=replay_buffer_class,
+                                 replay_buffer_kwargs=replay_buffer_kwargs or {})
                 model.set_logger(logger)
                 print(f"  ✓ Successfully loaded pretrained model")
                 print(f"  Path: {pretrained_path}")
@@ -204,6 +224,8 @@ def train():
                     env,
                     learning_rate=args.learning_rate,
                     buffer_size=args.buffer_size,
+                    replay_buffer_class=replay_buffer_class,
+                    replay_buffer_kwargs=replay_buffer_kwargs,
                     learning_starts=args.learning_starts,
                     batch_size=args.batch_size,
                     tau=args.tau,
@@ -223,6 +245,8 @@ def train():
                 env,
                 learning_rate=args.learning_rate,
                 buffer_size=args.buffer_size,
+                replay_buffer_class=replay_buffer_class,
+                replay_buffer_kwargs=replay_buffer_kwargs,
                 learning_starts=args.learning_starts,
                 batch_size=args.batch_size,
                 tau=args.tau,
@@ -242,6 +266,8 @@ def train():
             env,
             learning_rate=args.learning_rate,
             buffer_size=args.buffer_size,
+            replay_buffer_class=replay_buffer_class,
+            replay_buffer_kwargs=replay_buffer_kwargs,
             learning_starts=args.learning_starts,
             batch_size=args.batch_size,
             tau=args.tau,
@@ -262,10 +288,17 @@ def train():
         curriculum_callback = CurriculumCallback(
             curriculum_manager=curriculum,
             save_path=args.model_dir,
+            checkpoint_prefix="dqn_",
             verbose=1
         )
         callbacks.append(curriculum_callback)
     
+    if args.mixed_curriculum:
+        callbacks.append(MixedCurriculumCallback(env.sampler))
+    
+    if profiler.enabled:
+        callbacks.append(ProfilerCallback(profiler, log_path))
+    
     # Calculate total timesteps
     total_timesteps = args.episodes * args.max_steps
     
@@ -16,81 +16,9 @@ import os
 import sys
 import argparse
 from datetime import datetime
-import torch
-import numpy as np
 
-from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import BaseCallback
-from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.logger import configure
 
-from src.malmo_env_wrapper import MalmoToolProgressionEnv
-from src.curriculum_manager import CurriculumManager
-
-
-class CurriculumCallback(BaseCallback):
-    """
-    Callback para integrar el curriculum manager con SB3.
-    """
-    
-    def __init__(self, curriculum_manager, save_path, verbose=0):
-        super().__init__(verbose)
-        self.curriculum = curriculum_manager
-        self.save_path = save_path
-        self.episode_rewards = []
-        self.episode_lengths = []
-        self.current_episode_reward = 0
-        self.current_episode_length = 0
-    
-    def _on_step(self) -> bool:
-        """
-        Called at each step.
-        """
-        # Accumulate reward
-        self.current_episode_reward += self.locals['rewards'][0]
-        self.current_episode_length += 1
-        
-        # Check if episode ended
-        if self.locals['dones'][0]:
-            info = self.locals['infos'][0]
-            success = info.get("tool_crafted", False)
-            
-            # Log to curriculum
-            advanced = self.curriculum.log_episode(
-                success=success,
-                total_reward=self.current_episode_reward,
-                episode_info=info
-            )
-            
-            # Save episode stats
-            self.episode_rewards.append(self.current_episode_reward)
-            self.episode_lengths.append(self.current_episode_length)
-            
-            # Log to tensorboard
-            self.logger.record("curriculum/stage", self.curriculum.current_stage.stage_id)
-            self.logger.record("curriculum/stage_episodes", self.curriculum.current_stage.episodes_completed)
-            self.logger.record("curriculum/episode_reward", self.current_episode_reward)
-            self.logger.record("curriculum/episode_length", self.current_episode_length)
-            self.logger.record("curriculum/success", 1.0 if success else 0.0)
-            
-            # Reset counters
-            self.current_episode_reward = 0
-            self.current_episode_length = 0
-            
-            # Si avanzó de etapa, guardar modelo
-            if advanced:
-                print(f"\n[CALLBACK] Stage advanced! Saving model...")
-                model_path = os.path.join(
-                    self.save_path,
-                    f"stage_{self.curriculum.current_stage.stage_id - 1}_checkpoint.zip"
-                )
-                self.model.save(model_path)
-                print(f"  Saved to: {model_path}")
-        
-        return True
-
-
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description='Train PPO agent with curriculum learning')
     
     # Training parameters
@@ -118,6 +46,23 @@ def parse_args():
     # Environment parameters
     parser.add_argument('--port', type=int, default=10000,
                        help='Malmo port (default: 10000)')
+    parser.add_argument('--fallback-ports', type=int, nargs='*', default=[],
+                       help='Puertos alternativos si el cliente principal falla')
+    parser.add_argument('--wait-fresh-obs', action='store_true',
+                       help='Esperar una observación nueva tras cada comando')
+    parser.add_argument('--reuse-arena', action='store_true',
+                       help='Reutilizar el arena entre misiones (forceReset="false"; se reenvía el layout completo)')
+    parser.add_argument('--options', action='store_true',
+                       help='Agregar macro-acciones (minar / mirar al objetivo / avanzar) con descuento SMDP')
+    parser.add_argument('--action-repeat', type=str, default=None,
+                       help='Mantener cada acción k ticks: "4" o por comando, ej. "move=4,turn=2,attack=1"')
+    parser.add_argument('--obs-profile', type=str, default='minimal', choices=['minimal', 'full'],
+                       help='Handlers de observación: solo los que lee el entorno (minimal) o los anteriores (full)')
+    parser.add_argument('--mixed-curriculum', action='store_true',
+                       help='Entrenar las 4 etapas a la vez: un sub-entorno por puerto, '
+                            'etapa muestreada según el progreso de aprendizaje')
+    parser.add_argument('--ports', type=int, nargs='+', default=None,
+                       help='Puertos de los sub-entornos con --mixed-curriculum (default: --port)')
     parser.add_argument('--seed', type=int, default=123456,
                        help='Random seed (default: 123456)')
     parser.add_argument('--max-steps', type=int, default=1000,
@@ -133,11 +78,37 @@ def parse_args():
     parser.add_argument('--resume', type=str, default=None,
                        help='Path to model to resume training from')
     
-    return parser.parse_args()
+    # Profiling de fases del step (TensorBoard + profile_summary.json)
+    parser.add_argument('--profile', action='store_true',
+                       help='Medir fases del step (p50/p95/p99) y exportarlas a TensorBoard')
+    
+    # Validación rápida sin importar torch/SB3/Malmo
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Solo validar argumentos y salir (sin cargar torch/SB3/Malmo)')
+    
+    return parser.parse_args(argv)
 
 
-def train():
-    args = parse_args()
+def train(argv=None):
+    args = parse_args(argv)
+    
+    if args.dry_run:
+        resume = getattr(args, "resume", None)
+        if resume and not os.path.exists(resume):
+            print(f"[ERROR] Model to resume not found: {resume}")
+            sys.exit(1)
+        print("[DRY RUN] Arguments OK")
+        return
+    
+    # Imports pesados solo cuando realmente se entrena
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.monitor import Monitor
+    from stable_baselines3.common.logger import configure
+    
+    from src.malmo_env_wrapper import MalmoToolProgressionEnv
+    from src.curriculum_manager import CurriculumManager
+    from src.callbacks import CurriculumCallback, ProfilerCallback, MixedCurriculumCallback, SMDPCallback
+    from src.step_profiler import StepProfiler
     
     # Create directories
     os.makedirs(args.log_dir, exist_ok=True)
@@ -160,23 +131,53 @@ def train():
     
     # Initialize curriculum manager
     curriculum = None
-    if args.curriculum:
+    if args.curriculum and not args.mixed_curriculum:
         curriculum = CurriculumManager(
             start_stage=args.start_stage,
             log_dir=os.path.join(args.log_dir, run_name, "curriculum")
         )
     
     # Create environment
-    env = MalmoToolProgressionEnv(
-        curriculum_manager=curriculum,
-        port=args.port,
-        max_episode_steps=args.max_steps,
-        seed=args.seed
-    )
+    profiler = StepProfiler(enabled=True if args.profile else None)  # None: MALMO_PROFILE
+    if args.mixed_curriculum:
+        # Las 4 etapas a la vez: un sub-entorno por puerto, etapa elegida por StageSampler
+        from src.mixed_curriculum import make_mixed_curriculum_env
+        env = make_mixed_curriculum_env(
+            ports=args.ports or [args.port],
+            log_dir=os.path.join(args.log_dir, run_name, "envs"),
+            max_episode_steps=args.max_steps,
+            seed=args.seed,
+            wait_for_fresh_obs=args.wait_fresh_obs,
+            reuse_arena=args.reuse_arena,
+            options=args.options,
+            gamma=args.gamma,
+            action_repeat=args.action_repeat,
+            obs_profile=args.obs_profile
+        )
+    else:
+        env = MalmoToolProgressionEnv(
+            curriculum_manager=curriculum,
+            port=args.port,
+            max_episode_steps=args.max_steps,
+            seed=args.seed,
+            fallback_ports=args.fallback_ports,
+            profiler=profiler,
+            wait_for_fresh_obs=args.wait_fresh_obs,
+            reuse_arena=args.reuse_arena,
+            obs_profile=args.obs_profile
+        )
+        if args.action_repeat:
+            from src.action_repeat_wrapper import ActionRepeatWrapper
+            env = ActionRepeatWrapper(env, args.action_repeat)
+        if args.options:
+            # Macro-acciones con recompensa descontada por duración (SMDP)
+            from src.option_wrapper import OptionWrapper
+            env = OptionWrapper(env, gamma=args.gamma)
     
     # Wrap with Monitor
     log_path = os.path.join(args.log_dir, run_name)
-    env = Monitor(env, log_path)
+    if not args.mixed_curriculum:
+        env = Monitor(env, log_path)
     
     # Configure logger
     logger = configure(log_path, ["stdout", "tensorboard"])
@@ -243,6 +244,11 @@ def train():
             )
             model.set_logger(logger)
     
+    if args.options:
+        # GAE con gamma^k por transición (SMDPCallback copia el gamma^k de cada info)
+        from src.smdp import install_smdp_rollout_buffer
+        install_smdp_rollout_buffer(model)
+    
     # Create callbacks
     callbacks = []
     
@@ -250,10 +256,20 @@ def train():
         curriculum_callback = CurriculumCallback(
             curriculum_manager=curriculum,
             save_path=args.model_dir,
+            checkpoint_prefix="",
             verbose=1
         )
         callbacks.append(curriculum_callback)
     
+    if args.mixed_curriculum:
+        callbacks.append(MixedCurriculumCallback(env.sampler))
+    
+    if args.options:
+        callbacks.append(SMDPCallback())
+    
+    if profiler.enabled:
+        callbacks.append(ProfilerCallback(profiler, log_path))
+    
     # Calculate total timesteps
     # Aproximadamente: episodes * max_steps
     total_timesteps = args.episodes * args.max_steps